@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+存档写入功能测试脚本
+验证区块段 long 数组编解码、区域文件写入后读回，以及修改已有存档时的区块检查
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mcschematic import Version
+from nbtlib.tag import Compound, Int, List as NbtList, String
+from pynbs import Note
+
+from nbs2save.core.anvil import (
+    AnvilWorldOutputStrategy,
+    decode_block_states,
+    decode_chunk,
+    encode_block_states,
+    encode_chunk,
+    palette_key,
+    read_region,
+    write_region,
+    write_region_file,
+)
+from nbs2save.core.core import GroupProcessor
+from nbs2save.core.nbt_utils import block_state_compound
+
+
+def _region_blocks(path):
+    """读回区域文件中的全部非空气方块 {坐标: palette_key}。"""
+    blocks = {}
+    for payload in read_region(path).values():
+        chunk = decode_chunk(payload)
+        for section in chunk["sections"]:
+            palette = [palette_key(entry) for entry in section["block_states"]["palette"]]
+            states = decode_block_states(section["block_states"].get("data"), len(palette))
+            for index, state in enumerate(states.tolist()):
+                key = palette[state]
+                if key[0] == "minecraft:air":
+                    continue
+                y, rest = divmod(index, 256)
+                z, x = divmod(rest, 16)
+                blocks[(int(chunk["xPos"]) * 16 + x, int(section["Y"]) * 16 + y, int(chunk["zPos"]) * 16 + z)] = key
+    return blocks
+
+
+def _expected(blocks):
+    return {pos: palette_key(block_state_compound(block)) for pos, block in blocks}
+
+
+class Anvil_Functionality_Test(unittest.TestCase):
+    """存档写入功能测试类"""
+
+    def test_01_block_states_round_trip(self):
+        """测试各种调色板大小下 long 数组编码后解码得到原索引（含 4 位下限与不整除 64 的位宽）"""
+        rng = np.random.default_rng(0)
+        for palette_size in (2, 16, 17, 33, 100, 4096):
+            states = rng.integers(0, palette_size, 4096)
+            data = encode_block_states(states, palette_size)
+            bits = max(4, (palette_size - 1).bit_length())
+            self.assertEqual(len(data), -(-4096 // (64 // bits)))
+            np.testing.assert_array_equal(decode_block_states(data.view(np.int64), palette_size), states)
+
+    def test_02_region_read_back(self):
+        """测试写入新区域文件后读回的方块与写入的完全一致，再次写入时合并到已有区块"""
+        first = [
+            ((x, y, z), "minecraft:note_block[note=3]") for x in range(0, 40, 3) for y in (-60, 5) for z in (0, 17)
+        ]
+        second = [((1, 5, 1), "minecraft:redstone_wire"), ((0, 5, 0), "minecraft:stone")]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "r.0.0.mca")
+            version = Version.JE_1_21_4.value
+            self.assertEqual(write_region((path, first, version, 6)), (6, 0))
+            self.assertEqual(_region_blocks(path), _expected(first))
+
+            self.assertEqual(write_region((path, second, version, 6)), (0, 1))
+            expected = _expected(first)
+            expected.update(_expected(second))
+            self.assertEqual(_region_blocks(path), expected)
+
+    def test_03_overwritten_block_entities_dropped(self):
+        """测试被覆盖位置上原有的方块实体被移除，其他位置的保留"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "r.0.0.mca")
+            version = Version.JE_1_21_4.value
+            write_region((path, [((2, 0, 2), "minecraft:chest")], version, 6))
+
+            chunk = decode_chunk(read_region(path)[0])
+            chunk["block_entities"] = NbtList[Compound](
+                [
+                    Compound({"id": String("minecraft:chest"), "x": Int(x), "y": Int(0), "z": Int(2)})
+                    for x in (2, 3)
+                ]
+            )
+            write_region_file(path, {0: encode_chunk(chunk)}, {})
+
+            write_region((path, [((2, 0, 2), "minecraft:stone")], version, 6))
+            entities = decode_chunk(read_region(path)[0])["block_entities"]
+            self.assertEqual([int(entity["x"]) for entity in entities], [3])
+
+    def test_04_existing_world_missing_chunks_rejected(self):
+        """测试修改已有存档时方块落在未生成的区块上会拒绝写入，且不改动区域文件"""
+        group_config = {
+            0: {
+                "base_coords": ("0", "0", "0"),
+                "layers": [0],
+                "block": {"base": "minecraft:iron_block", "cover": "minecraft:iron_block"},
+            }
+        }
+        notes = [Note(tick=tick, layer=0, instrument=0, key=45, panning=0) for tick in range(40)]
+        with tempfile.TemporaryDirectory() as tmp:
+            world = os.path.join(tmp, "world")
+            config = dict(output_file=world, data_version=Version.JE_1_21_4)
+
+            # 先用较短的曲子新建虚空世界，之后较长的曲子会延伸到未生成的区块
+            processor = GroupProcessor(notes[:10], 10, config, group_config)
+            processor.set_output_strategy(AnvilWorldOutputStrategy())
+            processor.process()
+            region = os.path.join(world, "region", "r.0.0.mca")
+            with open(region, "rb") as f:
+                before = f.read()
+
+            processor = GroupProcessor(notes, 40, config, group_config)
+            processor.set_output_strategy(AnvilWorldOutputStrategy())
+            with self.assertRaisesRegex(ValueError, "尚未生成"):
+                processor.process()
+            with open(region, "rb") as f:
+                self.assertEqual(f.read(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
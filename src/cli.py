@@ -6,25 +6,43 @@
 通过命令行方式调用NBS转换工具，适用于自动化处理场景
 """
 
+import json
+import sys
+
 import pynbs
+from mcschematic import Version
 
 from nbs2save.core.config import GENERATE_CONFIG, GROUP_CONFIG
-from nbs2save.core.core import GroupProcessor
+from nbs2save.core.anvil import AnvilWorldOutputStrategy
+from nbs2save.core.composite import CompositeOutputStrategy
+from nbs2save.core.core import GroupProcessor, OutputFormatStrategy
+from nbs2save.core.diff import DiffOutputStrategy
+from nbs2save.core.litematic import LitematicOutputStrategy
+from nbs2save.core.load import LoadAnalysisStrategy
 from nbs2save.core.mcfunction import McFunctionOutputStrategy
+from nbs2save.core.packing import pack_song
+from nbs2save.core.partition import partition_song
+from nbs2save.core.rcon import RconOutputStrategy
+from nbs2save.core.remap import remap_schematic
 from nbs2save.core.schematic import SchematicOutputStrategy
+from nbs2save.core.structure import StructureOutputStrategy
 
 
 # --------------------------
 # 工具函数
 # --------------------------
 def log(message: str):
-    """简单的日志输出函数"""
-    print(message)
+    """简单的日志输出函数（输出写入标准输出时改为标准错误）"""
+    print(message, file=_log_stream())
 
 
 def progress(value: int):
     """进度显示函数"""
-    print(f"进度: {value}%")
+    print(f"进度: {value}%", file=_log_stream())
+
+
+def _log_stream():
+    return sys.stderr if GENERATE_CONFIG["output_file"] == "-" else sys.stdout
 
 
 # --------------------------
@@ -40,31 +58,135 @@ class CLIProcessor(GroupProcessor):
         global_max_tick = nbs.header.song_length
 
         # 调用父类初始化
-        super().__init__(all_notes, global_max_tick, GENERATE_CONFIG, GROUP_CONFIG)
+        super().__init__(all_notes, global_max_tick, GENERATE_CONFIG, GROUP_CONFIG, nbs.header.tempo)
 
         # 注册回调
         self.set_log_callback(log)
         self.set_progress_callback(progress)
 
 
+def create_output_strategy(output_type: str, sink=None) -> OutputFormatStrategy:
+    """根据输出类型创建对应的输出策略，sink 为输出目标文件对象（None 表示写入 output_file）。"""
+    if sink is not None and output_type not in ("mcfunction", "schematic", "litematic", "diff"):
+        raise ValueError(f"输出类型 {output_type} 不能写入标准输出")
+    if output_type == "mcfunction":
+        return McFunctionOutputStrategy(sink)
+    elif output_type == "schematic":
+        return SchematicOutputStrategy(sink)
+    elif output_type == "litematic":
+        return LitematicOutputStrategy(sink)
+    elif output_type == "structure":
+        return StructureOutputStrategy()
+    elif output_type == "world":
+        return AnvilWorldOutputStrategy()
+    elif output_type == "diff":
+        return DiffOutputStrategy(sink)
+    elif output_type == "rcon":
+        return RconOutputStrategy()
+    elif output_type == "load":
+        return LoadAnalysisStrategy()
+    else:
+        raise ValueError(f"不支持的输出类型: {output_type}")
+
+
+def remap() -> None:
+    """只改写已生成 .schem 的调色板与数据版本，不重新生成。"""
+    output_file = GENERATE_CONFIG["output_file"]
+    if output_file == "-":
+        target = sys.stdout.buffer
+    else:
+        target = output_file if output_file.endswith(".schem") else output_file + ".schem"
+    changes = remap_schematic(
+        GENERATE_CONFIG["remap_file"],
+        target,
+        GENERATE_CONFIG.get("remap_blocks") or {},
+        GENERATE_CONFIG["data_version"].value,
+        GENERATE_CONFIG.get("compression_level"),
+        GENERATE_CONFIG.get("workers"),
+    )
+    for old, new in changes.items():
+        log(f"├─ {old} -> {new}")
+    log(f"└─ 调色板重映射: {len(changes)} 项")
+
+
+def partition() -> None:
+    """按轨道冲突自动分组，写出 <output_file>_groups.json。"""
+    song = pynbs.read(GENERATE_CONFIG["input_file"])
+    template = next(iter(GROUP_CONFIG.values()), None)
+    group_config, bound = partition_song(song, GENERATE_CONFIG, template)
+    for group_id, group in group_config.items():
+        log(f"├─ 轨道组 {group_id}: Z={group['base_coords'][2]}，轨道 {group['layers']}")
+    log(f"└─ 自动分组: {len(group_config)} 组（下界 {bound}）")
+    write_group_config(group_config)
+
+
+def pack() -> None:
+    """按各组实际生成范围自动排布 base_coords，写出 <output_file>_groups.json。"""
+    song = pynbs.read(GENERATE_CONFIG["input_file"])
+    group_config, (low, high) = pack_song(song, GENERATE_CONFIG, GROUP_CONFIG)
+    for group_id, group in group_config.items():
+        log(f"├─ 轨道组 {group_id}: {group['base_coords']}")
+    size = tuple(h - l + 1 for l, h in zip(low, high))
+    log(f"└─ 自动排布: 整体范围 {low} ~ {high}，尺寸 {size[0]}x{size[1]}x{size[2]}")
+    write_group_config(group_config)
+
+
+def estimate() -> None:
+    """试运行：只估算输出规模（方块数、范围、命令数、文件大小），不生成任何文件。"""
+    for line in CLIProcessor().estimate().lines():
+        log(line)
+
+
+def write_group_config(group_config: dict) -> None:
+    """把全局配置与轨道组配置写出为 <output_file>_groups.json（格式与 GUI 保存的配置相同，可直接加载）。"""
+    app_config = {
+        key: value.name if isinstance(value, Version) else value for key, value in GENERATE_CONFIG.items()
+    }
+    path = GENERATE_CONFIG["output_file"] + "_groups.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"app_config": app_config, "group_config": group_config}, f, indent=2, ensure_ascii=False)
+    log(f"已写出分组配置: {path}")
+
+
 # --------------------------
 # 程序入口
 # --------------------------
 def main() -> None:
+    if GENERATE_CONFIG["type"] == "remap":
+        remap()
+        return
+    if GENERATE_CONFIG["type"] == "partition":
+        partition()
+        return
+    if GENERATE_CONFIG["type"] == "pack":
+        pack()
+        return
+    if GENERATE_CONFIG["type"] == "estimate":
+        estimate()
+        return
+
     processor = CLIProcessor()
 
     # 根据配置选择默认输出策略（核心会根据每组的生成模式自动选择对应策略）
+    # type 为列表时一次遍历同时生成多种输出；output_file 为 "-" 时写入标准输出
+    # load_report 开启时同时输出红石负载分析报告
     output_type = GENERATE_CONFIG["type"]
-    if output_type == "mcfunction":
-        processor.set_output_strategy(McFunctionOutputStrategy())
-    elif output_type == "schematic":
-        processor.set_output_strategy(SchematicOutputStrategy())
+    sink = sys.stdout.buffer if GENERATE_CONFIG["output_file"] == "-" else None
+    if isinstance(output_type, (list, tuple)):
+        if sink is not None:
+            raise ValueError("同时输出多种格式时不能写入标准输出")
+        strategy = CompositeOutputStrategy(create_output_strategy(t) for t in output_type)
     else:
-        raise ValueError(f"不支持的输出类型: {output_type}")
+        strategy = create_output_strategy(output_type, sink)
+    if GENERATE_CONFIG.get("load_report") and not isinstance(strategy, LoadAnalysisStrategy):
+        strategy = CompositeOutputStrategy([strategy, LoadAnalysisStrategy()])
+    processor.set_output_strategy(strategy)
 
     # 执行处理
     processor.process()
-    print("处理完成!")
+    if sink is not None:
+        sink.flush()
+    log("处理完成!")
 
 
 if __name__ == "__main__":
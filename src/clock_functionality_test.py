@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+时钟布局功能测试脚本
+沿生成的红石结构从输入端逐格走一遍（中继器累加档位，红石线检查传输距离），
+验证每个主干道覆盖方块被激活的时间与其 tick 一致，以及各布局的方块数
+"""
+
+import os
+import random
+import sys
+import unittest
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mcschematic import Version
+from pynbs import Note
+
+from nbs2save.core.clock import CompactClock, split_delay
+from nbs2save.core.core import GroupProcessor
+from nbs2save.core.schematic import SchematicOutputStrategy
+from nbs2save.core.tiling import schematic_blocks
+
+COVER = "minecraft:iron_block"
+# 中继器朝向（输入端方向） -> 信号传播方向
+_OUTPUT = {"west": (1, 0), "east": (-1, 0), "north": (0, 1), "south": (0, -1)}
+
+
+def _generate(notes, max_tick, **group):
+    """生成单个轨道组（基准坐标为原点），返回 (processor, {坐标: 方块状态})。"""
+    group_config = {
+        0: {
+            "base_coords": ("0", "0", "0"),
+            "layers": sorted({note.layer for note in notes}),
+            "block": {"base": "minecraft:stone", "cover": COVER},
+            **group,
+        }
+    }
+    return _generate_groups(notes, max_tick, group_config)
+
+
+def _generate_groups(notes, max_tick, group_config):
+    """按 group_config 生成全部轨道组，返回 (最后一组的 processor, {坐标: 方块状态})。"""
+    config = dict(output_file="unused", data_version=Version.JE_1_21_4)
+    processor = GroupProcessor(notes, max_tick, config, group_config)
+    strategy = SchematicOutputStrategy()
+    processor.set_output_strategy(strategy)
+    processor.generate()
+    return processor, schematic_blocks(strategy.schem)
+
+
+def _walk(blocks, start, came_from=None, time=0, strength=15):
+    """
+    从 start 处的第一个中继器（或 came_from 之后的红石线）沿信号方向走过时钟结构，返回 {覆盖方块坐标: 到达时间}。
+    中继器累加档位并把信号强度恢复为 15，覆盖方块（或偏移为 0 的音符盒）沿原方向继续，
+    红石线从 15 开始每格衰减 1（最多 MAX_WIRE_LENGTH 格）、可以逐格爬升或下降，且不能分叉。
+    """
+    arrivals = {}
+    x, y, z = start
+    while True:
+        block = blocks.get((x, y, z), "")
+        if block.startswith("minecraft:repeater"):
+            dx, dz = _OUTPUT[block.split("facing=")[1].rstrip("]")]
+            assert came_from in (None, (x - dx, y, z - dz)), f"中继器 {(x, y, z)} 的输入端不在信号来的方向"
+            time += int(block.split("delay=")[1].split(",")[0])
+            strength, came_from, (x, y, z) = 15, (x, y, z), (x + dx, y, z + dz)
+        elif block == COVER or block.startswith("minecraft:note_block"):  # 偏移为 0 的音符盒代替覆盖方块
+            arrivals[(x, y, z)] = time
+            dx, dz = x - came_from[0], z - came_from[2]
+            strength, came_from, (x, y, z) = 15, (x, y, z), (x + dx, y, z + dz)
+        elif block.startswith("minecraft:redstone_wire") and came_from is not None:
+            assert strength >= 1, f"红石线 {(x, y, z)} 处信号衰减为 0"
+            strength -= 1
+            following = []
+            for dx, dz in _OUTPUT.values():
+                for dy in (0, 1, -1):
+                    neighbor = (x + dx, y + dy, z + dz)
+                    state = blocks.get(neighbor, "")
+                    if neighbor == came_from:
+                        continue
+                    if state.startswith("minecraft:redstone_wire") or (
+                        dy == 0
+                        and state.startswith("minecraft:repeater")
+                        and _OUTPUT[state.split("facing=")[1].rstrip("]")] == (dx, dz)
+                    ):
+                        following.append(neighbor)
+            if not following:
+                return arrivals
+            assert len(following) == 1, f"红石线 {(x, y, z)} 处分叉: {following}"
+            came_from, (x, y, z) = (x, y, z), following[0]
+        else:
+            return arrivals
+
+
+def _walk_taps(blocks, processor):
+    """共用时钟的轨道组：从每个分支（以及从 tick 0 开始的一段的输入端）出发走一遍，返回 {覆盖方块坐标: 到达时间}。"""
+    clock, y, z = processor.clock, processor.base_y, processor.base_z
+    arrivals = _walk(blocks, (clock.tick_x(0) - 1, y, z)) if 0 in clock.ticks else {}
+    for tick in clock.ticks:
+        if not clock.mounted_links(tick):
+            continue
+        # 起点红石线在被共用组 tick - stages 的覆盖方块顶上（该覆盖方块在 tick - stages + 1 时被激活）
+        (x0, h0, z0, _), (x1, h1, z1, _) = clock.mounted_links(tick)[0], clock.links(tick)[0]
+        start, came_from = (x1, y + h1, z + z1), (x0, y + h0, z + z0)
+        arrivals.update(_walk(blocks, start, came_from, time=tick - clock.stages + 1, strength=14))
+    return arrivals
+
+
+def _expected(processor, ticks):
+    """各 tick 的覆盖方块坐标 -> tick + 1（每个覆盖方块在其 tick 之后 1 个红石刻被激活）。"""
+    return {
+        (processor.get_tick_x(tick), processor.get_tick_y(tick), processor.get_tick_z(tick)): tick + 1 for tick in ticks
+    }
+
+
+def _sparse_notes(ticks, seed=1):
+    """间隔 1~20 个 tick 的稀疏音符，最后一个音符之后还有很长的休止。"""
+    rng = random.Random(seed)
+    notes, tick = [], 0
+    while tick < ticks:
+        notes.append(Note(tick=tick, layer=0, instrument=0, key=45, panning=rng.choice((-30, 0, 20))))
+        tick += rng.choice((1, 1, 2, 3, 4, 5, 8, 13, 20))
+    return notes
+
+
+class Clock_Functionality_Test(unittest.TestCase):
+    """时钟布局功能测试类"""
+
+    def test_01_split_delay(self):
+        """测试延迟拆分为最少个数的中继器，除 1 外每个至少 2 档，总和不变"""
+        self.assertEqual(split_delay(1), [1])
+        self.assertEqual(split_delay(6), [3, 3])
+        for delay in range(1, 60):
+            parts = split_delay(delay)
+            self.assertEqual(sum(parts), delay)
+            self.assertEqual(len(parts), -(-delay // 4))
+            self.assertTrue(all(1 <= part <= 4 for part in parts))
+            if delay > 1:
+                self.assertTrue(all(part >= 2 for part in parts))
+        with self.assertRaises(ValueError):
+            split_delay(0)
+
+    def test_02_compact_rest_compression(self):
+        """测试紧凑布局每段休止的中继器档位之和等于两个音符的 tick 差，主干道在最后一个音符处结束"""
+        ticks = [0, 1, 2, 7, 30, 31, 100]
+        clock = CompactClock(ticks + [7, 2], 5)
+        self.assertEqual(clock.ticks, ticks)
+        self.assertEqual(clock.max_tick, 100)
+        self.assertEqual(clock.repeaters(0), [(4, 1)])
+        previous, x = -1, 4
+        for tick in ticks:
+            chain = clock.repeaters(tick)
+            self.assertEqual(sum(delay for _, delay in chain), tick - previous)
+            self.assertEqual([repeater_x for repeater_x, _ in chain], list(range(x, x + len(chain))))
+            self.assertEqual(clock.tick_x(tick), x + len(chain))
+            previous, x = tick, clock.tick_x(tick) + 1
+        self.assertEqual(list(clock.ticks_between(2, 31)), [2, 7, 30])
+        self.assertEqual(clock.start_x(3), clock.repeaters(7)[0][0])
+        self.assertIsNone(clock.start_x(101))
+        self.assertEqual(clock.length, clock.tick_x(100) - 4 + 1)
+
+    def test_03_compact_timing_walk(self):
+        """测试紧凑布局生成的主干道：每个有音符的 tick 的覆盖方块恰好在 tick + 1 时被激活，之后不再有主干道"""
+        notes = _sparse_notes(600)
+        note_ticks = sorted({note.tick for note in notes})
+        processor, blocks = _generate(notes, 1000, compact=True)
+        self.assertEqual(_walk(blocks, (-1, 0, 0)), _expected(processor, note_ticks))
+        self.assertEqual(max(x for x, _, _ in blocks), processor.clock.tick_x(note_ticks[-1]))
+
+        # 与默认布局的时序相同，方块更少
+        default, default_blocks = _generate(notes, 1000)
+        self.assertEqual(_walk(default_blocks, (-1, 0, 0)), _expected(default, range(1001)))
+        self.assertLess(len(blocks), len(default_blocks) // 2)
+
+    def test_04_dense_timing_and_blocks(self):
+        """测试密集布局两条时钟线的时序，覆盖方块下方没有基座，方块数少于默认布局"""
+        rng = random.Random(3)
+        notes = [
+            Note(tick=tick, layer=layer, instrument=0, key=45, panning=pan * 10)
+            for tick in range(300)
+            for layer, pan in enumerate(rng.sample(range(-4, 5), 3))
+            if rng.random() < 0.5
+        ]
+        processor, blocks = _generate(notes, 300, generation_mode="dense")
+        arrivals = {**_walk(blocks, (-1, 0, 0)), **_walk(blocks, (-1, 3, 0))}
+        self.assertEqual(arrivals, _expected(processor, range(301)))
+
+        # 覆盖方块下方（包括声像平台的主干道位置）都没有基座，偏移为 0 的音符盒下方是其乐器基座
+        centered = {note.tick for note in notes if note.panning == 0}
+        for tick in set(range(301)) - centered:
+            below = (processor.clock.tick_x(tick), processor.clock.lane_offset(tick) - 1, 0)
+            self.assertNotIn(below, blocks)
+
+        default, default_blocks = _generate(notes, 300)
+        # 与默认布局相比少了每个覆盖方块下方的基座，多了奇数线 tick 1 的第二个中继器及其基座
+        self.assertEqual(len(blocks), len(default_blocks) - (301 - len(centered)) + 2)
+        self.assertEqual(processor.estimate().total, len(blocks))
+        extent = [max(pos[1] for pos in found) - min(pos[1] for pos in found) for found in (blocks, default_blocks)]
+        self.assertEqual(extent[0], extent[1] + 3)
+        self.assertEqual(max(pos[0] for pos in blocks), 300)
+
+    def test_05_serpentine_turns_without_rests(self):
+        """测试蛇形布局在每个 tick 都有音符时也能转弯：平铺与上下错开两种行距下时序都不变，音符盒上方都是空气"""
+        rng = random.Random(4)
+        for span, stacked in ((3, False), (7, True), (10, True)):
+            notes = [
+                Note(tick=tick, layer=layer, instrument=tick % 16, key=45, panning=pan * 10)
+                for tick in range(400)
+                for layer, pan in enumerate(rng.sample(range(-span, span + 1), 3))
+            ]
+            with self.subTest(span=span):
+                processor, blocks = _generate(notes, 399, generation_mode="serpentine", segment_length=24)
+                self.assertEqual(processor.clock.stacked, stacked)
+                self.assertGreater(processor.clock.rows, 10)
+                self.assertEqual(_walk(blocks, (-1, 0, 0)), _expected(processor, range(400)))
+                for (x, y, z), block in blocks.items():
+                    if block.startswith("minecraft:note_block"):
+                        self.assertNotIn((x, y + 1, z), blocks)
+                self.assertEqual(processor.estimate().total, len(blocks))
+
+    def test_06_serpentine_compact_chains_cross_turns(self):
+        """测试紧凑蛇形布局的中继器链跨过转弯时时序不变"""
+        notes = _sparse_notes(800)
+        processor, blocks = _generate(notes, 800, generation_mode="serpentine", segment_length=12, compact=True)
+        ticks = sorted({note.tick for note in notes})
+        crossing = [tick for tick in ticks if any("repeater" in block for *_, block in processor.clock.links(tick))]
+        self.assertTrue(crossing)
+        self.assertEqual(_walk(blocks, (-1, 0, 0)), _expected(processor, ticks))
+        self.assertEqual(processor.estimate().total, len(blocks))
+
+    def test_07_shared_clock_taps(self):
+        """测试共用时钟的分支：各段的覆盖方块都按时激活，方块数和中继器数少于独立时钟，音符盒上方都是空气"""
+        rng = random.Random(7)
+        pans = (-20, -10, 0, 10, 20)
+        source = [Note(tick=tick, layer=0, instrument=0, key=45, panning=rng.choice(pans)) for tick in range(300)]
+        # (本组基准坐标, 相邻音符的最大间隔, 分支经过的中继器数)
+        for coords, gap, stages in ((("0", "0", "6"), 20, 1), (("0", "3", "-10"), 20, 1), (("0", "-2", "30"), 60, 3)):
+            sharing, tick = [], 0
+            while tick < 300:
+                sharing.append(Note(tick=tick, layer=1, instrument=0, key=45, panning=rng.choice(pans)))
+                tick += rng.randint(1, gap)
+            block = {"base": "minecraft:stone", "cover": COVER}
+            group_config = {
+                0: {"base_coords": ("0", "0", "0"), "layers": [0], "block": block},
+                1: {"base_coords": coords, "layers": [1], "block": block},
+            }
+            notes = sorted(source + sharing, key=lambda note: note.tick)
+            with self.subTest(coords=coords):
+                _, own_blocks = _generate_groups(notes, 300, group_config)
+                group_config[1]["shared_clock"] = 0
+                processor, blocks = _generate_groups(notes, 300, group_config)
+                clock = processor.clock
+                self.assertEqual(clock.stages, stages)
+                self.assertEqual(_walk_taps(blocks, processor), _expected(processor, clock.ticks))
+                self.assertEqual(_walk(blocks, (-1, 0, 0)), {(tick * 2, 0, 0): tick + 1 for tick in range(301)})
+
+                repeaters = [sum(block.startswith("minecraft:repeater") for block in found.values())
+                             for found in (blocks, own_blocks)]
+                self.assertLess(repeaters[0], repeaters[1])
+                self.assertLess(len(blocks), len(own_blocks))
+                for (x, y, z), block in blocks.items():
+                    if block.startswith("minecraft:note_block"):
+                        self.assertNotIn((x, y + 1, z), blocks)
+                self.assertEqual(processor.estimate().total, len(blocks))
+
+        # 隔一个 tick 就有音符时每段都要一条分支，共用时钟比独立时钟需要更多方块，拒绝共用
+        sharing = [Note(tick=tick, layer=1, instrument=0, key=45, panning=0) for tick in range(0, 300, 2)]
+        with self.assertRaisesRegex(ValueError, "更多"):
+            _generate_groups(source + sharing, 300, group_config)
+
+
+if __name__ == "__main__":
+    unittest.main()
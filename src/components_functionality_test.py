@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+低更新元件模式功能测试脚本
+验证中继器线只用于音符密集的外侧声像偏移，并确实减少播放时的红石更新
+"""
+
+import os
+import random
+import sys
+import unittest
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mcschematic import Version
+from pynbs import Note
+
+from nbs2save.core.components import plan_lanes
+from nbs2save.core.core import GroupProcessor
+from nbs2save.core.load import LoadAnalysisStrategy
+
+
+def _dense_outer_song(ticks):
+    """外侧偏移 ±5、±6 几乎每个 tick 都有音符，内侧偶尔有 ±2 的音符。"""
+    rng = random.Random(1)
+    notes = []
+    for tick in range(ticks):
+        for layer, pan in enumerate((5, 6, -5, -6)):
+            if rng.random() < 0.8:
+                notes.append(Note(tick=tick, layer=layer, instrument=0, key=45, panning=pan * 10))
+        if rng.random() < 0.3:
+            notes.append(Note(tick=tick, layer=4, instrument=0, key=45, panning=rng.choice((-2, 2)) * 10))
+    return notes
+
+
+def _load(notes, ticks, components):
+    group_config = {
+        0: {
+            "base_coords": ("0", "0", "0"),
+            "layers": list(range(5)),
+            "block": {"base": "minecraft:iron_block", "cover": "minecraft:iron_block"},
+            "components": components,
+        }
+    }
+    config = dict(output_file="unused", data_version=Version.JE_1_21_4)
+    processor = GroupProcessor(notes, ticks, config, group_config)
+    strategy = LoadAnalysisStrategy()
+    processor.set_output_strategy(strategy)
+    processor.process()
+    return strategy.report
+
+
+class Components_Functionality_Test(unittest.TestCase):
+    """低更新元件模式功能测试类"""
+
+    def test_01_sparse_offsets_keep_platforms(self):
+        """测试稀疏的偏移不铺中继器线"""
+        notes = [(tick, pan) for tick in range(0, 400, 20) for pan in (4, -7)]
+        self.assertEqual(plan_lanes("default", notes, list(range(400))), {})
+
+    def test_02_dense_outer_offsets(self):
+        """测试只给密集的外侧偏移铺中继器线，内侧偏移保留红石线声像平台"""
+        notes = [(tick, pan) for tick in range(400) for pan in (5, 6)] + [(tick, 2) for tick in range(0, 400, 7)]
+        lanes = plan_lanes("default", notes, list(range(400)))
+        self.assertEqual(sorted(lanes), [5, 6])
+        self.assertEqual(lanes[6], (0, 399))
+
+    def test_03_fewer_state_changes(self):
+        """测试中继器线模式的每刻状态变化数低于红石线声像平台，且全部音符都被激活"""
+        notes = _dense_outer_song(400)
+        redstone = _load(notes, 400, "redstone")
+        repeater = _load(notes, 400, "repeater")
+        self.assertEqual(repeater.unreached, 0)
+        self.assertLess(repeater.percentile(50), redstone.percentile(50))
+        self.assertLess(repeater.total.max(), redstone.total.max())
+
+
+if __name__ == "__main__":
+    unittest.main()
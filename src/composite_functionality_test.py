@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+组合输出功能测试脚本
+验证组合输出的各子策略写出的文件与单独输出时完全相同，且结构类子策略共用一份方块数据
+"""
+
+import gzip
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mcschematic import Version
+from nbtlib import File
+from pynbs import Note
+
+from nbs2save.core.composite import CompositeOutputStrategy
+from nbs2save.core.core import GroupProcessor
+from nbs2save.core.litematic import GroupRecordingSchematic, LitematicOutputStrategy
+from nbs2save.core.load import LoadAnalysisStrategy
+from nbs2save.core.mcfunction import McFunctionOutputStrategy
+from nbs2save.core.schematic import SchematicOutputStrategy
+from nbs2save.core.structure import StructureOutputStrategy
+
+NOTES = [
+    Note(tick=tick, layer=layer, instrument=tick % 16, key=45, panning=(tick % 5 - 2) * 20)
+    for tick in range(120)
+    for layer in (0, 1)
+]
+
+
+def _group_config(staircase):
+    block = {"base": "minecraft:iron_block", "cover": "minecraft:iron_block"}
+    return {
+        0: {"base_coords": ("0", "0", "0"), "layers": [0], "block": block},
+        1: {
+            "base_coords": ("0", "10", "30"),
+            "layers": [1],
+            "block": block,
+            "generation_mode": "staircase" if staircase else "default",
+        },
+    }
+
+
+def _run(strategy, output_file, staircase=False, **extra):
+    config = dict(output_file=output_file, data_version=Version.JE_1_21_4, **extra)
+    processor = GroupProcessor(NOTES, 120, config, _group_config(staircase))
+    processor.set_output_strategy(strategy)
+    processor.process()
+
+
+def _read_outputs(output_file):
+    """读取一次输出产生的全部文件（gzip 文件解压后比较，.litematic 另外去掉创建/修改时间）。"""
+    dir_name, file_name = os.path.split(output_file)
+    outputs = {}
+    for root, _, files in os.walk(dir_name):
+        for name in files:
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, dir_name).replace(file_name, "<out>", 1)
+            with open(path, "rb") as f:
+                data = f.read()
+            if data[:2] == b"\x1f\x8b":
+                data = gzip.decompress(data)
+            if name.endswith(".litematic"):
+                root_tag = File.parse(io.BytesIO(data))
+                root_tag["Metadata"].pop("TimeCreated")
+                root_tag["Metadata"].pop("TimeModified")
+                data = root_tag
+            outputs[relative] = data
+    return outputs
+
+
+class Composite_Functionality_Test(unittest.TestCase):
+    """组合输出功能测试类"""
+
+    def _children(self):
+        return [
+            SchematicOutputStrategy(),
+            LitematicOutputStrategy(),
+            StructureOutputStrategy(),
+            McFunctionOutputStrategy(),
+        ]
+
+    def test_01_outputs_match_separate_runs(self):
+        """测试组合输出写出的每个文件都与单独输出相同（含阶梯模式轨道组）"""
+        for staircase in (False, True):
+            with tempfile.TemporaryDirectory() as tmp:
+                os.makedirs(os.path.join(tmp, "composite"))
+                _run(CompositeOutputStrategy(self._children()), os.path.join(tmp, "composite", "song"), staircase)
+                combined = _read_outputs(os.path.join(tmp, "composite", "song"))
+
+                separate = {}
+                for index, child in enumerate(self._children()):
+                    os.makedirs(os.path.join(tmp, str(index)))
+                    _run(child, os.path.join(tmp, str(index), "song"), staircase)
+                    # mcfunction 单独输出时阶梯模式轨道组另存一个 .schem，以 .schem 输出写出的为准
+                    for name, data in _read_outputs(os.path.join(tmp, str(index), "song")).items():
+                        separate.setdefault(name, data)
+                self.assertEqual(combined.keys(), separate.keys())
+                for name in combined:
+                    self.assertEqual(combined[name], separate[name], name)
+
+    def test_02_structure_children_share_one_schematic(self):
+        """测试结构类子策略共用一个记录轨道组的结构对象，负载分析结果与单独运行相同"""
+        with tempfile.TemporaryDirectory() as tmp:
+            children = self._children() + [LoadAnalysisStrategy()]
+            _run(CompositeOutputStrategy(children), os.path.join(tmp, "song"), staircase=True)
+            schems = {id(child.schem) for child in children if hasattr(child, "schem")}
+            self.assertEqual(len(schems), 1)
+            self.assertIsInstance(children[0].schem, GroupRecordingSchematic)
+
+            alone = LoadAnalysisStrategy()
+            _run(alone, os.path.join(tmp, "alone"), staircase=True)
+            self.assertEqual(children[-1].report.lines(), alone.report.lines())
+
+    def test_03_pipelined_tiles_keep_own_schematic(self):
+        """测试流水线分片导出的子策略保留自己的结构对象，其余结构类子策略仍然共用"""
+        with tempfile.TemporaryDirectory() as tmp:
+            children = [SchematicOutputStrategy(), LitematicOutputStrategy(), StructureOutputStrategy()]
+            _run(CompositeOutputStrategy(children), os.path.join(tmp, "song"), tile_size=32, pipeline_ticks=16)
+            self.assertIsNot(children[0].schem, children[1].schem)
+            self.assertIs(children[1].schem, children[2].schem)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并行 gzip 压缩功能测试脚本
+验证多成员 gzip 输出解压后与原始数据一致
+"""
+
+import gzip
+import io
+import os
+import random
+import sys
+import tempfile
+import unittest
+import zlib
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from nbtlib import File
+from nbtlib.tag import Compound, Int, IntArray, String
+
+from nbs2save.core.compression import ParallelGzipWriter, normalize_level, write_gzipped
+
+
+def _data(size):
+    rng = random.Random(size)
+    # 一半随机字节、一半重复内容，兼顾可压缩与不可压缩的数据
+    return bytes(rng.getrandbits(8) for _ in range(size // 2)) + b"nbs2save" * (size // 16)
+
+
+class Compression_Functionality_Test(unittest.TestCase):
+    """并行 gzip 压缩功能测试类"""
+
+    def test_01_round_trip(self):
+        """测试不同数据大小、块大小、线程数与压缩级别下解压结果与原始数据一致"""
+        for size in (0, 1, 1000, 70000):
+            data = _data(size)
+            for workers in (1, 4):
+                for level in (0, 6, 9):
+                    buffer = io.BytesIO()
+                    with ParallelGzipWriter(buffer, level, workers, block_size=4096) as writer:
+                        # 分多次写入，写入边界与块边界不对齐
+                        for start in range(0, len(data), 3000):
+                            writer.write(data[start : start + 3000])
+                    self.assertEqual(gzip.decompress(buffer.getvalue()), data)
+
+    def test_02_multiple_members(self):
+        """测试超过块大小的数据按块拆成多个 gzip 成员"""
+        data = _data(20000)
+        buffer = io.BytesIO()
+        with ParallelGzipWriter(buffer, workers=3, block_size=4096) as writer:
+            writer.write(data)
+        output = buffer.getvalue()
+        members = 0
+        while output:
+            decompressor = zlib.decompressobj(31)
+            decompressor.decompress(output)
+            output = decompressor.unused_data
+            members += 1
+        self.assertEqual(members, -(-len(data) // 4096))
+
+    def test_03_write_gzipped_targets(self):
+        """测试写入路径、二进制流与文本流（使用其 buffer）得到相同的 NBT"""
+        root = Compound({"name": String("song"), "data": IntArray(list(range(5000))), "size": Int(3)})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.nbt")
+            write_gzipped(path, File(root).write, workers=4)
+            with gzip.open(path) as f:
+                self.assertEqual(File.parse(f), File(root))
+
+            binary = io.BytesIO()
+            write_gzipped(binary, File(root).write, level=1)
+            self.assertEqual(File.parse(io.BytesIO(gzip.decompress(binary.getvalue()))), File(root))
+
+            text = io.TextIOWrapper(io.BytesIO())
+            write_gzipped(text, File(root).write)
+            self.assertEqual(File.parse(io.BytesIO(gzip.decompress(text.buffer.getvalue()))), File(root))
+
+    def test_04_level_validation(self):
+        """测试压缩级别默认为 9，超出 0~9 时报错"""
+        self.assertEqual(normalize_level(None), 9)
+        self.assertEqual(normalize_level("3"), 3)
+        with self.assertRaises(ValueError):
+            normalize_level(10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+差量输出功能测试脚本
+验证相同版本的差量为空，以及把差量命令应用到旧版本后得到新版本
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pynbs
+from mcschematic import Version
+from pynbs import Note
+
+from nbs2save.core.core import GroupProcessor
+from nbs2save.core.diff import AIR_BLOCK, DiffOutputStrategy, collect_blocks, compute_block_diff, diff_to_commands
+from nbs2save.core.schematic import SchematicOutputStrategy
+
+GROUP_CONFIG = {
+    0: {
+        "base_coords": ("0", "0", "0"),
+        "layers": [0, 1],
+        "block": {"base": "minecraft:iron_block", "cover": "minecraft:iron_block"},
+    }
+}
+CONFIG = dict(output_file="unused", data_version=Version.JE_1_21_4)
+
+
+def _song(ticks, shift=0):
+    return [
+        Note(tick=tick, layer=layer, instrument=(tick + shift) % 16, key=45, panning=((tick + layer) % 5 - 2) * 20)
+        for tick in range(ticks)
+        for layer in (0, 1)
+        if (tick + layer + shift) % 3
+    ]
+
+
+def _save_nbs(notes, path):
+    song = pynbs.new_file(tempo=10.0)
+    song.layers.extend(pynbs.Layer(id=i) for i in range(2))
+    song.notes.extend(notes)
+    song.save(path)
+
+
+def _diff(output_file, notes, ticks, previous_file):
+    config = dict(CONFIG, output_file=output_file, previous_file=previous_file)
+    processor = GroupProcessor(notes, ticks, config, GROUP_CONFIG)
+    processor.set_output_strategy(DiffOutputStrategy())
+    processor.process()
+    with open(output_file + ".mcfunction", encoding="utf-8") as f:
+        return [line for line in f.read().splitlines() if line]
+
+
+def _apply(blocks, commands):
+    """按顺序执行 setblock / fill 命令（只沿 Z 轴填充），空气表示移除。"""
+    blocks = dict(blocks)
+    for command in commands:
+        parts = command.split(" ")
+        if parts[0] == "setblock":
+            x, y, z = map(int, parts[1:4])
+            positions, block = [(x, y, z)], parts[4]
+        else:
+            x, y, z0, _, _, z1 = map(int, parts[1:7])
+            positions, block = [(x, y, z) for z in range(z0, z1 + 1)], parts[7]
+        for pos in positions:
+            if block == AIR_BLOCK:
+                blocks.pop(pos, None)
+            else:
+                blocks[pos] = block
+    return blocks
+
+
+class Diff_Functionality_Test(unittest.TestCase):
+    """差量输出功能测试类"""
+
+    def test_01_same_version_empty_diff(self):
+        """测试旧版本为同一首曲子的 .schem 或 .nbs 时差量为空"""
+        with tempfile.TemporaryDirectory() as tmp:
+            # 与应用中一样从 .nbs 读取音符与长度
+            nbs = os.path.join(tmp, "old.nbs")
+            _save_nbs(_song(80), nbs)
+            song = pynbs.read(nbs)
+            notes, ticks = song.notes, song.header.song_length
+
+            schem = os.path.join(tmp, "old")
+            processor = GroupProcessor(notes, ticks, dict(CONFIG, output_file=schem), GROUP_CONFIG)
+            processor.set_output_strategy(SchematicOutputStrategy())
+            processor.process()
+
+            self.assertEqual(_diff(os.path.join(tmp, "a"), notes, ticks, schem + ".schem"), [])
+            self.assertEqual(_diff(os.path.join(tmp, "b"), notes, ticks, nbs), [])
+
+    def test_02_commands_turn_old_into_new(self):
+        """测试把差量命令应用到旧版本的方块后与新版本完全一致（含移除的方块）"""
+        old = collect_blocks(_song(100), 100, CONFIG, GROUP_CONFIG)
+        new = collect_blocks(_song(70, shift=1), 70, CONFIG, GROUP_CONFIG)
+        changes = compute_block_diff(old, new)
+        self.assertTrue(any(block == AIR_BLOCK for block in changes.values()))
+        commands = diff_to_commands(changes)
+        self.assertEqual(_apply(old, commands), new)
+        self.assertLess(len(commands), len(changes))
+
+    def test_03_removals_after_placements_top_down(self):
+        """测试先放置后移除，移除按 Y 从高到低（沙子下方的屏障最后移除）"""
+        changes = {
+            (0, 0, 0): AIR_BLOCK,
+            (0, 1, 0): AIR_BLOCK,
+            (1, 0, 0): "minecraft:stone",
+            (1, 0, 1): "minecraft:stone",
+        }
+        self.assertEqual(
+            diff_to_commands(changes),
+            ["fill 1 0 0 1 0 1 minecraft:stone", "setblock 0 1 0 minecraft:air", "setblock 0 0 0 minecraft:air"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+试运行功能测试脚本
+验证阶梯模式与低更新元件模式的估算与实际生成的方块完全一致
+"""
+
+import os
+import random
+import re
+import sys
+import unittest
+from collections import Counter
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mcschematic import Version
+from pynbs import Note
+
+from nbs2save.core.composite import CompositeOutputStrategy
+from nbs2save.core.core import GroupProcessor
+from nbs2save.core.schematic import SchematicOutputStrategy
+
+
+class _Recorder:
+    """代替 MCSchematic，记录每个位置最后写入的方块。"""
+
+    def __init__(self):
+        self.blocks = {}
+
+    def setBlock(self, position, block):
+        self.blocks[tuple(position)] = block
+
+
+def _song(ticks):
+    """外侧偏移 ±5、±6 密集（会铺中继器线），内侧偏移稀疏，沙子类基座的乐器也在其中。"""
+    rng = random.Random(2)
+    notes = []
+    for tick in range(ticks):
+        for layer, pan in enumerate((5, 6, -5, -6)):
+            if rng.random() < 0.8:
+                notes.append(Note(tick=tick, layer=layer, instrument=tick % 16, key=45, panning=pan * 10))
+        if rng.random() < 0.5:
+            pan = rng.choice((-4, -3, -1, 0, 1, 2, 3, 4))
+            notes.append(Note(tick=tick, layer=4, instrument=rng.randrange(16), key=50, panning=pan * 10))
+    return notes
+
+
+def _group_config(generation_mode, components):
+    return {
+        0: {
+            "base_coords": ("0", "0", "0"),
+            "layers": list(range(5)),
+            "block": {"base": "minecraft:stone", "cover": "minecraft:iron_block"},
+            "generation_mode": generation_mode,
+            "components": components,
+        },
+        1: {
+            "base_coords": ("3", "-2", "4"),
+            "layers": [4],
+            "block": {"base": "minecraft:stone", "cover": "minecraft:iron_block"},
+            "generation_mode": generation_mode,
+            "compact": True,
+        },
+    }
+
+
+class Estimate_Functionality_Test(unittest.TestCase):
+    """试运行功能测试类"""
+
+    def check(self, generation_mode, components):
+        notes = _song(200)
+        config = dict(output_file="unused", data_version=Version.JE_1_21_4)
+        estimate = GroupProcessor(notes, 200, config, _group_config(generation_mode, components)).estimate()
+
+        # 组合策略让阶梯模式的轨道组与结构输出共用同一个记录对象
+        processor = GroupProcessor(notes, 200, config, _group_config(generation_mode, components))
+        schematic = SchematicOutputStrategy()
+        schematic.schem = _Recorder()
+        processor.set_output_strategy(CompositeOutputStrategy([schematic]))
+        processor.generate()
+        counts = Counter(re.sub(r"\[.*\]$", "", block) for block in schematic.schem.blocks.values())
+        self.assertEqual(estimate.blocks, dict(counts))
+
+    def test_01_staircase(self):
+        """测试阶梯向下模式（含中继器线）的估算与生成一致"""
+        self.check("staircase", "repeater")
+        self.check("staircase", "redstone")
+
+    def test_02_staircase_up(self):
+        """测试阶梯向上模式（含中继器线）的估算与生成一致"""
+        self.check("staircase_up", "repeater")
+        self.check("staircase_up", "redstone")
+
+    def test_03_default_lanes(self):
+        """测试默认模式中继器线的估算与生成一致"""
+        self.check("default", "repeater")
+
+
+if __name__ == "__main__":
+    unittest.main()
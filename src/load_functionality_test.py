@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+红石负载分析功能测试脚本
+验证信号传播模拟能到达各生成模式下的全部音符盒
+"""
+
+import os
+import sys
+import unittest
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mcschematic import Version
+from pynbs import Note
+
+from nbs2save.core.core import GroupProcessor
+from nbs2save.core.load import LoadAnalysisStrategy
+
+
+def _wide_pan_song(ticks):
+    """每个 tick 一个音符，声像偏移在 -7~7 之间循环（每个 tick 只有一侧，红石线不会被音符盒截断）。"""
+    pans = [pan for pan in range(-7, 8) if pan]
+    return [
+        Note(tick=tick, layer=0, instrument=0, key=45, panning=pans[tick % len(pans)] * 10) for tick in range(ticks)
+    ]
+
+
+def _analyze(notes, ticks, generation_mode):
+    group_config = {
+        0: {
+            "base_coords": ("0", "0", "0"),
+            "layers": [0],
+            "block": {"base": "minecraft:iron_block", "cover": "minecraft:iron_block"},
+            "generation_mode": generation_mode,
+        }
+    }
+    config = dict(output_file="unused", data_version=Version.JE_1_21_4)
+    processor = GroupProcessor(notes, ticks, config, group_config)
+    strategy = LoadAnalysisStrategy()
+    processor.set_output_strategy(strategy)
+    processor.process()
+    return strategy.report
+
+
+class Load_Functionality_Test(unittest.TestCase):
+    """红石负载分析功能测试类"""
+
+    def test_01_default_reaches_all_notes(self):
+        """测试默认模式的全部音符盒都被信号激活"""
+        report = _analyze(_wide_pan_song(150), 150, "default")
+        self.assertEqual(report.unreached, 0)
+        self.assertEqual(report.components["note"], 150)
+
+    def test_02_staircase_reaches_all_notes(self):
+        """测试阶梯模式 |偏移| >= 3 的音符盒由红石线下方被弱充能的方块激活"""
+        report = _analyze(_wide_pan_song(150), 150, "staircase")
+        self.assertEqual(report.unreached, 0)
+        self.assertEqual(report.components["note"], 150)
+
+
+if __name__ == "__main__":
+    unittest.main()
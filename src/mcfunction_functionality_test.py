@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+mcfunction 输出功能测试脚本
+验证相对坐标模式下放置函数调用的函数ID
+"""
+
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from nbs2save.core.mcfunction import McFunctionOutputStrategy
+
+
+def _function_id(**config):
+    return McFunctionOutputStrategy.get_function_id(SimpleNamespace(config=config))
+
+
+class McFunction_Functionality_Test(unittest.TestCase):
+    """mcfunction 输出功能测试类"""
+
+    def test_01_default_function_id_sanitized(self):
+        """测试默认函数ID由输出文件名生成，空格与中文等非法字符替换为下划线"""
+        self.assertEqual(_function_id(output_file="out/My Song 小星星"), "nbs2save:my_song____")
+        self.assertEqual(_function_id(output_file="songs/test-1.v2"), "nbs2save:test-1.v2")
+
+    def test_02_configured_function_id_kept(self):
+        """测试显式配置的 function_id 原样使用"""
+        self.assertEqual(_function_id(output_file="a b", function_id="pack:song"), "pack:song")
+
+
+if __name__ == "__main__":
+    unittest.main()
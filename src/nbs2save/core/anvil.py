@@ -0,0 +1,686 @@
+# -*- coding: utf-8 -*-
+"""
+Anvil 存档写入器
+----------------------
+把生成的方块直接写入 Minecraft 存档的区域文件（region/r.X.Z.mca），无需进入游戏粘贴。
+
+主要流程
+1. 与 .schem 输出共用同一份方块数据（SchematicOutputStrategy 生成的 MCSchematic）。
+2. 按区域文件（32x32 区块）分组，每个区域作为一个任务交给进程池。
+3. 任务内按区块段（16x16x16）分组，用 NumPy 编码调色板与 long 数组，
+   已有区块则先解码原有方块再合并（离线修改已有存档），被覆盖位置上的方块实体与计划刻一并移除。
+   修改已有存档时要求方块所在区块都已生成，否则拒绝写入（不会新建区块阻止地形生成）。
+4. 每个区块单独 zlib 压缩后重写整个区域文件。
+
+仅支持 1.18 及以上的区块格式（数据版本 >= 2860），目标存档必须处于未被游戏打开的状态。
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import time
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from nbtlib import File
+from nbtlib.tag import Byte, Compound, Int, List as NbtList, Long, LongArray, String
+
+from .compression import DEFAULT_COMPRESSION_LEVEL, normalize_level
+from .core import GroupProcessor
+from .nbt_utils import block_state_compound, save_gzipped_nbt
+from .schematic import SchematicOutputStrategy
+from .tiling import ColumnIndexedSchematic, Position, schematic_blocks
+
+# 1.18 引入的区块格式（无 Level 包装、区块段自带调色板）的最低数据版本
+MIN_DATA_VERSION = 2860
+# 主世界高度范围（1.18+）
+MIN_SECTION_Y = -4
+MAX_SECTION_Y = 19
+
+SECTOR_SIZE = 4096
+# 区域文件边长（32 个区块）
+REGION_SIZE = 512
+COMPRESSION_GZIP = 1
+COMPRESSION_ZLIB = 2
+COMPRESSION_NONE = 3
+
+AIR = "minecraft:air"
+VOID_BIOME = "minecraft:the_void"
+
+PaletteKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+# --------------------------
+# Anvil 存档输出策略
+# --------------------------
+class AnvilWorldOutputStrategy(SchematicOutputStrategy):
+    """直接写入存档区域文件的策略实现（方块数据与 .schem 输出相同）。"""
+
+    def __init__(self):
+        super().__init__()
+        self._lock: WorldLock | None = None  # 写入期间持有的存档锁
+        self._existing = False  # 是否修改已有存档
+        self._chunk_counts = [0, 0]  # 新建区块数、修改区块数
+        self._spawn: Position | None = None  # 已写入方块的最小坐标（新建存档的出生点）
+
+    def initialize(self, processor: GroupProcessor):
+        """
+        初始化输出格式，检查数据版本
+
+        参数:
+        processor: GroupProcessor实例
+        """
+        super().initialize(processor)
+        if processor.config["data_version"].value < MIN_DATA_VERSION:
+            raise ValueError("直接写入存档仅支持 Minecraft 1.18 及以上版本")
+
+    def pipeline_column_width(self, processor: GroupProcessor) -> int | None:
+        """
+        流水线模式下以区域文件宽度（512 格）为列宽，整列区域生成完毕即可写入。
+        修改已有存档时不提前写出：需要先确认全部方块所在区块都已生成，才能开始修改存档。
+        """
+        if not processor.config.get("pipeline_ticks"):
+            return None
+        if os.path.isfile(os.path.join(self.get_world_dir(processor), "level.dat")):
+            return None
+        return REGION_SIZE
+
+    def finalize(self, processor: GroupProcessor):
+        """
+        完成输出，把方块写入存档。
+        world_dir 下已有 level.dat 时修改已有存档，否则新建一个虚空世界。
+
+        参数:
+        processor: GroupProcessor实例
+        """
+        world_dir = self.get_world_dir(processor)
+        try:
+            self.open_world(processor)
+            if isinstance(self.schem, ColumnIndexedSchematic):
+                # 流水线模式：大部分区域已在生成过程中写入
+                self.write_completed(processor, self.schem.pop_completed())
+                self.close_pipeline()
+            else:
+                blocks = schematic_blocks(self.schem)
+                if self._existing:
+                    self.check_chunks(processor, blocks)
+                jobs = self._region_jobs(processor, blocks)
+                processor.log(f"├─ 方块数量: {len(blocks)}，区域文件: {len(jobs)} 个")
+                workers = processor.config.get("workers") or None
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    for done, result in enumerate(pool.map(write_region, jobs), 1):
+                        self._count_chunks(result)
+                        processor.update_progress(int(done * 100 / len(jobs)))
+
+            if not self._existing:
+                spawn = self._spawn or (0, 64, 0)
+                level = processor.config.get("compression_level")
+                write_void_level_dat(world_dir, processor.config["data_version"], spawn, level)
+        finally:
+            self.close_pipeline()
+            if self._lock is not None:
+                self._lock.release()
+                self._lock = None
+
+        created, patched = self._chunk_counts
+        processor.log(f"├─ 新建区块: {created}，修改区块: {patched}")
+        processor.log("└─ 光照与高度图将在游戏加载区块时重新计算")
+
+    def write_completed(self, processor: GroupProcessor, blocks: Dict[Position, str]):
+        """流水线模式：把已完成区域的方块按区域文件交给后台写入。"""
+        self.open_world(processor)
+        jobs = self._region_jobs(processor, blocks)
+        if jobs:
+            self.submit_jobs(processor, write_region, jobs, self._count_chunks)
+
+    def open_world(self, processor: GroupProcessor):
+        """第一次写入前锁定存档并判断是否为已有存档（之后的调用直接返回）。"""
+        if self._lock is not None:
+            return
+        world_dir = self.get_world_dir(processor)
+        os.makedirs(os.path.join(world_dir, "region"), exist_ok=True)
+        self._lock = WorldLock(world_dir).acquire()
+        self._existing = os.path.isfile(os.path.join(world_dir, "level.dat"))
+        self._chunk_counts = [0, 0]
+        self._spawn = None
+        processor.log(
+            f"\n>> 写入存档: {world_dir}（{'修改已有存档' if self._existing else '新建虚空世界'}）"
+        )
+
+    def check_chunks(self, processor: GroupProcessor, blocks: Dict[Position, str]):
+        """
+        修改已有存档前检查方块所在区块是否都已生成。
+        为未生成的区块新建完整的虚空区块会让游戏永远不再生成那里的地形，因此直接拒绝写入。
+
+        参数:
+        processor: GroupProcessor实例
+        blocks: 要写入的 {坐标: 方块状态}
+        """
+        missing = missing_chunks(os.path.join(self.get_world_dir(processor), "region"), blocks)
+        if missing:
+            sample = "、".join(f"({x}, {z})" for x, z in missing[:5])
+            more = f" 等 {len(missing)} 个区块" if len(missing) > 5 else ""
+            raise ValueError(
+                f"已有存档中以下区块尚未生成: {sample}{more}；"
+                "请先进入游戏加载这些区块，或调整 base_coords，或写入新存档"
+            )
+
+    def _region_jobs(self, processor: GroupProcessor, blocks: Dict[Position, str]) -> List[Tuple]:
+        if blocks:
+            lowest = min(blocks)
+            self._spawn = lowest if self._spawn is None else min(self._spawn, lowest)
+        region_dir = os.path.join(self.get_world_dir(processor), "region")
+        data_version = processor.config["data_version"].value
+        level = normalize_level(processor.config.get("compression_level"))
+        return [
+            (os.path.join(region_dir, f"r.{rx}.{rz}.mca"), region_blocks, data_version, level)
+            for (rx, rz), region_blocks in sorted(group_by_region(blocks).items())
+        ]
+
+    def _count_chunks(self, result: Tuple[int, int]):
+        self._chunk_counts[0] += result[0]
+        self._chunk_counts[1] += result[1]
+
+    @staticmethod
+    def get_world_dir(processor: GroupProcessor) -> str:
+        """存档目录：world_dir，未设置时使用 output_file。"""
+        return processor.config.get("world_dir") or processor.config["output_file"]
+
+
+# --------------------------
+# 存档锁
+# --------------------------
+class WorldLock:
+    """
+    尝试锁定存档的 session.lock，游戏正在使用存档时拒绝写入。
+    游戏运行时会独占该文件，离线写入期间也阻止游戏打开存档。
+    """
+
+    def __init__(self, world_dir: str):
+        self.path = os.path.join(world_dir, "session.lock")
+        self._file = None
+
+    def acquire(self) -> "WorldLock":
+        """锁定存档；无法锁定时抛出 RuntimeError。"""
+        self._file = open(self.path, "a+b")
+        try:
+            _lock_file(self._file)
+        except OSError:
+            self._file.close()
+            raise RuntimeError(f"存档正在被使用（无法锁定 {self.path}），请先关闭游戏或服务器")
+        return self
+
+    def release(self):
+        """释放存档锁。"""
+        _unlock_file(self._file)
+        self._file.close()
+
+    def __enter__(self) -> "WorldLock":
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+
+    def _unlock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock_file(f):
+        fcntl.lockf(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _unlock_file(f):
+        fcntl.lockf(f, fcntl.LOCK_UN)
+
+
+# --------------------------
+# level.dat
+# --------------------------
+def write_void_level_dat(world_dir: str, data_version, spawn: Position, level: Optional[int] = None):
+    """
+    写出一个超平坦虚空世界的 level.dat（创造模式、允许作弊、不生成建筑）。
+
+    参数:
+    world_dir: 存档目录
+    data_version: mcschematic.Version
+    spawn: 出生点坐标
+    level: 压缩级别
+    """
+    version_name = data_version.name[3:].replace("_", ".")
+    overworld = Compound(
+        {
+            "type": String("minecraft:overworld"),
+            "generator": Compound(
+                {
+                    "type": String("minecraft:flat"),
+                    "settings": Compound(
+                        {
+                            "layers": NbtList[Compound]([]),
+                            "biome": String(VOID_BIOME),
+                            "features": Byte(0),
+                            "lakes": Byte(0),
+                            "structure_overrides": NbtList[String]([]),
+                        }
+                    ),
+                }
+            ),
+        }
+    )
+    nether = Compound(
+        {
+            "type": String("minecraft:the_nether"),
+            "generator": Compound(
+                {
+                    "type": String("minecraft:noise"),
+                    "settings": String("minecraft:nether"),
+                    "biome_source": Compound(
+                        {"type": String("minecraft:multi_noise"), "preset": String("minecraft:nether")}
+                    ),
+                }
+            ),
+        }
+    )
+    end = Compound(
+        {
+            "type": String("minecraft:the_end"),
+            "generator": Compound(
+                {
+                    "type": String("minecraft:noise"),
+                    "settings": String("minecraft:end"),
+                    "biome_source": Compound({"type": String("minecraft:the_end")}),
+                }
+            ),
+        }
+    )
+
+    now = Long(int(time.time() * 1000))
+    data = Compound(
+        {
+            "DataVersion": Int(data_version.value),
+            "version": Int(19133),
+            "LevelName": String(os.path.basename(os.path.abspath(world_dir))),
+            "GameType": Int(1),
+            "allowCommands": Byte(1),
+            "hardcore": Byte(0),
+            "Difficulty": Byte(0),
+            "initialized": Byte(1),
+            "LastPlayed": now,
+            "Time": Long(0),
+            "DayTime": Long(6000),
+            "SpawnX": Int(spawn[0]),
+            "SpawnY": Int(spawn[1] + 2),
+            "SpawnZ": Int(spawn[2]),
+            "Version": Compound(
+                {
+                    "Id": Int(data_version.value),
+                    "Name": String(version_name),
+                    "Series": String("main"),
+                    "Snapshot": Byte(0),
+                }
+            ),
+            "DataPacks": Compound(
+                {"Enabled": NbtList[String]([String("vanilla")]), "Disabled": NbtList[String]([])}
+            ),
+            "WorldGenSettings": Compound(
+                {
+                    "seed": Long(0),
+                    "generate_features": Byte(0),
+                    "bonus_chest": Byte(0),
+                    "dimensions": Compound(
+                        {
+                            "minecraft:overworld": overworld,
+                            "minecraft:the_nether": nether,
+                            "minecraft:the_end": end,
+                        }
+                    ),
+                }
+            ),
+        }
+    )
+    save_gzipped_nbt(Compound({"Data": data}), os.path.join(world_dir, "level.dat"), level)
+
+
+# --------------------------
+# 方块分组
+# --------------------------
+def group_by_region(blocks: Dict[Position, str]) -> Dict[Tuple[int, int], List[Tuple[Position, str]]]:
+    """按区域文件（512x512）分组，并检查高度范围。"""
+    min_y, max_y = MIN_SECTION_Y * 16, MAX_SECTION_Y * 16 + 15
+    regions: Dict[Tuple[int, int], List[Tuple[Position, str]]] = defaultdict(list)
+    for pos, block in blocks.items():
+        x, y, z = pos
+        if not min_y <= y <= max_y:
+            raise ValueError(f"方块超出世界高度范围 {min_y}~{max_y}: {pos}")
+        regions[(x >> 9, z >> 9)].append((pos, block))
+    return regions
+
+
+def missing_chunks(region_dir: str, blocks: Dict[Position, str]) -> List[Tuple[int, int]]:
+    """返回方块所在、但区域文件中尚不存在的区块坐标 (区块X, 区块Z)，按坐标排序。"""
+    chunks = {(x >> 4, z >> 4) for x, _, z in blocks}
+    existing: Dict[Tuple[int, int], Set[int]] = {}
+    missing = []
+    for chunk_x, chunk_z in sorted(chunks):
+        region = (chunk_x >> 5, chunk_z >> 5)
+        if region not in existing:
+            existing[region] = stored_chunks(os.path.join(region_dir, f"r.{region[0]}.{region[1]}.mca"))
+        if (chunk_x & 31) + (chunk_z & 31) * 32 not in existing[region]:
+            missing.append((chunk_x, chunk_z))
+    return missing
+
+
+# --------------------------
+# 区域文件读写
+# --------------------------
+def stored_chunks(path: str) -> Set[int]:
+    """只读取区域文件头，返回已保存区块的序号集合。"""
+    if not os.path.isfile(path) or os.path.getsize(path) < SECTOR_SIZE * 2:
+        return set()
+    with open(path, "rb") as f:
+        locations = struct.unpack(">1024I", f.read(SECTOR_SIZE))
+    return {index for index, location in enumerate(locations) if location >> 8 and location & 0xFF}
+
+
+def read_region(path: str) -> Dict[int, bytes]:
+    """读取区域文件，返回 {区块序号: 压缩类型字节 + 压缩数据}。"""
+    chunks: Dict[int, bytes] = {}
+    if not os.path.isfile(path):
+        return chunks
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < SECTOR_SIZE * 2:
+        return chunks
+    for index in range(1024):
+        location = struct.unpack_from(">I", data, index * 4)[0]
+        offset, sectors = (location >> 8) * SECTOR_SIZE, location & 0xFF
+        if not offset or not sectors:
+            continue
+        length = struct.unpack_from(">I", data, offset)[0]
+        chunks[index] = data[offset + 4 : offset + 4 + length]
+    return chunks
+
+
+def write_region_file(path: str, chunks: Dict[int, bytes], timestamps: Dict[int, int]):
+    """把 {区块序号: 压缩类型字节 + 压缩数据} 写成区域文件（先写临时文件再替换）。"""
+    locations = bytearray(SECTOR_SIZE)
+    stamps = bytearray(SECTOR_SIZE)
+    body = BytesIO()
+    sector = 2
+    for index in sorted(chunks):
+        payload = chunks[index]
+        record = struct.pack(">I", len(payload)) + payload
+        sectors = -(-len(record) // SECTOR_SIZE)
+        if sectors > 255:
+            raise ValueError(f"区块数据过大（{len(record)} 字节），超出区域文件单个区块上限")
+        body.write(record + b"\0" * (sectors * SECTOR_SIZE - len(record)))
+        struct.pack_into(">I", locations, index * 4, (sector << 8) | sectors)
+        struct.pack_into(">I", stamps, index * 4, timestamps.get(index, 0))
+        sector += sectors
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(locations)
+        f.write(stamps)
+        f.write(body.getvalue())
+    os.replace(tmp_path, path)
+
+
+def decode_chunk(payload: bytes) -> Compound:
+    """解压并解析一个区块（支持 gzip、zlib 与不压缩）。"""
+    compression, data = payload[0], payload[1:]
+    if compression & 0x80:
+        raise ValueError("不支持外置存储的超大区块（.mcc）")
+    if compression in (COMPRESSION_GZIP, COMPRESSION_ZLIB):
+        data = zlib.decompress(data, 47)  # 47: 自动识别 gzip/zlib 头
+    elif compression != COMPRESSION_NONE:
+        raise ValueError(f"不支持的区块压缩格式: {compression}")
+    return File.parse(BytesIO(data))
+
+
+def encode_chunk(chunk: Compound, level: int = DEFAULT_COMPRESSION_LEVEL) -> bytes:
+    """序列化并 zlib 压缩一个区块。"""
+    buffer = BytesIO()
+    File(chunk).write(buffer)
+    return bytes([COMPRESSION_ZLIB]) + zlib.compress(buffer.getvalue(), level)
+
+
+def write_region(job: Tuple[str, List[Tuple[Position, str]], int, int]) -> Tuple[int, int]:
+    """
+    进程池任务：把一个区域内的方块写入区域文件。
+
+    返回:
+    (新建区块数, 修改区块数)
+    """
+    path, blocks, data_version, level = job
+    raw_chunks = read_region(path)
+    timestamps = _read_timestamps(path)
+
+    # 区域内方块的全局调色板与坐标数组
+    palette = sorted({block for _, block in blocks})
+    palette_index = {block: i for i, block in enumerate(palette)}
+    palette_keys = [palette_key(block_state_compound(block)) for block in palette]
+    coords = np.array([pos for pos, _ in blocks], dtype=np.int64).reshape(-1, 3)
+    values = np.fromiter((palette_index[b] for _, b in blocks), dtype=np.int64, count=len(blocks))
+
+    cx, cz, sy = coords[:, 0] >> 4, coords[:, 2] >> 4, coords[:, 1] >> 4
+    local = ((coords[:, 1] & 15) * 16 + (coords[:, 2] & 15)) * 16 + (coords[:, 0] & 15)
+
+    # 按 (区块, 区块段) 排序后切分
+    order = np.lexsort((sy, cz, cx))
+    cx, cz, sy, local, values = cx[order], cz[order], sy[order], local[order], values[order]
+    keys = np.stack([cx, cz, sy], axis=1)
+    boundaries = np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1
+    starts = np.concatenate([[0], boundaries])
+    ends = np.concatenate([boundaries, [len(keys)]])
+
+    sections: Dict[Tuple[int, int], Dict[int, Tuple[np.ndarray, np.ndarray]]] = defaultdict(dict)
+    for start, end in zip(starts, ends):
+        sections[(int(cx[start]), int(cz[start]))][int(sy[start])] = (local[start:end], values[start:end])
+
+    created = patched = 0
+    now = int(time.time())
+    for (chunk_x, chunk_z), chunk_sections in sections.items():
+        index = (chunk_x & 31) + (chunk_z & 31) * 32
+        if index in raw_chunks:
+            chunk = decode_chunk(raw_chunks[index])
+            patched += 1
+        else:
+            chunk = new_chunk(chunk_x, chunk_z, data_version)
+            created += 1
+        merge_sections(chunk, chunk_sections, palette_keys)
+        raw_chunks[index] = encode_chunk(chunk, level)
+        timestamps[index] = now
+
+    write_region_file(path, raw_chunks, timestamps)
+    return created, patched
+
+
+def _read_timestamps(path: str) -> Dict[int, int]:
+    if not os.path.isfile(path) or os.path.getsize(path) < SECTOR_SIZE * 2:
+        return {}
+    with open(path, "rb") as f:
+        f.seek(SECTOR_SIZE)
+        stamps = struct.unpack(">1024I", f.read(SECTOR_SIZE))
+    return {index: stamp for index, stamp in enumerate(stamps) if stamp}
+
+
+# --------------------------
+# 区块与区块段
+# --------------------------
+def new_chunk(chunk_x: int, chunk_z: int, data_version: int) -> Compound:
+    """
+    创建一个全空气的完整区块（所有区块段均为空气、虚空生物群系）。
+    只用于新建的虚空世界：已有存档中未生成的区块会在写入前被拒绝（见 check_chunks）。
+    """
+    return Compound(
+        {
+            "DataVersion": Int(data_version),
+            "xPos": Int(chunk_x),
+            "zPos": Int(chunk_z),
+            "yPos": Int(MIN_SECTION_Y),
+            "Status": String("minecraft:full"),
+            "LastUpdate": Long(0),
+            "InhabitedTime": Long(0),
+            "isLightOn": Byte(0),
+            "sections": NbtList[Compound](
+                [
+                    section_compound(y, [block_state_compound(AIR)], None)
+                    for y in range(MIN_SECTION_Y, MAX_SECTION_Y + 1)
+                ]
+            ),
+            "block_entities": NbtList[Compound]([]),
+            "block_ticks": NbtList[Compound]([]),
+            "fluid_ticks": NbtList[Compound]([]),
+            "PostProcessing": NbtList[NbtList]([]),
+            "Heightmaps": Compound(),
+            "structures": Compound({"starts": Compound(), "References": Compound()}),
+        }
+    )
+
+
+def section_compound(y: int, palette: List[Compound], data: Optional[np.ndarray]) -> Compound:
+    """构建区块段标签（调色板只有一项时不写 data）。"""
+    block_states = Compound({"palette": NbtList[Compound](palette)})
+    if data is not None:
+        block_states["data"] = LongArray(data.view(np.int64))
+    return Compound(
+        {
+            "Y": Byte(y),
+            "block_states": block_states,
+            "biomes": Compound({"palette": NbtList[String]([String(VOID_BIOME)])}),
+        }
+    )
+
+
+def merge_sections(
+    chunk: Compound,
+    chunk_sections: Dict[int, Tuple[np.ndarray, np.ndarray]],
+    palette_keys: List[PaletteKey],
+):
+    """
+    把新方块合并进区块的各个区块段。
+
+    参数:
+    chunk: 区块标签（原地修改）
+    chunk_sections: {区块段Y: (段内索引数组, 全局调色板索引数组)}
+    palette_keys: 全局调色板（palette_key 形式）
+    """
+    existing = {int(section["Y"]): section for section in chunk.get("sections", [])}
+    for section_y, (local, values) in chunk_sections.items():
+        section = existing.get(section_y)
+        if section is not None and "block_states" in section:
+            palette = list(section["block_states"]["palette"])
+            states = decode_block_states(section["block_states"].get("data"), len(palette))
+        else:
+            palette = [block_state_compound(AIR)]
+            states = np.zeros(4096, dtype=np.int64)
+
+        # 全局调色板索引 -> 区块段调色板索引
+        keys = [palette_key(entry) for entry in palette]
+        lookup = {}
+        for value in np.unique(values).tolist():
+            key = palette_keys[value]
+            if key not in keys:
+                keys.append(key)
+                palette.append(_compound_from_key(key))
+            lookup[value] = keys.index(key)
+        mapping = np.zeros(len(palette_keys), dtype=np.int64)
+        mapping[list(lookup)] = list(lookup.values())
+        states[local] = mapping[values]
+
+        # 去掉不再使用的调色板项
+        used, states = np.unique(states, return_inverse=True)
+        palette = [palette[i] for i in used.tolist()]
+        data = encode_block_states(states, len(palette)) if len(palette) > 1 else None
+
+        new_section = section_compound(section_y, palette, data)
+        if section is not None:
+            section["block_states"] = new_section["block_states"]
+        else:
+            chunk.setdefault("sections", NbtList[Compound]([])).append(new_section)
+
+    # 被覆盖位置上原有的方块实体与计划刻属于旧方块，一并移除
+    _drop_overwritten_entries(chunk, chunk_sections)
+
+    # 光照和高度图由游戏加载区块时重新计算
+    chunk["isLightOn"] = Byte(0)
+    chunk.pop("Heightmaps", None)
+
+
+def _drop_overwritten_entries(chunk: Compound, chunk_sections: Dict[int, Tuple[np.ndarray, np.ndarray]]):
+    """移除 block_entities、block_ticks、fluid_ticks 中位于新写入位置的条目。"""
+    keys = [key for key in ("block_entities", "block_ticks", "fluid_ticks") if chunk.get(key)]
+    if not keys:
+        return
+    origin_x, origin_z = int(chunk["xPos"]) * 16, int(chunk["zPos"]) * 16
+    written = set()
+    for section_y, (local, _) in chunk_sections.items():
+        xs = (origin_x + (local & 15)).tolist()
+        ys = (section_y * 16 + (local >> 8)).tolist()
+        zs = (origin_z + ((local >> 4) & 15)).tolist()
+        written.update(zip(xs, ys, zs))
+    for key in keys:
+        chunk[key] = NbtList[Compound](
+            [entry for entry in chunk[key] if (int(entry["x"]), int(entry["y"]), int(entry["z"])) not in written]
+        )
+
+
+def bits_per_block(palette_size: int) -> int:
+    """区块段方块状态每项位数（最少 4 位）。"""
+    return max(4, (palette_size - 1).bit_length())
+
+
+def encode_block_states(states: np.ndarray, palette_size: int) -> np.ndarray:
+    """
+    把 4096 个调色板索引打包为 long 数组（1.16+ 格式：条目不跨越 long，末尾补零）。
+    每个 long 放 64 // bits 项，整体 reshape 后一次移位求或完成。
+    """
+    bits = bits_per_block(palette_size)
+    per_long = 64 // bits
+    count = -(-len(states) // per_long)
+    padded = np.zeros(count * per_long, dtype=np.uint64)
+    padded[: len(states)] = states
+    shifts = np.arange(per_long, dtype=np.uint64) * np.uint64(bits)
+    return np.bitwise_or.reduce(padded.reshape(count, per_long) << shifts, axis=1)
+
+
+def decode_block_states(data, palette_size: int) -> np.ndarray:
+    """encode_block_states 的逆操作；data 缺失时表示整段都是调色板第 0 项。"""
+    if data is None or palette_size <= 1:
+        return np.zeros(4096, dtype=np.int64)
+    bits = bits_per_block(palette_size)
+    per_long = 64 // bits
+    longs = np.asarray(data, dtype=np.int64).view(np.uint64)
+    shifts = np.arange(per_long, dtype=np.uint64) * np.uint64(bits)
+    mask = np.uint64((1 << bits) - 1)
+    values = (longs[:, None] >> shifts) & mask
+    return values.reshape(-1)[:4096].astype(np.int64)
+
+
+def palette_key(entry: Compound) -> PaletteKey:
+    """调色板条目的可哈希形式，用于比较方块状态是否相同。"""
+    properties = entry.get("Properties", {})
+    return str(entry["Name"]), tuple(sorted((str(k), str(v)) for k, v in properties.items()))
+
+
+def _compound_from_key(key: PaletteKey) -> Compound:
+    name, properties = key
+    entry = Compound({"Name": String(name)})
+    if properties:
+        entry["Properties"] = Compound({k: String(v) for k, v in properties})
+    return entry
@@ -0,0 +1,526 @@
+# -*- coding: utf-8 -*-
+"""
+时钟布局
+----------------------
+决定每个 tick 的主干道位置以及驱动它的中继器。
+
+默认布局每个 tick 占 2 格：tick_x - 1 处一个 1 档中继器，tick_x 处覆盖方块，
+从 tick 0 铺到曲子结尾（包括休止和本组最后一个音符之后的部分）。
+
+紧凑布局（轨道组配置 compact=True）只为有音符的 tick 生成主干道：
+相邻两个有音符的 tick 之间的延迟 d 用 ceil(d / 4) 个 2~4 档中继器首尾相接补足，
+每个中继器 1 档对应 1 个 tick，时序与默认布局完全相同；主干道在本组最后一个音符处结束。
+
+密集布局（generation_mode='dense'）每个 tick 只占 1 格：
+偶数 tick 与奇数 tick 分别使用上下两条时钟线（奇数线高 DENSE_LANE_HEIGHT 格），
+每条线每 2 格前进 2 个 tick（2 档中继器 + 覆盖方块），两条线交错排列。
+主要缩短的是占地长度：中继器和红石线仍各需一个基座，方块数只比默认布局少覆盖方块下方的基座，高度多 DENSE_LANE_HEIGHT 格。
+
+蛇形布局（generation_mode='serpentine'）把主干道折叠成宽度固定的若干行，沿 +Z 依次排列、
+相邻两行方向相反，行尾用红石线 U 形转弯连接到下一行，整首曲子落在一个矩形区域内。
+转弯只有红石线，不产生延迟，中继器链可以跨过转弯；声像偏移较大时奇数行抬高 SERPENTINE_LIFT 格、
+与偶数行上下错开，行距减半，转弯的红石线仍不超过传输距离。
+
+共用时钟（轨道组配置 shared_clock）的轨道组不铺设完整的主干道，只为有音符的 tick 生成 1 档中继器 + 覆盖方块：
+连续的 tick 首尾相接，每段的第一个 tick 由所共用轨道组更早 tick 的覆盖方块引出的分支驱动，
+分支每段红石线之后经过一个 1 档中继器，时序与所共用的轨道组相同。
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# 中继器最大档位（每档 1 个红石刻）
+MAX_REPEATER_DELAY = 4
+# 密集布局中奇数 tick 时钟线相对偶数线的高度
+DENSE_LANE_HEIGHT = 3
+# 红石线的最大传输距离（信号强度 15，每格衰减 1）
+MAX_WIRE_LENGTH = 15
+# 蛇形布局转弯占用的列数（行尾之外）
+SERPENTINE_CORNER_WIDTH = 2
+# 蛇形布局转弯除行距外的红石线格数（行尾空出的 1 格、两侧各 2 格）
+SERPENTINE_CORNER_WIRES = 4
+# 蛇形布局上下错开时奇数行抬高的格数（上层行的屏障在下层音符盒上方的空气之上）
+SERPENTINE_LIFT = 4
+
+# 共用时钟分支每段红石线的最大步数（每段从信号强度 15 开始，末端至少为 1）
+TAP_STAGE_STEPS = MAX_WIRE_LENGTH - 1
+# 共用时钟分支越过被共用组声像平台的高度（相对其主干道，支撑方块位于音符盒上方的空气之上）
+TAP_BRIDGE_HEIGHT = 3
+
+# 中继器位置与档位
+Repeater = Tuple[int, int]
+# 时钟线之外的连接结构 (X 坐标, 相对基准 Y 的高度, Z 偏移, 方块状态)，下方都需要基座方块
+Link = Tuple[int, int, int, str]
+# 红石线连接方向 (dx, dz) -> 方块状态中的方向名
+_WIRE_SIDES = {(1, 0): "east", (0, -1): "north", (0, 1): "south", (-1, 0): "west"}
+
+
+def split_delay(delay: int) -> List[int]:
+    """
+    把 delay 个 tick 的延迟拆分为最少个数的中继器档位。
+
+    例: 1 -> [1]，4 -> [4]，6 -> [3, 3]，9 -> [3, 3, 3]
+    各档位尽量平均，除 delay 为 1 外每个中继器至少 2 档。
+    """
+    if delay < 1:
+        raise ValueError(f"中继器延迟必须为正数: {delay}")
+    count = -(-delay // MAX_REPEATER_DELAY)
+    base, extra = divmod(delay, count)
+    return [base + 1] * extra + [base] * (count - extra)
+
+
+class ClockLayout:
+    """
+    默认时钟布局：从 tick 0 到 max_tick 每个 tick 占 2 格，1 档中继器 + 覆盖方块。
+    子类重写各方法实现其他布局。
+
+    参数:
+    base_x: 轨道组基准 X 坐标（tick 0 的主干道位置）
+    max_tick: 需要生成主干道的最后一个 tick
+    """
+
+    # 覆盖方块下方是否需要基座方块
+    cover_needs_base = True
+
+    def __init__(self, base_x: int, max_tick: int):
+        self.base_x = base_x
+        self.max_tick = max_tick
+
+    def tick_x(self, tick: int) -> int:
+        """tick 的主干道 X 坐标（覆盖方块、声像平台和音符所在的列）。"""
+        return self.base_x + tick * 2
+
+    def lane_offset(self, tick: int) -> int:
+        """tick 所在时钟线相对基准 Y 坐标的高度。"""
+        return 0
+
+    def row_offset(self, tick: int) -> int:
+        """tick 所在行相对基准 Z 坐标的偏移。"""
+        return 0
+
+    def repeaters(self, tick: int) -> List[Repeater]:
+        """驱动 tick 主干道的中继器 [(X 坐标, 档位)]，按信号方向排列。"""
+        return [(self.tick_x(tick) - 1, 1)]
+
+    def facing(self, tick: int) -> str:
+        """tick 所在行中继器的朝向（输入端方向），默认信号沿 +X 传播。"""
+        return "west"
+
+    def links(self, tick: int) -> List[Link]:
+        """信号到达 tick 的中继器之前经过的其他结构（蛇形布局的转弯、共用时钟的分支）。"""
+        return []
+
+    def mounted_links(self, tick: int) -> List[Link]:
+        """放在其他轨道组方块上、不需要基座的连接结构（共用时钟分支起点的红石线）。"""
+        return []
+
+    def ticks_between(self, start_tick: int, end_tick: int) -> Iterable[int]:
+        """[start_tick, end_tick) 范围内需要生成主干道的 tick。"""
+        return range(start_tick, min(end_tick, self.max_tick + 1))
+
+    def start_x(self, tick: int) -> Optional[int]:
+        """不早于 tick 的结构中最小的 X 坐标；之后不再生成时为 None。"""
+        if tick > self.max_tick:
+            return None
+        return self.repeaters(tick)[0][0]
+
+    @property
+    def length(self) -> int:
+        """主干道总长度（方块）。"""
+        return self.tick_x(self.max_tick) - self.start_x(0) + 1 if self.max_tick >= 0 else 0
+
+    def summary(self) -> str:
+        """布局概况（用于日志）。"""
+        return f"主干道 {self.length} 格"
+
+    def block_count(self) -> int:
+        """时钟结构的方块数：主干道（及其基座）、中继器与连接结构（各带一个基座）。"""
+        trunk = 2 if self.cover_needs_base else 1
+        return sum(
+            trunk + 2 * (len(self.repeaters(tick)) + len(self.links(tick))) + len(self.mounted_links(tick))
+            for tick in self.ticks_between(0, self.max_tick + 1)
+        )
+
+
+class CompactClock(ClockLayout):
+    """
+    紧凑时钟布局：只为有音符的 tick 生成主干道，休止用多档中继器链代替。
+
+    参数:
+    note_ticks: 本组有音符的 tick（任意顺序，可重复）
+    base_x: 轨道组基准 X 坐标（tick 0 在默认布局中的位置）
+    """
+
+    def __init__(self, note_ticks: Iterable[int], base_x: int):
+        self.ticks: List[int] = sorted(set(note_ticks))
+        super().__init__(base_x, self.ticks[-1] if self.ticks else -1)
+        self._tick_x: Dict[int, int] = {}
+        self._repeaters: Dict[int, List[Repeater]] = {}
+
+        # 第一个中继器与默认布局一样位于 base_x - 1，输入位置不变
+        previous_tick, x = -1, base_x - 2
+        for tick in self.ticks:
+            chain = []
+            for delay in split_delay(tick - previous_tick):
+                x += 1
+                chain.append((x, delay))
+            x += 1
+            self._repeaters[tick] = chain
+            self._tick_x[tick] = x
+            previous_tick = tick
+
+    def tick_x(self, tick: int) -> int:
+        return self._tick_x[tick]
+
+    def repeaters(self, tick: int) -> List[Repeater]:
+        return self._repeaters[tick]
+
+    def ticks_between(self, start_tick: int, end_tick: int) -> List[int]:
+        return self.ticks[bisect_left(self.ticks, start_tick):bisect_left(self.ticks, end_tick)]
+
+    def start_x(self, tick: int) -> Optional[int]:
+        index = bisect_left(self.ticks, tick)
+        if index == len(self.ticks):
+            return None
+        return self._repeaters[self.ticks[index]][0][0]
+
+    @property
+    def length(self) -> int:
+        if not self.ticks:
+            return 0
+        return self._tick_x[self.ticks[-1]] - self._repeaters[self.ticks[0]][0][0] + 1
+
+
+class DenseClock(ClockLayout):
+    """
+    密集时钟布局：每个 tick 占 1 格，偶数/奇数 tick 分别位于上下两条交错的时钟线。
+
+    两条线的输入都在 base_x - 2 列（奇数线高 DENSE_LANE_HEIGHT 格），需要同时触发：
+    偶数线 base_x - 1 处 1 档中继器驱动 tick 0；奇数线 base_x - 1、base_x 处两个 1 档中继器驱动 tick 1；
+    之后每条线每 2 格一个 2 档中继器。覆盖方块是完整方块，下方（包括声像平台的主干道位置）不需要基座。
+
+    X 方向长度约为默认布局的一半，但方块数只少了覆盖方块下方的基座（中继器与红石线都需要基座），
+    奇数线与偶数线之间必须留 1 格空隙，否则两条线的声像平台红石线会斜向相连，因此高度多 DENSE_LANE_HEIGHT 格。
+    """
+
+    cover_needs_base = False
+
+    def tick_x(self, tick: int) -> int:
+        return self.base_x + tick
+
+    def lane_offset(self, tick: int) -> int:
+        return DENSE_LANE_HEIGHT if tick % 2 else 0
+
+    def repeaters(self, tick: int) -> List[Repeater]:
+        if tick == 0:
+            return [(self.base_x - 1, 1)]
+        if tick == 1:
+            return [(self.base_x - 1, 1), (self.base_x, 1)]
+        return [(self.tick_x(tick) - 1, 2)]
+
+    def start_x(self, tick: int) -> Optional[int]:
+        # 下一个 tick 在另一条时钟线上，其中继器可能更靠前（tick 1 的中继器从 base_x - 1 开始）
+        starts = [self.repeaters(t)[0][0] for t in (tick, tick + 1) if t <= self.max_tick]
+        return min(starts) if starts else None
+
+
+class SerpentineClock(ClockLayout):
+    """
+    蛇形时钟布局：主干道折叠为宽度 width 格的若干行，第 r 行位于 Z 偏移 r * pitch 处。
+
+    偶数行信号沿 +X 传播，奇数行沿 -X 传播，每行都从 lo（奇数行从 hi）一格一格铺满中继器和覆盖方块，
+    行尾之外两列是 U 形转弯：(行尾+1, 0) → (行尾+2, 0) → 沿 +Z 到 (行尾+2, pitch) → (行尾+1, pitch) → 下一行第一格。
+    （奇数行镜像。）转弯只有红石线，不产生延迟，中继器链可以跨过转弯（跨过的中继器记在下一个 tick 的连接结构中）；
+    下一行的第一格必须是中继器（红石线只能弱充能覆盖方块，无法带动声像平台），
+    覆盖方块恰好落在行首时把前一个中继器移到下一行，行尾空出的 1 格铺红石线。
+
+    声像平台之间留 1 格空隙需要的行距为 右侧最大声像偏移 + 左侧最大声像偏移 + 2；
+    转弯红石线（行距 + SERPENTINE_CORNER_WIRES 格）超过 MAX_WIRE_LENGTH 时奇数行抬高 SERPENTINE_LIFT 格，
+    与偶数行上下错开，行距减半（同一高度的两行仍相隔完整行距），转弯的红石线在外侧一列逐格爬升或下降。
+
+    参数:
+    ticks: 需要生成主干道的 tick（默认布局为全部 tick，紧凑布局为有音符的 tick）
+    base_x, base_z: 轨道组基准坐标（tick 0 的主干道位置）
+    width: 每行占用的宽度（方块，包括两侧转弯），例如 64 即 4 个区块
+    right, left: 本组向右（+Z）、向左（-Z）的最大声像偏移（格）
+    """
+
+    def __init__(self, ticks: Iterable[int], base_x: int, base_z: int, width: int, right: int = 0, left: int = 0):
+        candidates = sorted(set(ticks))
+        super().__init__(base_x, candidates[-1] if candidates else -1)
+        self.base_z = base_z
+        self.width = width
+        self.right, self.left = right, left
+        spacing = right + left + 2
+        self.stacked = spacing + SERPENTINE_CORNER_WIRES > MAX_WIRE_LENGTH
+        self.pitch = -(-spacing // 2) if self.stacked else spacing
+        if self.pitch + SERPENTINE_CORNER_WIRES > MAX_WIRE_LENGTH:
+            raise ValueError(f"声像偏移过大（右侧 {right}、左侧 {left}），蛇形布局的转弯超过红石线的传输距离")
+        # 中继器和覆盖方块可用的列（两侧各留出转弯的 2 列）
+        self.lo = base_x - 1
+        self.hi = base_x - 2 + width - 2 * SERPENTINE_CORNER_WIDTH
+        if self.hi - self.lo < 2 * SERPENTINE_CORNER_WIDTH:
+            raise ValueError(f"segment_length 过小: {width}")
+
+        self.ticks: List[int] = candidates
+        self._tick_x: Dict[int, int] = {}
+        self._row: Dict[int, int] = {}
+        self._repeaters: Dict[int, List[Repeater]] = {}
+        self._links: Dict[int, List[Link]] = {}
+        self._layout()
+
+        # start_x: 不早于第 i 个 tick 的结构中最小的 X 坐标
+        self._min_x: List[int] = []
+        lowest = None
+        for tick in reversed(self.ticks):
+            xs = [x for x, _ in self._repeaters[tick]] + [x for x, _, _, _ in self._links.get(tick, [])]
+            lowest = min(xs) if lowest is None else min(lowest, *xs)
+            self._min_x.append(lowest)
+        self._min_x.reverse()
+
+    def _column_x(self, row: int, column: int) -> int:
+        return self.lo + column if row % 2 == 0 else self.hi - column
+
+    def _height(self, row: int) -> int:
+        return SERPENTINE_LIFT if self.stacked and row % 2 else 0
+
+    def _layout(self):
+        """沿蛇形路径逐格放置每个 tick 的中继器链和覆盖方块，行满时转弯。"""
+        columns = self.hi - self.lo + 1
+        row, column, previous = 0, 0, -1
+        for tick in self.ticks:
+            cells = []  # (行, 列, 档位)
+            links: List[Link] = []
+            for delay in split_delay(tick - previous):
+                if column == columns:
+                    links += self._passed(cells, row) + self._corner(row, gap=False)
+                    cells, row, column = [], row + 1, 0
+                cells.append((row, column, delay))
+                column += 1
+            if column == columns:
+                # 覆盖方块不能位于行首：最后一个中继器移到下一行
+                *cells, (_, _, delay) = cells
+                links += self._passed(cells, row) + self._corner(row, gap=True)
+                cells, row, column = [(row + 1, 0, delay)], row + 1, 1
+            self._repeaters[tick] = [(self._column_x(r, c), delay) for r, c, delay in cells]
+            if links:
+                self._links[tick] = links
+            self._tick_x[tick] = self._column_x(row, column)
+            self._row[tick] = row
+            column += 1
+            previous = tick
+
+    def _passed(self, cells: List[Tuple[int, int, int]], row: int) -> List[Link]:
+        """中继器链在转弯之前的部分（位于上一行，朝向与该行相同）。"""
+        facing = "west" if row % 2 == 0 else "east"
+        height, z = self._height(row), row * self.pitch
+        return [
+            (self._column_x(row, column), height, z, f"minecraft:repeater[delay={delay},facing={facing}]")
+            for _, column, delay in cells
+        ]
+
+    def _corner(self, row: int, gap: bool) -> List[Link]:
+        """第 row 行行尾到下一行的 U 形转弯红石线（按信号方向排列），gap 表示行尾最后一格空出。"""
+        direction = 1 if row % 2 == 0 else -1
+        end = self.hi if direction == 1 else self.lo
+        near, far = end + direction, end + 2 * direction
+        z0, z1 = row * self.pitch, (row + 1) * self.pitch
+        h0, h1 = self._height(row), self._height(row + 1)
+        climb = (h1 > h0) - (h1 < h0)
+        path = [(end, h0, z0)] if gap else []
+        path += [(near, h0, z0), (far, h0, z0)]
+        path += [(far, h0 + climb * min(k, abs(h1 - h0)), z0 + k) for k in range(1, self.pitch)]
+        path += [(far, h1, z1), (near, h1, z1)]
+
+        # 两端分别连接行尾的方块和下一行第一个中继器（与路径两端同高）
+        ends = [(end - direction if gap else end, h0, z0)] + path + [(end, h1, z1)]
+        links = []
+        for i, (x, height, z) in enumerate(path, 1):
+            sides = {}
+            for nx, nheight, nz in (ends[i - 1], ends[i + 1]):
+                sides[_WIRE_SIDES[(nx - x, nz - z)]] = "up" if nheight > height else "side"
+            state = ",".join(f"{side}={sides[side]}" for side in sorted(sides))
+            links.append((x, height, z, f"minecraft:redstone_wire[{state}]"))
+        return links
+
+    def tick_x(self, tick: int) -> int:
+        return self._tick_x[tick]
+
+    def row_offset(self, tick: int) -> int:
+        return self._row[tick] * self.pitch
+
+    def repeaters(self, tick: int) -> List[Repeater]:
+        return self._repeaters[tick]
+
+    def facing(self, tick: int) -> str:
+        return "west" if self._row[tick] % 2 == 0 else "east"
+
+    def links(self, tick: int) -> List[Link]:
+        return self._links.get(tick, [])
+
+    def ticks_between(self, start_tick: int, end_tick: int) -> List[int]:
+        return self.ticks[bisect_left(self.ticks, start_tick):bisect_left(self.ticks, end_tick)]
+
+    def start_x(self, tick: int) -> Optional[int]:
+        index = bisect_left(self.ticks, tick)
+        if index == len(self.ticks):
+            return None
+        return self._min_x[index]
+
+    @property
+    def rows(self) -> int:
+        return self._row[self.ticks[-1]] + 1 if self.ticks else 0
+
+    @property
+    def length(self) -> int:
+        return sum(len(self._repeaters[tick]) + 1 + len(self._links.get(tick, [])) for tick in self.ticks)
+
+    def lane_offset(self, tick: int) -> int:
+        return self._height(self._row[tick])
+
+    def footprint(self) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        """占地范围 ((最小 X, 最大 X), (最小 Z, 最大 Z))，包括转弯和声像平台。"""
+        min_x = self.lo - SERPENTINE_CORNER_WIDTH
+        max_x = self.hi + SERPENTINE_CORNER_WIDTH
+        return (min_x, max_x), (self.base_z - self.left, self.base_z + (self.rows - 1) * self.pitch + self.right)
+
+    def summary(self) -> str:
+        (min_x, max_x), (min_z, max_z) = self.footprint()
+        chunks = (max_x // 16 - min_x // 16 + 1) * (max_z // 16 - min_z // 16 + 1)
+        stacked = f"，奇数行抬高 {SERPENTINE_LIFT} 格" if self.stacked else ""
+        return (
+            f"{self.rows} 行，行距 {self.pitch} 格{stacked}，占地 {max_x - min_x + 1}×{max_z - min_z + 1}"
+            f"（X {min_x}~{max_x}，Z {min_z}~{max_z}，{chunks} 个区块）"
+        )
+
+
+class TapClock(ClockLayout):
+    """
+    共用时钟：本组只为需要的 tick 生成与默认布局相同的 1 档中继器 + 覆盖方块，连续的 tick 首尾相接，
+    每段连续 tick 的第一个 tick s 的中继器由所共用时钟的分支驱动。
+
+    分支从被共用组 tick s - k 的覆盖方块顶上出发，在该 tick 的列中沿 Z 轴逐格爬升到 TAP_BRIDGE_HEIGHT 高度
+    越过声像平台，再逐格下降到本组主干道的高度；每 TAP_STAGE_STEPS 格经过一个 1 档中继器转到下一个 tick 的列，
+    最后在 tick s - 1 的列接入本组 tick s 的中继器，共 k 个 1 档中继器，时序与所共用的时钟相同。
+    同一 tick 的列中两组的结构在同一红石刻被激活，分支与它们相邻不会改变时序，只需要避开已有方块和音符盒上方的空气。
+    无法铺设分支时（路径被占用或 s < k），本段向前延伸一个 tick 后重试；延伸到 tick 0 的段与独立时钟一样由输入端触发。
+
+    参数:
+    source: 所共用轨道组的时钟布局
+    note_ticks: 本组有音符的 tick
+    height: 所共用轨道组主干道相对本组主干道的高度（-|offset| - 1 ~ |offset| - 1）
+    offset: 所共用轨道组主干道相对本组主干道的 Z 偏移（不为 0）
+    occupied: tick -> 两组的音符在该 tick 的列中占用的位置 {(相对本组基准 Y 的高度, Z 偏移)}，
+              包括声像平台及其基座、音符盒下方的屏障和上方的空气（两组的主干道由本类计入）
+    """
+
+    def __init__(
+        self,
+        source: ClockLayout,
+        note_ticks: Iterable[int],
+        height: int,
+        offset: int,
+        occupied: Dict[int, Set[Tuple[int, int]]],
+    ):
+        self.source = source
+        self.height = height
+        self.offset = offset
+        self.occupied = occupied
+        steps = abs(offset)
+        self.stages = -(-steps // TAP_STAGE_STEPS)
+        direction = 1 if offset < 0 else -1  # 分支朝本组主干道前进的方向
+        bridge = max(height + TAP_BRIDGE_HEIGHT, 0)
+        # 分支逐格经过的 (高度, Z 偏移)：起点在被共用组覆盖方块顶上，终点在本组主干道的高度
+        self._path = [(min(height + 1 + i, bridge, steps - i), offset + direction * i) for i in range(steps + 1)]
+
+        self._taps: Dict[int, Tuple[List[Link], List[Link]]] = {}  # 段首 tick -> (分支结构, 起点红石线)
+        own = {tick for tick in note_ticks if tick <= source.max_tick}
+        for tick in sorted(own):
+            start = tick
+            while start > 0 and start - 1 not in own:
+                tap = self._tap(start, own)
+                if tap is not None:
+                    self._taps[start] = tap
+                    break
+                start -= 1
+                own.add(start)
+        self.ticks: List[int] = sorted(own)
+        super().__init__(source.base_x, self.ticks[-1] if self.ticks else -1)
+        # 不早于各 tick 的结构中最小的 X 坐标（分支位于之前 tick 的列）
+        first = [self.tick_x(t - self.stages) if t in self._taps else self.tick_x(t) - 1 for t in self.ticks]
+        self._start_x = list(accumulate(reversed(first), min))[::-1]
+
+    def _tap(self, start: int, own: Set[int]) -> Optional[Tuple[List[Link], List[Link]]]:
+        """
+        驱动 tick start 的分支；路径被占用或之前的 tick 不足时为 None。
+
+        返回:
+        (需要基座的红石线与中继器, 放在被共用组覆盖方块上的起点红石线)，按信号方向排列
+        """
+        first = start - self.stages
+        if first < 0:
+            return None
+        trunks = {(self.height, self.offset), (self.height - 1, self.offset)}
+        own_trunk = {(0, 0), (-1, 0)}
+        path, last = self._path, len(self._path) - 1
+        bounds = [min(stage * TAP_STAGE_STEPS, last) for stage in range(self.stages + 1)]
+        links: List[Link] = []
+        mounted: List[Link] = []
+        for stage in range(self.stages):
+            tick = first + stage
+            x = self.source.tick_x(tick)
+            taken = trunks | self.occupied.get(tick, set()) | (own_trunk if tick in own else set())
+            low, high = bounds[stage], bounds[stage + 1]
+            for i in range(low, high + 1):
+                height, z = path[i]
+                cells = [(height, z)] if i == 0 else [(height, z), (height - 1, z)]
+                sides = {}
+                if i > low:
+                    previous_height, previous_z = path[i - 1]
+                    sides[_WIRE_SIDES[(0, previous_z - z)]] = "up" if previous_height > height else "side"
+                elif stage:
+                    sides["west"] = "side"  # 上一段的中继器
+                if i < high:
+                    next_height, next_z = path[i + 1]
+                    sides[_WIRE_SIDES[(0, next_z - z)]] = "up" if next_height > height else "side"
+                    if next_height != height:  # 爬升或下降时较低一格的上方必须是空气
+                        cells.append((max(height, next_height), z if next_height > height else next_z))
+                else:
+                    sides["east"] = "side"  # 下一段的中继器或本组主干道的中继器
+                if taken.intersection(cells):
+                    return None
+                state = ",".join(f"{side}={sides[side]}" for side in sorted(sides))
+                (links if i else mounted).append((x, height, z, f"minecraft:redstone_wire[{state}]"))
+            if stage < self.stages - 1:
+                # 转到下一个 tick 的列的中继器位于该 tick 的中继器列
+                height, z = path[high]
+                column = trunks | (own_trunk if tick + 1 in own else set())
+                if column.intersection([(height, z), (height - 1, z)]):
+                    return None
+                links.append((x + 1, height, z, "minecraft:repeater[delay=1,facing=west]"))
+        return links, mounted
+
+    def tick_x(self, tick: int) -> int:
+        return self.source.tick_x(tick)
+
+    def links(self, tick: int) -> List[Link]:
+        return self._taps[tick][0] if tick in self._taps else []
+
+    def mounted_links(self, tick: int) -> List[Link]:
+        return self._taps[tick][1] if tick in self._taps else []
+
+    def ticks_between(self, start_tick: int, end_tick: int) -> List[int]:
+        return self.ticks[bisect_left(self.ticks, start_tick):bisect_left(self.ticks, end_tick)]
+
+    def start_x(self, tick: int) -> Optional[int]:
+        index = bisect_left(self.ticks, tick)
+        return self._start_x[index] if index < len(self.ticks) else None
+
+    def summary(self) -> str:
+        return (
+            f"共用时钟，{len(self.ticks)} 个 tick 生成主干道，"
+            f"{len(self._taps)} 个分支（每个 {abs(self.offset)} 格、{self.stages} 个中继器）"
+        )
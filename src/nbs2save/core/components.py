@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+低更新元件模式
+----------------------
+默认布局用红石线把主干道的信号沿 Z 轴送到声像平台上的音符盒，每个 tick 整条红石线都会亮灭一次，
+每格红石线变化时都要更新周围的方块，声像平台越长、音符越密，更新越多。
+
+轨道组配置 components='repeater' 时，音符密集的外侧声像偏移不铺声像平台：
+这些偏移各有一条与主干道平行的中继器线（位于该偏移的 Z 坐标、音符盒所在的高度），
+结构与主干道相同（每个 tick 一个中继器 + 覆盖方块），音符盒直接替换该线在音符 tick 处的覆盖方块，
+由前一格的中继器激活。中继器只更新前后两格，覆盖方块被中继器强充能后只影响紧邻的方块，
+相邻中继器线在同一 X 上的覆盖方块总是同时充能，不会提前激活旁边的音符。
+
+横向传输信号又不产生延迟的元件只有红石线，因此中继器线不从主干道分支，而是与主干道同时触发：
+主干道输入位置（第一个中继器之前一格）沿 Z 轴铺一排红石线（输入排），连接所有中继器线的输入端，
+输入排只在开始播放时变化一次。紧邻主干道、由覆盖方块直接激活的音符不需要中继器线；
+每条中继器线在该偏移最后一个音符处结束。
+
+中继器线从开始播放起每个 tick 都会亮灭，只有该偏移（及更内侧）的音符足够密集时才比红石线更新少，
+稀疏的偏移仍使用红石线声像平台（规则见 plan_lanes）。
+
+中继器线的高度跟随生成模式（相对 base_y，distance 为偏移的绝对值）：
+- default: 0（distance >= 2）
+- staircase: 1 - distance（distance >= 2；偏移 2 比红石线模式低 1 格，使输入排每格高度最多变化 1）
+- staircase_up: distance - 2（distance >= 1，与红石线模式的音符盒高度相同）
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 可选的元件模式：redstone（默认，红石线声像平台）、repeater（中继器线）
+COMPONENT_MODES = ("redstone", "repeater")
+
+# 中继器线: 声像偏移 -> (相对 base_y 的高度, 最后一个音符的 tick)
+Lanes = Dict[int, Tuple[int, int]]
+# 输入排的一格 (Z 偏移, 相对 base_y 的高度, 红石线方块状态)，下方需要基座方块
+BarCell = Tuple[int, int, str]
+# 不铺中继器线时的阈值（大于任何声像偏移）
+_NO_LANES = 1 << 30
+
+
+def lane_height(generation_mode: str, distance: int) -> Optional[int]:
+    """
+    偏移 distance 格的音符所在中继器线相对 base_y 的高度。
+
+    返回:
+    高度；None 表示音符紧邻主干道，由覆盖方块直接激活，不需要中继器线
+    """
+    if generation_mode == "staircase_up":
+        return distance - 2 if distance >= 1 else None
+    if distance < 2:
+        return None
+    if generation_mode == "staircase":
+        return 1 - distance
+    return 0
+
+
+def plan_lanes(generation_mode: str, notes: Iterable[Tuple[int, int]], clock_ticks: Sequence[int]) -> Lanes:
+    """
+    根据本组音符规划中继器线。
+
+    中继器线从开始播放一直亮灭到该偏移最后一个音符，每个时钟 tick 两次状态变化（中继器亮、灭）；
+    红石线声像平台只在有音符的 tick 变化，长度为该 tick 同侧最远音符的偏移。
+    声像平台不能穿过中继器线，因此每侧只给最外侧的一段偏移（|偏移| >= 阈值）铺中继器线，
+    内侧的偏移仍使用红石线声像平台（长度只到内侧最远的音符）。
+    每侧按估计的状态变化数选择阈值，中继器线不能减少变化时该侧不铺中继器线。
+
+    参数:
+    generation_mode: 生成模式
+    notes: 本组音符的 (tick, 声像偏移)
+    clock_ticks: 本组生成主干道的 tick（升序），用于估计中继器线的变化数
+
+    返回:
+    {声像偏移: (相对 base_y 的高度, 最后一个音符的 tick)}
+    """
+    table = np.array(list(notes), dtype=np.int64).reshape(-1, 2)
+    clock_ticks = np.asarray(clock_ticks, dtype=np.int64)
+    lanes: Lanes = {}
+    for side in (1, -1):
+        mask = table[:, 1] * side > 0
+        ticks, distances = table[mask, 0], np.abs(table[mask, 1])
+        if not len(ticks):
+            continue
+        tick_index = np.unique(ticks, return_inverse=True)[1]
+        candidates = [
+            distance
+            for distance in np.unique(distances).tolist()
+            if lane_height(generation_mode, distance) is not None
+        ]
+        last = {distance: int(ticks[distances == distance].max()) for distance in candidates}
+
+        def changes(threshold: int) -> int:
+            # 阈值以外的偏移各一条中继器线，内侧偏移每个有音符的 tick 铺一次红石线（到音符盒前一格）
+            repeaters = sum(
+                2 * int(np.searchsorted(clock_ticks, last[distance], side="right"))
+                for distance in candidates
+                if distance >= threshold
+            )
+            reach = np.zeros(tick_index.max() + 1, dtype=np.int64)
+            np.maximum.at(reach, tick_index, np.where(distances < threshold, distances, 0))
+            return repeaters + 2 * int(np.maximum(reach - 1, 0).sum())
+
+        best, threshold = changes(_NO_LANES), _NO_LANES
+        for candidate in candidates:
+            cost = changes(candidate)
+            if cost < best:
+                best, threshold = cost, candidate
+        for distance in candidates:
+            if distance >= threshold:
+                lanes[distance * side] = (lane_height(generation_mode, distance), last[distance])
+    return lanes
+
+
+def input_bar(generation_mode: str, lanes: Lanes) -> List[BarCell]:
+    """
+    连接主干道与全部中继器线输入端的红石线（从 Z 偏移 0 向两侧铺到最远的中继器线）。
+
+    没有中继器线的偏移按同样的高度规则铺设，相邻两格高度最多相差 1；
+    有中继器线（以及主干道）的一格额外连接东侧的中继器。
+    """
+    if not lanes:
+        return []
+    heights = {0: 0}
+    for side in (1, -1):
+        reach = max((pan * side for pan in lanes if pan * side > 0), default=0)
+        for distance in range(1, reach + 1):
+            height = lane_height(generation_mode, distance)
+            heights[distance * side] = 0 if height is None else height
+
+    cells = []
+    for z in sorted(heights):
+        height = heights[z]
+        sides = {"east": "side"} if z == 0 or z in lanes else {}
+        for direction, neighbor in (("north", z - 1), ("south", z + 1)):
+            if neighbor in heights:
+                sides[direction] = "up" if heights[neighbor] > height else "side"
+        state = ",".join(f"{direction}={value}" for direction, value in sorted(sides.items()))
+        cells.append((z, height, f"minecraft:redstone_wire[{state}]"))
+    return cells
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+组合输出策略
+----------------------
+一次遍历同时生成多种输出：每个基础结构、声像平台、音符事件依次转发给全部子策略，
+例如同时输出 .schem、.mcfunction 与原版结构数据包，只需解析和生成一次。
+
+结构类子策略（持有 MCSchematic 的子策略，如 .schem、.litematic、原版结构）共用同一个 MCSchematic，
+每个方块只存一份、只写入一次，完成时各自按自己的格式写出；
+流水线模式下提前写出的子策略（分片、存档）写出后会释放方块，仍使用各自的结构对象。
+
+阶梯模式的轨道组只有结构类输出能够表示，
+GroupProcessor 会为每个结构对象创建共用它的阶梯策略，
+命令类子策略（mcfunction、rcon）不输出阶梯模式的轨道组。
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Iterable, List
+
+from mcschematic import MCSchematic
+from pynbs import Note
+
+from .core import GroupProcessor, OutputFormatStrategy
+
+
+class CompositeOutputStrategy(OutputFormatStrategy):
+    """
+    把事件转发给多个子策略的组合策略。
+
+    参数:
+    children: 子策略列表，同一类型的输出只能出现一次（否则会写入同一个输出文件）
+
+    每个子策略独立完成自己的输出；GroupProcessor 完成阶段会展开组合策略，
+    保证每个子策略（以及共用同一个 MCSchematic 的策略）只 finalize 一次。
+    """
+
+    def __init__(self, children: Iterable[OutputFormatStrategy]):
+        self.children: List[OutputFormatStrategy] = list(children)
+        if not self.children:
+            raise ValueError("组合输出至少需要一个子策略")
+        # 接收生成事件的子策略：与前面的子策略共用结构对象的不再重复写入
+        self._writers: List[OutputFormatStrategy] = self.children
+
+    def initialize(self, processor: GroupProcessor):
+        """
+        依次初始化全部子策略
+
+        参数:
+        processor: GroupProcessor实例
+        """
+        self.validate_outputs(processor)
+        self.share_schematic(processor)
+        for child in self.children:
+            child.initialize(processor)
+
+        self._writers = []
+        seen_schems = set()
+        for child in self.children:
+            schem = getattr(child, "schem", None)
+            if schem is not None:
+                if id(schem) in seen_schems:
+                    continue
+                seen_schems.add(id(schem))
+            self._writers.append(child)
+
+    def share_schematic(self, processor: GroupProcessor):
+        """
+        让不提前写出的结构类子策略共用同一个结构对象；
+        其中有需要按轨道组记录方块的子策略（.litematic、负载分析）时使用 GroupRecordingSchematic。
+
+        参数:
+        processor: GroupProcessor实例
+        """
+        from .litematic import GroupRecordingSchematic
+        from .schematic import SchematicOutputStrategy
+
+        shared = [
+            child
+            for child in self.leaves()
+            if isinstance(child, SchematicOutputStrategy)
+            and child.schem is None
+            and child.pipeline_column_width(processor) is None
+        ]
+        if len(shared) < 2:
+            return
+        if any(child.records_groups for child in shared):
+            schem = GroupRecordingSchematic(processor)
+        else:
+            schem = MCSchematic()
+        for child in shared:
+            child.schem = schem
+
+    def write_base_structures(self, processor: GroupProcessor, tick: int):
+        """
+        写入基础结构
+
+        参数:
+        processor: GroupProcessor实例
+        tick: 当前tick
+        """
+        for child in self._writers:
+            child.write_base_structures(processor, tick)
+
+    def write_pan_platform(self, processor: GroupProcessor, tick: int, direction: int):
+        """
+        写入声像平台。
+        子策略写入平台后会标记 processor.tick_status，
+        因此每个子策略调用前恢复原来的标记，保证每个子策略都能写入自己的平台。
+
+        参数:
+        processor: GroupProcessor实例
+        tick: 当前tick
+        direction: 方向（1=右，-1=左）
+        """
+        status = processor.tick_status[tick]
+        key = "right" if direction == 1 else "left"
+        done = status[key]
+        for child in self._writers:
+            status[key] = done
+            child.write_pan_platform(processor, tick, direction)
+
+    def write_note(self, processor: GroupProcessor, note: Note):
+        """
+        写入音符
+
+        参数:
+        processor: GroupProcessor实例
+        note: 要写入的音符
+        """
+        for child in self._writers:
+            child.write_note(processor, note)
+
+    def flush(self, processor: GroupProcessor, completed_x: int):
+        """
+        流水线模式：通知全部子策略已完成区域
+
+        参数:
+        processor: GroupProcessor实例
+        completed_x: 已完成区域的 X 上界（不含）
+        """
+        for child in self.children:
+            child.flush(processor, completed_x)
+
+    def finalize(self, processor: GroupProcessor):
+        """
+        依次完成全部子策略（GroupProcessor 会展开组合策略逐个完成，不经过此方法）
+
+        参数:
+        processor: GroupProcessor实例
+        """
+        for child in self.children:
+            child.finalize(processor)
+
+    def leaves(self) -> List[OutputFormatStrategy]:
+        """展开嵌套的组合策略，返回全部子策略。"""
+        leaves = []
+        for child in self.children:
+            if isinstance(child, CompositeOutputStrategy):
+                leaves.extend(child.leaves())
+            else:
+                leaves.append(child)
+        return leaves
+
+    def derive_schematic_strategies(self, factory: Callable[[], OutputFormatStrategy]) -> List[OutputFormatStrategy]:
+        """
+        为每个结构对象（共用的只算一个）创建一个由 factory 生成、共用该 MCSchematic 的策略
+        （用于阶梯模式的轨道组）。
+
+        参数:
+        factory: 新策略的构造函数，例如 StaircaseSchematicOutputStrategy
+
+        返回:
+        新策略列表；没有结构类子策略时为空
+        """
+        derived = []
+        seen_schems = set()
+        for child in self.leaves():
+            schem = getattr(child, "schem", None)
+            if schem is not None and id(schem) not in seen_schems:
+                seen_schems.add(id(schem))
+                strategy = factory()
+                strategy.schem = schem
+                derived.append(strategy)
+        return derived
+
+    def validate_outputs(self, processor: GroupProcessor):
+        """检查子策略之间是否会写入同一个文件。"""
+        from .diff import DiffOutputStrategy
+        from .mcfunction import McFunctionOutputStrategy
+        from .rcon import RconOutputStrategy
+        from .schematic import SchematicOutputStrategy
+        from .structure import StructureOutputStrategy
+
+        leaves = self.leaves()
+        types = [
+            type(child) for child in leaves
+            if isinstance(child, (SchematicOutputStrategy, McFunctionOutputStrategy))
+        ]
+        duplicated = {t.__name__ for t in types if types.count(t) > 1}
+        if duplicated:
+            raise ValueError(f"组合输出中的输出类型重复: {', '.join(sorted(duplicated))}")
+        writes_mcfunction = [
+            child for child in leaves
+            if isinstance(child, (McFunctionOutputStrategy, DiffOutputStrategy))
+            and not isinstance(child, RconOutputStrategy)
+        ]
+        if len(writes_mcfunction) > 1:
+            raise ValueError("mcfunction 与 diff 输出都会写入 <output_file>.mcfunction，不能同时使用")
+        has_structure = any(isinstance(child, StructureOutputStrategy) for child in leaves)
+        if writes_mcfunction and has_structure and processor.config.get("relative_coords"):
+            raise ValueError(
+                "相对坐标的 mcfunction 与原版结构输出都会写入 <output_file>_place.mcfunction，不能同时使用"
+            )
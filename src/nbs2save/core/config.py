@@ -23,11 +23,121 @@ GENERATE_CONFIG = {
     # 可选值:
     #   'schematic'  -> 生成WorldEdit格式的.schem文件
     #   'mcfunction' -> 生成Minecraft原版函数文件(.mcfunction)
+    #   'litematic'  -> 生成Litematica投影文件(.litematic)，每个轨道组一个区域
+    #   'structure'  -> 生成原版结构方块使用的.nbt文件（自动切分为48x48x48以内），以及/place template放置函数
+    #   'world'      -> 直接把方块写入存档的区域文件(.mca)，仅支持1.18及以上版本
+    #   'diff'       -> 与 previous_file 对比，只把变化的方块输出为.mcfunction文件
+    #   'rcon'       -> 生成与mcfunction相同的命令，通过RCON直接推送到运行中的服务器
+    #   'remap'      -> 不重新生成：改写 remap_file 的调色板（remap_blocks）并标记为 data_version，另存为.schem
+    #   'load'       -> 不输出文件：模拟播放，在日志中输出每个游戏刻的红石元件状态变化统计（红石负载分析）
+    #   'partition'  -> 不生成：按轨道冲突（同一 tick 同一声像偏移）自动把轨道划分为尽量少的轨道组，
+    #                   以第一个轨道组为模板沿 +Z 排列，写出 <output_file>_groups.json（可在 GUI 中加载）
+    #   'pack'       -> 不生成：按各轨道组实际生成的范围重新计算 base_coords（见 pack_*），使各组互不重叠，
+    #                   写出 <output_file>_groups.json（可在 GUI 中加载）
+    #   'estimate'   -> 不生成：试运行，在日志中输出各方块数量、整体范围、区块数、mcfunction 命令数与估计的文件大小
+    # 也可以是列表，例如 ["schematic", "mcfunction", "structure"]，一次生成同时输出多种格式
+    # （阶梯模式的轨道组只输出到结构类格式；mcfunction与diff不能同时使用）
     "type": "schematic",
     # output_file: 指定输出文件的名称(不包含扩展名)
     # 程序会根据type参数自动添加相应的扩展名
     # 例如: 如果type为'schematic'且output_file为'test'，则生成'test.schem'
+    # 命令行中为 "-" 时写入标准输出（仅限schematic、litematic、mcfunction、diff等单文件输出，日志改为输出到标准错误）
+    # 作为库使用时，可以在创建输出策略时传入文件对象（如 BytesIO），直接写入内存而不经过磁盘
     "output_file": "test",
+    # tile_size: schematic分片导出的分片边长（方块），None表示输出单个.schem文件
+    # 必须是16的倍数，分片沿X/Z方向按区块对齐切分（Y方向不切分）
+    # 输出 <output_file>_000.schem、<output_file>_001.schem ... 以及记录各分片偏移的 <output_file>_tiles.json
+    # 适用于超出.schem尺寸上限（32767）或WorldEdit一次粘贴过于卡顿的长曲子
+    "tile_size": None,
+    # structure_namespace: 原版结构输出时结构所在的命名空间（place template <命名空间>:<名称>）
+    "structure_namespace": "nbs2save",
+    # world_dir: 直接写入存档时的存档目录（仅在type为'world'时生效），None表示使用output_file
+    # 目录下已有level.dat时离线修改已有存档（必须先关闭游戏或服务器，原有区块中未被覆盖的方块保持不变）
+    # 修改已有存档时方块所在的区块必须都已生成（进游戏加载过），否则拒绝写入；此时流水线模式不提前写出
+    # 否则新建一个超平坦虚空世界（创造模式、允许作弊）
+    "world_dir": None,
+    # workers: 并行写出文件时的进程数（以及并行gzip压缩的线程数），None表示使用CPU核心数
+    "workers": None,
+    # compression_level: 输出文件的压缩级别(0~9)，适用于.schem、.litematic、原版结构、存档等所有压缩输出
+    # 数值越小越快、文件越大；9为压缩率最高（旧版本的固定行为），6通常只大10%~15%但快数倍
+    # 压缩输出被切分为多个独立的gzip块并行压缩，仍是标准gzip文件，游戏与WorldEdit均可直接读取
+    "compression_level": 9,
+    # tempo_remap: 是否按曲子速度（header.tempo）把音符换算到红石刻（1档中继器=0.1秒）
+    # 关闭时每个NBS tick对应0.1秒，非10 t/s的曲子播放速度会不正确
+    # 换算后量化到同一位置的tick会合并（同一轨道只保留第一个音符），并在日志中报告时间误差
+    # 不同轨道合并到同一轨道组同一位置的音符只保留轨道编号最小的一个（开启 pan_nudge 时先尝试移开），日志中列出被丢弃的音符
+    "tempo_remap": False,
+    # tempo_quantum: 速度重映射的量化网格（红石刻），1为最精细；2表示音符只落在偶数红石刻上，误差更大
+    # 量化后空出的红石刻需要配合轨道组的 compact 紧凑布局才会从结构中去掉
+    "tempo_quantum": 1,
+    # pan_nudge: 声像微调的最大移动距离（格），None或0表示关闭（遇到位置冲突时中止生成）
+    # 同一轨道组内多个音符落在同一 tick、同一声像偏移时，保留轨道编号最小的音符，
+    # 其余音符移到同侧最近的空闲偏移（同样距离时优先靠近主干道），每次调整都会写入日志
+    "pan_nudge": None,
+    # pan_snap: 声像吸附的最大误差（格），None或0表示关闭
+    # 每个 tick 每侧的声像平台长度由最远的音符决定，开启后按 tick 把同侧音符尽量向主干道压缩：
+    # 每个音符的偏移最多改变 pan_snap 格，不越过中央，同侧音符的左右顺序不变，日志报告节省的平台方块数
+    "pan_snap": None,
+    # pack_*: 自动排布（type为'pack'或GUI轨道组页面的“自动排布”）的参数，排布区域从第一个轨道组的 base_coords 开始
+    # pack_axis: 'z' 各排沿 +Z 依次排列，'y' 各排沿 +Y 向上堆叠；共用时钟的轨道组与被共用的组作为整体移动
+    "pack_axis": "z",
+    # pack_spacing: 相邻轨道组之间的空隙（方块）
+    "pack_spacing": 1,
+    # pack_chunk_align: 是否把每个轨道组的 X、Z 起点对齐到区块边界（16的倍数）
+    "pack_chunk_align": False,
+    # pack_row_length: 每排的 X 长度上限（方块），None表示每排一个轨道组（所有组从同一 X 开始）
+    # 设置后较短的轨道组会并排放在同一排中，整体更紧凑
+    "pack_row_length": None,
+    # overlap_check: 输出前检测轨道组之间是否生成到同一位置（后生成的组会覆盖先生成的方块）
+    # 发现重叠时在日志中列出重叠的方块数、范围与双方的 tick 范围，并中止生成
+    "overlap_check": False,
+    # max_blocks: 生成前估算方块总数（与 'estimate' 相同，不生成方块，十几万个音符约一秒），超过该数量时拒绝生成；None表示不限制
+    "max_blocks": None,
+    # pipeline_ticks: 流水线模式每批生成的tick数，None表示关闭（先生成全部方块再一次性写出）
+    # 开启后所有轨道组按tick窗口交替生成，已生成完毕的部分立即交给后台线程写出，生成与写出同时进行
+    # 适用于分片schematic（tile_size）、存档（world）、mcfunction与rcon输出
+    # 已交给后台写出的方块列与命令随即从内存中释放，内存中只保留尚未写出的部分
+    # 单个.schem、.litematic与原版结构需要完整尺寸后才能写出，不受此选项影响
+    "pipeline_ticks": None,
+    # load_report: 生成时同时进行红石负载分析（相当于在 type 中加入 'load'）
+    # 模拟所有轨道组同时开始播放，统计每个游戏刻改变状态的红石线、中继器和音符盒数量，
+    # 输出峰值、P50/P90/P99、最繁忙的游戏刻及其来自哪些轨道组，以及信号到达不了的元件数
+    "load_report": False,
+    # load_pulse_ticks: 负载分析中输入脉冲的长度（红石刻），决定熄灭波比亮起波晚多少，石质按钮为10
+    "load_pulse_ticks": 10,
+    # relative_coords: mcfunction输出是否使用相对坐标（~dx ~dy ~dz）
+    # 开启后命令不再包含绝对坐标，同一个函数可以通过
+    #   execute positioned <x> <y> <z> run function <function_id>
+    # 放置到任意位置或多次放置，程序会额外生成 <output_file>_place.mcfunction 作为示例
+    "relative_coords": False,
+    # relative_origin: 相对坐标的原点(x, y, z)，None表示使用第一个轨道组的基准坐标
+    "relative_origin": None,
+    # function_id: 放置函数调用的函数ID，None表示使用 nbs2save:<output_file>（文件名中的非法字符替换为下划线）
+    "function_id": None,
+    # previous_file: 差量输出时的旧版本文件（仅在type为'diff'时生效）
+    # 可以是旧版本的.nbs（使用下方同一份GROUP_CONFIG重新生成）
+    # 也可以是之前生成的.schem文件
+    # 输出只包含变化位置的setblock/fill命令，被删除的位置会填充为air
+    "previous_file": "test_old.nbs",
+    # remap_file: 调色板重映射时读取的已生成.schem文件（仅在type为'remap'时生效）
+    # remap_blocks: {旧方块: 新方块}，例如 {"minecraft:iron_block": "minecraft:stone"}
+    # 旧方块只写方块ID时匹配该方块的所有状态；只改写调色板，耗时与方块数量无关
+    "remap_file": "test.schem",
+    "remap_blocks": {},
+    # rcon_*: RCON推送配置（仅在type为'rcon'时生效）
+    # 服务器需要在server.properties中开启enable-rcon并设置rcon.password
+    "rcon_host": "127.0.0.1",
+    "rcon_port": 25575,
+    "rcon_password": "",
+    # rcon_pool_size: 并行连接数，同一区块的命令总在同一连接上按顺序执行
+    "rcon_pool_size": 2,
+    # rcon_max_in_flight: 每条连接未确认命令数上限（流水线窗口）
+    "rcon_max_in_flight": 64,
+    # rcon_commands_per_second: 每秒命令数上限，None表示不限速
+    "rcon_commands_per_second": None,
+    # rcon_max_retries / rcon_timeout: 超时或断线后的最大重发次数 / 单条命令超时秒数
+    "rcon_max_retries": 3,
+    "rcon_timeout": 5.0,
 }
 
 # --------------------------
@@ -63,6 +173,31 @@ GROUP_CONFIG = {
         #   'default'       -> 默认生成模式（当前schematic.py的实现）
         #   'staircase'     -> 阶梯向下生成模式（偏移>=3时启用阶梯效果）
         #   'staircase_up'  -> 阶梯向上生成模式（偏移>=3时启用阶梯效果）
+        #   'dense'         -> 密集模式：每个tick只占1格，偶数/奇数tick分别位于上下两条交错的时钟线
+        #                      （奇数线高3格，两条线的输入需要同时触发），长度约为默认模式的一半
+        #                      只缩短占地长度：方块数只少了覆盖方块下方的基座，高度多3格
+        #   'serpentine'    -> 蛇形模式：主干道折叠为宽 segment_length 格的若干行，沿 +Z 排列，行尾 U 形转弯，时序不变
+        #                      行距由本组的最大声像偏移决定；转弯只有红石线，不需要休止
+        #                      行距超过 11 格时奇数行抬高 4 格与偶数行上下错开，行距减半
         "generation_mode": "default",
+        # segment_length: 蛇形模式每行的宽度（方块，包括两侧转弯，默认64即4个区块）
+        # 占地 X 范围为 base_x-3 ~ base_x-4+segment_length，base_x 取 16 的倍数 + 3 时与区块对齐
+        "segment_length": 64,
+        # compact: 紧凑布局（可选，默认False），适用于以上除 dense 外的所有生成模式（蛇形模式下只折叠有音符的 tick）
+        # 连续的空tick合并为2~4档中继器（更长的休止使用多个中继器首尾相接），时序不变
+        # 主干道在本组最后一个音符处结束，休止较多的曲子长度和方块数都会大幅减少
+        "compact": False,
+        # shared_clock: 共用另一个轨道组的时钟（可选，填轨道组ID）
+        # 两组都使用默认生成模式（不开启 compact），base_x 相同、沿 Z 轴错开，高度差不超过两条主干道的 Z 距离
+        # 本组只在有音符的 tick（及相连的几个 tick）生成主干道，每段从该组较早 tick 的覆盖方块引出分支，
+        # 分支用红石线和 1 档中继器接到本组主干道（时序不变）；从 tick 0 开始的一段仍由本组输入位置激活
+        # 共用后的方块数比本组独立的时钟更多时（音符太密或两组相距太远）报错，应去掉此项
+        # "shared_clock": 0,
+        # components: 元件模式（可选，默认 'redstone'），适用于 default、staircase、staircase_up（可开启 compact）
+        #   'redstone'  -> 红石线声像平台
+        #   'repeater'  -> 低更新模式：音符密集的外侧声像偏移各有一条与主干道平行的中继器线，音符盒由中继器直接激活；
+        #                  中继器线每个 tick 都会亮灭，只在比红石线声像平台更新更少时使用，其余偏移仍铺红石线声像平台
+        #                  所有中继器线的输入端由主干道输入位置的一排红石线同时触发（只在开始时变化一次）
+        "components": "redstone",
     },
 }
@@ -18,11 +18,18 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Container, Dict, Iterable, List, Tuple
 
 from collections import defaultdict
+from itertools import chain
 from pynbs import Note
 
+from .clock import ClockLayout, CompactClock, DenseClock, Repeater, SerpentineClock, TapClock
+from .components import COMPONENT_MODES, Lanes, input_bar, plan_lanes
+from .nudge import nudge_pans
+from .snap import snap_pans
+from .tempo import drop_slot_conflicts
+
 
 # --------------------------
 # 输出格式策略接口
@@ -87,6 +94,18 @@ class OutputFormatStrategy(ABC):
         """
         pass
 
+    def flush(self, processor: GroupProcessor, completed_x: int):
+        """
+        流水线模式（配置 pipeline_ticks）下，每生成完一段 tick 后调用。
+        X 坐标小于 completed_x 的方块已全部生成、之后不会再改变，
+        策略可以把这部分交给后台线程提前写出。默认不处理，全部留到 finalize。
+
+        参数:
+        processor: GroupProcessor实例
+        completed_x: 已完成区域的 X 上界（不含）
+        """
+        pass
+
 
 # --------------------------
 # 轨道组处理器抽象基类
@@ -103,6 +122,7 @@ class GroupProcessor(ABC):
         global_max_tick: int,
         config: Dict,
         group_config: Dict,
+        tempo: float | None = None,
     ):
         """
         参数
@@ -115,26 +135,37 @@ class GroupProcessor(ABC):
             全局生成配置，如输出路径、版本号等。
         group_config : Dict
             轨道组配置，格式见 GROUP_CONFIG。
+        tempo : float | None
+            曲子速度（tick/秒，即 header.tempo），配置 tempo_remap 时用于换算到红石刻。
         """
         self.all_notes: List[Note] = all_notes
         self.global_max_tick: int = global_max_tick
         self.config: Dict = config
         self.group_config: Dict = group_config
+        self.tempo: float | None = tempo
 
         # 以下字段在 process() 中动态填充
+        self.group_id = None  # 当前处理的轨道组ID
         self.base_x: int | None = None  # 轨道组基准 X 坐标
         self.base_y: int | None = None  # 轨道组基准 Y 坐标
         self.base_z: int | None = None  # 轨道组基准 Z 坐标
         self.notes: List[Note] | None = None  # 属于本组的音符（按 tick 排序）
         self.tick_status: defaultdict[int, Dict[str, bool]] = None  # tick 级状态缓存
         self.group_max_tick: int = 0  # 本组最大 tick
+        self.current_tick: int = 0  # 正在生成的 tick（供按 tick 记录方块的结构对象使用）
         self.layers: set[int] = set()  # 本组包含的 layer 编号
         self.cover_block: str = ""  # 走线顶层方块
         self.base_block: str = ""  # 走线/基座方块
         self.log_callback = None  # 日志回调
         self.progress_callback = None  # 进度回调
-        self.output_strategy: OutputFormatStrategy = None  # 输出格式策略
+        self.output_strategy: OutputFormatStrategy = None  # 当前输出格式策略
+        self.default_strategy: OutputFormatStrategy = None  # 默认输出格式策略
+        self._mode_strategies: Dict[str, OutputFormatStrategy] = {}  # 按生成模式缓存的策略
+        self._active_strategies: List[OutputFormatStrategy] = []  # 已初始化的策略（按初始化顺序）
         self.generation_mode: str = "default"  # 生成模式（default 或 staircase）
+        self.clock: ClockLayout | None = None  # 本组的时钟布局（主干道位置与中继器）
+        self.lanes: Lanes = {}  # 低更新元件模式的中继器线（见 components.py），为空时使用红石线声像平台
+        self._layer_index = None  # (all_notes, 音符数, {layer: [音符下标]})，见 load_notes
 
     # ----------------------
     # 回调注册
@@ -168,49 +199,95 @@ class GroupProcessor(ABC):
         strategy: OutputFormatStrategy实例
         """
         self.output_strategy = strategy
+        self.default_strategy = strategy
 
     def _pick_strategy_for_group(self, generation_mode: str) -> OutputFormatStrategy:
         """
         根据生成模式和输出类型选择对应的输出策略。
         子类可以重写此方法以提供自定义策略选择逻辑。
+
+        default 模式直接沿用 set_output_strategy 设置的默认策略，
+        这样自定义策略（如差量输出）不会被同类型的新实例替换；
+        其他模式的策略按模式缓存，同一次处理中只创建一次。
+
+        默认策略是组合策略时，阶梯模式为其中每个结构类子策略创建共用 MCSchematic 的阶梯策略。
         """
+        from .composite import CompositeOutputStrategy
         from .schematic import SchematicOutputStrategy
         from .staircase_schematic import StaircaseSchematicOutputStrategy, StaircaseUpSchematicOutputStrategy
         from .mcfunction import McFunctionOutputStrategy
 
+        if generation_mode in self._mode_strategies:
+            return self._mode_strategies[generation_mode]
+
         output_type = self.config.get("type", "schematic")
 
-        if generation_mode == "staircase":
-            return StaircaseSchematicOutputStrategy()
-        elif generation_mode == "staircase_up":
-            return StaircaseUpSchematicOutputStrategy()
-        elif generation_mode == "default":
+        if generation_mode in ("staircase", "staircase_up"):
+            factory = (
+                StaircaseSchematicOutputStrategy
+                if generation_mode == "staircase"
+                else StaircaseUpSchematicOutputStrategy
+            )
+            derived = []
+            if isinstance(self.default_strategy, CompositeOutputStrategy):
+                derived = self.default_strategy.derive_schematic_strategies(factory)
+                leaves = self.default_strategy.leaves()
+                if derived and any(getattr(leaf, "schem", None) is None for leaf in leaves):
+                    self.log("   └─ 注意: 阶梯模式只输出到结构类输出，命令类输出跳过该轨道组")
+            if len(derived) > 1:
+                strategy = CompositeOutputStrategy(derived)
+            elif derived:
+                strategy = derived[0]
+            else:
+                # 默认策略没有可共用的 MCSchematic（如 mcfunction），阶梯策略单独写出 <output_file>.schem
+                default_sink = getattr(self.default_strategy, "sink", None)
+                if default_sink is not None and getattr(self.default_strategy, "schem", None) is None:
+                    raise ValueError("阶梯模式的轨道组需要单独写出 .schem 文件，不支持写入 sink，请使用 output_file")
+                strategy = factory()
+        elif generation_mode in ("default", "dense", "serpentine"):
+            # 密集、蛇形布局只改变时钟布局（见 create_clock），沿用默认策略
+            if self.default_strategy is not None:
+                return self.default_strategy
             if output_type == "mcfunction":
-                return McFunctionOutputStrategy()
-            return SchematicOutputStrategy()
+                strategy = McFunctionOutputStrategy()
+            else:
+                strategy = SchematicOutputStrategy()
         else:
             # 回退到已设置的默认策略
-            if self.output_strategy is not None:
-                return self.output_strategy
-            return SchematicOutputStrategy()
+            if self.default_strategy is not None:
+                return self.default_strategy
+            strategy = SchematicOutputStrategy()
+
+        self._mode_strategies[generation_mode] = strategy
+        return strategy
 
     def _switch_strategy(self, new_strategy: OutputFormatStrategy):
         """
         切换到新策略，并将当前策略持有的共享资源传递给新策略。
-        仅当策略类型实际发生变化时才执行切换。
+        仅当策略实例实际发生变化时才执行切换，已初始化过的策略不会重复初始化。
         """
-        old_strategy = self.output_strategy
-        if type(old_strategy) is type(new_strategy):
-            return  # 同类型策略，无需切换
+        if self.output_strategy is new_strategy:
+            return  # 同一策略，无需切换
+
+        self.output_strategy = new_strategy
+        if new_strategy in self._active_strategies:
+            return  # 已初始化过，直接复用
 
         # 传递schematic（所有schematic策略共享同一个MCSchematic对象）
-        schem = getattr(old_strategy, "schem", None)
-        if schem is not None:
+        schem = next(
+            (
+                s.schem
+                for s in self._active_strategies
+                if getattr(s, "schem", None) is not None
+            ),
+            None,
+        )
+        if schem is not None and hasattr(new_strategy, "schem"):
             new_strategy.schem = schem
 
-        self.output_strategy = new_strategy
         # 初始化新策略（schem已存在时不会重建）
         self.output_strategy.initialize(self)
+        self._active_strategies.append(new_strategy)
 
     # ----------------------
     # 主流程入口
@@ -218,67 +295,440 @@ class GroupProcessor(ABC):
     def process(self):
         """遍历所有轨道组，依次处理。完整生命周期：初始化 -> 逐组处理 -> 完成。"""
         # 检查是否设置了输出策略（作为默认回退）
-        if self.output_strategy is None:
+        if self.default_strategy is None:
             raise ValueError("未设置输出格式策略，请先调用set_output_strategy方法")
 
-        # 初始化默认策略
+        # 输出前检测轨道组之间的重叠
+        if self.config.get("overlap_check"):
+            self._check_overlaps()
+
+        # 输出前估算规模，超过上限时拒绝执行
+        if self.config.get("max_blocks"):
+            self._check_size(int(self.config["max_blocks"]))
+
+        # 初始化并处理所有轨道组
+        self.generate()
+
+        # 完成处理
+        self._finalize_strategies()
+
+    def generate(self):
+        """只执行初始化与逐组生成，不调用 finalize（供差量对比等只需内存数据的场景使用）。"""
+        self.output_strategy = self.default_strategy
+        self._mode_strategies = {}
+        self._active_strategies = [self.default_strategy]
         self.output_strategy.initialize(self)
 
-        # 处理所有轨道组
+        if self.config.get("tempo_remap"):
+            self._remap_tempo()
         self._process_groups()
 
-        # 完成处理
-        self.output_strategy.finalize(self)
+    def _remap_tempo(self):
+        """按曲子速度把全部音符换算到红石刻（见 tempo.py），并输出时间误差统计。"""
+        from .tempo import remap_notes
+
+        if self.tempo is None:
+            raise ValueError("tempo_remap 需要曲子速度，请在创建 GroupProcessor 时传入 tempo=header.tempo")
+        quantum = int(self.config.get("tempo_quantum") or 1)
+        self.all_notes, self.global_max_tick, report = remap_notes(
+            self.all_notes, self.global_max_tick, self.tempo, quantum
+        )
+        before, after = report["length"]
+        self.log(f"\n>> 速度重映射: {self.tempo:g} t/s -> 每 {quantum} 红石刻一格")
+        self.log(f"├─ 长度: {before} -> {after} tick")
+        self.log(f"├─ 时间误差: 最大 {report['max_error_ms']:.1f} ms, 平均 {report['mean_error_ms']:.1f} ms")
+        self.log(f"└─ 合并 tick: {report['merged_ticks']}, 丢弃重叠音符: {report['dropped_notes']}")
+
+    def _check_overlaps(self):
+        """检测各轨道组生成的方块是否重叠（见 overlap.py），有重叠时输出详情并中止。"""
+        from .overlap import OverlapIndex
+
+        index = OverlapIndex(self.all_notes, self.global_max_tick, self.config, self.tempo)
+        overlaps = index.find_overlaps(self.group_config)
+        if not overlaps:
+            self.log("\n>> 重叠检测: 各轨道组互不重叠")
+            return
+        self.log(f"\n>> 重叠检测: 发现 {len(overlaps)} 处重叠")
+        for overlap in overlaps:
+            self.log(f"├─ {overlap.describe()}")
+        raise ValueError(f"轨道组重叠，后生成的轨道组会覆盖先生成的方块: {overlaps[0].describe()}")
+
+    def estimate(self):
+        """
+        试运行：不生成方块，根据音符表与轨道组配置估算输出规模（见 estimate.py）。
+        速度重映射只作用于估算过程，不改变本实例的音符。
+
+        返回:
+        SizeEstimate
+        """
+        from .estimate import estimate_size
+
+        return self.run_remapped(estimate_size)
+
+    def run_remapped(self, function):
+        """
+        按配置完成速度重映射后调用 function(self) 并返回其结果，之后恢复本实例的音符
+        （试运行与重叠检测只根据音符表计算，不经过 generate）。
+        """
+        notes, max_tick = self.all_notes, self.global_max_tick
+        try:
+            if self.config.get("tempo_remap"):
+                self._remap_tempo()
+            return function(self)
+        finally:
+            self.all_notes, self.global_max_tick = notes, max_tick
+
+    def _check_size(self, max_blocks: int):
+        """估算方块总数（不输出各组的加载日志），超过 max_blocks 时中止。"""
+        estimator = GroupProcessor(self.all_notes, self.global_max_tick, self.config, self.group_config, self.tempo)
+        estimate = estimator.estimate()
+        for line in estimate.lines()[:4]:
+            self.log(line)
+        if estimate.total > max_blocks:
+            raise ValueError(f"预计生成 {estimate.total} 个方块，超过上限 max_blocks={max_blocks}")
+
+    def _finalize_strategies(self):
+        """
+        依次完成所有用到的策略。
+        共享默认策略 MCSchematic 的阶梯策略不单独完成（由最先初始化的策略负责保存），
+        因此默认策略总会执行自己的 finalize；组合输出中共用结构对象的各结构类子策略各自写出自己的格式。
+        """
+        for strategy in self._owning_strategies():
+            strategy.finalize(self)
+
+    def _owning_strategies(self) -> List[OutputFormatStrategy]:
+        """
+        已初始化的策略中负责写出的策略：共享同一个 MCSchematic 的策略中，
+        每种结构类输出（SchematicOutputStrategy 的各子类）保留最先初始化的一个，其余策略（阶梯策略）不单独写出。
+        组合策略展开为各个子策略，保证每个子策略只完成一次。
+        """
+        from .composite import CompositeOutputStrategy
+        from .schematic import SchematicOutputStrategy
+
+        leaves = []
+        for strategy in self._active_strategies:
+            if isinstance(strategy, CompositeOutputStrategy):
+                leaves.extend(strategy.leaves())
+            else:
+                leaves.append(strategy)
+
+        owners = []
+        schem_owners: Dict[int, set] = {}  # 结构对象 -> 已负责写出的策略类型
+        for strategy in leaves:
+            if strategy in owners:
+                continue
+            schem = getattr(strategy, "schem", None)
+            if schem is not None:
+                types = schem_owners.setdefault(id(schem), set())
+                if types and (not isinstance(strategy, SchematicOutputStrategy) or type(strategy) in types):
+                    continue
+                types.add(type(strategy))
+            owners.append(strategy)
+        return owners
 
     def _process_groups(self):
         """逐个处理轨道组，根据每组的生成模式选择对应的输出策略。"""
-        for group_id, config in self.group_config.items():
-            self.log(f"\n>> 处理轨道组 {group_id}:")
-            self.log(f"├─ 包含轨道: {config['layers']}")
-            self.log(f"├─ 基准坐标: {config['base_coords']}")
-            self.log(f"├─ 方块配置: {config['block']}")
-            self.log(f"└─ 生成模式: {config.get('generation_mode', 'default')}")
-
-            # 初始化本组专属字段
-            self.base_x, self.base_y, self.base_z = map(int, config["base_coords"])
-            self.base_block = config["block"]["base"]
-            self.cover_block = config["block"]["cover"]
-            self.generation_mode = config.get(
-                "generation_mode", "default"
-            )  # 获取生成模式
-            self.layers = set(config["layers"])
-            self.tick_status = defaultdict(lambda: {"left": False, "right": False})
-
-            # 根据生成模式选择策略
-            group_strategy = self._pick_strategy_for_group(self.generation_mode)
-            if group_strategy is not self.output_strategy:
-                self._switch_strategy(group_strategy)
-
-            # 加载本组音符
-            self.load_notes(self.all_notes)
-            if self.notes:
-                self.log(f"   ├─ 发现音符数量: {len(self.notes)}")
-                self.log(f"   └─ 组内最大tick: {self.group_max_tick}")
-            else:
-                self.log("   └─ 警告: 未找到该组的音符")
+        pipeline_ticks = self.config.get("pipeline_ticks")
+        if pipeline_ticks:
+            self._process_groups_pipelined(int(pipeline_ticks))
+            return
 
+        for group_id, config in self.group_config.items():
+            self._enter_group(group_id, config)
             # 核心生成
             self.process_group()
 
+    def _process_groups_pipelined(self, window: int):
+        """
+        流水线模式：所有轨道组按 tick 分段交替生成（每段 window 个 tick），
+        每段结束后通知各策略 X 坐标小于 completed_x 的区域已经完成，可以交给后台写出。
+        """
+        group_states = []
+        for group_id, config in self.group_config.items():
+            self._enter_group(group_id, config)
+            group_states.append(self._save_group_state(note_index=0))
+
+        self.log(f"\n>> 流水线模式: 每 {window} tick 提交一次已完成区域")
+        for start in range(0, self.global_max_tick + 1, window):
+            end = min(start + window, self.global_max_tick + 1)
+            for state in group_states:
+                self._restore_group_state(state)
+                state["note_index"] = self.process_ticks(start, end, state["note_index"])
+                state.update(self._save_group_state(state["note_index"]))
+
+            # 各组下一段 tick 的第一个方块是其中继器，之前的列都已完成
+            next_x = []
+            for state in group_states:
+                self._restore_group_state(state)
+                x = self.get_clock_start_x(end)
+                if x is not None:
+                    next_x.append(x)
+            if not next_x:
+                break  # 全部生成完毕，剩余部分由 finalize 写出
+            completed_x = min(next_x)
+            for strategy in self._owning_strategies():
+                strategy.flush(self, completed_x)
+
+    # 切换轨道组时需要保存/恢复的字段
+    _GROUP_STATE_FIELDS = (
+        "group_id",
+        "base_x",
+        "base_y",
+        "base_z",
+        "base_block",
+        "cover_block",
+        "generation_mode",
+        "layers",
+        "tick_status",
+        "notes",
+        "group_max_tick",
+        "clock",
+        "lanes",
+        "output_strategy",
+    )
+
+    def _save_group_state(self, note_index: int) -> Dict:
+        state = {field: getattr(self, field) for field in self._GROUP_STATE_FIELDS}
+        state["note_index"] = note_index
+        return state
+
+    def _restore_group_state(self, state: Dict):
+        for field in self._GROUP_STATE_FIELDS:
+            setattr(self, field, state[field])
+
+    def _enter_group(self, group_id, config: Dict):
+        """初始化本组专属字段、选择输出策略并加载本组音符。"""
+        self.log(f"\n>> 处理轨道组 {group_id}:")
+        self.log(f"├─ 包含轨道: {config['layers']}")
+        self.log(f"├─ 基准坐标: {config['base_coords']}")
+        self.log(f"├─ 方块配置: {config['block']}")
+        self.log(f"└─ 生成模式: {config.get('generation_mode', 'default')}")
+
+        self._init_group_fields(group_id, config)
+
+        # 根据生成模式选择策略
+        group_strategy = self._pick_strategy_for_group(self.generation_mode)
+        self._switch_strategy(group_strategy)
+
+        self._load_group(config)
+
+    def prepare_group(self, group_id, config: Dict):
+        """只初始化本组字段并加载音符、时钟布局，不涉及输出策略（供估算等只需要几何信息的场景使用）。"""
+        self._init_group_fields(group_id, config)
+        self._load_group(config)
+
+    def _init_group_fields(self, group_id, config: Dict):
+        """初始化本组专属字段。"""
+        self.group_id = group_id
+        self.base_x, self.base_y, self.base_z = map(int, config["base_coords"])
+        self.base_block = config["block"]["base"]
+        self.cover_block = config["block"]["cover"]
+        self.generation_mode = config.get(
+            "generation_mode", "default"
+        )  # 获取生成模式
+        self.layers = set(config["layers"])
+        self.tick_status = defaultdict(lambda: {"left": False, "right": False})
+
+    def _load_group(self, config: Dict):
+        """加载本组音符（含声像微调、吸附），创建时钟布局与中继器线。"""
+        self.load_notes(self.all_notes)
+        if self.notes:
+            self.log(f"   ├─ 发现音符数量: {len(self.notes)}")
+            self.log(f"   └─ 组内最大tick: {self.group_max_tick}")
+        else:
+            self.log("   └─ 警告: 未找到该组的音符")
+        if self.config.get("pan_nudge"):
+            self._nudge_pans(int(self.config["pan_nudge"]))
+        if self.config.get("tempo_remap"):
+            self._drop_remap_conflicts()
+        if self.config.get("pan_snap"):
+            self._snap_pans(int(self.config["pan_snap"]))
+
+        # 时钟布局
+        self.clock = self.create_clock(config)
+        if type(self.clock) is not ClockLayout:
+            self.log(
+                f"   └─ 时钟布局: {self.clock.summary()}（默认布局主干道 {self.global_max_tick * 2 + 2} 格）"
+            )
+        self.lanes = self.create_lanes(config)
+        if self.lanes:
+            self.log(f"   └─ 低更新元件: 声像偏移 {', '.join(map(str, sorted(self.lanes)))} 使用中继器线")
+        elif config.get("components") == "repeater":
+            self.log("   └─ 低更新元件: 音符稀疏，中继器线不能减少红石更新，全部使用红石线声像平台")
+
+    def create_clock(self, config: Dict) -> ClockLayout:
+        """
+        根据轨道组配置创建时钟布局（子类可以重写以提供自定义布局）。
+
+        - generation_mode='dense': 每个 tick 占 1 格的双线交错时钟
+        - generation_mode='serpentine': 折叠为宽 segment_length 格的若干行（可与 compact 同时使用）
+        - compact=True: 休止压缩为多档中继器，主干道在本组最后一个音符处结束
+        - shared_clock=<轨道组ID>: 共用该轨道组的时钟，只为有音符的 tick 生成主干道（见 create_tap_clock）
+        - 其他: 默认布局
+        """
+        if config.get("shared_clock") is not None:
+            return self.create_tap_clock(config["shared_clock"], config)
+        if self.generation_mode == "dense":
+            if config.get("compact"):
+                raise ValueError(f"轨道组 {self.group_id}: dense 模式不支持 compact")
+            return DenseClock(self.base_x, self.global_max_tick)
+        if self.generation_mode == "serpentine":
+            pans = [self._calculate_pan(note) for note in self.notes]
+            return SerpentineClock(
+                [note.tick for note in self.notes] if config.get("compact") else range(self.global_max_tick + 1),
+                self.base_x,
+                self.base_z,
+                int(config.get("segment_length", 64)),
+                right=max([pan for pan in pans if pan > 0], default=0),
+                left=-min([pan for pan in pans if pan < 0], default=0),
+            )
+        if config.get("compact"):
+            return CompactClock((note.tick for note in self.notes), self.base_x)
+        return ClockLayout(self.base_x, self.global_max_tick)
+
+    def create_tap_clock(self, source_id, config: Dict) -> TapClock:
+        """
+        创建共用 source_id 轨道组时钟的布局（见 TapClock）。
+
+        两组必须使用默认生成模式（不开启 compact 和低更新元件），base_x 相同，沿 Z 轴错开，
+        高度差不超过两组主干道的 Z 距离；共用后时钟的方块数比本组独立的默认时钟更多时拒绝共用。
+        """
+        source = self.group_config.get(source_id)
+        if source is None or source_id == self.group_id:
+            raise ValueError(f"轨道组 {self.group_id}: shared_clock 指向的轨道组不存在: {source_id}")
+        for name, group in ((self.group_id, config), (source_id, source)):
+            if (
+                group.get("generation_mode", "default") != "default"
+                or group.get("compact")
+                or group.get("components", "redstone") != "redstone"
+            ):
+                raise ValueError(f"轨道组 {name}: 共用时钟只支持默认生成模式（不开启 compact 和低更新元件）")
+        if source.get("shared_clock") is not None:
+            raise ValueError(f"轨道组 {source_id} 自身共用其他轨道组的时钟，不能再被共用")
+        source_x, source_y, source_z = map(int, source["base_coords"])
+        if source_x != self.base_x:
+            raise ValueError(f"轨道组 {self.group_id}: 共用时钟要求与轨道组 {source_id} 的 base_x 相同")
+        height, offset = source_y - self.base_y, source_z - self.base_z
+        if offset == 0:
+            raise ValueError(f"轨道组 {self.group_id}: 共用时钟的轨道组不能与轨道组 {source_id} 位于同一 Z 坐标")
+        if not -abs(offset) - 1 <= height <= abs(offset) - 1:
+            raise ValueError(
+                f"轨道组 {self.group_id}: 与轨道组 {source_id} 的主干道相距 {abs(offset)} 格，"
+                f"高度只能比它低 {abs(offset) - 1} 格到高 {abs(offset) + 1} 格"
+            )
+
+        # 两组的音符在各 tick 的列中占用的位置（声像平台及其基座、音符盒下方的屏障和上方的空气）
+        occupied = defaultdict(set)
+        for notes, y, z in ((self._final_notes(source["layers"]), height, offset), (self.notes, 0, 0)):
+            pans_by_tick = defaultdict(set)
+            for note in notes:
+                pans_by_tick[note.tick].add(self._calculate_pan(note))
+            for tick, pans in pans_by_tick.items():
+                cells = occupied[tick]
+                for pan in range(min(pans | {0}), max(pans | {0}) + 1):
+                    cells.update(((y, z + pan), (y - 1, z + pan)))
+                for pan in pans:
+                    cells.update(((y + 1, z + pan), (y - 2, z + pan)))
+
+        clock = TapClock(self.clock_for_group(source), (note.tick for note in self.notes), height, offset, occupied)
+        shared, own = clock.block_count(), self.clock_for_group(config).block_count()
+        if shared > own:
+            raise ValueError(
+                f"轨道组 {self.group_id}: 共用轨道组 {source_id} 的时钟需要 {shared} 个方块，"
+                f"比独立的时钟（{own} 个）更多，请去掉 shared_clock"
+            )
+        return clock
+
+    def create_lanes(self, config: Dict) -> Lanes:
+        """
+        根据轨道组配置 components 规划低更新元件模式的中继器线（见 components.py）。
+        中继器线复制主干道的结构，只支持默认和 compact 时钟布局。
+        """
+        components = config.get("components", "redstone")
+        if components not in COMPONENT_MODES:
+            raise ValueError(f"轨道组 {self.group_id}: 未知的元件模式 {components}，可选 {', '.join(COMPONENT_MODES)}")
+        if components == "redstone":
+            return {}
+        if type(self.clock) not in (ClockLayout, CompactClock):
+            raise ValueError(f"轨道组 {self.group_id}: 低更新元件模式只支持默认时钟布局（可开启 compact）")
+        return plan_lanes(
+            self.generation_mode,
+            ((note.tick, self._calculate_pan(note)) for note in self.notes),
+            list(self.get_clock_ticks(0, self.group_max_tick + 1)),
+        )
+
+    def clock_for_group(self, config: Dict) -> ClockLayout:
+        """默认生成模式的轨道组的时钟布局（共用时钟时用于确定分支位置和比较方块数）。"""
+        return ClockLayout(int(config["base_coords"][0]), self.global_max_tick)
+
     # ----------------------
     # 音符加载 & 工具方法
     # ----------------------
     def load_notes(self, all_notes: List[Note]):
         """
-        过滤出属于本组的音符，并按 tick 升序排序。
+        过滤出属于本组的音符，并按 tick 升序排序（同一 tick 内保持原顺序）。
         同时计算组内最大 tick。
         """
+        # 按轨道建立的音符索引在 all_notes 不变时复用，逐组加载不需要每次遍历整首曲子
+        cached = self._layer_index
+        if cached is None or cached[0] is not all_notes or cached[1] != len(all_notes):
+            index = defaultdict(list)
+            for position, note in enumerate(all_notes):
+                index[note.layer].append(position)
+            self._layer_index = (all_notes, len(all_notes), index)
+        index = self._layer_index[2]
+        positions = sorted(chain.from_iterable(index.get(layer, ()) for layer in self.layers))
         self.notes = sorted(
-            (n for n in all_notes if n.layer in self.layers),
+            (all_notes[position] for position in positions),
             key=lambda note: note.tick,
         )
         self.group_max_tick = max(note.tick for note in self.notes) if self.notes else 0
 
+    def _final_notes(self, layers: Iterable[int]) -> List[Note]:
+        """指定轨道经过与本组相同的声像微调、速度重映射去重和声像吸附后的音符（不记录日志）。"""
+        layers = set(layers)
+        notes = sorted((note for note in self.all_notes if note.layer in layers), key=lambda note: note.tick)
+        if self.config.get("pan_nudge"):
+            notes = nudge_pans(notes, int(self.config["pan_nudge"]))[0]
+        if self.config.get("tempo_remap"):
+            notes = drop_slot_conflicts(notes)[0]
+        if self.config.get("pan_snap"):
+            notes = snap_pans(notes, int(self.config["pan_snap"]))[0]
+        return notes
+
+    def _nudge_pans(self, tolerance: int):
+        """把本组位置冲突的音符移到同侧最近的空闲声像偏移（见 nudge.py），逐条记录调整。"""
+        self.notes, adjustments, unresolved = nudge_pans(self.notes, tolerance)
+        if not adjustments and not unresolved:
+            return
+        self.log(f"   └─ 声像微调: 移动 {len(adjustments)} 个冲突音符（最大 {tolerance} 格）")
+        for note, old_pan, new_pan in adjustments:
+            self.log(
+                f"      ├─ Tick {note.tick}, Layer={note.layer}, Key={note.key}: 偏移 {old_pan} -> {new_pan}"
+            )
+        for note in unresolved:
+            self.log(
+                f"      ├─ 警告: Tick {note.tick}, Layer={note.layer} 附近没有空闲偏移，保持原位"
+            )
+
+    def _drop_remap_conflicts(self):
+        """速度重映射后合并到同一位置的不同轨道的音符只保留一个（见 tempo.py），逐条记录丢弃的音符。"""
+        self.notes, dropped = drop_slot_conflicts(self.notes)
+        if not dropped:
+            return
+        self.log(f"   └─ 速度重映射: 丢弃 {len(dropped)} 个合并到同一位置的音符")
+        for note in dropped:
+            self.log(f"      ├─ Tick {note.tick}, Layer={note.layer}, Key={note.key}, 声像 {self._calculate_pan(note)}")
+
+    def _snap_pans(self, max_error: int):
+        """按 tick 重新量化本组声像偏移以缩短声像平台（见 snap.py），报告节省的方块数。"""
+        self.notes, moved, (before, after) = snap_pans(self.notes, max_error)
+        if moved:
+            self.log(
+                f"   └─ 声像吸附: 移动 {moved} 个音符（最大误差 {max_error} 格），"
+                f"声像平台 {before} -> {after} 格，节省 {before - after} 格"
+            )
+
     @staticmethod
     def _calculate_pan(note: Note) -> int:
         """
@@ -289,7 +739,7 @@ class GroupProcessor(ABC):
         return int(round(note.panning / 10))
 
     @staticmethod
-    def _get_max_pan(notes: List[Note], tick: int, direction: int) -> int:
+    def _get_max_pan(notes: List[Note], tick: int, direction: int, lanes: Container[int] = ()) -> int:
         """
         在指定 tick 内，找出给定方向（1=右，-1=左）的最大绝对偏移值。
         用于决定声像平台长度。
@@ -298,6 +748,7 @@ class GroupProcessor(ABC):
         notes: 音符列表
         tick: 当前tick
         direction: 方向（1=右，-1=左）
+        lanes: 有中继器线的偏移（低更新元件模式），这些偏移的音符不需要声像平台
 
         返回:
         带符号的最大偏移值
@@ -307,7 +758,7 @@ class GroupProcessor(ABC):
             if note.tick == tick:
                 pan = GroupProcessor._calculate_pan(note)
                 # 检查音符方向是否与指定方向一致
-                if pan * direction > 0:
+                if pan * direction > 0 and pan not in lanes:
                     max_pan = max(max_pan, abs(pan))
         return max_pan * direction  # 带符号
 
@@ -325,48 +776,163 @@ class GroupProcessor(ABC):
         返回:
         (x, y, z) 三元组，表示音符在Minecraft世界中的坐标
         """
-        tick_x = self.base_x + note.tick * 2
+        tick_x = self.get_tick_x(note.tick)
         pan_offset = self._calculate_pan(note)
-        z_pos = self.base_z + pan_offset
-        return tick_x, self.base_y, z_pos
+        z_pos = self.get_tick_z(note.tick) + pan_offset
+        return tick_x, self.get_tick_y(note.tick), z_pos
 
-    def get_platform_start_z(self) -> int:
+    def get_tick_x(self, tick: int) -> int:
+        """
+        指定 tick 的主干道 X 坐标（覆盖方块、声像平台和音符所在的列）
+
+        参数:
+        tick: 当前tick
+
+        返回:
+        X 坐标；默认布局每个 tick 占 2 格
+        """
+        return self.clock.tick_x(tick)
+
+    def get_tick_y(self, tick: int) -> int:
+        """指定 tick 所在时钟线的 Y 坐标（密集布局奇数 tick 位于上层时钟线）。"""
+        return self.base_y + self.clock.lane_offset(tick)
+
+    def get_tick_z(self, tick: int) -> int:
+        """指定 tick 所在行主干道的 Z 坐标（蛇形布局每行依次沿 +Z 排列）。"""
+        return self.base_z + self.clock.row_offset(tick)
+
+    def get_clock_blocks(self, tick: int) -> List[Tuple[Tuple[int, int, int], str]]:
+        """
+        指定 tick 的基础时钟结构 [((x, y, z), 方块状态)]：
+        覆盖方块及其基座、驱动它的中继器链、蛇形布局的转弯与跨过转弯的中继器、共用时钟的分支
+        （中继器和红石线下方都有基座方块，分支起点的红石线放在被共用组的覆盖方块上）。
+        """
+        tick_x, y, z = self.get_tick_x(tick), self.get_tick_y(tick), self.get_tick_z(tick)
+        blocks = [((tick_x, y, z), self.cover_block)]
+        if self.trunk_needs_base():
+            blocks.append(((tick_x, y - 1, z), self.base_block))
+        facing = self.clock.facing(tick)
+        for repeater_x, delay in self.get_clock_repeaters(tick):
+            blocks += [
+                ((repeater_x, y, z), f"minecraft:repeater[delay={delay},facing={facing}]"),
+                ((repeater_x, y - 1, z), self.base_block),
+            ]
+        for link_x, height, z_offset, block in self.clock.links(tick):
+            link_y, link_z = self.base_y + height, self.base_z + z_offset
+            blocks += [((link_x, link_y, link_z), block), ((link_x, link_y - 1, link_z), self.base_block)]
+        for link_x, height, z_offset, block in self.clock.mounted_links(tick):
+            blocks.append(((link_x, self.base_y + height, self.base_z + z_offset), block))
+        if self.lanes:
+            blocks += self.get_lane_blocks(tick)
+        return blocks
+
+    def get_lane_blocks(self, tick: int) -> List[Tuple[Tuple[int, int, int], str]]:
+        """
+        低更新元件模式下指定 tick 的中继器线结构（与主干道相同的中继器和覆盖方块，位于各偏移的 Z 坐标），
+        第一个 tick 还包括主干道输入位置的输入排。
+        """
+        tick_x = self.get_tick_x(tick)
+        repeaters = self.get_clock_repeaters(tick)
+        blocks = []
+        for pan, (height, last_tick) in sorted(self.lanes.items()):
+            if tick > last_tick:
+                continue
+            y, z = self.base_y + height, self.base_z + pan
+            blocks += [((tick_x, y, z), self.cover_block), ((tick_x, y - 1, z), self.base_block)]
+            for repeater_x, delay in repeaters:
+                blocks += [
+                    ((repeater_x, y, z), f"minecraft:repeater[delay={delay},facing=west]"),
+                    ((repeater_x, y - 1, z), self.base_block),
+                ]
+        if self.get_clock_start_x(0) == repeaters[0][0]:  # 本组的第一个 tick
+            bar_x = repeaters[0][0] - 1
+            for z_offset, height, block in input_bar(self.generation_mode, self.lanes):
+                y, z = self.base_y + height, self.base_z + z_offset
+                blocks += [((bar_x, y, z), block), ((bar_x, y - 1, z), self.base_block)]
+        return blocks
+
+    def get_lane_y(self, pan: int) -> int | None:
+        """声像偏移 pan 的中继器线（音符盒）的 Y 坐标；不是低更新元件模式或该偏移没有中继器线时为 None。"""
+        if pan not in self.lanes:
+            return None
+        return self.base_y + self.lanes[pan][0]
+
+    def get_clock_repeaters(self, tick: int) -> List[Repeater]:
+        """
+        驱动指定 tick 主干道的中继器 [(X 坐标, 档位)]，按信号方向排列。
+        默认布局为主干道前一格的 1 档中继器；紧凑布局为补足休止的多档中继器链。
+        """
+        return self.clock.repeaters(tick)
+
+    def get_clock_ticks(self, start_tick: int, end_tick: int) -> Iterable[int]:
+        """[start_tick, end_tick) 范围内需要生成主干道的 tick。"""
+        return self.clock.ticks_between(start_tick, end_tick)
+
+    def get_clock_start_x(self, tick: int) -> int | None:
+        """不早于 tick 的结构中最小的 X 坐标（流水线模式据此判断已完成区域）；之后不再生成时为 None。"""
+        return self.clock.start_x(tick)
+
+    def trunk_needs_base(self) -> bool:
+        """主干道覆盖方块下方是否需要基座方块（沙子类方块下方始终需要支撑）。"""
+        return self.clock.cover_needs_base or self.cover_block.endswith("sand")
+
+    def get_platform_base_start_z(self, direction: int, tick: int) -> int:
+        """
+        获取平台基座起始Z坐标：覆盖方块需要基座时从主干道开始，否则只支撑红石线，从主干道旁边开始
+
+        参数:
+        direction: 方向（1=右，-1=左）
+        tick: 当前tick
+
+        返回:
+        平台基座起始Z坐标
+        """
+        if self.trunk_needs_base():
+            return self.get_platform_start_z(tick)
+        return self.get_wire_start_z(direction, tick)
+
+    def get_platform_start_z(self, tick: int) -> int:
         """
         获取平台起始Z坐标（主干道位置）
 
+        参数:
+        tick: 当前tick
+
         返回:
         平台起始Z坐标
         """
-        return self.base_z
+        return self.get_tick_z(tick)
 
-    def calculate_platform_end_z(self, max_pan_offset: int, direction: int) -> int:
+    def calculate_platform_end_z(self, max_pan_offset: int, direction: int, tick: int) -> int:
         """
         计算平台结束Z坐标
 
         参数:
         max_pan_offset: 最大偏移量
         direction: 方向（1=右，-1=左）
+        tick: 当前tick
 
         返回:
         平台结束Z坐标
         """
-        platform_start_z = self.get_platform_start_z()
+        platform_start_z = self.get_platform_start_z(tick)
         if direction == 1:  # 右侧
             return platform_start_z + max_pan_offset - 1
         else:  # 左侧
             return platform_start_z + max_pan_offset + 1
 
-    def get_wire_start_z(self, direction: int) -> int:
+    def get_wire_start_z(self, direction: int, tick: int) -> int:
         """
         获取红石线起始Z坐标（从主干道旁边开始）
 
         参数:
         direction: 方向（1=右，-1=左）
+        tick: 当前tick
 
         返回:
         红石线起始Z坐标
         """
-        platform_start_z = self.get_platform_start_z()
+        platform_start_z = self.get_platform_start_z(tick)
         return platform_start_z + direction
 
     # ----------------------
@@ -381,10 +947,21 @@ class GroupProcessor(ABC):
         4. 生成声像平台；
         5. 生成音符方块。
         """
-        current_tick = 0
-        note_index = 0  # 已处理到的音符索引
+        self.process_ticks(0, self.global_max_tick + 1, 0)
 
-        while current_tick <= self.global_max_tick:
+    def process_ticks(self, start_tick: int, end_tick: int, note_index: int) -> int:
+        """
+        生成本组 [start_tick, end_tick) 范围内的 tick（步骤同 process_group）。
+
+        参数:
+        start_tick, end_tick: tick 范围
+        note_index: 本组音符中第一个未处理音符的索引
+
+        返回:
+        处理完后第一个未处理音符的索引
+        """
+        for current_tick in self.get_clock_ticks(start_tick, end_tick):
+            self.current_tick = current_tick
             # 1. 更新进度
             progress = (
                 int((current_tick / self.global_max_tick) * 100)
@@ -418,11 +995,11 @@ class GroupProcessor(ABC):
                     )
                 occupied_positions.add(position)
 
-            # 5. 生成声像平台（左优先）
+            # 5. 生成声像平台（左优先；低更新元件模式下有中继器线的偏移不需要平台）
             pan_directions = set()
             for note in active_notes:
                 pan = self._calculate_pan(note)
-                if pan != 0:
+                if pan != 0 and pan not in self.lanes:
                     pan_directions.add(1 if pan > 0 else -1)
 
             for direction in sorted(pan_directions, reverse=True):  # 左(-1) > 右(1)
@@ -432,4 +1009,4 @@ class GroupProcessor(ABC):
             for note in active_notes:
                 self.output_strategy.write_note(self, note)
 
-            current_tick += 1
+        return note_index
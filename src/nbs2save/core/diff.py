@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+差量输出生成器
+----------------------
+对比同一轨道组配置下曲子的两个版本，只输出发生变化的方块。
+
+主要流程
+1. 按当前配置正常生成新版本的方块数据（与 .schem 输出完全一致）。
+2. 读取旧版本：
+   - .nbs   → 用同一份 group_config 在内存中重新生成方块数据；
+   - .schem → 直接读取之前生成的结构文件。
+3. 逐方块对比，被删除的位置写入 air。
+4. 把变化合并为 setblock / fill 命令，输出为 .mcfunction 文件。
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import pynbs
+from mcschematic import MCSchematic
+from pynbs import Note
+
+from .core import GroupProcessor
+from .schematic import SchematicOutputStrategy
+from .sinks import write_text
+from .tiling import schematic_blocks
+
+Position = Tuple[int, int, int]
+
+AIR_BLOCK = "minecraft:air"
+
+
+# --------------------------
+# 方块数据收集
+# --------------------------
+def collect_blocks(
+    all_notes: List[Note], global_max_tick: int, config: Dict, group_config: Dict, tempo: float | None = None
+) -> Dict[Position, str]:
+    """
+    在内存中生成整首曲子的方块数据，不写出任何文件。
+
+    参数:
+    all_notes: 整首曲子的全部音符
+    global_max_tick: 曲子总长度（tick）
+    config: 全局生成配置
+    group_config: 轨道组配置
+    tempo: 曲子速度（开启 tempo_remap 时需要）
+
+    返回:
+    {坐标: 方块状态} 字典
+    """
+    # 始终按结构文件的方块语义生成，保证与 .schem 输出逐方块一致
+    processor = GroupProcessor(
+        all_notes, global_max_tick, dict(config, type="schematic", pipeline_ticks=None), group_config, tempo
+    )
+    strategy = SchematicOutputStrategy()
+    processor.set_output_strategy(strategy)
+    processor.generate()
+    return schematic_blocks(strategy.schem)
+
+
+def load_previous_blocks(path: str, config: Dict, group_config: Dict) -> Dict[Position, str]:
+    """
+    读取旧版本的方块数据。
+
+    参数:
+    path: 旧版本文件路径（.nbs 或 .schem）
+    config: 全局生成配置
+    group_config: 轨道组配置（.nbs 时用于重新生成）
+    """
+    if path.endswith(".schem"):
+        return schematic_blocks(MCSchematic(path))
+    if path.endswith(".nbs"):
+        song = pynbs.read(path)
+        return collect_blocks(song.notes, song.header.song_length, config, group_config, song.header.tempo)
+    raise ValueError(f"不支持的旧版本文件类型: {path}（仅支持 .nbs 或 .schem）")
+
+
+# --------------------------
+# 差量计算
+# --------------------------
+def compute_block_diff(
+    old_blocks: Dict[Position, str], new_blocks: Dict[Position, str]
+) -> Dict[Position, str]:
+    """
+    计算方块级差量。
+
+    返回:
+    {坐标: 新方块状态}，旧版本有而新版本没有的位置为 minecraft:air
+    """
+    changes = {
+        pos: block for pos, block in new_blocks.items() if old_blocks.get(pos) != block
+    }
+    for pos in old_blocks.keys() - new_blocks.keys():
+        changes[pos] = AIR_BLOCK
+    return changes
+
+
+def diff_to_commands(changes: Dict[Position, str]) -> List[str]:
+    """
+    把差量转换为命令。
+    同一 (x, y) 上沿 Z 轴连续、方块相同的位置合并为一条 fill 命令，
+    声像平台和红石线都是沿 Z 轴铺设的，这样能合并绝大多数变化。
+    """
+    # (方块, x, y) -> 所有 z
+    runs: defaultdict[Tuple[str, int, int], List[int]] = defaultdict(list)
+    for (x, y, z), block in changes.items():
+        runs[(block, x, y)].append(z)
+
+    commands = []
+    # 放置按 y 从低到高、移除按 y 从高到低，保证沙子类基座下方的屏障始终先于沙子存在
+    def order(item):
+        block, x, y = item[0]
+        is_air = block == AIR_BLOCK
+        return is_air, -y if is_air else y, x, block
+
+    for (block, x, y), zs in sorted(runs.items(), key=order):
+        zs.sort()
+        start = prev = zs[0]
+        for z in zs[1:] + [None]:
+            if z is not None and z == prev + 1:
+                prev = z
+                continue
+            if start == prev:
+                commands.append(f"setblock {x} {y} {start} {block}")
+            else:
+                commands.append(f"fill {x} {y} {start} {x} {y} {prev} {block}")
+            if z is not None:
+                start = prev = z
+    return commands
+
+
+# --------------------------
+# 差量输出策略
+# --------------------------
+class DiffOutputStrategy(SchematicOutputStrategy):
+    """
+    差量输出策略：按正常流程生成新版本，完成时与旧版本对比，
+    只把变化写入 .mcfunction 文件。
+    """
+
+    def pipeline_column_width(self, processor: GroupProcessor) -> None:
+        """差量需要完整的新版本方块，不提前写出。"""
+        return None
+
+    def validate_config(self, processor: GroupProcessor):
+        """除 .schem 输出所需的键外，还需要旧版本文件路径。"""
+        SchematicOutputStrategy.validate_config(processor)
+        if not processor.config.get("previous_file"):
+            raise ValueError("配置缺失: previous_file")
+
+    def finalize(self, processor: GroupProcessor):
+        """
+        完成输出，计算差量并写入命令文件
+
+        参数:
+        processor: GroupProcessor实例
+        """
+        new_blocks = schematic_blocks(self.schem)
+        old_blocks = load_previous_blocks(
+            processor.config["previous_file"], processor.config, processor.group_config
+        )
+        changes = compute_block_diff(old_blocks, new_blocks)
+        commands = diff_to_commands(changes)
+
+        removed = sum(1 for block in changes.values() if block == AIR_BLOCK)
+        processor.log(
+            f"\n>> 差量对比: 旧版本 {len(old_blocks)} 方块, 新版本 {len(new_blocks)} 方块"
+        )
+        processor.log(f"├─ 变化方块: {len(changes)}（其中移除 {removed}）")
+        processor.log(f"└─ 生成命令: {len(commands)} 条")
+
+        text = "\n".join(commands) + "\n"
+        if self.sink is not None:
+            write_text(self.sink, text)
+            return
+        output_file = processor.config["output_file"] + ".mcfunction"
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(text)
@@ -0,0 +1,489 @@
+# -*- coding: utf-8 -*-
+"""
+输出规模估算（试运行）
+----------------------
+长曲子的转换可能要十几分钟，试运行只根据音符表和轨道组配置计算输出规模，不经过输出策略、不生成方块：
+
+- 每种方块的精确数量（同一位置被多次写入时只计最后写入的方块，与 .schem 中的结果一致）
+- 整体包围盒与涉及的区块数
+- mcfunction 命令数与文件大小，以及 .schem 等压缩输出的估计大小
+
+全部轨道组（各种时钟布局、阶梯模式、低更新元件模式）直接由时钟布局和音符表用 numpy 算出每次写入的位置与方块：
+阶梯平台和音符的高度只取决于 tick、声像偏移和该 tick 同侧平台的长度，中继器线复制主干道的中继器链。
+按写入顺序（轨道组、tick、时钟/右侧平台/左侧平台/音符）排序后取每个位置最后写入的方块。
+
+配置 max_blocks 后，process() 在生成前先估算，方块总数超过上限时拒绝执行。
+"""
+
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import chain
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .clock import ClockLayout, CompactClock
+from .components import input_bar
+from .core import GroupProcessor
+from .mcfunction import McFunctionOutputStrategy
+from .overlap import decode_positions, encode_positions
+from .schematic import SchematicOutputStrategy
+from .tiling import CHUNK_SIZE, Position
+
+# 声像平台的红石线
+PLATFORM_WIRE = "minecraft:redstone_wire[north=side,south=side]"
+# 压缩输出（.schem 等，压缩级别 9）的估计大小：包围盒内每格约 _SCHEM_BYTES_PER_VOLUME 字节，
+# 每个非空气方块约 _SCHEM_BYTES_PER_BLOCK 字节（由实际生成的 .schem 拟合，误差通常在 ±15% 以内）
+_SCHEM_BYTES_PER_VOLUME = 0.0125
+_SCHEM_BYTES_PER_BLOCK = 0.62
+
+# 写入阶段（同一 tick 内的写入顺序，与 GroupProcessor.process_ticks 一致）
+_PHASE_CLOCK, _PHASE_RIGHT, _PHASE_LEFT, _PHASE_NOTES = 0, 1, 2, 3
+
+
+@dataclass
+class SizeEstimate:
+    """试运行结果。"""
+
+    blocks: Dict[str, int]  # 方块ID（不含状态） -> 数量，按数量从大到小排列
+    low: Position  # 整体包围盒
+    high: Position
+    chunks: int  # 涉及的区块数
+    commands: int  # mcfunction 命令数（阶梯模式的轨道组不输出命令）
+    mcfunction_bytes: int  # mcfunction 文件大小
+    schematic_bytes: int  # 压缩输出的估计大小
+
+    @property
+    def total(self) -> int:
+        return sum(self.blocks.values())
+
+    def lines(self) -> List[str]:
+        """日志输出（树形）。"""
+        size = tuple(h - l + 1 for l, h in zip(self.low, self.high))
+        lines = [
+            f"\n>> 试运行: {self.total} 个方块，{len(self.blocks)} 种",
+            f"├─ 范围: {self.low} ~ {self.high}（{size[0]}x{size[1]}x{size[2]}），{self.chunks} 个区块",
+            f"├─ mcfunction: {self.commands} 条命令，{_format_bytes(self.mcfunction_bytes)}",
+            f"├─ .schem 等压缩输出: 约 {_format_bytes(self.schematic_bytes)}",
+        ]
+        items = list(self.blocks.items())
+        for index, (block, count) in enumerate(items):
+            lines.append(f"{'└' if index == len(items) - 1 else '├'}─ {block}: {count}")
+        return lines
+
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def _digits(values: np.ndarray) -> np.ndarray:
+    """整数的十进制字符数（含负号）。"""
+    values = np.asarray(values, dtype=np.int64)
+    magnitude = np.maximum(np.abs(values), 1)
+    return np.floor(np.log10(magnitude)).astype(np.int64) + 1 + (values < 0)
+
+
+class _Writes:
+    """按生成顺序登记的方块写入，以及对应的 mcfunction 命令数与字节数。"""
+
+    def __init__(self, origin: Position | None):
+        self.origin = origin  # mcfunction 相对坐标原点，None 表示绝对坐标
+        self.codes: Dict[str, int] = {}  # 方块状态 -> 编号
+        self.parts: List[Tuple[np.ndarray, ...]] = []
+        self.commands = 0
+        self.command_bytes = 0
+        self.counting = True  # 是否统计 mcfunction 命令（阶梯模式的轨道组只输出到结构类输出）
+
+    def code(self, block: str) -> int:
+        return self.codes.setdefault(block, len(self.codes))
+
+    def coord_chars(self, positions: np.ndarray) -> np.ndarray:
+        """mcfunction 中 "x y z" 的字符数。"""
+        if self.origin is None:
+            return _digits(positions).sum(axis=1) + 2
+        offsets = positions - np.asarray(self.origin)
+        return (1 + np.where(offsets != 0, _digits(offsets), 0)).sum(axis=1) + 2
+
+    def add(self, group: int, positions, codes, ticks, phase: int):
+        """登记一批写入（同一 tick 内按登记顺序写入）。"""
+        positions = np.asarray(positions, dtype=np.int64).reshape(-1, 3)
+        if not len(positions):
+            return
+        count = len(positions)
+        self.parts.append((
+            encode_positions(positions),
+            np.broadcast_to(np.asarray(codes, dtype=np.int64), (count,)),
+            np.full(count, group, dtype=np.int64),
+            np.broadcast_to(np.asarray(ticks, dtype=np.int64), (count,)),
+            np.full(count, phase, dtype=np.int64),
+        ))
+
+    def add_setblocks(self, positions, codes, command_names: Dict[int, int] | None = None):
+        """登记与写入一一对应的 setblock 命令（command_names: 方块编号 -> 命令中方块名比状态少的字符数）。"""
+        positions = np.asarray(positions, dtype=np.int64).reshape(-1, 3)
+        if not self.counting or not len(positions):
+            return
+        codes = np.broadcast_to(np.asarray(codes, dtype=np.int64), (len(positions),))
+        names = np.fromiter(map(len, self.codes), dtype=np.int64, count=len(self.codes))
+        for code, shorter in (command_names or {}).items():
+            names[code] -= shorter
+        lengths = names[codes]
+        self.commands += len(positions)
+        self.command_bytes += int((len("setblock ") + self.coord_chars(positions) + 1 + lengths + 1).sum())
+
+    def add_fills(self, low, high, block: str):
+        """登记 fill 命令。"""
+        low = np.asarray(low, dtype=np.int64).reshape(-1, 3)
+        high = np.asarray(high, dtype=np.int64).reshape(-1, 3)
+        if not self.counting or not len(low):
+            return
+        self.commands += len(low)
+        self.command_bytes += int(
+            (len("fill ") + self.coord_chars(low) + 1 + self.coord_chars(high) + 1 + len(block) + 1).sum()
+        )
+
+    def resolve(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """按写入顺序排序，返回每个位置最后写入的方块 (坐标编码（升序）, 方块编号, 写入时的 tick)。"""
+        if not self.parts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        keys, codes, groups, ticks, phases = (np.concatenate(column) for column in zip(*self.parts))
+        order = np.argsort((groups << 40) | (ticks << 2) | phases, kind="stable")  # 同一阶段内保持登记顺序
+        keys, codes, ticks = keys[order][::-1], codes[order][::-1], ticks[order][::-1]
+        final_keys, first = np.unique(keys, return_index=True)
+        return final_keys, codes[first], ticks[first]
+
+
+def _clock_columns(processor: GroupProcessor, writes: _Writes):
+    """
+    本组每个 tick 的主干道坐标，中继器与转弯等连接结构，以及不需要基座的连接结构（共用时钟分支的起点）。
+
+    返回:
+    (ticks, xs, ys, zs, (方块编号, tick, x, y, z), 不需要基座的结构 [(方块编号, tick, x, y, z)])，
+    中继器和连接结构按 get_clock_blocks 的顺序排列
+    """
+    clock = processor.clock
+    ticks = np.fromiter(clock.ticks_between(0, processor.global_max_tick + 1), dtype=np.int64)
+    if type(clock) is ClockLayout:
+        xs = processor.base_x + ticks * 2
+        ys = np.full(len(ticks), processor.base_y, dtype=np.int64)
+        zs = np.full(len(ticks), processor.base_z, dtype=np.int64)
+        repeater = writes.code("minecraft:repeater[delay=1,facing=west]")
+        extras = (np.full(len(ticks), repeater), ticks, xs - 1, ys, zs)
+        return ticks, xs, ys, zs, extras, np.zeros((0, 5), dtype=np.int64)
+
+    if type(clock) is CompactClock:
+        # 紧凑布局只有 X 坐标和中继器链随 tick 变化
+        tick_list = ticks.tolist()
+        xs = np.fromiter(map(clock.tick_x, tick_list), dtype=np.int64, count=len(tick_list))
+        ys = np.full(len(ticks), processor.base_y, dtype=np.int64)
+        zs = np.full(len(ticks), processor.base_z, dtype=np.int64)
+        chains = list(map(clock.repeaters, tick_list))
+        repeaters = np.array(list(chain.from_iterable(chains)), dtype=np.int64).reshape(-1, 2)
+        delays = {delay: writes.code(f"minecraft:repeater[delay={delay},facing=west]") for delay in range(1, 5)}
+        codes = np.array([delays[delay] for delay in range(1, 5)])[repeaters[:, 1] - 1]
+        counts = np.fromiter(map(len, chains), dtype=np.int64, count=len(chains))
+        extras = (codes, np.repeat(ticks, counts), repeaters[:, 0], np.repeat(ys, counts), np.repeat(zs, counts))
+        return ticks, xs, ys, zs, extras, np.zeros((0, 5), dtype=np.int64)
+
+    columns, extras, mounted = [], [], []
+    repeater_codes: Dict[Tuple[int, str], int] = {}
+    for tick in ticks.tolist():
+        x, y, z = processor.get_tick_x(tick), processor.get_tick_y(tick), processor.get_tick_z(tick)
+        columns.append((x, y, z))
+        facing = clock.facing(tick)
+        for repeater_x, delay in processor.get_clock_repeaters(tick):
+            code = repeater_codes.get((delay, facing))
+            if code is None:
+                code = repeater_codes[(delay, facing)] = writes.code(
+                    f"minecraft:repeater[delay={delay},facing={facing}]"
+                )
+            extras.append((code, tick, repeater_x, y, z))
+        for link_x, height, z_offset, block in clock.links(tick):
+            extras.append((writes.code(block), tick, link_x, processor.base_y + height, processor.base_z + z_offset))
+        for link_x, height, z_offset, block in clock.mounted_links(tick):
+            mounted.append((writes.code(block), tick, link_x, processor.base_y + height, processor.base_z + z_offset))
+    columns = np.array(columns, dtype=np.int64).reshape(-1, 3)
+    extras = np.array(extras, dtype=np.int64).reshape(-1, 5)
+    mounted = np.array(mounted, dtype=np.int64).reshape(-1, 5)
+    return ticks, columns[:, 0], columns[:, 1], columns[:, 2], tuple(extras.T), mounted
+
+
+def _analytic_writes(processor: GroupProcessor, writes: _Writes, group: int):
+    """由时钟布局与音符表算出本组的全部写入（阶梯模式的轨道组不输出 mcfunction 命令）。"""
+    counting = writes.counting
+    writes.counting = counting and processor.generation_mode not in ("staircase", "staircase_up")
+    try:
+        _group_writes(processor, writes, group)
+    finally:
+        writes.counting = counting
+
+
+def _group_writes(processor: GroupProcessor, writes: _Writes, group: int):
+    ticks, xs, ys, zs, extras, mounted = _clock_columns(processor, writes)
+    extra_codes, extra_ticks, extra_x, extra_y, extra_z = extras
+    base = writes.code(processor.base_block)
+
+    # 时钟：主干道方块（及其基座）、中继器与连接结构（及其基座）
+    trunk = writes.code(processor.cover_block)
+    trunk_positions = np.stack([xs, ys, zs], axis=1)
+    writes.add(group, trunk_positions, trunk, ticks, _PHASE_CLOCK)
+    writes.add_setblocks(trunk_positions, trunk)
+    if processor.trunk_needs_base():
+        below = trunk_positions - (0, 1, 0)
+        writes.add(group, below, base, ticks, _PHASE_CLOCK)
+        writes.add_setblocks(below, base)
+    # 每个结构与其基座交替写入
+    positions = np.stack([extra_x, extra_y, extra_z], axis=1)
+    _add_pairs(writes, group, positions, extra_codes, base, extra_ticks)
+    if len(mounted):
+        writes.add(group, mounted[:, 2:], mounted[:, 0], mounted[:, 1], _PHASE_CLOCK)
+        writes.add_setblocks(mounted[:, 2:], mounted[:, 0])
+    if processor.lanes:
+        _lane_writes(processor, writes, group, ticks, xs, (extra_codes, extra_ticks, extra_x))
+
+    notes = processor.notes
+    if not notes or not len(ticks):
+        return
+    # 与 _calculate_pan 相同的取整（四舍六入五成双）
+    table = np.array([(note.tick, note.panning, note.instrument, note.key) for note in notes], dtype=np.int64)
+    note_ticks, pans = table[:, 0], np.round(table[:, 1] / 10).astype(np.int64)
+    index = np.minimum(np.searchsorted(ticks, note_ticks), len(ticks) - 1)
+    kept = np.flatnonzero(ticks[index] == note_ticks)  # 只有生成主干道的 tick 才会写入音符
+    note_ticks, pans, index, table = note_ticks[kept], pans[kept], index[kept], table[kept]
+
+    # 与 process_ticks 相同的位置冲突检测
+    slots = note_ticks * 64 + (pans + 32)
+    first = np.zeros(len(slots), dtype=bool)
+    first[np.unique(slots, return_index=True)[1]] = True
+    if not first.all():
+        conflict = int(np.argmax(~first))
+        note = notes[kept[conflict]]
+        raise Exception(
+            f"位置冲突! Tick {note.tick}, Z={processor.base_z + int(pans[conflict])} 位置已有音符\n"
+            f"冲突音符: Layer={note.layer}, Key={note.key}, Instrument={note.instrument}"
+        )
+
+    # 声像平台：每个 tick 每侧按最远的音符铺设（先右后左；有中继器线的偏移不需要平台）
+    on_lane = np.isin(pans, np.array(sorted(processor.lanes), dtype=np.int64))
+    note_reach = np.zeros(len(pans), dtype=np.int64)  # 音符所在一侧的平台长度（阶梯模式决定音符高度）
+    for direction, phase in ((1, _PHASE_RIGHT), (-1, _PHASE_LEFT)):
+        side = (pans * direction > 0) & ~on_lane
+        tick_reach = np.zeros(len(ticks), dtype=np.int64)
+        np.maximum.at(tick_reach, index[side], np.abs(pans[side]))
+        note_reach = np.where(pans * direction > 0, tick_reach[index], note_reach)
+        platform_index = np.flatnonzero(tick_reach)
+        if not len(platform_index):
+            continue
+        platform = (xs[platform_index], ys[platform_index], zs[platform_index], ticks[platform_index])
+        if processor.generation_mode == "staircase":
+            _staircase_platforms(processor, writes, group, platform, tick_reach[platform_index], direction, phase)
+        elif processor.generation_mode == "staircase_up":
+            _staircase_up_platforms(processor, writes, group, platform, tick_reach[platform_index], direction, phase)
+        else:
+            _platforms(processor, writes, group, platform, tick_reach[platform_index], direction, phase)
+
+    # 音符：音符盒、基座（沙子类基座下方加屏障），高度随生成模式变化
+    distance = np.abs(pans)
+    note_y = ys[index]
+    if processor.generation_mode == "staircase":
+        lane_y = np.array([processor.lanes.get(int(pan), (0, 0))[0] for pan in pans.tolist()], dtype=np.int64)
+        stair = (note_reach >= 3) & (distance >= 3)
+        note_y = np.where(on_lane, processor.base_y + lane_y, np.where(stair, note_y - (distance - 1), note_y))
+    elif processor.generation_mode == "staircase_up":
+        note_y = np.where(distance > 0, note_y + distance - 2, note_y)
+
+    combos = table[:, 2] * 256 + table[:, 3]
+    _, samples, combo_index = np.unique(combos, return_index=True, return_inverse=True)
+    note_codes, base_codes, sand = [], [], []
+    for sample in samples.tolist():
+        name, base_block, pitch = SchematicOutputStrategy.get_note_block_info(notes[kept[sample]])
+        note_codes.append(writes.code(f"minecraft:note_block[note={pitch},instrument={name}]"))
+        base_codes.append(writes.code(base_block))
+        sand.append(SchematicOutputStrategy.is_sand_block(base_block))
+    note_codes = np.array(note_codes, dtype=np.int64)[combo_index]
+    base_codes = np.array(base_codes, dtype=np.int64)[combo_index]
+    on_sand = np.array(sand, dtype=bool)[combo_index]
+
+    positions = np.stack([xs[index], note_y, zs[index] + pans], axis=1)
+    barrier = writes.code("minecraft:barrier")
+    writes.add(group, positions, note_codes, note_ticks, _PHASE_NOTES)
+    writes.add(group, positions - (0, 1, 0), base_codes, note_ticks, _PHASE_NOTES)
+    writes.add(group, positions[on_sand] - (0, 2, 0), barrier, note_ticks[on_sand], _PHASE_NOTES)
+    writes.add_setblocks(positions, note_codes, _short_names(writes, note_codes))
+    writes.add_setblocks(positions - (0, 1, 0), base_codes)
+    writes.add_setblocks(positions[on_sand] - (0, 2, 0), barrier, {barrier: len("minecraft:")})
+
+
+def _add_pairs(writes: _Writes, group: int, positions: np.ndarray, codes, base: int, ticks):
+    """登记方块与其正下方基座交替写入的结构（get_clock_blocks 的写入方式）。"""
+    positions = np.asarray(positions, dtype=np.int64).reshape(-1, 3)
+    codes = np.broadcast_to(np.asarray(codes, dtype=np.int64), (len(positions),))
+    pairs = np.stack([positions, positions - (0, 1, 0)], axis=1).reshape(-1, 3)
+    pair_codes = np.stack([codes, np.full(len(codes), base)], axis=1).ravel()
+    writes.add(group, pairs, pair_codes, np.repeat(np.broadcast_to(ticks, (len(positions),)), 2), _PHASE_CLOCK)
+    writes.add_setblocks(pairs, pair_codes)
+
+
+def _lane_writes(processor: GroupProcessor, writes: _Writes, group: int, ticks, xs, repeaters):
+    """低更新元件模式的中继器线（复制主干道的覆盖方块与中继器链）与第一个 tick 的输入排（见 get_lane_blocks）。"""
+    base, cover = writes.code(processor.base_block), writes.code(processor.cover_block)
+    codes, repeater_ticks, repeater_x = repeaters
+    for pan, (height, last_tick) in sorted(processor.lanes.items()):
+        y, z = processor.base_y + height, processor.base_z + pan
+        active = ticks <= last_tick
+        covers = np.stack([xs[active], np.full(active.sum(), y), np.full(active.sum(), z)], axis=1)
+        _add_pairs(writes, group, covers, cover, base, ticks[active])
+        active = repeater_ticks <= last_tick
+        chain_positions = np.stack([repeater_x[active], np.full(active.sum(), y), np.full(active.sum(), z)], axis=1)
+        _add_pairs(writes, group, chain_positions, codes[active], base, repeater_ticks[active])
+
+    bar_x = int(repeater_x[repeater_ticks == ticks[0]][0]) - 1
+    cells = input_bar(processor.generation_mode, processor.lanes)
+    positions = [(bar_x, processor.base_y + height, processor.base_z + z_offset) for z_offset, height, _ in cells]
+    _add_pairs(writes, group, positions, [writes.code(block) for _, _, block in cells], base, ticks[0])
+
+
+def _platform_cells(reach: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """把各平台展开为逐格的 (平台序号, 距主干道的格数)。"""
+    cells = np.repeat(np.arange(len(reach)), reach)
+    steps = np.arange(len(cells)) - np.repeat(np.cumsum(reach) - reach, reach)
+    return cells, steps
+
+
+def _platforms(processor: GroupProcessor, writes: _Writes, group: int, platform, reach, direction: int, phase: int):
+    """红石线声像平台（与 SchematicOutputStrategy/McFunctionOutputStrategy.write_pan_platform 相同）。"""
+    x, y, z, platform_ticks = platform
+    base, trunk = writes.code(processor.base_block), writes.code(processor.cover_block)
+    wire = writes.code(PLATFORM_WIRE)
+    cells, steps = _platform_cells(reach)
+    on_wire = steps > 0
+    # 覆盖方块不需要基座时只支撑红石线
+    supported = np.ones(len(cells), dtype=bool) if processor.trunk_needs_base() else on_wire
+    bases = np.stack([x[cells], y[cells] - 1, z[cells] + direction * steps], axis=1)[supported]
+    writes.add(group, bases, base, platform_ticks[cells][supported], phase)
+    centers = np.stack([x, y, z], axis=1)
+    writes.add(group, centers, trunk, platform_ticks, phase)
+    wires = np.stack([x[cells], y[cells], z[cells] + direction * steps], axis=1)[on_wire]
+    writes.add(group, wires, wire, platform_ticks[cells][on_wire], phase)
+
+    ends = np.stack([x, y - 1, z + direction * (reach - 1)], axis=1)
+    long = reach > 1
+    if processor.trunk_needs_base():
+        writes.add_fills(centers - (0, 1, 0), ends, processor.base_block)
+    else:
+        writes.add_fills(centers[long] + (0, -1, direction), ends[long], processor.base_block)
+    writes.add_setblocks(centers, trunk)
+    writes.add_fills(centers[long] + (0, 0, direction), ends[long] + (0, 1, 0), PLATFORM_WIRE)
+
+
+def _staircase_platforms(processor: GroupProcessor, writes: _Writes, group: int, platform, reach, direction, phase):
+    """阶梯向下模式的声像平台（见 StaircaseSchematicOutputStrategy.write_pan_platform）：最远偏移 >= 3 时逐格下降。"""
+    x, _, z, platform_ticks = platform
+    base_y = processor.base_y
+    base, cover = writes.code(processor.base_block), writes.code(processor.cover_block)
+    wire = writes.code(PLATFORM_WIRE)
+    cells, steps = _platform_cells(reach)
+    stair = reach[cells] >= 3
+    base_ys = np.where(stair, np.where(steps == 0, base_y, base_y - steps), base_y - 1)
+    bases = np.stack([x[cells], base_ys, z[cells] + direction * steps], axis=1)
+    writes.add(group, bases, base, platform_ticks[cells], phase)
+    centers = np.stack([x, np.full(len(x), base_y), z], axis=1)
+    writes.add(group, centers, cover, platform_ticks, phase)
+    on_wire = steps > 0
+    wire_ys = np.where(stair, base_y + 1 - steps, base_y)
+    wires = np.stack([x[cells], wire_ys, z[cells] + direction * steps], axis=1)[on_wire]
+    writes.add(group, wires, wire, platform_ticks[cells][on_wire], phase)
+
+
+def _staircase_up_platforms(processor: GroupProcessor, writes: _Writes, group: int, platform, reach, direction, phase):
+    """阶梯向上模式的声像平台（见 StaircaseUpSchematicOutputStrategy.write_pan_platform）：逐格上升。"""
+    x, _, z, platform_ticks = platform
+    base_y = processor.base_y
+    base, cover = writes.code(processor.base_block), writes.code(processor.cover_block)
+    wire = writes.code(PLATFORM_WIRE)
+    cells, steps = _platform_cells(reach)
+    bases = np.stack([x[cells], base_y - 2 + steps, z[cells] + direction * steps], axis=1)
+    writes.add(group, bases, base, platform_ticks[cells], phase)
+    centers = np.stack([x, np.full(len(x), base_y), z], axis=1)
+    writes.add(group, centers, cover, platform_ticks, phase)
+    on_wire = steps > 0
+    wires = np.stack([x[cells], base_y - 1 + steps, z[cells] + direction * steps], axis=1)[on_wire]
+    writes.add(group, wires, wire, platform_ticks[cells][on_wire], phase)
+
+
+def _short_names(writes: _Writes, codes: np.ndarray) -> Dict[int, int]:
+    """mcfunction 中音符盒与屏障不带 minecraft: 前缀（见 McFunctionOutputStrategy.write_note）。"""
+    blocks = list(writes.codes)
+    return {
+        int(code): len("minecraft:")
+        for code in np.unique(codes).tolist()
+        if blocks[code].startswith("minecraft:note_block") or blocks[code] == "minecraft:barrier"
+    }
+
+
+def estimate_size(processor: GroupProcessor) -> SizeEstimate:
+    """
+    估算 processor 的全部轨道组的输出规模（音符应已完成速度重映射，见 GroupProcessor.estimate）。
+
+    返回:
+    SizeEstimate
+    """
+    writes = _Writes(McFunctionOutputStrategy.get_relative_origin(processor))
+
+    group_index = {group_id: index for index, group_id in enumerate(processor.group_config)}
+    for group_id, group in processor.group_config.items():
+        processor.prepare_group(group_id, group)
+        _analytic_writes(processor, writes, group_index[group_id])
+
+    writes.command_bytes += 1  # 命令文件末尾的空行
+    keys, codes, _ = writes.resolve()
+    names = [re.sub(r"\[.*\]$", "", block) for block in writes.codes]
+    counts: Dict[str, int] = defaultdict(int)
+    for code, count in enumerate(np.bincount(codes, minlength=len(names)).tolist()):
+        if count:
+            counts[names[code]] += count
+    blocks = dict(sorted(counts.items(), key=lambda item: -item[1]))
+
+    if not len(keys):
+        return SizeEstimate(blocks, (0, 0, 0), (0, 0, 0), 0, writes.commands, writes.command_bytes, 0)
+    positions = decode_positions(keys)
+    low, high = positions.min(axis=0), positions.max(axis=0)
+    chunk_keys = (positions[:, 0] // CHUNK_SIZE) * (1 << 32) + positions[:, 2] // CHUNK_SIZE
+    volume = int(np.prod(high - low + 1))
+    schematic_bytes = int(volume * _SCHEM_BYTES_PER_VOLUME + len(keys) * _SCHEM_BYTES_PER_BLOCK)
+    return SizeEstimate(
+        blocks,
+        tuple(low.tolist()),
+        tuple(high.tolist()),
+        len(np.unique(chunk_keys)),
+        writes.commands,
+        writes.command_bytes,
+        schematic_bytes,
+    )
+
+
+def group_footprints(processor: GroupProcessor) -> Dict[object, Tuple[np.ndarray, np.ndarray]]:
+    """
+    各轨道组自身写入的方块（重叠检测的足迹，见 overlap.py），不生成方块。
+    音符应已完成速度重映射（见 GroupProcessor.run_remapped）。
+
+    返回:
+    {轨道组ID: (坐标编码（升序）, 每个位置最后写入时的 tick)}，没有写入方块的轨道组不出现
+    """
+    footprints = {}
+    for group_id, group in processor.group_config.items():
+        processor.prepare_group(group_id, group)
+        writes = _Writes(None)
+        writes.counting = False
+        _analytic_writes(processor, writes, 0)
+        keys, _, ticks = writes.resolve()
+        if len(keys):
+            footprints[group_id] = (keys, ticks)
+    return footprints
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+进程内 RCON 模拟服务器
+----------------------
+用于离线测试 RCON 推送：不需要真正的 Minecraft 服务器即可验证吞吐、背压和重发逻辑。
+
+特性
+1. 与 Minecraft 相同的认证流程（密码错误时返回请求ID -1）。
+2. 可限制服务端每秒处理的命令数，处理不过来时客户端会被 TCP 背压阻塞。
+3. 可按固定间隔丢弃响应，模拟丢包以触发客户端重发。
+4. 记录收到的全部命令，供测试断言。
+"""
+
+from __future__ import annotations
+
+import socket
+import threading
+import time
+from typing import List, Optional
+
+from .rcon import (
+    PACKET_TYPE_COMMAND,
+    PACKET_TYPE_LOGIN,
+    PACKET_TYPE_RESPONSE,
+    encode_packet,
+    read_packet,
+)
+
+
+class FakeRconServer:
+    """
+    进程内 RCON 模拟服务器，可作为上下文管理器使用。
+
+    参数:
+    password: 认证密码
+    commands_per_second: 服务端处理速度上限，None 表示不限速
+    drop_every: 每收到 N 条命令丢弃一次响应（0 表示不丢包）
+    host, port: 监听地址，port 为 0 时自动分配
+    """
+
+    def __init__(
+        self,
+        password: str = "",
+        commands_per_second: Optional[float] = None,
+        drop_every: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.password = password
+        self.commands_per_second = commands_per_second
+        self.drop_every = drop_every
+        self.host = host
+        self.port = port
+
+        self.commands: List[str] = []  # 按处理顺序记录的命令
+        self.dropped = 0  # 被丢弃响应的命令数
+        self.max_connections = 0  # 同时在线的最大连接数
+
+        self._lock = threading.Lock()
+        self._received = 0
+        self._connections = 0
+        self._server: Optional[socket.socket] = None
+        self._threads: List[threading.Thread] = []
+        self._running = False
+
+    # ----------------------
+    # 生命周期
+    # ----------------------
+    def start(self) -> "FakeRconServer":
+        """开始监听，返回自身；实际端口写回 self.port。"""
+        self._server = socket.create_server((self.host, self.port))
+        self.port = self._server.getsockname()[1]
+        self._running = True
+        thread = threading.Thread(target=self._accept_loop, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        return self
+
+    def stop(self):
+        """停止监听并等待所有连接线程退出。"""
+        self._running = False
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        for thread in self._threads:
+            thread.join(timeout=1)
+
+    def __enter__(self) -> "FakeRconServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ----------------------
+    # 连接处理
+    # ----------------------
+    def _accept_loop(self):
+        while self._running:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            thread = threading.Thread(target=self._handle, args=(conn,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _handle(self, conn: socket.socket):
+        with self._lock:
+            self._connections += 1
+            self.max_connections = max(self.max_connections, self._connections)
+        authenticated = False
+        interval = 1 / self.commands_per_second if self.commands_per_second else 0
+        try:
+            with conn:
+                conn.settimeout(0.5)
+                while self._running:
+                    try:
+                        request_id, packet_type, body = read_packet(conn)
+                    except socket.timeout:
+                        continue
+                    except (ConnectionError, OSError):
+                        return
+
+                    if packet_type == PACKET_TYPE_LOGIN:
+                        authenticated = body == self.password
+                        reply_id = request_id if authenticated else -1
+                        conn.sendall(encode_packet(reply_id, PACKET_TYPE_COMMAND, ""))
+                        continue
+
+                    if not authenticated or packet_type != PACKET_TYPE_COMMAND:
+                        return
+
+                    # 模拟服务端处理耗时：处理不过来时不再读取，客户端被 TCP 背压阻塞
+                    if interval:
+                        time.sleep(interval)
+
+                    with self._lock:
+                        self._received += 1
+                        drop = self.drop_every and self._received % self.drop_every == 0
+                        if drop:
+                            self.dropped += 1
+                        else:
+                            self.commands.append(body)
+                    if not drop:
+                        conn.sendall(encode_packet(request_id, PACKET_TYPE_RESPONSE, ""))
+        finally:
+            with self._lock:
+                self._connections -= 1
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+Litematica 投影文件生成器
+----------------------
+负责把生成的方块数据写成 Litematica 使用的 .litematic 文件，无需再通过第三方工具从 .schem 转换。
+
+主要流程
+1. 与 .schem 输出共用同一份方块数据，同时按轨道组记录每个方块的归属。
+2. 每个轨道组输出为一个独立的区域（Region），区域位置相对于整体包围盒的最小角。
+3. 区域内的方块状态索引使用 NumPy 位运算一次性打包为 long 数组（不逐方块循环）。
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+from mcschematic import MCSchematic
+from nbtlib.tag import Compound, Int, List as NbtList, Long, LongArray, String
+
+from .core import GroupProcessor
+from .nbt_utils import block_state_compound, save_gzipped_nbt
+from .schematic import SchematicOutputStrategy
+from .tiling import Position, bounding_box
+
+# Litematica 文件格式版本（1.20.5 及以后的版本均可读取）
+LITEMATIC_VERSION = 6
+LITEMATIC_SUB_VERSION = 1
+
+AIR = "minecraft:air"
+
+
+# --------------------------
+# 按轨道组记录方块的结构对象
+# --------------------------
+class GroupRecordingSchematic(MCSchematic):
+    """
+    与 MCSchematic 行为一致，额外按 processor.group_id 记录每个方块属于哪个轨道组。
+    阶梯等其他模式的策略共享同一个对象，因此它们写入的方块也会被正确归组。
+    同一位置被后写入的轨道组覆盖时，方块只归属最后写入的组（与 .schem 中的结果一致）。
+    """
+
+    def __init__(self, processor: GroupProcessor):
+        super().__init__()
+        self.processor = processor
+        self.group_blocks: Dict[object, Dict[Position, str]] = {}  # 轨道组ID -> {坐标: 方块状态}
+        self._owner: Dict[Position, object] = {}  # 坐标 -> 轨道组ID
+
+    def setBlock(self, position: Tuple[int, int, int], blockData: str):
+        position = tuple(position)
+        group_id = self.processor.group_id
+        owner = self._owner.get(position)
+        if owner is not None and owner != group_id:
+            self.group_blocks[owner].pop(position, None)
+
+        if blockData == AIR:
+            self.group_blocks.get(group_id, {}).pop(position, None)
+            self._owner.pop(position, None)
+        else:
+            self.group_blocks.setdefault(group_id, {})[position] = blockData
+            self._owner[position] = group_id
+        return super().setBlock(position, blockData)
+
+
+# --------------------------
+# Litematica 输出策略
+# --------------------------
+class LitematicOutputStrategy(SchematicOutputStrategy):
+    """输出为 .litematic 投影文件的策略实现（方块数据与 .schem 输出相同，每个轨道组一个区域）。"""
+
+    records_groups = True
+
+    def initialize(self, processor: GroupProcessor):
+        """
+        初始化输出格式，使用按轨道组记录方块的结构对象
+
+        参数:
+        processor: GroupProcessor实例
+        """
+        if self.schem is None:
+            self.schem = GroupRecordingSchematic(processor)
+        super().initialize(processor)
+
+    def pipeline_column_width(self, processor: GroupProcessor) -> None:
+        """投影文件是一个整体，不提前写出。"""
+        return None
+
+    def finalize(self, processor: GroupProcessor):
+        """
+        完成输出，保存 <output_file>.litematic
+
+        参数:
+        processor: GroupProcessor实例
+        """
+        path = processor.config["output_file"]
+        if not path.endswith(".litematic"):
+            path += ".litematic"
+        name = os.path.splitext(os.path.basename(path))[0]
+
+        root = build_litematic(
+            self.schem.group_blocks,
+            processor.config["data_version"].value,
+            name=name,
+        )
+        save_gzipped_nbt(
+            root,
+            path if self.sink is None else self.sink,
+            processor.config.get("compression_level"),
+            processor.config.get("workers"),
+        )
+
+        regions = root["Regions"]
+        processor.log(f"\n>> Litematica 导出: {len(regions)} 个区域")
+        for region_name, region in regions.items():
+            size = region["Size"]
+            processor.log(
+                f"├─ {region_name}: {int(size['x'])}x{int(size['y'])}x{int(size['z'])}，"
+                f"调色板 {len(region['BlockStatePalette'])} 种方块"
+            )
+        processor.log(f"└─ 输出文件: {path if self.sink is None else 'sink'}")
+
+
+# --------------------------
+# 格式构建
+# --------------------------
+def build_litematic(
+    group_blocks: Dict[object, Dict[Position, str]],
+    data_version: int,
+    name: str = "",
+    author: str = "",
+) -> Compound:
+    """
+    构建 .litematic 根标签。
+
+    参数:
+    group_blocks: {轨道组ID: {坐标: 方块状态}}，每个非空轨道组输出为一个区域
+    data_version: Minecraft 数据版本号
+    name, author: 写入元数据的投影名称与作者
+    """
+    groups = {group_id: blocks for group_id, blocks in group_blocks.items() if blocks}
+    all_blocks = {pos: block for blocks in groups.values() for pos, block in blocks.items()}
+    if all_blocks:
+        origin, max_corner = bounding_box(all_blocks)
+        enclosing = tuple(b - a + 1 for a, b in zip(origin, max_corner))
+    else:
+        origin, enclosing = (0, 0, 0), (1, 1, 1)
+
+    regions = Compound()
+    total_volume = 0
+    for group_id, blocks in groups.items():
+        region = build_region(blocks, origin)
+        size = region["Size"]
+        total_volume += int(size["x"]) * int(size["y"]) * int(size["z"])
+        regions[f"group_{group_id}"] = region
+
+    now = Long(int(time.time() * 1000))
+    metadata = Compound(
+        {
+            "Name": String(name),
+            "Author": String(author),
+            "Description": String(""),
+            "RegionCount": Int(len(regions)),
+            "TotalBlocks": Int(len(all_blocks)),
+            "TotalVolume": Int(total_volume),
+            "TimeCreated": now,
+            "TimeModified": now,
+            "EnclosingSize": _vec3(enclosing),
+        }
+    )
+    return Compound(
+        {
+            "Version": Int(LITEMATIC_VERSION),
+            "SubVersion": Int(LITEMATIC_SUB_VERSION),
+            "MinecraftDataVersion": Int(data_version),
+            "Metadata": metadata,
+            "Regions": regions,
+        }
+    )
+
+
+def build_region(blocks: Dict[Position, str], origin: Position) -> Compound:
+    """
+    把一个轨道组的方块构建为 Litematica 区域。
+
+    参数:
+    blocks: {坐标: 方块状态}（不含空气，不能为空）
+    origin: 整个投影的原点（所有区域包围盒的最小角）
+    """
+    (x0, y0, z0), (x1, y1, z1) = bounding_box(blocks)
+    size = (x1 - x0 + 1, y1 - y0 + 1, z1 - z0 + 1)
+
+    # 调色板第 0 项固定为空气，区域内未写入的位置均为 0
+    palette = [AIR] + sorted(set(blocks.values()))
+    palette_index = {block: index for index, block in enumerate(palette)}
+
+    coords = np.fromiter(
+        (c for pos in blocks for c in pos), dtype=np.int64, count=len(blocks) * 3
+    ).reshape(-1, 3)
+    values = np.fromiter(
+        (palette_index[block] for block in blocks.values()), dtype=np.uint64, count=len(blocks)
+    )
+    # Litematica 的索引顺序为 (y * 长 + z) * 宽 + x
+    indices = ((coords[:, 1] - y0) * size[2] + (coords[:, 2] - z0)) * size[0] + (coords[:, 0] - x0)
+
+    bits = bits_per_entry(len(palette))
+    volume = size[0] * size[1] * size[2]
+    states = pack_block_states(indices, values, bits, volume)
+
+    return Compound(
+        {
+            "Position": _vec3((x0 - origin[0], y0 - origin[1], z0 - origin[2])),
+            "Size": _vec3(size),
+            "BlockStatePalette": NbtList[Compound]([block_state_compound(b) for b in palette]),
+            "BlockStates": LongArray(states.view(np.int64)),
+            "TileEntities": NbtList[Compound]([]),
+            "Entities": NbtList[Compound]([]),
+            "PendingBlockTicks": NbtList[Compound]([]),
+            "PendingFluidTicks": NbtList[Compound]([]),
+        }
+    )
+
+
+def bits_per_entry(palette_size: int) -> int:
+    """每个方块状态索引占用的位数（Litematica 最少使用 2 位）。"""
+    return max(2, (palette_size - 1).bit_length())
+
+
+def pack_block_states(indices: np.ndarray, values: np.ndarray, bits: int, volume: int) -> np.ndarray:
+    """
+    把调色板索引紧密打包为 long 数组（Litematica 格式：条目可以跨越两个 long）。
+
+    只需处理非空气位置：先把每个值左移到所在 long 内的位偏移上，
+    再把跨越边界的高位部分写入下一个 long，两步都通过 np.bitwise_or.at 一次完成。
+
+    参数:
+    indices: 各方块在区域内的线性索引
+    values: 对应的调色板索引（uint64）
+    bits: 每个条目的位数
+    volume: 区域总体积
+
+    返回:
+    uint64 数组，长度为 ceil(volume * bits / 64)
+    """
+    states = np.zeros((volume * bits + 63) // 64, dtype=np.uint64)
+    if len(indices) == 0:
+        return states
+
+    bit_offsets = np.asarray(indices, dtype=np.uint64) * np.uint64(bits)
+    start = (bit_offsets >> np.uint64(6)).astype(np.intp)
+    shift = bit_offsets & np.uint64(63)
+    values = np.asarray(values, dtype=np.uint64)
+    np.bitwise_or.at(states, start, values << shift)
+
+    spill = shift > np.uint64(64 - bits)
+    if spill.any():
+        np.bitwise_or.at(states, start[spill] + 1, values[spill] >> (np.uint64(64) - shift[spill]))
+    return states
+
+
+def unpack_block_states(states: np.ndarray, bits: int, volume: int) -> np.ndarray:
+    """pack_block_states 的逆操作，返回长度为 volume 的调色板索引数组（用于校验）。"""
+    states = np.asarray(states).view(np.uint64)
+    bit_offsets = np.arange(volume, dtype=np.uint64) * np.uint64(bits)
+    start = (bit_offsets >> np.uint64(6)).astype(np.intp)
+    shift = bit_offsets & np.uint64(63)
+    mask = np.uint64((1 << bits) - 1)
+
+    values = states[start] >> shift
+    spill = shift > np.uint64(64 - bits)
+    if spill.any():
+        values[spill] |= states[start[spill] + 1] << (np.uint64(64) - shift[spill])
+    return values & mask
+
+
+def _vec3(values: Tuple[int, int, int]) -> Compound:
+    x, y, z = values
+    return Compound({"x": Int(x), "y": Int(y), "z": Int(z)})
+
+
+def read_litematic_region(region: Compound) -> Tuple[Position, Position, List[str], np.ndarray]:
+    """
+    读取区域的位置、尺寸、调色板名称以及解包后的索引数组。
+
+    返回:
+    (位置, 尺寸, 调色板方块ID列表, 调色板索引数组)
+    """
+    position = tuple(int(region["Position"][k]) for k in "xyz")
+    size = tuple(int(region["Size"][k]) for k in "xyz")
+    palette = [str(entry["Name"]) for entry in region["BlockStatePalette"]]
+    volume = abs(size[0] * size[1] * size[2])
+    values = unpack_block_states(
+        np.asarray(region["BlockStates"], dtype=np.int64), bits_per_entry(len(palette)), volume
+    )
+    return position, size, palette, values
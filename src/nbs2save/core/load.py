@@ -0,0 +1,413 @@
+# -*- coding: utf-8 -*-
+"""
+红石负载分析
+----------------------
+在部署前估计播放时每个游戏刻有多少红石元件改变状态，找出可能造成卡顿的位置。
+
+主要流程
+1. 与 .schem 输出共用同一份方块数据，按轨道组记录每个方块的归属（见 litematic.GroupRecordingSchematic）。
+2. 从各轨道组的输入位置同时触发一个脉冲，模拟信号在方块数据中的传播：
+   - 中继器：输入充能 delay 个红石刻后输出，强充能前方的方块（或下一个中继器、红石线）；
+   - 被强充能的方块：激活紧邻的音符盒、红石线以及以它为输入的中继器；
+   - 红石线：不产生延迟，信号强度每格衰减 1，激活指向的音符盒、正下方的音符盒以及以它为输入的中继器；
+     红石线下方的方块被弱充能，激活紧邻的音符盒（阶梯模式 |偏移| >= 3 的音符由此激活）。
+   输入位置为背后没有方块的中继器，以及没有任何元件驱动、连接着中继器输入端的红石线（如低更新元件模式的输入排）。
+   信号到达不了的元件（例如被音符盒截断的走线）单独计数，在报告中给出警告。
+3. 统计每个元件（红石线、中继器、音符盒）的状态变化时间：脉冲到达时亮起，输入脉冲结束后熄灭
+   （熄灭波与亮起波相同，晚 pulse 个红石刻）。
+4. 按红石刻汇总各轨道组的状态变化数，输出峰值、分位数、最繁忙的游戏刻及其来源。
+
+每个红石刻为 2 个游戏刻，状态变化都发生在偶数游戏刻上，分位数按播放期间的每个红石刻统计。
+"""
+
+from __future__ import annotations
+
+import heapq
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .core import GroupProcessor
+from .litematic import GroupRecordingSchematic
+from .schematic import SchematicOutputStrategy
+from .tiling import Position
+
+# 默认输入脉冲长度（红石刻），石质按钮为 10
+DEFAULT_PULSE = 10
+# 每个红石刻对应的游戏刻
+GAME_TICKS_PER_REDSTONE_TICK = 2
+# 报告中列出的最繁忙游戏刻数量
+WORST_TICKS = 5
+
+# 统计的元件类型
+KINDS = ("dust", "repeater", "note")
+KIND_NAMES = {"dust": "红石线", "repeater": "中继器", "note": "音符盒"}
+
+# 中继器朝向（输入端方向）-> 信号方向 (dx, dz)
+_FORWARD = {"west": (1, 0), "east": (-1, 0), "north": (0, 1), "south": (0, -1)}
+# 红石线连接方向 -> (dx, dz)
+_SIDES = {"north": (0, -1), "south": (0, 1), "east": (1, 0), "west": (-1, 0)}
+
+
+def component_kind(block: str) -> str | None:
+    """方块状态对应的元件类型；不是统计的元件时为 None。"""
+    if block.startswith("minecraft:redstone_wire"):
+        return "dust"
+    if block.startswith("minecraft:repeater"):
+        return "repeater"
+    if block.startswith("minecraft:note_block"):
+        return "note"
+    return None
+
+
+def _state(block: str, key: str) -> str | None:
+    """读取方块状态中的属性值。"""
+    marker = key + "="
+    start = block.find(marker)
+    if start < 0:
+        return None
+    end = start + len(marker)
+    stop = min((i for i in (block.find(",", end), block.find("]", end)) if i >= 0), default=len(block))
+    return block[end:stop]
+
+
+# --------------------------
+# 信号传播模拟
+# --------------------------
+def simulate(blocks: Dict[Position, str]) -> Dict[Position, int]:
+    """
+    从所有输入位置同时触发脉冲，计算每个元件亮起的红石刻。
+
+    参数:
+    blocks: {坐标: 方块状态}
+
+    返回:
+    {元件坐标: 亮起的红石刻}，信号到达不了的元件不包含在内
+    """
+    repeaters = {pos: block for pos, block in blocks.items() if block.startswith("minecraft:repeater")}
+
+    def front(pos: Position) -> Position:
+        dx, dz = _FORWARD[_state(repeaters[pos], "facing")]
+        return pos[0] + dx, pos[1], pos[2] + dz
+
+    def back(pos: Position) -> Position:
+        dx, dz = _FORWARD[_state(repeaters[pos], "facing")]
+        return pos[0] - dx, pos[1], pos[2] - dz
+
+    def is_dust(pos: Position) -> bool:
+        return blocks.get(pos, "").startswith("minecraft:redstone_wire")
+
+    def is_note(pos: Position) -> bool:
+        return blocks.get(pos, "").startswith("minecraft:note_block")
+
+    def is_solid(pos: Position) -> bool:
+        return pos in blocks and component_kind(blocks[pos]) in (None, "note")
+
+    outputs = {front(pos) for pos in repeaters}
+    times: Dict[Position, int] = {}
+    queue: List[Tuple[int, int, Position]] = []  # (红石刻, 事件类型, 坐标)
+    REPEATER_INPUT, POWERED, DUST = 0, 1, 2
+
+    # 输入位置：背后没有方块的中继器、没有任何元件驱动且连接着中继器输入端的红石线网络
+    # （没有元件驱动、也不驱动中继器的红石线是断开的走线，信号到达不了）
+    inputs = {back(pos) for pos in repeaters}
+    for pos in repeaters:
+        if back(pos) not in blocks:
+            heapq.heappush(queue, (0, REPEATER_INPUT, pos))
+    fed = set()
+    for pos in outputs:
+        x, y, z = pos
+        fed.update(((x, y + 1, z), pos, *((x + dx, y, z + dz) for dx, dz in _SIDES.values())))
+    for network in _dust_networks(blocks, is_dust):
+        if not fed & network and inputs & network:
+            # 不知道玩家从哪一格触发，整个网络按满强度处理
+            for pos in network:
+                heapq.heappush(queue, (0, DUST, pos))
+
+    def activate(pos: Position, tick: int):
+        if pos not in times:
+            times[pos] = tick
+
+    def feed_repeaters(pos: Position, tick: int):
+        x, y, z = pos
+        for dx, dz in _SIDES.values():
+            neighbor = (x + dx, y, z + dz)
+            if neighbor in repeaters and back(neighbor) == pos:
+                heapq.heappush(queue, (tick, REPEATER_INPUT, neighbor))
+
+    def power_weakly(pos: Position, tick: int):
+        # 红石线下方的方块被弱充能：激活紧邻的音符盒以及以它为输入的中继器（不激活红石线）
+        x, y, z = pos
+        for neighbor in [(x + dx, y, z + dz) for dx, dz in _SIDES.values()] + [(x, y - 1, z)]:
+            if is_note(neighbor):
+                activate(neighbor, tick)
+        feed_repeaters(pos, tick)
+
+    dust_strength: Dict[Position, int] = {}
+    while queue:
+        tick, event, pos = heapq.heappop(queue)
+        if event == REPEATER_INPUT:
+            if pos in times:
+                continue
+            delay = int(_state(repeaters[pos], "delay") or 1)
+            times[pos] = tick + delay
+            target = front(pos)
+            if target in repeaters:
+                if back(target) == pos:
+                    heapq.heappush(queue, (tick + delay, REPEATER_INPUT, target))
+            elif is_dust(target):
+                heapq.heappush(queue, (tick + delay, DUST, target))
+            elif is_solid(target):
+                heapq.heappush(queue, (tick + delay, POWERED, target))
+        elif event == POWERED:
+            # 被强充能的方块
+            if is_note(pos):
+                activate(pos, tick)
+            x, y, z = pos
+            feed_repeaters(pos, tick)
+            for neighbor in [(x + dx, y, z + dz) for dx, dz in _SIDES.values()] + [(x, y + 1, z), (x, y - 1, z)]:
+                if is_note(neighbor):
+                    activate(neighbor, tick)
+                elif is_dust(neighbor) and neighbor[1] >= y:
+                    heapq.heappush(queue, (tick, DUST, neighbor))
+        else:
+            # 红石线网络：同一红石刻内按信号强度扩散
+            stack = [(pos, 15)]
+            while stack:
+                cell, strength = stack.pop()
+                if strength < 1 or dust_strength.get(cell, 0) >= strength:
+                    continue
+                dust_strength[cell] = strength
+                activate(cell, tick)
+                feed_repeaters(cell, tick)
+                x, y, z = cell
+                below = (x, y - 1, z)
+                if is_note(below):
+                    activate(below, tick)
+                elif is_solid(below):
+                    power_weakly(below, tick)
+                block = blocks[cell]
+                for side, (dx, dz) in _SIDES.items():
+                    if _state(block, side) in ("side", "up") and is_note((x + dx, y, z + dz)):
+                        activate((x + dx, y, z + dz), tick)
+                for neighbor in _dust_neighbors(cell, is_dust, is_solid):
+                    stack.append((neighbor, strength - 1))
+    return times
+
+
+def _dust_neighbors(cell: Position, is_dust, is_solid) -> List[Position]:
+    """与红石线相连的红石线：同层相邻，或隔一格高度的斜上/斜下方（中间没有方块阻挡）。"""
+    x, y, z = cell
+    neighbors = []
+    for dx, dz in _SIDES.values():
+        side = (x + dx, y, z + dz)
+        if is_dust(side):
+            neighbors.append(side)
+            continue
+        below, above = (x + dx, y - 1, z + dz), (x + dx, y + 1, z + dz)
+        if not is_solid(side) and is_dust(below):
+            neighbors.append(below)
+        elif is_solid(side) and not is_solid((x, y + 1, z)) and is_dust(above):
+            neighbors.append(above)
+    return neighbors
+
+
+def _dust_networks(blocks: Dict[Position, str], is_dust) -> List[set]:
+    """把红石线按相连关系（同层相邻或上下一格）分成若干网络。"""
+    remaining = {pos for pos in blocks if is_dust(pos)}
+    networks = []
+    while remaining:
+        start = remaining.pop()
+        network, stack = {start}, [start]
+        while stack:
+            x, y, z = stack.pop()
+            for dx, dz in _SIDES.values():
+                for dy in (-1, 0, 1):
+                    neighbor = (x + dx, y + dy, z + dz)
+                    if neighbor in remaining:
+                        remaining.discard(neighbor)
+                        network.add(neighbor)
+                        stack.append(neighbor)
+        networks.append(network)
+    return networks
+
+
+# --------------------------
+# 负载统计
+# --------------------------
+@dataclass
+class LoadReport:
+    """
+    每个红石刻的元件状态变化数。
+
+    counts: {轨道组ID: (len(KINDS), 红石刻数) 数组}，第 i 行为 KINDS[i] 类元件的状态变化数
+    components: {元件类型: 模拟中被激活的元件数}
+    unreached: 信号到达不了的元件数（通常说明结构不完整或被其他轨道组覆盖）
+    pulse: 输入脉冲长度（红石刻）
+    """
+
+    counts: Dict[object, np.ndarray]
+    components: Dict[str, int] = field(default_factory=dict)
+    unreached: int = 0
+    pulse: int = DEFAULT_PULSE
+
+    @property
+    def total(self) -> np.ndarray:
+        """每个红石刻全部轨道组的状态变化数。"""
+        if not self.counts:
+            return np.zeros(0, dtype=np.int64)
+        return sum(counts.sum(axis=0) for counts in self.counts.values())
+
+    def percentile(self, q: float) -> float:
+        """每个红石刻状态变化数的 q 分位数。"""
+        total = self.total
+        return float(np.percentile(total, q)) if len(total) else 0.0
+
+    def worst_ticks(self, n: int = WORST_TICKS) -> List[Tuple[int, int, Dict[object, int]]]:
+        """
+        状态变化最多的 n 个红石刻。
+
+        返回:
+        [(红石刻, 状态变化数, {轨道组ID: 状态变化数})]，按状态变化数从多到少排列
+        """
+        total = self.total
+        worst = np.argsort(-total, kind="stable")[:n]
+        return [
+            (
+                int(tick),
+                int(total[tick]),
+                {
+                    group_id: int(counts[:, tick].sum())
+                    for group_id, counts in self.counts.items()
+                    if counts[:, tick].sum()
+                },
+            )
+            for tick in worst
+            if total[tick]
+        ]
+
+    def lines(self) -> List[str]:
+        """报告文本（用于日志）。"""
+        total = self.total
+        lines = [f"\n>> 红石负载分析（输入脉冲 {self.pulse} 红石刻，状态变化包括亮起与熄灭）"]
+        lines.append(
+            "├─ 元件: " + "、".join(f"{KIND_NAMES[kind]} {self.components.get(kind, 0)}" for kind in KINDS)
+        )
+        if self.unreached:
+            lines.append(f"├─ 警告: {self.unreached} 个元件没有被信号激活")
+        if not len(total):
+            lines.append("└─ 没有红石元件")
+            return lines
+        lines.append(
+            f"├─ 每游戏刻状态变化: 峰值 {int(total.max())}，P50 {self.percentile(50):g}，"
+            f"P90 {self.percentile(90):g}，P99 {self.percentile(99):g}，平均 {total.mean():.1f}"
+        )
+        lines.append("├─ 最繁忙的游戏刻:")
+        for tick, count, groups in self.worst_ticks():
+            kinds = "、".join(
+                f"{KIND_NAMES[kind]} {sum(int(c[i, tick]) for c in self.counts.values())}"
+                for i, kind in enumerate(KINDS)
+            )
+            sources = ", ".join(
+                f"轨道组 {group_id}: {n}" for group_id, n in sorted(groups.items(), key=lambda item: -item[1])
+            )
+            lines.append(f"│  ├─ 游戏刻 {tick * GAME_TICKS_PER_REDSTONE_TICK}: {count}（{kinds}）← {sources}")
+        lines.append("└─ 轨道组负载（按峰值排列）:")
+        groups = sorted(self.counts.items(), key=lambda item: -int(item[1].sum(axis=0).max()))
+        for index, (group_id, counts) in enumerate(groups):
+            per_tick = counts.sum(axis=0)
+            peak_tick = int(per_tick.argmax())
+            dust = counts[KINDS.index("dust")].sum() / max(per_tick.sum(), 1)
+            branch = "└─" if index == len(groups) - 1 else "├─"
+            lines.append(
+                f"   {branch} 轨道组 {group_id}: 峰值 {int(per_tick[peak_tick])}"
+                f"（游戏刻 {peak_tick * GAME_TICKS_PER_REDSTONE_TICK}），"
+                f"总计 {int(per_tick.sum())}，红石线占 {dust:.0%}"
+            )
+        return lines
+
+
+def analyze_load(group_blocks: Dict[object, Dict[Position, str]], pulse: int = DEFAULT_PULSE) -> LoadReport:
+    """
+    模拟各轨道组同时开始播放，统计每个红石刻的元件状态变化数。
+
+    参数:
+    group_blocks: {轨道组ID: {坐标: 方块状态}}（同一位置只属于最后写入的轨道组）
+    pulse: 输入脉冲长度（红石刻），元件亮起 pulse 个红石刻后熄灭
+
+    返回:
+    LoadReport
+    """
+    if pulse < 1:
+        raise ValueError(f"输入脉冲长度必须为正整数: {pulse}")
+    blocks: Dict[Position, str] = {}
+    owners: Dict[Position, object] = {}
+    for group_id, group in group_blocks.items():
+        blocks.update(group)
+        owners.update(dict.fromkeys(group, group_id))
+
+    times = simulate(blocks)
+    end = max(times.values(), default=-1) + pulse + 1
+    counts: Dict[object, np.ndarray] = {}
+    components: Dict[str, int] = defaultdict(int)
+    unreached = 0
+    for pos, block in blocks.items():
+        kind = component_kind(block)
+        if kind is None:
+            continue
+        if pos not in times:
+            unreached += 1
+            continue
+        components[kind] += 1
+        group_counts = counts.get(owners[pos])
+        if group_counts is None:
+            group_counts = counts[owners[pos]] = np.zeros((len(KINDS), end), dtype=np.int64)
+        row = KINDS.index(kind)
+        group_counts[row, times[pos]] += 1  # 亮起
+        group_counts[row, times[pos] + pulse] += 1  # 熄灭
+    return LoadReport(counts, dict(components), unreached, pulse)
+
+
+# --------------------------
+# 分析策略
+# --------------------------
+class LoadAnalysisStrategy(SchematicOutputStrategy):
+    """
+    红石负载分析策略：与 .schem 输出生成相同的方块数据（按轨道组记录归属），
+    完成时在日志中输出负载报告，不写出任何文件。可以单独使用，也可以放进组合策略与其他输出一起生成。
+    """
+
+    records_groups = True
+
+    def __init__(self):
+        super().__init__()
+        self.report: LoadReport | None = None  # finalize 后的分析结果
+
+    def initialize(self, processor: GroupProcessor):
+        """
+        初始化，使用按轨道组记录方块的结构对象
+
+        参数:
+        processor: GroupProcessor实例
+        """
+        if self.schem is None:
+            self.schem = GroupRecordingSchematic(processor)
+        super().initialize(processor)
+
+    def pipeline_column_width(self, processor: GroupProcessor) -> None:
+        """分析需要完整的方块数据，不提前写出。"""
+        return None
+
+    def finalize(self, processor: GroupProcessor):
+        """
+        模拟播放并输出负载报告
+
+        参数:
+        processor: GroupProcessor实例
+        """
+        pulse = int(processor.config.get("load_pulse_ticks") or DEFAULT_PULSE)
+        self.report = analyze_load(self.schem.group_blocks, pulse)
+        for line in self.report.lines():
+            processor.log(line)
@@ -14,11 +14,15 @@ Minecraft函数文件生成器
 
 from __future__ import annotations
 
-from typing import List
+import os
+import re
+from typing import IO, List, Optional
 
 from pynbs import Note
 
 from .core import GroupProcessor, OutputFormatStrategy
+from .pipeline import BackgroundWriter
+from .sinks import OutputTarget, is_path, write_text
 from .constants import INSTRUMENT_MAPPING, INSTRUMENT_BLOCK_MAPPING, NOTEPITCH_MAPPING
 
 
@@ -26,10 +30,18 @@ from .constants import INSTRUMENT_MAPPING, INSTRUMENT_BLOCK_MAPPING, NOTEPITCH_M
 # 命令文件生成策略
 # --------------------------
 class McFunctionOutputStrategy(OutputFormatStrategy):
-    """输出为 .mcfunction 命令文件的策略实现。"""
+    """
+    输出为 .mcfunction 命令文件的策略实现。
 
-    def __init__(self):
+    参数:
+    sink: 输出目标文件对象（文本或二进制），None 表示写入 <output_file>.mcfunction
+    """
+
+    def __init__(self, sink: Optional[IO] = None):
+        self.sink = sink  # 输出目标文件对象
         self.commands = []  # 存储生成的命令
+        self.origin: tuple[int, int, int] | None = None  # 相对坐标原点（None 表示使用绝对坐标）
+        self._writer: BackgroundWriter | None = None  # 流水线模式的后台写出线程
 
     def initialize(self, processor: GroupProcessor):
         """
@@ -39,6 +51,9 @@ class McFunctionOutputStrategy(OutputFormatStrategy):
         processor: GroupProcessor实例
         """
         self.commands = []
+        self.origin = self.get_relative_origin(processor)
+        if self.sink is not None:
+            return
         # 清空输出文件（output_file 已由 GUI 移除了扩展名）
         output_file = processor.config["output_file"] + ".mcfunction"
         with open(output_file, "w", encoding="utf-8") as f:
@@ -52,13 +67,10 @@ class McFunctionOutputStrategy(OutputFormatStrategy):
         processor: GroupProcessor实例
         tick: 当前tick
         """
-        # 计算当前tick在X轴上的位置（每个tick占2格）
-        tick_x = processor.base_x + tick * 2
+        # 覆盖方块、中继器等时钟结构（位置由轨道组的时钟布局决定）
         commands = [
-            f"setblock {tick_x} {processor.base_y} {processor.base_z} {processor.cover_block}",
-            f"setblock {tick_x} {processor.base_y - 1} {processor.base_z} {processor.base_block}",
-            f"setblock {tick_x - 1} {processor.base_y} {processor.base_z} minecraft:repeater[delay=1,facing=west]",
-            f"setblock {tick_x - 1} {processor.base_y - 1} {processor.base_z} {processor.base_block}",
+            f"setblock {self._pos(*position)} {block}"
+            for position, block in processor.get_clock_blocks(tick)
         ]
         self._write_commands(processor, commands)
 
@@ -76,28 +88,34 @@ class McFunctionOutputStrategy(OutputFormatStrategy):
             return  # 已生成
 
         # 获取该方向上的最大偏移量
-        max_pan_offset = processor._get_max_pan(processor.notes, tick, direction)
+        max_pan_offset = processor._get_max_pan(processor.notes, tick, direction, processor.lanes)
         if max_pan_offset == 0:
             return
 
         # 计算平台的起始和结束坐标
-        tick_x = processor.base_x + tick * 2
-        platform_start_z = processor.get_platform_start_z()  # 平台起始Z坐标（主干道）
-        platform_end_z = processor.calculate_platform_end_z(max_pan_offset, direction)
-
-        # 生成平台基础结构命令
-        platform_commands = [
-            f"fill {tick_x} {processor.base_y - 1} {platform_start_z} {tick_x} {processor.base_y - 1} {platform_end_z} {processor.base_block}",
-            f"setblock {tick_x} {processor.base_y} {platform_start_z} {processor.cover_block}",
-        ]
+        tick_x = processor.get_tick_x(tick)
+        y = processor.get_tick_y(tick)
+        platform_start_z = processor.get_platform_start_z(tick)  # 平台起始Z坐标（主干道）
+        platform_end_z = processor.calculate_platform_end_z(max_pan_offset, direction, tick)
+
+        # 生成平台基础结构命令（覆盖方块不需要基座且没有红石线时不铺基座）
+        platform_commands = []
+        base_start_z = processor.get_platform_base_start_z(direction, tick)
+        if processor.trunk_needs_base() or abs(max_pan_offset) > 1:
+            platform_commands.append(
+                f"fill {self._pos(tick_x, y - 1, base_start_z)} "
+                f"{self._pos(tick_x, y - 1, platform_end_z)} {processor.base_block}"
+            )
+        platform_commands.append(f"setblock {self._pos(tick_x, y, platform_start_z)} {processor.cover_block}")
 
         # 如果偏移量大于1，需要铺设红石线连接
         if abs(max_pan_offset) > 1:
             # 红石线的起始位置应该是从主干道旁边开始
-            wire_start_z = processor.get_wire_start_z(direction)
+            wire_start_z = processor.get_wire_start_z(direction, tick)
             wire_end_z = platform_end_z
             platform_commands.append(
-                f"fill {tick_x} {processor.base_y} {wire_start_z} {tick_x} {processor.base_y} {wire_end_z} "
+                f"fill {self._pos(tick_x, y, wire_start_z)} "
+                f"{self._pos(tick_x, y, wire_end_z)} "
                 "minecraft:redstone_wire[north=side,south=side]"
             )
 
@@ -119,13 +137,13 @@ class McFunctionOutputStrategy(OutputFormatStrategy):
 
         # 生成音符方块和基座方块的命令
         commands = [
-            f"setblock {tick_x} {y} {z_pos} note_block[note={note_pitch},instrument={instrument}]",
-            f"setblock {tick_x} {y - 1} {z_pos} {base_block}",
+            f"setblock {self._pos(tick_x, y, z_pos)} note_block[note={note_pitch},instrument={instrument}]",
+            f"setblock {self._pos(tick_x, y - 1, z_pos)} {base_block}",
         ]
 
         # 如果基座是沙子类方块，需要在下方添加屏障防止掉落
         if self.is_sand_block(base_block):
-            commands.append(f"setblock {tick_x} {y - 2} {z_pos} barrier")
+            commands.append(f"setblock {self._pos(tick_x, y - 2, z_pos)} barrier")
 
         self._write_commands(processor, commands)
 
@@ -136,9 +154,62 @@ class McFunctionOutputStrategy(OutputFormatStrategy):
         参数:
         processor: GroupProcessor实例
         """
-        output_file = processor.config["output_file"] + ".mcfunction"
-        with open(output_file, "a", encoding="utf-8") as f:
-            f.write("\n".join(self.commands) + "\n\n")
+        target = self.get_output_target(processor)
+        if self._writer is not None:
+            # 流水线模式：前面的命令已由后台线程写入，提交剩余命令并等待写完
+            writer, self._writer = self._writer, None
+            writer.submit(self._append_commands, target, self.commands, "\n")
+            self.commands = []
+            writer.close()
+        else:
+            self._append_commands(target, self.commands, "\n")
+
+        # 相对坐标模式：额外生成一个在原点处调用主函数的放置函数（写入 sink 时只输出到日志）
+        if self.origin is not None:
+            function_id = self.get_function_id(processor)
+            place_command = f"execute positioned {' '.join(map(str, self.origin))} run function {function_id}"
+            if self.sink is None:
+                place_file = processor.config["output_file"] + "_place.mcfunction"
+                with open(place_file, "w", encoding="utf-8") as f:
+                    f.write(place_command + "\n")
+            else:
+                processor.log(f">> 放置命令: {place_command}")
+            processor.log(
+                f">> 相对坐标模式: 原点 {self.origin}，"
+                f"可用 execute positioned <x> <y> <z> run function {function_id} 在任意位置放置"
+            )
+
+    def flush(self, processor: GroupProcessor, completed_x: int):
+        """
+        流水线模式：把目前生成的命令交给后台线程追加写入文件。
+        命令按生成顺序执行，不依赖区域是否完成，因此每次都全部提交。
+
+        参数:
+        processor: GroupProcessor实例
+        completed_x: 已完成区域的 X 上界（不含）
+        """
+        if not self.commands:
+            return
+        if self._writer is None:
+            self._writer = BackgroundWriter()
+        batch, self.commands = self.commands, []
+        self._writer.submit(self._append_commands, self.get_output_target(processor), batch)
+
+    def get_output_target(self, processor: GroupProcessor) -> OutputTarget:
+        """输出目标：构造时传入的 sink，或 <output_file>.mcfunction。"""
+        if self.sink is not None:
+            return self.sink
+        return processor.config["output_file"] + ".mcfunction"
+
+    @staticmethod
+    def _append_commands(target: OutputTarget, commands: List[str], tail: str = ""):
+        """（后台）写出任务：把一批命令追加到命令文件或 sink。"""
+        text = "".join(command + "\n" for command in commands) + tail
+        if not is_path(target):
+            write_text(target, text)
+            return
+        with open(target, "a", encoding="utf-8") as f:
+            f.write(text)
 
     def _write_commands(self, processor: GroupProcessor, commands: List[str]):
         """
@@ -150,9 +221,48 @@ class McFunctionOutputStrategy(OutputFormatStrategy):
         """
         self.commands.extend(commands)
 
+    def _pos(self, x: int, y: int, z: int) -> str:
+        """
+        格式化命令中的坐标。
+        相对坐标模式下输出相对原点的偏移（~dx ~dy ~dz），
+        生成的函数不依赖 base_coords 的绝对位置，可以放置到任意位置或多次放置。
+        """
+        if self.origin is None:
+            return f"{x} {y} {z}"
+        return " ".join(
+            f"~{d}" if d else "~"
+            for d in (x - self.origin[0], y - self.origin[1], z - self.origin[2])
+        )
+
     # ----------------------
     # 工具方法
     # ----------------------
+    @staticmethod
+    def get_relative_origin(processor: GroupProcessor) -> tuple[int, int, int] | None:
+        """
+        读取相对坐标原点。
+        relative_coords 关闭时返回 None；未指定 relative_origin 时以第一个轨道组的基准坐标为原点。
+        """
+        if not processor.config.get("relative_coords"):
+            return None
+        origin = processor.config.get("relative_origin")
+        if origin is None:
+            first_group = next(iter(processor.group_config.values()))
+            origin = first_group["base_coords"]
+        return tuple(map(int, origin))
+
+    @staticmethod
+    def get_function_id(processor: GroupProcessor) -> str:
+        """
+        放置函数中调用的函数ID，默认是 nbs2save:<输出文件名>。
+        函数ID只允许小写字母、数字和 _-. 字符，文件名中的其余字符（空格、中文等）替换为下划线。
+        """
+        function_id = processor.config.get("function_id")
+        if function_id:
+            return function_id
+        name = re.sub(r"[^a-z0-9_.-]", "_", os.path.basename(processor.config["output_file"]).lower())
+        return f"nbs2save:{name or 'song'}"
+
     @staticmethod
     def get_note_block_info(note: Note):
         """根据 instrument 获取音符方块属性。"""
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+NBT 工具函数
+----------------------
+原版结构、投影等基于 NBT 的输出格式共用的方块状态解析与文件写出。
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, Optional, Tuple
+
+from nbtlib import File
+from nbtlib.tag import Compound, String
+
+from .compression import write_gzipped
+from .sinks import OutputTarget
+
+_BLOCK_STATE_RE = re.compile(r"^([^\[]+)(?:\[(.*)\])?$")
+
+
+def parse_block_state(block_state: str) -> Tuple[str, Dict[str, str]]:
+    """
+    把方块状态字符串拆分为方块ID与属性。
+
+    例: "minecraft:repeater[delay=1,facing=west]"
+        -> ("minecraft:repeater", {"delay": "1", "facing": "west"})
+    缺少命名空间时自动补全为 minecraft。
+    """
+    match = _BLOCK_STATE_RE.match(block_state.strip())
+    if match is None:
+        raise ValueError(f"无法解析的方块状态: {block_state}")
+    name, props = match.groups()
+    if ":" not in name:
+        name = "minecraft:" + name
+    properties = {}
+    if props:
+        for pair in props.split(","):
+            key, _, value = pair.partition("=")
+            properties[key.strip()] = value.strip()
+    return name, properties
+
+
+def block_state_compound(block_state: str) -> Compound:
+    """把方块状态字符串转换为调色板条目 {Name, Properties}。"""
+    name, properties = parse_block_state(block_state)
+    entry = Compound({"Name": String(name)})
+    if properties:
+        entry["Properties"] = Compound({k: String(v) for k, v in properties.items()})
+    return entry
+
+
+def save_gzipped_nbt(
+    root: Compound,
+    path: OutputTarget,
+    level: Optional[int] = None,
+    workers: Optional[int] = 1,
+    root_name: str = "",
+):
+    """
+    以 gzip 压缩的大端 NBT 文件写出（结构、投影、存档等文件均使用此格式）。
+
+    参数:
+    root: 根标签
+    path: 输出路径，或已打开的二进制文件对象
+    level: 压缩级别 0~9，None 表示默认级别
+    workers: 压缩线程数，默认单线程（在进程池任务中调用时不再额外开线程）
+    root_name: 根标签名称
+    """
+    write_gzipped(path, File(root, root_name=root_name).write, level, workers)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+声像微调
+----------------------
+同一轨道组内两个音符落在同一 (tick, 声像偏移) 位置时生成会报 "位置冲突" 并中止。
+社区曲子里这种情况很常见（多个轨道同一 tick 都在中央），配置 pan_nudge 后在生成前自动处理：
+
+- 每个冲突位置保留轨道编号最小的音符，其余音符移到同侧最近的空闲偏移（距离不超过 pan_nudge 格）；
+- 同样距离时优先靠近主干道（声像平台更短），中央的音符左侧优先（与声像平台的生成顺序一致）；
+- 偏移不越过中央、不超出 ±10（panning ±100）。
+
+冲突位置用 numpy 一次找出，只有含冲突的 tick 才逐个处理，每个 tick 内所有候选偏移一次算出。
+找不到空闲偏移的音符保持不变，生成时仍会报位置冲突。
+"""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import List, Tuple
+
+import numpy as np
+from pynbs import Note
+
+# 声像偏移的范围（panning ±100 对应 ±10 格）
+PAN_LIMIT = 10
+
+# 一次调整: (原音符, 原偏移, 新偏移)
+Adjustment = Tuple[Note, int, int]
+
+
+def _candidates(pan: int, tolerance: int) -> np.ndarray:
+    """按优先顺序排列的同侧候选偏移（可能超出范围，由调用方过滤）。"""
+    distances = np.repeat(np.arange(1, tolerance + 1), 2)
+    if pan == 0:
+        signs = np.tile([-1, 1], tolerance)
+        return signs * distances
+    inward = -1 if pan > 0 else 1
+    signs = np.tile([inward, -inward], tolerance)
+    return pan + signs * distances
+
+
+def nudge_pans(notes: List[Note], tolerance: int) -> Tuple[List[Note], List[Adjustment], List[Note]]:
+    """
+    把冲突的音符移到同侧最近的空闲声像偏移。
+
+    参数:
+    notes: 本组音符（按 tick 排序）
+    tolerance: 最大移动距离（格）
+
+    返回:
+    (处理后的音符（顺序不变）, 调整记录, 无法解决的冲突音符)
+    """
+    if not notes or tolerance < 1:
+        return notes, [], []
+    ticks = np.fromiter((note.tick for note in notes), dtype=np.int64, count=len(notes))
+    pans = np.fromiter(
+        (int(round(note.panning / 10)) for note in notes), dtype=np.int64, count=len(notes)
+    )
+    slots = ticks * 64 + (pans + 32)
+    _, inverse, counts = np.unique(slots, return_inverse=True, return_counts=True)
+    conflict_ticks = np.unique(ticks[counts[inverse] > 1])
+    if not len(conflict_ticks):
+        return notes, [], []
+
+    order = np.argsort(ticks, kind="stable")
+    sorted_ticks = ticks[order]
+    result = list(notes)
+    adjustments: List[Adjustment] = []
+    unresolved: List[Note] = []
+    for tick in conflict_ticks.tolist():
+        lo, hi = np.searchsorted(sorted_ticks, [tick, tick + 1])
+        bucket = order[lo:hi]
+        # 轨道编号小的音符保留原位
+        bucket = bucket[np.argsort([notes[i].layer for i in bucket.tolist()], kind="stable")]
+        bucket_pans = pans[bucket]
+        occupied = np.zeros(2 * PAN_LIMIT + 1, dtype=bool)
+        first = np.zeros(len(bucket), dtype=bool)
+        first[np.unique(bucket_pans, return_index=True)[1]] = True
+        occupied[bucket_pans[first] + PAN_LIMIT] = True
+
+        for index, pan in zip(bucket[~first].tolist(), bucket_pans[~first].tolist()):
+            candidates = _candidates(pan, tolerance)
+            valid = (np.abs(candidates) <= PAN_LIMIT) & ((candidates * pan > 0) | (pan == 0))
+            candidates = candidates[valid]
+            free = ~occupied[candidates + PAN_LIMIT]
+            if not free.any():
+                unresolved.append(notes[index])
+                continue
+            new_pan = int(candidates[np.argmax(free)])
+            occupied[new_pan + PAN_LIMIT] = True
+            result[index] = replace(notes[index], panning=new_pan * 10)
+            adjustments.append((notes[index], pan, new_pan))
+    return result, adjustments, unresolved
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+轨道组重叠检测
+----------------------
+两个轨道组生成到同一位置时，后生成的组会直接覆盖前一组的方块，结构因此损坏却没有任何提示。
+本模块在输出前找出所有重叠：
+
+1. 足迹：由试运行的写入模型（见 estimate.py）直接算出每组写入的全部方块（相对 base_coords 的坐标编码为 int64 并排序）
+   以及写入该方块时正在生成的 tick，不生成方块。足迹与 base_coords 无关，按轨道组的其他配置缓存，
+   修改坐标后只需平移，不需要重新生成；共用时钟的分支与两组的相对位置有关，相对位置变化时才重新生成。
+2. 粗筛：各组包围盒的 X 区间按起点排序后扫描（区间扫描），只有包围盒相交的组才进一步比较，
+   几百个沿 Z 或 Y 排列的轨道组只会产生相邻组之间的少量候选。
+3. 精确比较：平移后的坐标编码直接相减即可，两组排序后的编码用 np.intersect1d 求交集，
+   得到重叠的方块数、重叠区域的包围盒以及双方受影响的 tick 范围。
+
+几百个轨道组的修改坐标后重新检测只需要平移与求交集，GUI 可以在每次修改坐标后立即检查。
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+from pynbs import Note
+
+from .core import GroupProcessor
+from .tiling import Position
+
+# 坐标编码：X、Z 各 25 位，Y 12 位（偏置后为非负数，编码对平移是线性的）
+_XZ_BITS = 25
+_Y_BITS = 12
+_XZ_BIAS = 1 << (_XZ_BITS - 1)
+_Y_BIAS = 1 << (_Y_BITS - 1)
+
+
+def encode_positions(positions: np.ndarray) -> np.ndarray:
+    """把 (N, 3) 坐标数组编码为 int64（按 X、Y、Z 的字典序有序）。"""
+    positions = np.asarray(positions, dtype=np.int64).reshape(-1, 3)
+    return (
+        ((positions[:, 0] + _XZ_BIAS) << (_Y_BITS + _XZ_BITS))
+        | ((positions[:, 1] + _Y_BIAS) << _XZ_BITS)
+        | (positions[:, 2] + _XZ_BIAS)
+    )
+
+
+def decode_positions(keys: np.ndarray) -> np.ndarray:
+    """encode_positions 的逆运算，返回 (N, 3) 坐标数组。"""
+    keys = np.asarray(keys, dtype=np.int64)
+    x = (keys >> (_Y_BITS + _XZ_BITS)) - _XZ_BIAS
+    y = ((keys >> _XZ_BITS) & ((1 << _Y_BITS) - 1)) - _Y_BIAS
+    z = (keys & ((1 << _XZ_BITS) - 1)) - _XZ_BIAS
+    return np.stack([x, y, z], axis=1)
+
+
+def _offset_key(offset: Position) -> int:
+    """平移 offset 时编码的增量。"""
+    dx, dy, dz = offset
+    return (dx << (_Y_BITS + _XZ_BITS)) + (dy << _XZ_BITS) + dz
+
+
+@dataclass
+class Footprint:
+    """一个轨道组写入的方块（相对 base_coords），keys 升序排列，ticks 与 keys 一一对应。"""
+
+    keys: np.ndarray
+    ticks: np.ndarray
+    low: Position
+    high: Position
+
+
+@dataclass
+class Overlap:
+    """两个轨道组之间的一处重叠。"""
+
+    groups: Tuple[object, object]  # (先生成的轨道组, 后生成并覆盖前者的轨道组)
+    blocks: int  # 重叠的方块数
+    low: Position  # 重叠方块的包围盒
+    high: Position
+    ticks: Tuple[Tuple[int, int], Tuple[int, int]]  # 双方受影响的 tick 范围
+
+    def describe(self) -> str:
+        (a, b), ((a0, a1), (b0, b1)) = self.groups, self.ticks
+        return (
+            f"轨道组 {a} 与 {b} 重叠 {self.blocks} 格，范围 {self.low} ~ {self.high}，"
+            f"tick {a0}~{a1}（组 {a}） / {b0}~{b1}（组 {b}）"
+        )
+
+
+def measure_footprints(
+    notes: List[Note], global_max_tick: int, config: Dict, group_config: Dict, tempo: float | None = None
+) -> Dict[object, Footprint]:
+    """
+    由试运行的写入模型（见 estimate.py）算出每个轨道组的足迹，不生成方块。
+
+    参数:
+    notes, global_max_tick, config, group_config, tempo: 与 GroupProcessor 相同
+
+    返回:
+    {轨道组ID: Footprint}，没有写入方块的轨道组不出现
+    """
+    from .estimate import group_footprints
+
+    processor = GroupProcessor(notes, global_max_tick, config, group_config, tempo)
+    footprints = {}
+    for group_id, (keys, ticks) in processor.run_remapped(group_footprints).items():
+        base = tuple(map(int, group_config[group_id]["base_coords"]))
+        keys = keys - _offset_key(base)  # 平移不改变编码的顺序
+        positions = decode_positions(keys)
+        low, high = positions.min(axis=0), positions.max(axis=0)
+        footprints[group_id] = Footprint(keys, ticks, tuple(low.tolist()), tuple(high.tolist()))
+    return footprints
+
+
+class OverlapIndex:
+    """
+    一首曲子的轨道组重叠检测，缓存各组足迹，修改坐标后重新检测不需要重新生成。
+
+    参数:
+    notes, global_max_tick, config, tempo: 与 GroupProcessor 相同
+    """
+
+    def __init__(self, notes: List[Note], global_max_tick: int, config: Dict, tempo: float | None = None):
+        self.notes = notes
+        self.global_max_tick = global_max_tick
+        self.config = config
+        self.tempo = tempo
+        self._footprints: Dict[str, Footprint] = {}  # 足迹缓存: 轨道组签名 -> Footprint
+
+    @staticmethod
+    def _signature(group_id, group_config: Dict) -> str:
+        """与坐标无关的轨道组签名；共用时钟的组额外包含被共用组的配置与两组的相对位置。"""
+        group = group_config[group_id]
+        fields = {key: value for key, value in group.items() if key != "base_coords"}
+        source_id = group.get("shared_clock")
+        if source_id is not None and source_id in group_config:
+            source = group_config[source_id]
+            fields["shared_clock"] = [
+                OverlapIndex._signature(source_id, group_config),
+                [int(s) - int(g) for s, g in zip(source["base_coords"], group["base_coords"])],
+            ]
+        return json.dumps(fields, sort_keys=True, default=str)
+
+    def footprints(self, group_config: Dict) -> Dict[object, Footprint]:
+        """返回各轨道组的足迹（相对 base_coords），未缓存的组按需生成。"""
+        signatures = {group_id: self._signature(group_id, group_config) for group_id in group_config}
+        missing = [group_id for group_id, signature in signatures.items() if signature not in self._footprints]
+        if missing:
+            # 共用时钟的组需要被共用的组一起生成
+            needed = set(missing)
+            needed.update(
+                group_config[group_id]["shared_clock"]
+                for group_id in missing
+                if group_config[group_id].get("shared_clock") in group_config
+            )
+            subset = {group_id: group for group_id, group in group_config.items() if group_id in needed}
+            measured = measure_footprints(self.notes, self.global_max_tick, self.config, subset, self.tempo)
+            for group_id in needed:
+                if group_id in measured:
+                    self._footprints[signatures[group_id]] = measured[group_id]
+        return {
+            group_id: self._footprints[signature]
+            for group_id, signature in signatures.items()
+            if signature in self._footprints
+        }
+
+    def find_overlaps(self, group_config: Dict) -> List[Overlap]:
+        """
+        检测各轨道组之间的重叠。
+
+        参数:
+        group_config: 轨道组配置
+
+        返回:
+        重叠列表（按轨道组在配置中的顺序）
+        """
+        footprints = self.footprints(group_config)
+        order = {group_id: index for index, group_id in enumerate(group_config)}
+        bases = {group_id: tuple(map(int, group_config[group_id]["base_coords"])) for group_id in footprints}
+
+        # 粗筛：按 X 区间扫描，active 为 X 区间仍覆盖当前起点的轨道组
+        boxes = {}
+        for group_id, footprint in footprints.items():
+            base = bases[group_id]
+            low = tuple(b + v for b, v in zip(base, footprint.low))
+            high = tuple(b + v for b, v in zip(base, footprint.high))
+            boxes[group_id] = (low, high)
+
+        candidates = []
+        active: List[object] = []
+        for group_id in sorted(boxes, key=lambda g: boxes[g][0][0]):
+            low = boxes[group_id][0]
+            active = [other for other in active if boxes[other][1][0] >= low[0]]
+            for other in active:
+                if _boxes_intersect(boxes[group_id], boxes[other]):
+                    candidates.append((other, group_id) if order[other] < order[group_id] else (group_id, other))
+            active.append(group_id)
+
+        # 精确比较
+        overlaps = []
+        for a, b in sorted(candidates, key=lambda pair: (order[pair[0]], order[pair[1]])):
+            keys_a = footprints[a].keys + _offset_key(bases[a])
+            keys_b = footprints[b].keys + _offset_key(bases[b])
+            shared, index_a, index_b = np.intersect1d(keys_a, keys_b, assume_unique=True, return_indices=True)
+            if not len(shared):
+                continue
+            positions = decode_positions(shared)
+            ticks_a, ticks_b = footprints[a].ticks[index_a], footprints[b].ticks[index_b]
+            overlaps.append(
+                Overlap(
+                    groups=(a, b),
+                    blocks=len(shared),
+                    low=tuple(positions.min(axis=0).tolist()),
+                    high=tuple(positions.max(axis=0).tolist()),
+                    ticks=(
+                        (int(ticks_a.min()), int(ticks_a.max())),
+                        (int(ticks_b.min()), int(ticks_b.max())),
+                    ),
+                )
+            )
+        return overlaps
+
+
+def _boxes_intersect(a: Tuple[Position, Position], b: Tuple[Position, Position]) -> bool:
+    return all(a[0][i] <= b[1][i] and b[0][i] <= a[1][i] for i in range(3))
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+自动排布
+----------------------
+根据每个轨道组实际生成的方块范围计算各组的 base_coords，使各组紧凑排列又互不重叠：
+
+1. 测量：由试运行的写入模型（见 overlap.measure_footprints）算出每组写入方块的包围盒，不生成方块，
+   生成模式、紧凑布局、低更新元件、速度重映射、声像微调等设置都会被准确计入。
+2. 分簇：共用时钟（shared_clock）的轨道组与被共用的轨道组必须保持相对位置，作为一个整体移动。
+3. 排布：货架式排列。pack_axis='z' 时各排沿 +Z 依次排列，'y' 时沿 +Y 向上堆叠；
+   pack_row_length 为每排的 X 长度上限，None 表示每排只放一簇（所有组从同一 X 开始）；
+   设置上限时按簇在排列方向上的尺寸从大到小依次放入第一个放得下的排（First Fit Decreasing）。
+   簇之间留 pack_spacing 格空隙，pack_chunk_align 开启时每簇的 X、Z 起点对齐到区块边界。
+
+排布区域从第一个轨道组当前的 base_coords 开始（作为整体包围盒的最小角）。
+"""
+
+from __future__ import annotations
+
+from copy import deepcopy
+from typing import Dict, List, Tuple
+
+import pynbs
+
+from .overlap import measure_footprints
+from .tiling import CHUNK_SIZE, Position
+
+# 可选的排布方向
+PACK_AXES = ("z", "y")
+
+# 包围盒 (最小角, 最大角)，均包含
+Bounds = Tuple[Position, Position]
+
+
+def measure_groups(
+    notes: List[pynbs.Note], global_max_tick: int, config: Dict, group_config: Dict, tempo: float | None = None
+) -> Dict[object, Bounds]:
+    """
+    按当前配置计算每个轨道组方块的包围盒（世界坐标），不生成方块。
+
+    参数:
+    notes, global_max_tick, config, group_config, tempo: 与 GroupProcessor 相同
+
+    返回:
+    {轨道组ID: (最小角, 最大角)}，没有写入方块的轨道组不出现
+    """
+    bounds = {}
+    for group_id, footprint in measure_footprints(notes, global_max_tick, config, group_config, tempo).items():
+        base = tuple(map(int, group_config[group_id]["base_coords"]))
+        bounds[group_id] = (
+            tuple(b + v for b, v in zip(base, footprint.low)),
+            tuple(b + v for b, v in zip(base, footprint.high)),
+        )
+    return bounds
+
+
+def _clusters(group_config: Dict) -> List[List[object]]:
+    """按共用时钟关系分簇（被共用的轨道组在前），簇按其第一个轨道组在配置中的顺序排列。"""
+    clusters: Dict[object, List[object]] = {}
+    for group_id, group in group_config.items():
+        source = group.get("shared_clock")
+        root = source if source is not None and source in group_config else group_id
+        clusters.setdefault(root, [])
+        if root == group_id:
+            clusters[root].insert(0, group_id)
+        else:
+            clusters[root].append(group_id)
+    return list(clusters.values())
+
+
+def _align(value: int, enabled: bool) -> int:
+    return -(-value // CHUNK_SIZE) * CHUNK_SIZE if enabled else value
+
+
+def _size(low: Position, high: Position, axis: int) -> int:
+    return high[axis] - low[axis] + 1
+
+
+def pack_groups(
+    bounds: Dict[object, Bounds],
+    group_config: Dict,
+    axis: str = "z",
+    spacing: int = 1,
+    chunk_align: bool = False,
+    row_length: int | None = None,
+) -> Tuple[Dict, Bounds]:
+    """
+    根据包围盒排布轨道组。
+
+    参数:
+    bounds: measure_groups 的结果
+    group_config: 当前轨道组配置（不修改）
+    axis: 排的排列方向，'z' 或 'y'
+    spacing: 簇之间的空隙（方块）
+    chunk_align: 每簇的 X、Z 起点是否对齐到区块边界
+    row_length: 每排的 X 长度上限，None 表示每排一簇
+
+    返回:
+    (新的 group_config, 排布后的整体包围盒)
+    """
+    if axis not in PACK_AXES:
+        raise ValueError(f"未知的排布方向: {axis}（可选 {', '.join(PACK_AXES)}）")
+    if spacing < 0:
+        raise ValueError(f"排布间距不能为负数: {spacing}")
+    result = deepcopy(group_config)
+    if not bounds:
+        return result, ((0, 0, 0), (0, 0, 0))
+
+    # 每簇的整体包围盒
+    boxes = []
+    for members in _clusters(group_config):
+        measured = [bounds[group_id] for group_id in members if group_id in bounds]
+        if not measured:
+            continue
+        low = tuple(min(box[0][i] for box in measured) for i in range(3))
+        high = tuple(max(box[1][i] for box in measured) for i in range(3))
+        boxes.append((members, low, high))
+
+    origin = tuple(map(int, next(iter(group_config.values()))["base_coords"]))
+    stack = 2 if axis == "z" else 1  # 排依次排列的坐标轴
+    if row_length is not None:
+        boxes.sort(key=lambda box: -_size(box[1], box[2], stack))
+
+    # 货架式排布：rows 中每排为 [该排的起点, 深度, 下一簇的 X]
+    rows: List[List[int]] = []
+    placements = []
+    start_x = _align(origin[0], chunk_align)
+    for members, low, high in boxes:
+        width, depth = _size(low, high, 0), _size(low, high, stack)
+        for row in rows:
+            x = _align(row[2], chunk_align)
+            if row_length is not None and depth <= row[1] and x + width - start_x <= row_length:
+                break
+        else:
+            start = rows[-1][0] + rows[-1][1] + spacing if rows else origin[stack]
+            if axis == "z":
+                start = _align(start, chunk_align)
+            row = [start, depth, start_x]
+            rows.append(row)
+            x = start_x
+        target = [x, origin[1], _align(origin[2], chunk_align)]
+        target[stack] = row[0]
+        row[2] = x + width + spacing
+        placements.append((members, low, high, target))
+
+    packed_low = [None, None, None]
+    packed_high = [None, None, None]
+    for members, low, high, target in placements:
+        shift = [target[i] - low[i] for i in range(3)]
+        for group_id in members:
+            coords = map(int, group_config[group_id]["base_coords"])
+            result[group_id]["base_coords"] = tuple(str(c + d) for c, d in zip(coords, shift))
+        for i in range(3):
+            lo, hi = low[i] + shift[i], high[i] + shift[i]
+            packed_low[i] = lo if packed_low[i] is None else min(packed_low[i], lo)
+            packed_high[i] = hi if packed_high[i] is None else max(packed_high[i], hi)
+    return result, (tuple(packed_low), tuple(packed_high))
+
+
+def pack_song(song: pynbs.File, config: Dict, group_config: Dict) -> Tuple[Dict, Bounds]:
+    """
+    为整首曲子自动排布轨道组（排布参数读取 config 中的 pack_* 配置）。
+
+    返回:
+    (新的 group_config, 排布后的整体包围盒)
+    """
+    bounds = measure_groups(song.notes, song.header.song_length, config, group_config, song.header.tempo)
+    row_length = config.get("pack_row_length")
+    return pack_groups(
+        bounds,
+        group_config,
+        axis=config.get("pack_axis") or "z",
+        spacing=int(config.get("pack_spacing", 1) or 0),
+        chunk_align=bool(config.get("pack_chunk_align")),
+        row_length=int(row_length) if row_length else None,
+    )
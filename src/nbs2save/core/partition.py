@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+自动分组
+----------------------
+同一轨道组内两个音符落在同一 (tick, 声像偏移) 位置时生成会报 "位置冲突"。
+本模块根据音符表自动把轨道划分为尽量少的轨道组，使每组内都没有冲突：
+
+1. 冲突图：每个轨道是一个顶点，两个轨道在任意 tick 落在同一声像偏移上就连一条边。
+2. 着色：DSatur（优先给已相邻颜色最多的顶点着色）得到初始分组，
+   再用迭代贪心（按颜色类重新排序后逐个顶点取最小可用颜色，颜色数不会增加）尝试减少组数。
+3. 下界：贪心找一个团（两两冲突的轨道），组数不可能少于团的大小；两者相等时分组数最少。
+4. 生成 group_config：沿 Z 轴依次排列各组，先按组内左右两侧的最大声像偏移估计间距，
+   再由试运行的写入模型（见 overlap.measure_footprints）测量各组实际占用的 Z 范围重新排列，
+   蛇形等沿 Z 轴展开的生成模式也互不重叠。
+
+冲突图的边数只与同一位置上同时出现的轨道有关，几百个轨道的曲子也只需要几秒。
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+import pynbs
+from pynbs import Note
+
+from .overlap import Footprint, measure_footprints
+from .tempo import remap_notes
+
+# 迭代贪心的最大轮数
+REFINE_ROUNDS = 20
+# 相邻两组声像平台之间的空隙（方块）
+GROUP_GAP = 1
+
+# 轨道 -> 与其冲突的轨道
+ConflictGraph = Dict[int, Set[int]]
+
+
+def _pan(panning: np.ndarray) -> np.ndarray:
+    """与 GroupProcessor._calculate_pan 相同的声像偏移（Python round 为银行家舍入，np.round 一致）。"""
+    return np.round(panning / 10).astype(np.int64)
+
+
+def layer_conflicts(notes: List[Note]) -> ConflictGraph:
+    """
+    构建轨道冲突图。
+
+    参数:
+    notes: 全部音符
+
+    返回:
+    {轨道: 冲突轨道集合}，包含所有有音符的轨道（没有冲突时为空集合）
+    """
+    if not notes:
+        return {}
+    ticks = np.fromiter((note.tick for note in notes), dtype=np.int64, count=len(notes))
+    layers = np.fromiter((note.layer for note in notes), dtype=np.int64, count=len(notes))
+    pans = _pan(np.fromiter((note.panning for note in notes), dtype=np.float64, count=len(notes)))
+
+    # 每个 (tick, 偏移) 位置上的轨道（去重后按位置排序）
+    slots = ticks * 64 + (pans + 32)
+    pairs = np.unique(np.stack([slots, layers], axis=1), axis=0)
+    graph: ConflictGraph = {int(layer): set() for layer in np.unique(layers)}
+    starts = np.flatnonzero(np.r_[True, pairs[1:, 0] != pairs[:-1, 0]])
+    counts = np.diff(np.r_[starts, len(pairs)])
+    for start, count in zip(starts[counts > 1].tolist(), counts[counts > 1].tolist()):
+        shared = pairs[start:start + count, 1].tolist()
+        for layer in shared:
+            graph[layer].update(shared)
+    for layer, neighbors in graph.items():
+        neighbors.discard(layer)
+    return graph
+
+
+def dsatur(graph: ConflictGraph) -> Dict[int, int]:
+    """
+    DSatur 着色。
+
+    返回:
+    {轨道: 颜色（从 0 开始）}
+    """
+    colors: Dict[int, int] = {}
+    saturation: Dict[int, Set[int]] = {layer: set() for layer in graph}
+    uncolored = set(graph)
+    while uncolored:
+        layer = max(uncolored, key=lambda v: (len(saturation[v]), len(graph[v]), -v))
+        color = _smallest_free(saturation[layer])
+        colors[layer] = color
+        uncolored.discard(layer)
+        for neighbor in graph[layer]:
+            if neighbor in uncolored:
+                saturation[neighbor].add(color)
+    return colors
+
+
+def refine(graph: ConflictGraph, colors: Dict[int, int], rounds: int = REFINE_ROUNDS) -> Dict[int, int]:
+    """
+    迭代贪心：按颜色类从大到小的顺序依次重新着色，颜色数不会增加，没有改进时提前结束。
+    """
+    best = colors
+    for _ in range(rounds):
+        classes = defaultdict(list)
+        for layer, color in best.items():
+            classes[color].append(layer)
+        order = [
+            layer
+            for _, members in sorted(classes.items(), key=lambda item: (-len(item[1]), item[0]))
+            for layer in sorted(members)
+        ]
+        recolored: Dict[int, int] = {}
+        for layer in order:
+            recolored[layer] = _smallest_free({recolored[n] for n in graph[layer] if n in recolored})
+        if _count(recolored) >= _count(best):
+            break
+        best = recolored
+    return best
+
+
+def clique_lower_bound(graph: ConflictGraph) -> int:
+    """贪心找一个团（从度数最大的顶点开始依次加入与团内全部顶点冲突的轨道），返回其大小。"""
+    best = 1 if graph else 0
+    for start in sorted(graph, key=lambda v: -len(graph[v]))[:32]:
+        clique = {start}
+        candidates = set(graph[start])
+        while candidates:
+            layer = max(candidates, key=lambda v: (len(graph[v] & candidates), -v))
+            clique.add(layer)
+            candidates &= graph[layer]
+        best = max(best, len(clique))
+    return best
+
+
+def partition_layers(notes: List[Note]) -> Tuple[List[List[int]], int]:
+    """
+    把有音符的轨道划分为互不冲突的轨道组。
+
+    返回:
+    (按最小轨道编号排序的分组列表, 组数下界)
+    """
+    graph = layer_conflicts(notes)
+    colors = refine(graph, dsatur(graph))
+    groups = defaultdict(list)
+    for layer, color in colors.items():
+        groups[color].append(layer)
+    ordered = sorted((sorted(layers) for layers in groups.values()), key=lambda layers: layers[0])
+    return ordered, clique_lower_bound(graph)
+
+
+def partition_song(song: pynbs.File, config: Dict, template: Dict | None = None) -> Tuple[Dict[int, Dict], int]:
+    """
+    为整首曲子自动分组（开启 tempo_remap 时按重映射后的音符计算冲突）。
+
+    参数:
+    song: pynbs 读取的曲子
+    config: 全局生成配置
+    template: 作为模板的轨道组配置，见 build_group_config
+
+    返回:
+    (group_config, 组数下界)
+    """
+    notes = song.notes
+    if config.get("tempo_remap"):
+        quantum = int(config.get("tempo_quantum") or 1)
+        notes = remap_notes(notes, song.header.song_length, song.header.tempo, quantum)[0]
+    groups, bound = partition_layers(notes)
+    group_config = build_group_config(notes, groups, template)
+    footprints = measure_footprints(
+        song.notes, song.header.song_length, config, group_config, song.header.tempo
+    )
+    return place_groups(group_config, footprints), bound
+
+
+def build_group_config(
+    notes: List[Note], groups: Iterable[List[int]], template: Dict | None = None
+) -> Dict[int, Dict]:
+    """
+    生成可直接使用的 group_config：各组沿 +Z 依次排列，相邻两组的声像平台之间留 GROUP_GAP 格空隙。
+
+    参数:
+    notes: 全部音符
+    groups: 每组包含的轨道
+    template: 作为模板的轨道组配置（基准坐标作为第一组的位置，方块和生成模式等其他设置复制到每一组，
+              共用时钟 shared_clock 不复制）
+
+    返回:
+    {轨道组ID: 轨道组配置}
+    """
+    template = template or {
+        "base_coords": ("0", "0", "0"),
+        "block": {"base": "minecraft:iron_block", "cover": "minecraft:iron_block"},
+        "generation_mode": "default",
+    }
+    x, y, z = map(int, template["base_coords"])
+    layer_pans = defaultdict(lambda: [0, 0])  # 轨道 -> [左侧最大偏移, 右侧最大偏移]
+    for note in notes:
+        pan = int(round(note.panning / 10))
+        extent = layer_pans[note.layer]
+        extent[0], extent[1] = max(extent[0], -pan), max(extent[1], pan)
+
+    config: Dict[int, Dict] = {}
+    previous_right = None
+    for group_id, layers in enumerate(groups):
+        left = max(layer_pans[layer][0] for layer in layers)
+        right = max(layer_pans[layer][1] for layer in layers)
+        if previous_right is not None:
+            z += previous_right + left + 1 + GROUP_GAP
+        config[group_id] = {
+            "base_coords": (str(x), str(y), str(z)),
+            "layers": list(layers),
+            **{key: value for key, value in template.items() if key not in ("base_coords", "layers", "shared_clock")},
+            "block": dict(template["block"]),
+        }
+        previous_right = right
+    return config
+
+
+def place_groups(group_config: Dict[int, Dict], footprints: Dict[object, Footprint]) -> Dict[int, Dict]:
+    """
+    按实测足迹沿 +Z 重新排列各组（X、Y 与第一组的 Z 不变），相邻两组之间留 GROUP_GAP 格空隙。
+
+    参数:
+    group_config: build_group_config 的结果（原地修改）
+    footprints: 各组相对 base_coords 的足迹，没有写入方块的组按只占 base_coords 一格处理
+
+    返回:
+    group_config
+    """
+    previous_high = None
+    for group_id, group in group_config.items():
+        x, y, z = group["base_coords"]
+        footprint = footprints.get(group_id)
+        low, high = (footprint.low[2], footprint.high[2]) if footprint else (0, 0)
+        z = int(z) if previous_high is None else previous_high - low + 1 + GROUP_GAP
+        group["base_coords"] = (x, y, str(z))
+        previous_high = z + high
+    return group_config
+
+
+def _smallest_free(used: Set[int]) -> int:
+    color = 0
+    while color in used:
+        color += 1
+    return color
+
+
+def _count(colors: Dict[int, int]) -> int:
+    return len(set(colors.values()))
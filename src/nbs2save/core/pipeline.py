@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+生成与写出流水线
+----------------------
+生成线程（生产者）把已经生成完毕的部分交给后台写出线程（消费者）序列化、压缩并写盘，
+使生成与写出同时进行，总耗时接近 max(生成, 写出) 而不是两者之和。
+
+队列有容量上限：写出跟不上生成时 submit 会阻塞（背压），内存中待写出的数据量有上限。
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Callable, List, Optional
+
+# 未指定时后台写出队列的容量（任务数）
+DEFAULT_QUEUE_SIZE = 4
+
+
+class BackgroundWriter:
+    """
+    后台写出线程：按提交顺序逐个执行写出任务。
+
+    参数:
+    max_pending: 队列中最多等待的任务数，超过时 submit 阻塞
+    name: 线程名称（便于调试）
+
+    任务中抛出的异常会在下一次 submit 或 close 时在生成线程中重新抛出，
+    出错后的任务不再执行。
+    """
+
+    def __init__(self, max_pending: int = DEFAULT_QUEUE_SIZE, name: str = "nbs2save-writer"):
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max(1, max_pending))
+        self._errors: List[BaseException] = []
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        self._closed = False
+
+    def submit(self, fn: Callable, *args):
+        """提交一个写出任务；队列已满时阻塞等待。"""
+        self._raise_error()
+        if self._closed:
+            raise RuntimeError("后台写出线程已关闭")
+        self._queue.put((fn, args))
+
+    def close(self):
+        """等待全部任务完成并结束线程；有任务失败时抛出第一个异常。"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+        self._raise_error()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._errors:
+                continue  # 已出错：丢弃剩余任务，只清空队列避免生成线程阻塞
+            fn, args = item
+            try:
+                fn(*args)
+            except BaseException as e:  # 交给生成线程抛出
+                self._errors.append(e)
+
+    def _raise_error(self):
+        if self._errors:
+            raise self._errors[0]
@@ -0,0 +1,454 @@
+# -*- coding: utf-8 -*-
+"""
+RCON 推送客户端
+----------------------
+负责把生成的命令通过 RCON 直接推送到正在运行的服务器，无需放置函数文件和 /reload。
+
+主要流程
+1. 建立若干条 RCON 连接（连接池）并完成认证。
+2. 按 X 坐标所在区块把命令分配到各连接，保证同一位置的命令始终按顺序执行。
+3. 每条连接流水线发送：不等待响应连续发送，未确认的命令数不超过窗口大小。
+4. 全局令牌桶限制每秒命令数；超时或断线时重连，从最早的未确认命令起按原顺序重发。
+"""
+
+from __future__ import annotations
+
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from pynbs import Note
+
+from .core import GroupProcessor
+from .mcfunction import McFunctionOutputStrategy
+from .pipeline import BackgroundWriter
+
+# RCON 数据包类型
+PACKET_TYPE_RESPONSE = 0
+PACKET_TYPE_COMMAND = 2
+PACKET_TYPE_LOGIN = 3
+
+# 单个命令数据包正文的最大长度（Minecraft 限制）
+MAX_COMMAND_LENGTH = 1446
+
+
+# --------------------------
+# 数据包编解码
+# --------------------------
+def encode_packet(request_id: int, packet_type: int, body: str) -> bytes:
+    """按 RCON 协议打包：长度、请求ID、类型、正文和两个结尾空字节（小端序）。"""
+    payload = struct.pack("<ii", request_id, packet_type) + body.encode("utf-8") + b"\x00\x00"
+    return struct.pack("<i", len(payload)) + payload
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    """从套接字读取恰好 size 字节，连接关闭时抛出 ConnectionError。"""
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("RCON 连接已关闭")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def read_packet(sock: socket.socket) -> tuple[int, int, str]:
+    """读取一个数据包，返回 (请求ID, 类型, 正文)。"""
+    (length,) = struct.unpack("<i", _recv_exact(sock, 4))
+    payload = _recv_exact(sock, length)
+    request_id, packet_type = struct.unpack("<ii", payload[:8])
+    body = payload[8:-2].decode("utf-8", errors="replace")
+    return request_id, packet_type, body
+
+
+# --------------------------
+# 限速
+# --------------------------
+class RateLimiter:
+    """线程安全的令牌桶，commands_per_second 为 None 或 0 时不限速。"""
+
+    def __init__(self, commands_per_second: Optional[float]):
+        self.rate = commands_per_second or 0
+        self._lock = threading.Lock()
+        self._tokens = float(self.rate)
+        self._last = time.monotonic()
+
+    def acquire(self):
+        """取得一个令牌，必要时阻塞等待。"""
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                # 桶容量为一秒的配额，允许短暂突发
+                self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# --------------------------
+# 单连接客户端
+# --------------------------
+class RconClient:
+    """单条 RCON 连接，负责认证与数据包收发。"""
+
+    def __init__(self, host: str, port: int, password: str, timeout: float = 5.0):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self.sock: Optional[socket.socket] = None
+        self._next_id = 0
+
+    def connect(self):
+        """建立连接并认证，密码错误时抛出 PermissionError。"""
+        self.close()
+        self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        request_id = self.next_id()
+        self.sock.sendall(encode_packet(request_id, PACKET_TYPE_LOGIN, self.password))
+        while True:
+            response_id, packet_type, _ = read_packet(self.sock)
+            if response_id == -1:
+                self.close()
+                raise PermissionError("RCON 认证失败，请检查密码")
+            # 部分服务端会在认证响应前先发送一个空的响应包
+            if response_id == request_id and packet_type == PACKET_TYPE_COMMAND:
+                return
+
+    def next_id(self) -> int:
+        """生成递增的请求ID（保持为正的 32 位整数）。"""
+        self._next_id = self._next_id % 0x7FFFFFFF + 1
+        return self._next_id
+
+    def send_command(self, command: str) -> int:
+        """发送命令但不等待响应，返回请求ID。"""
+        request_id = self.next_id()
+        self.sock.sendall(encode_packet(request_id, PACKET_TYPE_COMMAND, command))
+        return request_id
+
+    def read_response(self, timeout: float) -> tuple[int, int, str]:
+        """在 timeout 秒内读取一个响应包，超时抛出 socket.timeout。"""
+        self.sock.settimeout(max(timeout, 0.001))
+        return read_packet(self.sock)
+
+    def command(self, command: str) -> str:
+        """同步执行一条命令并返回响应正文。"""
+        request_id = self.send_command(command)
+        while True:
+            response_id, _, body = self.read_response(self.timeout)
+            if response_id == request_id:
+                return body
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            finally:
+                self.sock = None
+
+
+# --------------------------
+# 连接池 + 流水线推送
+# --------------------------
+class RconPushClient:
+    """
+    基于连接池的流水线 RCON 推送客户端。
+
+    参数:
+    host, port, password: RCON 连接信息
+    pool_size: 连接数
+    max_in_flight: 每条连接允许的未确认命令数（流水线窗口）
+    commands_per_second: 所有连接合计的每秒命令上限，None 表示不限速
+    max_retries: 单条命令超时/断线后的最大重发次数
+    timeout: 单条命令等待响应的超时时间（秒）
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        password: str,
+        pool_size: int = 2,
+        max_in_flight: int = 64,
+        commands_per_second: Optional[float] = None,
+        max_retries: int = 3,
+        timeout: float = 5.0,
+    ):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.pool_size = max(1, pool_size)
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(commands_per_second)
+
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {}
+        self._progress_callback: Optional[Callable[[int, int], None]] = None
+
+    @staticmethod
+    def _lane_key(command: str) -> int:
+        """按命令中 X 坐标所在的区块分配连接，同一位置的命令落在同一连接上。"""
+        parts = command.split(" ", 2)
+        try:
+            return int(parts[1]) >> 4
+        except (IndexError, ValueError):
+            return 0
+
+    def push(
+        self,
+        commands: List[str],
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict[str, float]:
+        """
+        推送全部命令，阻塞直到全部确认或放弃。
+
+        参数:
+        commands: 命令列表（不带前导斜杠）
+        progress_callback: 进度回调，参数为 (已确认数, 总数)
+
+        返回:
+        统计信息：sent / acknowledged / retried / failed / elapsed
+        """
+        for command in commands:
+            if len(command) > MAX_COMMAND_LENGTH:
+                raise ValueError(f"命令过长（{len(command)} 字符），RCON 无法发送: {command[:60]}...")
+
+        lanes: List[List[str]] = [[] for _ in range(self.pool_size)]
+        for command in commands:
+            lanes[self._lane_key(command) % self.pool_size].append(command)
+
+        self._stats = {"sent": 0, "acknowledged": 0, "retried": 0, "failed": 0}
+        self._progress_callback = progress_callback
+        total = len(commands)
+        errors: List[BaseException] = []
+
+        def run(lane: List[str]):
+            try:
+                self._run_lane(lane, total)
+            except BaseException as e:  # 交给主线程抛出
+                errors.append(e)
+
+        start = time.monotonic()
+        threads = [
+            threading.Thread(target=run, args=(lane,), daemon=True) for lane in lanes if lane
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if errors:
+            raise errors[0]
+
+        stats: Dict[str, float] = dict(self._stats)
+        stats["elapsed"] = time.monotonic() - start
+        return stats
+
+    def _count(self, key: str, total: int = 0):
+        with self._lock:
+            self._stats[key] += 1
+            acknowledged = self._stats["acknowledged"]
+        if key == "acknowledged" and self._progress_callback:
+            self._progress_callback(acknowledged, total)
+
+    def _run_lane(self, commands: List[str], total: int):
+        """
+        单条连接的流水线发送循环。
+
+        超时（视为丢包）或断线时停止发送并重连，从最早的未确认命令起按原顺序重发，
+        其后已执行的命令也一并重发，保证同一位置的命令最终按原顺序生效。
+        """
+        client = RconClient(self.host, self.port, self.password, self.timeout)
+        client.connect()
+        timeouts = [0] * len(commands)  # 每条命令作为最早的未确认命令超时/断线的次数
+        acknowledged = [False] * len(commands)
+        next_index = 0  # 下一条要发送的命令
+        # 未确认命令：请求ID -> (命令下标, 发送时间)，按发送顺序排列
+        in_flight: OrderedDict[int, tuple[int, float]] = OrderedDict()
+
+        try:
+            while next_index < len(commands) or in_flight:
+                try:
+                    # 1. 填满流水线窗口
+                    while next_index < len(commands) and len(in_flight) < self.max_in_flight:
+                        self.rate_limiter.acquire()
+                        request_id = client.send_command(commands[next_index])
+                        in_flight[request_id] = (next_index, time.monotonic())
+                        next_index += 1
+                        self._count("sent")
+
+                    # 2. 读取响应，直到最早的未确认命令超时
+                    oldest_sent = next(iter(in_flight.values()))[1]
+                    remaining = self.timeout - (time.monotonic() - oldest_sent)
+                    response_id, _, _ = client.read_response(remaining)
+                    self._acknowledge(in_flight.pop(response_id, None), acknowledged, total)
+                except socket.timeout:
+                    # 3. 超时视为丢包：停止发送，等旧连接上已发出的命令执行完，
+                    #    再回退到最早的未确认命令，重连后按原顺序重发
+                    self._drain(client, in_flight, acknowledged, total)
+                    next_index = self._rewind(in_flight, next_index, timeouts, acknowledged)
+                    in_flight.clear()
+                    client.connect()
+                except (ConnectionError, OSError):
+                    # 4. 断线：重连后从最早的未确认命令起按原顺序重发
+                    next_index = self._rewind(in_flight, next_index, timeouts, acknowledged)
+                    in_flight.clear()
+                    client.connect()
+        finally:
+            client.close()
+
+    def _acknowledge(self, entry: Optional[tuple[int, float]], acknowledged: List[bool], total: int):
+        """记录一条命令的响应（重发的命令只计一次确认）。"""
+        if entry is not None and not acknowledged[entry[0]]:
+            acknowledged[entry[0]] = True
+            self._count("acknowledged", total)
+
+    def _drain(self, client: RconClient, in_flight: OrderedDict, acknowledged: List[bool], total: int):
+        """不再发送，读取剩余响应直到最后发出的命令也超时；此后旧连接上不会再有命令执行。"""
+        if not in_flight:
+            return
+        last_sent = next(reversed(in_flight.values()))[1]
+        while True:
+            remaining = self.timeout - (time.monotonic() - last_sent)
+            if remaining <= 0:
+                return
+            try:
+                response_id, _, _ = client.read_response(remaining)
+            except (socket.timeout, ConnectionError, OSError):
+                return
+            self._acknowledge(in_flight.pop(response_id, None), acknowledged, total)
+
+    def _rewind(self, in_flight: OrderedDict, next_index: int, timeouts: List[int], acknowledged: List[bool]) -> int:
+        """
+        返回重发的起点：最早的未确认命令；它超过重试次数时记为失败并从下一条开始。
+        起点之后已发送过的命令都会重发。
+        """
+        oldest = next(iter(in_flight.values()))[0] if in_flight else next_index
+        if oldest == len(timeouts):
+            return oldest
+        timeouts[oldest] += 1
+        resume = oldest
+        if timeouts[oldest] > self.max_retries:
+            if not acknowledged[oldest]:
+                self._count("failed")
+            resume = oldest + 1
+        for _ in range(resume, next_index):
+            self._count("retried")
+        return resume
+
+
+# --------------------------
+# RCON 推送策略
+# --------------------------
+class RconOutputStrategy(McFunctionOutputStrategy):
+    """
+    与 McFunctionOutputStrategy 生成相同的命令，
+    完成时通过 RCON 推送到服务器而不是写入 .mcfunction 文件。
+    """
+
+    def initialize(self, processor: GroupProcessor):
+        """
+        初始化输出格式，清空命令列表并校验 RCON 配置
+
+        参数:
+        processor: GroupProcessor实例
+        """
+        if self.sink is not None:
+            raise ValueError("RCON 推送不写出文件，不支持 sink")
+        self.commands = []
+        self._writer = None
+        self._stats = {"sent": 0, "acknowledged": 0, "retried": 0, "failed": 0, "elapsed": 0.0}
+        if not processor.config.get("rcon_host"):
+            raise ValueError("配置缺失: rcon_host")
+
+    def write_note(self, processor: GroupProcessor, note: Note):
+        """
+        写入音符。
+        RCON 命令可能分散在多个游戏刻执行，因此先放置屏障再放置沙子类基座，避免基座掉落。
+        """
+        start = len(self.commands)
+        super().write_note(processor, note)
+        written = self.commands[start:]
+        barriers = [c for c in written if c.endswith(" barrier")]
+        if barriers:
+            self.commands[start:] = barriers + [c for c in written if not c.endswith(" barrier")]
+
+    def flush(self, processor: GroupProcessor, completed_x: int):
+        """
+        流水线模式：把目前生成的命令交给后台线程推送，边生成边推送。
+        后台线程按提交顺序逐批推送，批与批之间保持顺序。
+
+        参数:
+        processor: GroupProcessor实例
+        completed_x: 已完成区域的 X 上界（不含）
+        """
+        if not self.commands:
+            return
+        if self._writer is None:
+            self._writer = BackgroundWriter()
+            processor.log(f"\n>> 流水线模式: 边生成边通过 RCON 推送到 {processor.config['rcon_host']}")
+        batch, self.commands = self.commands, []
+        self._writer.submit(self._push, self.create_client(processor), batch, None)
+
+    def finalize(self, processor: GroupProcessor):
+        """
+        完成输出，通过 RCON 推送全部命令
+
+        参数:
+        processor: GroupProcessor实例
+        """
+        client = self.create_client(processor)
+        if self._writer is not None:
+            # 流水线模式：前面的命令已在后台推送，提交剩余命令并等待全部确认
+            writer, self._writer = self._writer, None
+            writer.submit(self._push, client, self.commands, None)
+            self.commands = []
+            writer.close()
+        else:
+            processor.log(f"\n>> 通过 RCON 推送 {len(self.commands)} 条命令到 {client.host}:{client.port}")
+            self._push(
+                client,
+                self.commands,
+                lambda done, count: processor.update_progress(int(done * 100 / count)),
+            )
+
+        stats = self._stats
+        processor.log(f"├─ 已确认: {stats['acknowledged']}, 重发: {stats['retried']}")
+        processor.log(f"├─ 失败: {stats['failed']}")
+        processor.log(
+            f"└─ 耗时: {stats['elapsed']:.2f}s "
+            f"({stats['acknowledged'] / max(stats['elapsed'], 1e-6):.0f} 条/秒)"
+        )
+        if stats["failed"]:
+            raise RuntimeError(f"{stats['failed']} 条命令在重试 {client.max_retries} 次后仍未确认")
+
+    def _push(self, client: RconPushClient, commands: List[str], progress_callback):
+        """推送一批命令并累加统计信息。"""
+        if not commands:
+            return
+        stats = client.push(commands, progress_callback)
+        for key, value in stats.items():
+            self._stats[key] += value
+
+    @staticmethod
+    def create_client(processor: GroupProcessor) -> RconPushClient:
+        """根据 rcon_* 配置创建推送客户端。"""
+        config = processor.config
+        return RconPushClient(
+            config["rcon_host"],
+            int(config.get("rcon_port", 25575)),
+            config.get("rcon_password", ""),
+            pool_size=int(config.get("rcon_pool_size", 2)),
+            max_in_flight=int(config.get("rcon_max_in_flight", 64)),
+            commands_per_second=config.get("rcon_commands_per_second"),
+            max_retries=int(config.get("rcon_max_retries", 3)),
+            timeout=float(config.get("rcon_timeout", 5.0)),
+        )
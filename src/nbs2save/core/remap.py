@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+调色板重映射
+----------------------
+只修改了轨道组的基座/覆盖方块（或只修改了 data_version）时，不必重新生成整首曲子：
+读取已生成的 .schem，只改写调色板中的方块状态并重新标记数据版本后另存。
+
+方块数据按调色板索引存储，改名不需要触碰每个方块，耗时与调色板大小相关而不是方块数量。
+只有多个调色板条目被映射到同一个方块时才需要合并索引，此时用 NumPy 整体改写一次方块数据。
+
+音符盒下方的方块决定音色，与基座方块共用调色板条目：
+如果要替换的方块同时是曲子中某个音色的乐器方块（例如铁块对应 iron_xylophone），只改调色板会改变音色，
+此时拒绝重映射，需要重新生成。
+
+注意：重新标记数据版本不会转换跨版本改名的方块 ID（例如 1.20.3 的 grass → short_grass），
+这类方块需要同时写入映射表。
+"""
+
+from __future__ import annotations
+
+import gzip
+from typing import BinaryIO, Dict, Optional, Union
+
+import numpy as np
+from nbtlib import File
+from nbtlib.tag import ByteArray, Compound, Int
+
+from .constants import INSTRUMENT_BLOCK_MAPPING, INSTRUMENT_MAPPING
+from .nbt_utils import parse_block_state, save_gzipped_nbt
+from .schematic import decode_varints, encode_varints
+from .sinks import OutputTarget, is_path
+
+
+def remap_schematic(
+    source: Union[str, BinaryIO],
+    target: OutputTarget,
+    blocks: Dict[str, str],
+    data_version: Optional[int] = None,
+    level: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, str]:
+    """
+    重映射 .schem 的调色板并另存。
+
+    参数:
+    source: 原 .schem 路径或二进制文件对象
+    target: 输出路径或二进制文件对象（可以与 source 是同一路径）
+    blocks: {旧方块: 新方块}；旧方块可以是完整方块状态，也可以只写方块ID（匹配该方块的所有状态）
+    data_version: 新的数据版本，None 表示保持不变
+    level, workers: 压缩级别与压缩线程数，同 save_gzipped_nbt
+
+    返回:
+    实际发生变化的调色板条目 {旧方块状态: 新方块状态}
+    """
+    root = load_schematic_file(source)
+    body = root["Schematic"] if "Schematic" in root else root  # Sponge v3 多一层 Schematic
+    palette_parent, data_key = (body["Blocks"], "Data") if "Blocks" in body else (body, "BlockData")
+
+    changes = remap_palette(palette_parent, data_key, blocks)
+    if data_version is not None:
+        body["DataVersion"] = Int(data_version)
+    save_gzipped_nbt(root, target, level, workers, root_name=root.root_name)
+    return changes
+
+
+def remap_palette(parent: Compound, data_key: str, blocks: Dict[str, str]) -> Dict[str, str]:
+    """
+    改写 parent["Palette"]；有多个条目映射到同一方块时合并索引并改写 parent[data_key]。
+
+    返回:
+    实际发生变化的调色板条目 {旧方块状态: 新方块状态}
+    """
+    mapping = normalize_mapping(blocks)
+    palette = {str(block): int(index) for block, index in parent["Palette"].items()}
+    instrument_blocks = used_instrument_blocks(palette)
+
+    changes = {}
+    new_palette: Dict[str, int] = {}
+    index_map = np.arange(max(palette.values(), default=-1) + 1, dtype=np.uint32)
+    for block, index in sorted(palette.items(), key=lambda item: item[1]):
+        new_block = remap_block(block, mapping)
+        if new_block != block:
+            name, _ = parse_block_state(block)
+            if name in instrument_blocks:
+                raise ValueError(
+                    f"{name} 同时是音色 {instrument_blocks[name]} 的乐器方块，只改调色板会改变音色，请重新生成"
+                )
+            changes[block] = new_block
+        if new_block in new_palette:
+            index_map[index] = new_palette[new_block]  # 与已有条目合并
+        else:
+            new_palette[new_block] = index_map[index] = len(new_palette)
+
+    merged = len(new_palette) < len(palette)
+    if merged or (index_map != np.arange(len(index_map))).any():
+        data = np.asarray(parent[data_key]).view(np.uint8)
+        parent[data_key] = ByteArray(encode_varints(index_map[decode_varints(data)]).view(np.int8))
+    parent["Palette"] = Compound({block: Int(index) for block, index in new_palette.items()})
+    if "PaletteMax" in parent:
+        parent["PaletteMax"] = Int(len(new_palette))
+    return changes
+
+
+def used_instrument_blocks(palette: Dict[str, int]) -> Dict[str, str]:
+    """调色板中音符盒用到的音色对应的乐器方块 {方块ID: 音色}。"""
+    instruments = set()
+    for block in palette:
+        name, properties = parse_block_state(block)
+        if name == "minecraft:note_block" and "instrument" in properties:
+            instruments.add(properties["instrument"])
+    return {
+        INSTRUMENT_BLOCK_MAPPING[index]: instrument
+        for index, instrument in INSTRUMENT_MAPPING.items()
+        if instrument in instruments and index in INSTRUMENT_BLOCK_MAPPING
+    }
+
+
+def normalize_mapping(blocks: Dict[str, str]) -> Dict[str, str]:
+    """补全映射表两侧缺少的 minecraft 命名空间。"""
+    return {_with_namespace(old): _with_namespace(new) for old, new in blocks.items()}
+
+
+def remap_block(block: str, mapping: Dict[str, str]) -> str:
+    """完整方块状态优先匹配，其次按方块ID匹配（替换为新方块，不保留原有属性）。"""
+    if block in mapping:
+        return mapping[block]
+    name, _ = parse_block_state(block)
+    return mapping.get(name, block)
+
+
+def load_schematic_file(source: Union[str, BinaryIO]) -> File:
+    """读取 gzip 压缩的 .schem（路径或二进制文件对象）。"""
+    if is_path(source):
+        return File.load(source, gzipped=True)
+    with gzip.GzipFile(fileobj=source) as f:
+        return File.parse(f)
+
+
+def _with_namespace(block: str) -> str:
+    name, bracket, properties = block.strip().partition("[")
+    if ":" not in name:
+        name = "minecraft:" + name
+    return name + bracket + properties
+
@@ -15,23 +15,47 @@ Minecraft结构文件生成器
 
 from __future__ import annotations
 
-from typing import List
-
-from mcschematic import MCSchematic
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from mcschematic import MCSchematic, Version
+from nbtlib.tag import ByteArray, Compound, Int, List as NbtList, Short
 from pynbs import Note
 
 from .constants import INSTRUMENT_MAPPING, INSTRUMENT_BLOCK_MAPPING, NOTEPITCH_MAPPING
 from .core import GroupProcessor, OutputFormatStrategy
+from .nbt_utils import save_gzipped_nbt
+from .pipeline import BackgroundWriter
+from .sinks import OutputTarget, reject_sink
+from .tiling import CHUNK_SIZE, ColumnIndexedSchematic, Position, Tile, schematic_blocks, split_into_tiles
+
+# Sponge schematic 的宽、高、长以 short 存储
+MAX_SCHEMATIC_SIZE = 32767
 
 
 # --------------------------
 # 结构文件生成策略
 # --------------------------
 class SchematicOutputStrategy(OutputFormatStrategy):
-    """输出为 .schem 结构文件的策略实现。"""
+    """
+    输出为 .schem 结构文件的策略实现。
+
+    参数:
+    sink: 输出目标文件对象，None 表示写入 <output_file>.schem（分片导出不支持 sink）
+    """
+
+    # 是否需要按轨道组记录方块归属（GroupRecordingSchematic），组合输出共用结构对象时据此选择类型
+    records_groups = False
 
-    def __init__(self):
+    def __init__(self, sink: Optional[BinaryIO] = None):
+        self.sink = sink  # 输出目标文件对象
         self.schem: MCSchematic = None  # 内存中的结构对象
+        self._writer: BackgroundWriter | None = None  # 流水线模式的后台写出线程
+        self._pool: ProcessPoolExecutor | None = None  # 流水线模式的写出进程池
+        self._tiles: List[Dict] = []  # 已提交写出的分片清单
 
     def initialize(self, processor: GroupProcessor):
         """
@@ -41,7 +65,9 @@ class SchematicOutputStrategy(OutputFormatStrategy):
         processor: GroupProcessor实例
         """
         if self.schem is None:
-            self.schem = MCSchematic()
+            column_width = self.pipeline_column_width(processor)
+            self.schem = ColumnIndexedSchematic(column_width) if column_width else MCSchematic()
+            self._tiles = []
         # 验证配置
         self.validate_config(processor)
 
@@ -53,23 +79,9 @@ class SchematicOutputStrategy(OutputFormatStrategy):
         processor: GroupProcessor实例
         tick: 当前tick
         """
-        # 计算当前tick在X轴上的位置（每个tick占2格）
-        tick_x = processor.base_x + tick * 2
-        # 设置基础平台方块
-        self.schem.setBlock(
-            (tick_x, processor.base_y, processor.base_z), processor.cover_block
-        )
-        self.schem.setBlock(
-            (tick_x, processor.base_y - 1, processor.base_z), processor.base_block
-        )
-        # 设置红石中继器（用于时钟信号）
-        self.schem.setBlock(
-            (tick_x - 1, processor.base_y, processor.base_z),
-            "minecraft:repeater[delay=1,facing=west]",
-        )
-        self.schem.setBlock(
-            (tick_x - 1, processor.base_y - 1, processor.base_z), processor.base_block
-        )
+        # 覆盖方块、中继器等时钟结构（位置由轨道组的时钟布局决定）
+        for position, block in processor.get_clock_blocks(tick):
+            self.schem.setBlock(position, block)
 
     def write_pan_platform(self, processor: GroupProcessor, tick: int, direction: int):
         """
@@ -85,33 +97,32 @@ class SchematicOutputStrategy(OutputFormatStrategy):
             return
 
         # 获取该方向上的最大偏移量
-        max_pan_offset = processor._get_max_pan(processor.notes, tick, direction)
+        max_pan_offset = processor._get_max_pan(processor.notes, tick, direction, processor.lanes)
         if max_pan_offset == 0:
             return
 
         # 计算平台的起始和结束坐标
-        tick_x = processor.base_x + tick * 2
-        platform_start_z = processor.get_platform_start_z()  # 平台起始Z坐标（主干道）
-        platform_end_z = processor.calculate_platform_end_z(max_pan_offset, direction)
+        tick_x = processor.get_tick_x(tick)
+        y = processor.get_tick_y(tick)
+        platform_start_z = processor.get_platform_start_z(tick)  # 平台起始Z坐标（主干道）
+        platform_end_z = processor.calculate_platform_end_z(max_pan_offset, direction, tick)
         step = 1 if direction == 1 else -1
 
         # 生成平台基座方块
-        for z in range(platform_start_z, platform_end_z + step, step):
-            self.schem.setBlock((tick_x, processor.base_y - 1, z), processor.base_block)
+        for z in range(processor.get_platform_base_start_z(direction, tick), platform_end_z + step, step):
+            self.schem.setBlock((tick_x, y - 1, z), processor.base_block)
 
         # 在主干道位置放置覆盖方块
-        self.schem.setBlock(
-            (tick_x, processor.base_y, platform_start_z), processor.cover_block
-        )
+        self.schem.setBlock((tick_x, y, platform_start_z), processor.cover_block)
 
         # 如果偏移量大于1，需要铺设红石线连接
         if abs(max_pan_offset) > 1:
             # 红石线的起始位置应该是从主干道旁边开始
-            wire_start_z = processor.get_wire_start_z(direction)
+            wire_start_z = processor.get_wire_start_z(direction, tick)
             wire_end_z = platform_end_z
             for z in range(wire_start_z, wire_end_z + step, step):
                 self.schem.setBlock(
-                    (tick_x, processor.base_y, z),
+                    (tick_x, y, z),
                     "minecraft:redstone_wire[north=side,south=side]",
                 )
 
@@ -144,24 +155,179 @@ class SchematicOutputStrategy(OutputFormatStrategy):
 
     def finalize(self, processor: GroupProcessor):
         """
-        完成输出，保存结构文件
+        完成输出，保存结构文件。
+        配置了 tile_size 时按区块对齐切分为多个 .schem 分片并生成清单文件。
 
         参数:
         processor: GroupProcessor实例
         """
-        import os
+        dir_name, file_name = self.get_output_name(processor)
+        tile_size = processor.config.get("tile_size")
+        if tile_size:
+            self.save_tiled(processor, dir_name, file_name, int(tile_size))
+        else:
+            save_schematic(
+                self.schem,
+                self.get_output_target(processor, ".schem"),
+                processor.config["data_version"],
+                processor.config.get("compression_level"),
+                processor.config.get("workers"),
+            )
+
+    def save_tiled(self, processor: GroupProcessor, dir_name: str, file_name: str, tile_size: int):
+        """
+        分片保存：沿 X/Z 方向切成 tile_size 大小、与区块边界对齐的分片（Y 方向不切分），
+        在进程池中并行写出 <文件名>_<序号>.schem，并生成 <文件名>_tiles.json 清单。
+
+        每个分片都保留了自身在整体中的偏移（WEOffset），
+        在同一位置依次 //schem load + //paste 即可逐片还原整体结构。
+        """
+        self.validate_tile_size(tile_size)
+        reject_sink(self.sink, "分片导出")
+        if isinstance(self.schem, ColumnIndexedSchematic):
+            # 流水线模式：大部分分片已在生成过程中写出，这里只提交剩余部分并等待写完
+            self.write_completed(processor, self.schem.pop_completed())
+            self.close_pipeline()
+            processor.log(f"\n>> 分片导出: {len(self._tiles)} 个分片（{tile_size}x{tile_size}，区块对齐，流水线写出）")
+        else:
+            tiles = split_into_tiles(schematic_blocks(self.schem), (tile_size, None, tile_size))
+            jobs = self._tile_jobs(processor, tiles)
+            processor.log(f"\n>> 分片导出: {len(tiles)} 个分片（{tile_size}x{tile_size}，区块对齐）")
+
+            workers = processor.config.get("workers") or None
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for done, _ in enumerate(pool.map(_save_tile, jobs), 1):
+                    processor.update_progress(int(done * 100 / len(jobs)))
+
+        manifest = {
+            "tile_size": tile_size,
+            "data_version": processor.config["data_version"].value,
+            "tiles": self._tiles,
+        }
+        manifest_path = os.path.join(dir_name, f"{file_name}_tiles.json")
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        processor.log(f"└─ 清单文件: {manifest_path}")
+
+    def _tile_jobs(self, processor: GroupProcessor, tiles: List[Tile]) -> List[Tuple]:
+        """为分片生成写出任务，并按顺序登记到分片清单（序号接着已登记的分片）。"""
+        dir_name, file_name = self.get_output_name(processor)
+        tile_size = int(processor.config["tile_size"])
+        version = processor.config["data_version"]
+        level = processor.config.get("compression_level")
+        jobs = []
+        for tile in tiles:
+            index = len(self._tiles)
+            tile_file = f"{file_name}_{index:03d}.schem"
+            jobs.append((list(tile.blocks.items()), os.path.join(dir_name, tile_file), version, level))
+            self._tiles.append(
+                {
+                    "index": index,
+                    "file": tile_file,
+                    "chunk": [tile.key[0] * tile_size // CHUNK_SIZE, tile.key[2] * tile_size // CHUNK_SIZE],
+                    "offset": list(tile.min_corner),
+                    "size": list(tile.size),
+                    "blocks": len(tile.blocks),
+                }
+            )
+        return jobs
+
+    # ----------------------
+    # 流水线写出
+    # ----------------------
+    def pipeline_column_width(self, processor: GroupProcessor) -> Optional[int]:
+        """
+        流水线模式下提前写出的列宽（X 方向）。
+        None 表示该输出无法分块提前写出（如单个 .schem 文件），全部留到 finalize。
+        """
+        if processor.config.get("pipeline_ticks") and processor.config.get("tile_size"):
+            reject_sink(self.sink, "分片导出")
+            return self.validate_tile_size(int(processor.config["tile_size"]))
+        return None
+
+    def flush(self, processor: GroupProcessor, completed_x: int):
+        """取出已完成的列交给后台写出（仅在使用 ColumnIndexedSchematic 时生效）。"""
+        if isinstance(self.schem, ColumnIndexedSchematic):
+            blocks = self.schem.pop_completed(completed_x)
+            if blocks:
+                self.write_completed(processor, blocks)
+
+    def write_completed(self, processor: GroupProcessor, blocks: Dict[Position, str]):
+        """
+        把已完成区域的方块切分为分片，交给后台线程写出。
+
+        参数:
+        processor: GroupProcessor实例
+        blocks: 已完成区域的 {坐标: 方块状态}
+        """
+        tile_size = int(processor.config["tile_size"])
+        tiles = split_into_tiles(blocks, (tile_size, None, tile_size))
+        if tiles:
+            self.submit_jobs(processor, _save_tile, self._tile_jobs(processor, tiles))
+
+    def submit_jobs(
+        self,
+        processor: GroupProcessor,
+        fn: Callable,
+        jobs: List,
+        on_result: Optional[Callable] = None,
+    ):
+        """
+        把一批进程池任务交给后台写出线程；后台队列已满时阻塞（背压）。
+
+        参数:
+        processor: GroupProcessor实例
+        fn: 进程池任务函数（模块级函数）
+        jobs: 任务参数列表
+        on_result: 每个任务完成后在后台线程中调用的回调
+        """
+        if self._writer is None:
+            self._pool = ProcessPoolExecutor(max_workers=processor.config.get("workers") or None)
+            self._writer = BackgroundWriter()
+        self._writer.submit(self._run_jobs, fn, jobs, on_result)
+
+    def _run_jobs(self, fn: Callable, jobs: List, on_result: Optional[Callable]):
+        for result in self._pool.map(fn, jobs):
+            if on_result is not None:
+                on_result(result)
+
+    def close_pipeline(self):
+        """等待后台写出全部完成并释放线程与进程池。"""
+        try:
+            if self._writer is not None:
+                self._writer.close()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+            self._writer = self._pool = None
+
+    # ----------------------
+    # 工具方法
+    # ----------------------
+    @staticmethod
+    def get_output_name(processor: GroupProcessor) -> Tuple[str, str]:
+        """返回 (输出目录, 不含 .schem 扩展名的文件名)，兼容 Windows 路径分隔符。"""
         path = processor.config["output_file"]
-        # 分离目录和文件名，兼容 Windows 路径分隔符
         dir_name = os.path.dirname(path) or "."
         file_name = os.path.basename(path)
-        # 移除已有的 .schem 扩展名（mcschematic 会自动添加）
         if file_name.endswith(".schem"):
             file_name = file_name[:-6]
-        self.schem.save(dir_name, file_name, processor.config["data_version"])
+        return dir_name, file_name
+
+    def get_output_target(self, processor: GroupProcessor, extension: str) -> OutputTarget:
+        """输出目标：构造时传入的 sink，或 <输出目录>/<文件名><extension>。"""
+        if self.sink is not None:
+            return self.sink
+        dir_name, file_name = self.get_output_name(processor)
+        return os.path.join(dir_name, file_name + extension)
+
+    @staticmethod
+    def validate_tile_size(tile_size: int) -> int:
+        """检查分片大小：必须是区块边长的倍数且不超过 .schem 尺寸上限。"""
+        if tile_size % CHUNK_SIZE or not 0 < tile_size <= MAX_SCHEMATIC_SIZE:
+            raise ValueError(f"tile_size 必须是 {CHUNK_SIZE} 的倍数且不超过 {MAX_SCHEMATIC_SIZE}: {tile_size}")
+        return tile_size
 
-    # ----------------------
-    # 工具方法
-    # ----------------------
     @staticmethod
     def get_note_block_info(note: Note):
         """根据 instrument 获取音符方块属性。"""
@@ -184,6 +350,112 @@ class SchematicOutputStrategy(OutputFormatStrategy):
                 raise ValueError(f"配置缺失: {key}")
 
 
+def _save_tile(job: Tuple[List[Tuple[Tuple[int, int, int], str]], str, Version, Optional[int]]):
+    """进程池任务：把一个分片的方块写成独立的 .schem 文件（分片之间已并行，单线程压缩）。"""
+    blocks, path, version, level = job
+    schem = MCSchematic()
+    for pos, block in blocks:
+        schem.setBlock(pos, block)
+    save_schematic(schem, path, version, level, workers=1)
+
+
+# --------------------------
+# .schem 序列化
+# --------------------------
+def build_schematic_nbt(schem: MCSchematic, version: Version) -> Compound:
+    """
+    把 MCSchematic 转换为 Sponge Schematic v2 根标签（内容与 MCSchematic.save 一致）。
+    方块数据按 YZX 顺序用 NumPy 一次性编码为 varint 字节数组。
+    """
+    structure = schem.getStructure()
+    block_states = structure.getBlockStates()
+    if block_states:
+        (x0, y0, z0), (x1, y1, z1) = structure.getBounds()
+    else:
+        (x0, y0, z0), (x1, y1, z1) = (0, 0, 0), (0, 0, 0)
+    width, height, length = x1 - x0 + 1, y1 - y0 + 1, z1 - z0 + 1
+    if max(width, height, length) > MAX_SCHEMATIC_SIZE:
+        raise ValueError(f"结构尺寸 {width}x{height}x{length} 超出 .schem 上限 {MAX_SCHEMATIC_SIZE}，请设置 tile_size 分片导出")
+
+    palette = structure.getBlockPalette()
+    ids = np.zeros(width * height * length, dtype=np.uint32)  # 0 = minecraft:air
+    if block_states:
+        coords = np.array(list(block_states.keys()), dtype=np.int64).reshape(-1, 3)
+        values = np.fromiter(block_states.values(), dtype=np.uint32, count=len(block_states))
+        ids[((coords[:, 1] - y0) * length + (coords[:, 2] - z0)) * width + (coords[:, 0] - x0)] = values
+
+    return Compound(
+        {
+            "Version": Int(2),
+            "DataVersion": Int(version.value),
+            "Metadata": Compound({"WEOffsetX": Int(x0), "WEOffsetY": Int(y0), "WEOffsetZ": Int(z0)}),
+            "Height": Short(height),
+            "Length": Short(length),
+            "Width": Short(width),
+            "PaletteMax": Int(len(palette)),
+            "Palette": Compound({block: Int(index) for block, index in palette.items()}),
+            "BlockData": ByteArray(encode_varints(ids).view(np.int8)),
+            "BlockEntities": NbtList[Compound]([]),
+        }
+    )
+
+
+def encode_varints(values: np.ndarray) -> np.ndarray:
+    """
+    把非负整数数组编码为连续的 varint 字节（每字节低 7 位为数据，最高位表示后面还有字节）。
+    调色板不超过 128 项时每个值恰好 1 字节，直接返回。
+    """
+    values = np.asarray(values, dtype=np.uint32)
+    if len(values) == 0 or values.max() < 0x80:
+        return values.astype(np.uint8)
+
+    lengths = np.ones(len(values), dtype=np.int64)
+    for shift in (7, 14, 21, 28):
+        lengths += values >= (1 << shift)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    out = np.empty(int(lengths.sum()), dtype=np.uint8)
+    for byte in range(int(lengths.max())):
+        mask = lengths > byte
+        part = (values[mask] >> np.uint32(7 * byte)) & np.uint32(0x7F)
+        more = (lengths[mask] > byte + 1).astype(np.uint32) << np.uint32(7)
+        out[starts[mask] + byte] = part | more
+    return out
+
+
+def decode_varints(data: np.ndarray) -> np.ndarray:
+    """encode_varints 的逆运算：把连续的 varint 字节解码为 uint32 数组。"""
+    data = np.asarray(data).view(np.uint8)
+    ends = np.flatnonzero(data < 0x80)
+    if len(ends) == len(data):
+        return data.astype(np.uint32)
+
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    group_starts = np.repeat(starts, ends - starts + 1)
+    shifts = ((np.arange(len(data)) - group_starts) * 7).astype(np.uint32)
+    parts = (data & 0x7F).astype(np.uint32) << shifts
+    return np.bitwise_or.reduceat(parts, starts)
+
+
+def save_schematic(
+    schem: MCSchematic,
+    path: OutputTarget,
+    version: Version,
+    level: Optional[int] = None,
+    workers: Optional[int] = None,
+):
+    """
+    保存 .schem 文件，可指定压缩级别，并行 gzip 压缩。
+
+    参数:
+    schem: 要保存的结构
+    path: 输出路径（含 .schem 扩展名），或已打开的二进制文件对象
+    version: 目标 Minecraft 版本
+    level: 压缩级别 0~9，None 表示默认级别
+    workers: 压缩线程数，None 表示 CPU 核心数
+    """
+    save_gzipped_nbt(build_schematic_nbt(schem, version), path, level, workers, root_name="Schematic")
+
+
 # --------------------------
 # 兼容性类（为了保持向后兼容）
 # --------------------------
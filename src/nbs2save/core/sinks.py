@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+输出目标（sink）
+----------------------
+输出策略默认写入由 config["output_file"] 推导的文件路径，
+也可以在构造时传入一个已打开的文件对象（sink），直接写入内存（BytesIO/StringIO）、
+标准输出、管道或 HTTP 响应，不经过磁盘。
+
+二进制输出（.schem、.litematic）需要二进制 sink；文本输出（.mcfunction）两种都可以，
+写入二进制 sink 时按 UTF-8 编码。传入 sys.stdout 这类文本流时，二进制输出会改写到其 .buffer。
+只能写出单个文件的输出才支持 sink（分片、原版结构、存档等多文件输出不支持）。
+"""
+
+from __future__ import annotations
+
+import io
+import os
+from typing import BinaryIO, Optional, Union
+
+# 输出目标：文件路径或已打开的文件对象
+OutputTarget = Union[str, "os.PathLike[str]", BinaryIO]
+
+
+def is_path(target) -> bool:
+    """判断输出目标是文件路径还是文件对象。"""
+    return isinstance(target, (str, os.PathLike))
+
+
+def binary_sink(sink) -> BinaryIO:
+    """返回可写入字节的文件对象；文本流使用其底层 buffer。"""
+    if isinstance(sink, io.TextIOBase):
+        buffer = getattr(sink, "buffer", None)
+        if buffer is None:
+            raise TypeError("二进制输出需要二进制 sink（如 BytesIO 或 sys.stdout.buffer）")
+        sink.flush()
+        return buffer
+    return sink
+
+
+def write_text(sink, text: str):
+    """向 sink 写入文本，二进制 sink 按 UTF-8 编码。"""
+    if isinstance(sink, io.TextIOBase):
+        sink.write(text)
+    else:
+        sink.write(text.encode("utf-8"))
+
+
+def reject_sink(sink: Optional[object], output_name: str):
+    """多文件输出不支持 sink，传入时报错。"""
+    if sink is not None:
+        raise ValueError(f"{output_name}会写出多个文件，不支持写入 sink，请使用 output_file")
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+声像吸附
+----------------------
+每个 tick 每侧的声像平台长度由该侧偏移最大的音符决定：一个 ±10 的音符就需要 10 格平台和 9 格红石线。
+配置 pan_snap 后在生成前按 tick 重新量化声像偏移，使平台尽量短：
+
+- 每个音符的偏移最多改变 pan_snap 格，不越过中央（中央的音符不动）；
+- 同一 tick 同侧的音符保持原来的左右顺序，原本不同的偏移仍然不同（不产生新的位置冲突），
+  原本相同的偏移仍然相同；
+- 在此约束下从靠近主干道的一侧依次取最小的可行距离：e_i = max(e_{i-1} + 1, d_i - pan_snap)，
+  逐个取最小值同时使最远的距离最小，因此每侧平台长度都是最优的。
+
+默认布局每侧平台为 m 个基座 + (m - 1) 格红石线（m 为最远距离），节省量按此估算。
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import replace
+from typing import Dict, List, Tuple
+
+from pynbs import Note
+
+
+def platform_blocks(distance: int) -> int:
+    """一侧最远距离为 distance 时声像平台的基座与红石线数量（默认布局）。"""
+    return 2 * distance - 1 if distance > 0 else 0
+
+
+def snap_distances(distances: List[int], max_error: int) -> Dict[int, int]:
+    """
+    同一 tick 同侧的偏移距离重新量化。
+
+    参数:
+    distances: 互不相同、升序排列的原距离（>= 1）
+    max_error: 每个距离最多改变的格数
+
+    返回:
+    {原距离: 新距离}，新距离严格递增且 >= 1
+    """
+    mapping = {}
+    previous = 0
+    for distance in distances:
+        previous = max(previous + 1, distance - max_error)
+        mapping[distance] = previous
+    return mapping
+
+
+def snap_pans(notes: List[Note], max_error: int) -> Tuple[List[Note], int, Tuple[int, int]]:
+    """
+    按 tick 重新量化本组音符的声像偏移。
+
+    参数:
+    notes: 本组音符
+    max_error: 最大声像误差（格）
+
+    返回:
+    (处理后的音符（顺序不变）, 移动的音符数, (原平台方块数, 新平台方块数))
+    """
+    if not notes or max_error < 1:
+        return notes, 0, (0, 0)
+    # (tick, 方向) -> 该侧出现的距离
+    sides: Dict[Tuple[int, int], set] = defaultdict(set)
+    pans = [int(round(note.panning / 10)) for note in notes]
+    for note, pan in zip(notes, pans):
+        if pan:
+            sides[(note.tick, 1 if pan > 0 else -1)].add(abs(pan))
+
+    mappings = {}
+    before = after = 0
+    for side, distances in sides.items():
+        ordered = sorted(distances)
+        mappings[side] = snap_distances(ordered, max_error)
+        before += platform_blocks(ordered[-1])
+        after += platform_blocks(mappings[side][ordered[-1]])
+
+    result = list(notes)
+    moved = 0
+    for index, (note, pan) in enumerate(zip(notes, pans)):
+        if not pan:
+            continue
+        direction = 1 if pan > 0 else -1
+        new_pan = mappings[(note.tick, direction)][abs(pan)] * direction
+        if new_pan != pan:
+            result[index] = replace(note, panning=new_pan * 10)
+            moved += 1
+    return result, moved, (before, after)
@@ -15,21 +15,31 @@ Minecraft阶梯结构文件生成器
 
 from __future__ import annotations
 
+import os
+from typing import BinaryIO, Optional
 
 from mcschematic import MCSchematic
 from pynbs import Note
 
 from .constants import INSTRUMENT_MAPPING, INSTRUMENT_BLOCK_MAPPING, NOTEPITCH_MAPPING
 from .core import GroupProcessor, OutputFormatStrategy
+from .schematic import SchematicOutputStrategy, save_schematic
+from .sinks import OutputTarget
 
 
 # --------------------------
 # 阶梯结构文件生成策略
 # --------------------------
 class StaircaseSchematicOutputStrategy(OutputFormatStrategy):
-    """输出为 .schem 结构文件的阶梯向下策略实现。"""
+    """
+    输出为 .schem 结构文件的阶梯向下策略实现。
 
-    def __init__(self):
+    参数:
+    sink: 输出目标文件对象，None 表示写入 <output_file>.schem
+    """
+
+    def __init__(self, sink: Optional[BinaryIO] = None):
+        self.sink = sink  # 输出目标文件对象
         self.schem: MCSchematic = None  # 内存中的结构对象
 
     def initialize(self, processor: GroupProcessor):
@@ -52,23 +62,9 @@ class StaircaseSchematicOutputStrategy(OutputFormatStrategy):
         processor: GroupProcessor实例
         tick: 当前tick
         """
-        # 计算当前tick在X轴上的位置（每个tick占2格）
-        tick_x = processor.base_x + tick * 2
-        # 设置基础平台方块
-        self.schem.setBlock(
-            (tick_x, processor.base_y, processor.base_z), processor.cover_block
-        )
-        self.schem.setBlock(
-            (tick_x, processor.base_y - 1, processor.base_z), processor.base_block
-        )
-        # 设置红石中继器（用于时钟信号）
-        self.schem.setBlock(
-            (tick_x - 1, processor.base_y, processor.base_z),
-            "minecraft:repeater[delay=1,facing=west]",
-        )
-        self.schem.setBlock(
-            (tick_x - 1, processor.base_y - 1, processor.base_z), processor.base_block
-        )
+        # 覆盖方块、中继器等时钟结构（低更新元件模式还包括各偏移的中继器线）
+        for position, block in processor.get_clock_blocks(tick):
+            self.schem.setBlock(position, block)
 
     def write_pan_platform(self, processor: GroupProcessor, tick: int, direction: int):
         """
@@ -84,14 +80,14 @@ class StaircaseSchematicOutputStrategy(OutputFormatStrategy):
             return
 
         # 获取该方向上的最大偏移量
-        max_pan_offset = processor._get_max_pan(processor.notes, tick, direction)
+        max_pan_offset = processor._get_max_pan(processor.notes, tick, direction, processor.lanes)
         if max_pan_offset == 0:
             return
 
         # 计算平台的起始和结束坐标
-        tick_x = processor.base_x + tick * 2
-        platform_start_z = processor.get_platform_start_z()  # 平台起始Z坐标（主干道）
-        platform_end_z = processor.calculate_platform_end_z(max_pan_offset, direction)
+        tick_x = processor.get_tick_x(tick)
+        platform_start_z = processor.get_platform_start_z(tick)  # 平台起始Z坐标（主干道）
+        platform_end_z = processor.calculate_platform_end_z(max_pan_offset, direction, tick)
         step = 1 if direction == 1 else -1
 
         # 判断是否需要启用阶梯效果（偏移量>=3）
@@ -125,7 +121,7 @@ class StaircaseSchematicOutputStrategy(OutputFormatStrategy):
         # 如果偏移量大于1，需要铺设红石线连接
         if abs(max_pan_offset) > 1:
             # 红石线的起始位置应该是从主干道旁边开始
-            wire_start_z = processor.get_wire_start_z(direction)
+            wire_start_z = processor.get_wire_start_z(direction, tick)
             wire_end_z = platform_end_z
 
             if use_staircase:  # 这里的use_staircase，是看是否启用阶梯效果，如果偏移量大于等于3，则为启动，2和1为普通模式
@@ -166,14 +162,17 @@ class StaircaseSchematicOutputStrategy(OutputFormatStrategy):
         max_pan_offset = 0
         if direction != 0:
             max_pan_offset = processor._get_max_pan(
-                processor.notes, note.tick, direction
+                processor.notes, note.tick, direction, processor.lanes
             )
 
         # 判断是否需要启用阶梯效果
         use_staircase = abs(max_pan_offset) >= 3
 
         # 计算音符高度
-        if use_staircase and abs(pan_offset) >= 3:  # 只有当偏移量>=3时才应用阶梯效果
+        if processor.get_lane_y(pan_offset) is not None:
+            # 低更新元件模式：音符盒位于本偏移的中继器线上
+            y_pos = processor.get_lane_y(pan_offset)
+        elif use_staircase and abs(pan_offset) >= 3:  # 只有当偏移量>=3时才应用阶梯效果
             # 主干道保持在base_y层，偏移位置每增加一个偏移单位下降一格
             # 需要加1来补偿音符方块自身的高度
             y_level = abs(pan_offset) - 1
@@ -204,13 +203,25 @@ class StaircaseSchematicOutputStrategy(OutputFormatStrategy):
         参数:
         processor: GroupProcessor实例
         """
-        path = processor.config["output_file"]
-        # 保存到本地 .schem
-        self.schem.save(".", path.rsplit("/", 1)[-1], processor.config["data_version"])
+        # 保存到 <output_file>.schem（保留输出目录）或 sink
+        save_schematic(
+            self.schem,
+            self.get_output_target(processor),
+            processor.config["data_version"],
+            processor.config.get("compression_level"),
+            processor.config.get("workers"),
+        )
 
     # ----------------------
     # 工具方法
     # ----------------------
+    def get_output_target(self, processor: GroupProcessor) -> OutputTarget:
+        """输出目标：构造时传入的 sink，或 <output_file>.schem。"""
+        if self.sink is not None:
+            return self.sink
+        dir_name, file_name = SchematicOutputStrategy.get_output_name(processor)
+        return os.path.join(dir_name, file_name + ".schem")
+
     @staticmethod
     def get_note_block_info(note: Note):
         """根据 instrument 获取音符方块属性。"""
@@ -239,9 +250,10 @@ class StaircaseSchematicOutputStrategy(OutputFormatStrategy):
 # 阶梯向上结构文件生成策略
 # --------------------------
 class StaircaseUpSchematicOutputStrategy(OutputFormatStrategy):
-    """输出为 .schem 结构文件的阶梯向上策略实现。"""
+    """输出为 .schem 结构文件的阶梯向上策略实现（sink 同阶梯向下策略）。"""
 
-    def __init__(self):
+    def __init__(self, sink: Optional[BinaryIO] = None):
+        self.sink = sink
         self.schem: MCSchematic = None
 
     def initialize(self, processor: GroupProcessor):
@@ -250,20 +262,8 @@ class StaircaseUpSchematicOutputStrategy(OutputFormatStrategy):
         self.validate_config(processor)
 
     def write_base_structures(self, processor: GroupProcessor, tick: int):
-        tick_x = processor.base_x + tick * 2
-        self.schem.setBlock(
-            (tick_x, processor.base_y, processor.base_z), processor.cover_block
-        )
-        self.schem.setBlock(
-            (tick_x, processor.base_y - 1, processor.base_z), processor.base_block
-        )
-        self.schem.setBlock(
-            (tick_x - 1, processor.base_y, processor.base_z),
-            "minecraft:repeater[delay=1,facing=west]",
-        )
-        self.schem.setBlock(
-            (tick_x - 1, processor.base_y - 1, processor.base_z), processor.base_block
-        )
+        for position, block in processor.get_clock_blocks(tick):
+            self.schem.setBlock(position, block)
 
     def write_pan_platform(self, processor: GroupProcessor, tick: int, direction: int):
         """
@@ -274,13 +274,13 @@ class StaircaseUpSchematicOutputStrategy(OutputFormatStrategy):
         if processor.tick_status[tick]["right" if direction == 1 else "left"]:
             return
 
-        max_pan_offset = processor._get_max_pan(processor.notes, tick, direction)
+        max_pan_offset = processor._get_max_pan(processor.notes, tick, direction, processor.lanes)
         if max_pan_offset == 0:
             return
 
-        tick_x = processor.base_x + tick * 2
-        platform_start_z = processor.get_platform_start_z()
-        platform_end_z = processor.calculate_platform_end_z(max_pan_offset, direction)
+        tick_x = processor.get_tick_x(tick)
+        platform_start_z = processor.get_platform_start_z(tick)
+        platform_end_z = processor.calculate_platform_end_z(max_pan_offset, direction, tick)
         step = 1 if direction == 1 else -1
 
         base_y = processor.base_y
@@ -302,7 +302,7 @@ class StaircaseUpSchematicOutputStrategy(OutputFormatStrategy):
         # 如果偏移量大于1，需要铺设红石线连接
         # 红石线沿阶梯的"顶面"铺设（每个阶梯方块上方 1 格）
         if abs(max_pan_offset) > 1:
-            wire_start_z = processor.get_wire_start_z(direction)
+            wire_start_z = processor.get_wire_start_z(direction, tick)
             wire_end_z = platform_end_z
             for z in range(wire_start_z, wire_end_z + step, step):
                 distance = abs(z - platform_start_z)
@@ -352,8 +352,15 @@ class StaircaseUpSchematicOutputStrategy(OutputFormatStrategy):
             self.schem.setBlock((tick_x, note_base_y - 1, z_pos), "minecraft:barrier")
 
     def finalize(self, processor: GroupProcessor):
-        path = processor.config["output_file"]
-        self.schem.save(".", path.rsplit("/", 1)[-1], processor.config["data_version"])
+        save_schematic(
+            self.schem,
+            self.get_output_target(processor),
+            processor.config["data_version"],
+            processor.config.get("compression_level"),
+            processor.config.get("workers"),
+        )
+
+    get_output_target = StaircaseSchematicOutputStrategy.get_output_target
 
     @staticmethod
     def get_note_block_info(note: Note):
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+原版结构文件生成器
+----------------------
+负责把生成的方块数据写成原版结构方块使用的 .nbt 文件，不依赖 WorldEdit。
+
+主要流程
+1. 与 .schem 输出共用同一份方块数据（SchematicOutputStrategy 生成的 MCSchematic）。
+2. 按 48x48x48 的原版结构尺寸上限切分为若干结构。
+3. 在进程池中并行写出各结构的 .nbt 文件。
+4. 生成一个 /place template 命令文件，按顺序放置全部结构。
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from nbtlib.tag import Compound, Int, List as NbtList
+
+from .core import GroupProcessor
+from .nbt_utils import block_state_compound, save_gzipped_nbt
+from .schematic import SchematicOutputStrategy
+from .sinks import reject_sink
+from .tiling import Tile, bounding_box, schematic_blocks, split_into_tiles
+
+# 原版结构方块单个结构的尺寸上限
+MAX_STRUCTURE_SIZE = 48
+
+
+# --------------------------
+# 原版结构生成策略
+# --------------------------
+class StructureOutputStrategy(SchematicOutputStrategy):
+    """输出为原版结构 .nbt 文件的策略实现（方块数据与 .schem 输出相同）。"""
+
+    def initialize(self, processor: GroupProcessor):
+        """
+        初始化输出格式
+
+        参数:
+        processor: GroupProcessor实例
+        """
+        reject_sink(self.sink, "原版结构导出")
+        super().initialize(processor)
+
+    def pipeline_column_width(self, processor: GroupProcessor) -> None:
+        """结构切分网格以整体最小角为原点，需要全部方块生成后才能确定，不提前写出。"""
+        return None
+
+    def finalize(self, processor: GroupProcessor):
+        """
+        完成输出，切分并写出结构文件与放置函数
+
+        输出文件:
+        <output_file>_structures/<名称>_<序号>.nbt  各个结构
+        <output_file>_place.mcfunction             依次放置所有结构的命令
+
+        参数:
+        processor: GroupProcessor实例
+        """
+        path = processor.config["output_file"]
+        dir_name = os.path.dirname(path) or "."
+        file_name = os.path.basename(path)
+        template_name = self.get_template_name(file_name)
+        namespace = processor.config.get("structure_namespace") or "nbs2save"
+
+        structure_dir = os.path.join(dir_name, f"{file_name}_structures")
+        os.makedirs(structure_dir, exist_ok=True)
+
+        # 网格以整体最小角为原点，避免结构跨越 48 的整数倍坐标时被多切一刀
+        blocks = schematic_blocks(self.schem)
+        size = (MAX_STRUCTURE_SIZE,) * 3
+        tiles = split_into_tiles(blocks, size, bounding_box(blocks)[0]) if blocks else []
+        data_version = processor.config["data_version"].value
+        level = processor.config.get("compression_level")
+        jobs = [
+            (tile, data_version, os.path.join(structure_dir, f"{template_name}_{index:03d}.nbt"), level)
+            for index, tile in enumerate(tiles)
+        ]
+        processor.log(f"\n>> 原版结构导出: {len(tiles)} 个结构（上限 {MAX_STRUCTURE_SIZE}³）")
+
+        workers = processor.config.get("workers") or None
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for done, _ in enumerate(pool.map(_save_structure, jobs), 1):
+                processor.update_progress(int(done * 100 / len(jobs)))
+
+        # 放置函数：按分块顺序（沿时间轴从前往后）放置每个结构
+        commands = [
+            f"place template {namespace}:{template_name}_{index:03d} "
+            f"{' '.join(map(str, tile.min_corner))}"
+            for index, tile in enumerate(tiles)
+        ]
+        place_file = path + "_place.mcfunction"
+        with open(place_file, "w", encoding="utf-8") as f:
+            f.write("\n".join(commands) + "\n")
+
+        processor.log(f"├─ 结构目录: {structure_dir}")
+        processor.log(
+            f"├─ 请将结构文件放入数据包 data/{namespace}/structure/"
+            "（1.21 以前为 structures/）"
+        )
+        processor.log(f"└─ 放置函数: {place_file}")
+
+    @staticmethod
+    def get_template_name(file_name: str) -> str:
+        """结构ID只允许小写字母、数字和 _-. 字符，其余字符替换为下划线。"""
+        return re.sub(r"[^a-z0-9_.-]", "_", file_name.lower()) or "song"
+
+
+def build_structure_nbt(tile: Tile, data_version: int) -> Compound:
+    """
+    把一个分块转换为原版结构 NBT。
+    未写入的位置不会出现在 blocks 中（相当于结构空位），放置时不会覆盖原有方块。
+    """
+    origin = tile.min_corner
+    palette: List[str] = []
+    palette_index = {}
+    blocks = []
+    for (x, y, z), block in tile.blocks.items():
+        state = palette_index.get(block)
+        if state is None:
+            state = palette_index[block] = len(palette)
+            palette.append(block)
+        blocks.append(
+            Compound(
+                {
+                    "pos": NbtList[Int]([Int(x - origin[0]), Int(y - origin[1]), Int(z - origin[2])]),
+                    "state": Int(state),
+                }
+            )
+        )
+
+    return Compound(
+        {
+            "DataVersion": Int(data_version),
+            "size": NbtList[Int]([Int(v) for v in tile.size]),
+            "palette": NbtList[Compound]([block_state_compound(b) for b in palette]),
+            "blocks": NbtList[Compound](blocks),
+            "entities": NbtList[Compound]([]),
+        }
+    )
+
+
+def _save_structure(job: Tuple[Tile, int, str, Optional[int]]):
+    """进程池任务：写出一个结构文件。"""
+    tile, data_version, path, level = job
+    save_gzipped_nbt(build_structure_nbt(tile, data_version), path, level)
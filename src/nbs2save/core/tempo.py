@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+速度重映射
+----------------------
+布局中每个 tick 对应 1 档中继器（0.1 秒，即 1 个红石刻），只有 10 t/s 的曲子才能按原速播放。
+开启 tempo_remap 后按曲子的 header.tempo 把音符时间换算到红石刻，再按 tempo_quantum 量化到网格：
+
+    红石刻 = floor(tick / tempo * 10 / quantum + 0.5) * quantum
+
+取整为四舍五入（不用 np.round 的四舍六入五成双，否则 20 t/s 的 tick 1、3、5、7 会落到 0、2、2、4）。
+量化到同一红石刻的 tick 合并为一个 tick；同一轨道在同一红石刻上的多个音符只保留第一个。
+不同轨道的音符合并后可能落在同一 (红石刻, 声像偏移)，同一轨道组内由 drop_slot_conflicts 只保留一个。
+20 t/s 等高采样率的曲子因此长度减半，生成结构随之变短。
+"""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import Dict, List, Tuple
+
+import numpy as np
+from pynbs import Note
+
+# 每秒红石刻数（1 档中继器的延迟为 0.1 秒）
+REDSTONE_TICKS_PER_SECOND = 10
+
+
+def quantize_ticks(ticks: np.ndarray, tempo: float, quantum: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    把 NBS tick 换算为量化后的红石刻。
+
+    参数:
+    ticks: NBS tick 数组
+    tempo: 曲子速度（tick/秒）
+    quantum: 量化网格（红石刻），1 表示每个红石刻都可以放置音符
+
+    返回:
+    (红石刻数组, 时间误差数组（秒，正数表示晚于原曲）)
+    """
+    if tempo <= 0:
+        raise ValueError(f"曲子速度必须为正数: {tempo}")
+    if quantum < 1:
+        raise ValueError(f"tempo_quantum 必须为正整数: {quantum}")
+    seconds = np.asarray(ticks, dtype=np.float64) / tempo
+    slots = np.floor(seconds * REDSTONE_TICKS_PER_SECOND / quantum + 0.5).astype(np.int64) * quantum
+    return slots, slots / REDSTONE_TICKS_PER_SECOND - seconds
+
+
+def remap_notes(
+    notes: List[Note], song_length: int, tempo: float, quantum: int = 1
+) -> Tuple[List[Note], int, Dict]:
+    """
+    把整首曲子的音符重映射到红石刻。
+
+    参数:
+    notes: 全部音符
+    song_length: 曲子总长度（NBS tick）
+    tempo: 曲子速度（tick/秒）
+    quantum: 量化网格（红石刻）
+
+    返回:
+    (新音符列表, 新的曲子总长度, 统计信息)
+    统计信息包括最大/平均时间误差（毫秒）、合并的 tick 数与丢弃的音符数
+    """
+    new_length = int(quantize_ticks(np.array([song_length]), tempo, quantum)[0][0])
+    report = {
+        "tempo": tempo,
+        "quantum": quantum,
+        "length": (song_length, new_length),
+        "max_error_ms": 0.0,
+        "mean_error_ms": 0.0,
+        "merged_ticks": 0,
+        "dropped_notes": 0,
+    }
+    if not notes:
+        return [], new_length, report
+
+    ticks = np.fromiter((note.tick for note in notes), dtype=np.int64, count=len(notes))
+    layers = np.fromiter((note.layer for note in notes), dtype=np.int64, count=len(notes))
+    slots, error = quantize_ticks(ticks, tempo, quantum)
+
+    # 同一轨道同一红石刻只保留第一个音符（return_index 返回首次出现的位置）
+    keys = slots * (int(layers.max()) + 1) + layers
+    _, keep = np.unique(keys, return_index=True)
+    keep.sort()
+
+    report["max_error_ms"] = float(np.abs(error).max() * 1000)
+    report["mean_error_ms"] = float(np.abs(error).mean() * 1000)
+    report["merged_ticks"] = len(np.unique(ticks)) - len(np.unique(slots))
+    report["dropped_notes"] = len(notes) - len(keep)
+
+    remapped = [replace(notes[i], tick=int(slots[i])) for i in keep.tolist()]
+    return remapped, max(new_length, int(slots.max())), report
+
+
+def drop_slot_conflicts(notes: List[Note]) -> Tuple[List[Note], List[Note]]:
+    """
+    重映射后不同轨道的音符可能合并到同一 (红石刻, 声像偏移)，例如 20 t/s 时轨道 0 的 tick 3
+    与轨道 1 的 tick 4 都落在红石刻 2；同一轨道组内生成时会报位置冲突。每个位置只保留轨道编号最小的音符。
+
+    参数:
+    notes: 一个轨道组的音符
+
+    返回:
+    (保留的音符（顺序不变）, 丢弃的音符)
+    """
+    if not notes:
+        return notes, []
+    ticks = np.fromiter((note.tick for note in notes), dtype=np.int64, count=len(notes))
+    layers = np.fromiter((note.layer for note in notes), dtype=np.int64, count=len(notes))
+    # 与 GroupProcessor._calculate_pan 相同的取整
+    pans = np.round(np.fromiter((note.panning for note in notes), dtype=np.float64, count=len(notes)) / 10)
+    slots = ticks * 64 + (pans.astype(np.int64) + 32)
+    order = np.lexsort((layers, slots))  # 同一位置轨道编号小的在前
+    duplicate = np.zeros(len(notes), dtype=bool)
+    duplicate[order[1:][slots[order][1:] == slots[order][:-1]]] = True
+    if not duplicate.any():
+        return notes, []
+    kept = [note for note, drop in zip(notes, duplicate.tolist()) if not drop]
+    dropped = [note for note, drop in zip(notes, duplicate.tolist()) if drop]
+    return kept, dropped
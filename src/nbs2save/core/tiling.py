@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+方块数据分块工具
+----------------------
+把整首曲子的方块数据按固定大小切分成若干块，供分块导出（.schem 分片、原版结构等）使用。
+
+切分规则
+- 分块边界对齐到世界坐标网格（坐标整除分块大小），相邻分块互不重叠。
+- 分块编号按 X、Z、Y 依次排序，沿时间轴（X）方向从前往后，可按顺序逐块粘贴。
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple
+
+from mcschematic import MCSchematic
+
+Position = Tuple[int, int, int]
+
+# 区块边长（方块）
+CHUNK_SIZE = 16
+
+
+@dataclass
+class Tile:
+    """一个分块：网格坐标、包含的方块以及实际包围盒。"""
+
+    key: Tuple[int, int, int]  # 网格坐标（x, y, z 方向上的分块序号）
+    blocks: Dict[Position, str] = field(default_factory=dict)
+
+    @cached_property
+    def bounds(self) -> Tuple[Position, Position]:
+        """分块内方块的 (最小角, 最大角)，只在第一次访问时扫描一遍（分块创建后不再写入方块）。"""
+        return bounding_box(self.blocks)
+
+    @property
+    def min_corner(self) -> Position:
+        """分块内方块的最小角坐标（世界坐标）。"""
+        return self.bounds[0]
+
+    @property
+    def max_corner(self) -> Position:
+        """分块内方块的最大角坐标（世界坐标）。"""
+        return self.bounds[1]
+
+    @property
+    def size(self) -> Position:
+        """分块包围盒尺寸 (宽, 高, 长)。"""
+        (x0, y0, z0), (x1, y1, z1) = self.bounds
+        return x1 - x0 + 1, y1 - y0 + 1, z1 - z0 + 1
+
+
+class ColumnIndexedSchematic(MCSchematic):
+    """
+    流水线模式使用的 MCSchematic：写入的方块只按 X 方向固定宽度的列登记，不再存入底层结构。
+    已完成的列（之后不会再写入）取出后即交给后台写出并从内存中释放，
+    因此内存中只保留尚未写出的列；底层结构始终为空，不能再通过 getStructure 读取方块。
+    """
+
+    def __init__(self, column_width: int):
+        super().__init__()
+        self.column_width = column_width
+        self.columns: Dict[int, Dict[Position, str]] = defaultdict(dict)
+
+    def setBlock(self, position: Tuple[int, int, int], blockData: str):
+        position = tuple(position)
+        column = self.columns[position[0] // self.column_width]
+        if blockData == "minecraft:air":
+            column.pop(position, None)
+        else:
+            column[position] = blockData
+
+    def pop_completed(self, completed_x: Optional[int] = None) -> Dict[Position, str]:
+        """取出 X 范围完全小于 completed_x 的列中的方块（None 表示取出全部剩余方块）。"""
+        done = [
+            key
+            for key in self.columns
+            if completed_x is None or (key + 1) * self.column_width <= completed_x
+        ]
+        blocks: Dict[Position, str] = {}
+        for key in sorted(done):
+            blocks.update(self.columns.pop(key))
+        return blocks
+
+
+def schematic_blocks(schem: MCSchematic) -> Dict[Position, str]:
+    """把 MCSchematic 中的方块展开为 {坐标: 方块状态} 字典（不含空气）。"""
+    structure = schem.getStructure()
+    palette = structure.getInternalBlockPalette()
+    return {
+        pos: palette[block_id]
+        for pos, block_id in structure.getBlockStates().items()
+        if palette[block_id] != "minecraft:air"
+    }
+
+
+def bounding_box(blocks: Dict[Position, str]) -> Tuple[Position, Position]:
+    """返回方块集合的 (最小角, 最大角)。"""
+    xs, ys, zs = zip(*blocks)
+    return (min(xs), min(ys), min(zs)), (max(xs), max(ys), max(zs))
+
+
+def split_into_tiles(
+    blocks: Dict[Position, str],
+    size: Tuple[Optional[int], Optional[int], Optional[int]],
+    origin: Position = (0, 0, 0),
+) -> List[Tile]:
+    """
+    按网格切分方块。
+
+    参数:
+    blocks: {坐标: 方块状态}
+    size: (x, y, z) 三个方向的分块大小，None 表示该方向不切分
+    origin: 网格原点，默认对齐世界坐标（区块对齐）；传入结构最小角可减少分块数量
+
+    返回:
+    按 X、Z、Y 排序的分块列表（空分块不返回）
+    """
+    sx, sy, sz = size
+    ox, oy, oz = origin
+    tiles: defaultdict[Tuple[int, int, int], Dict[Position, str]] = defaultdict(dict)
+    for pos, block in blocks.items():
+        x, y, z = pos
+        key = (
+            (x - ox) // sx if sx else 0,
+            (y - oy) // sy if sy else 0,
+            (z - oz) // sz if sz else 0,
+        )
+        tiles[key][pos] = block
+    return [
+        Tile(key, tile_blocks)
+        for key, tile_blocks in sorted(tiles.items(), key=lambda item: (item[0][0], item[0][2], item[0][1]))
+    ]
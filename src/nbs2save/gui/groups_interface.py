@@ -31,6 +31,9 @@ from .coordinate_picker import CoordinatePickerDialog
 class GroupsInterface(ScrollArea):
     """轨道组管理界面"""
 
+    # 基准坐标被修改（编辑表格或坐标规划），主窗口据此检测轨道组重叠
+    coordinatesChanged = pyqtSignal()
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setObjectName("groupsInterface")
@@ -71,8 +74,20 @@ class GroupsInterface(ScrollArea):
         self.removeBtn.setFixedWidth(110)
         self.removeBtn.setIcon(FluentIcon.DELETE)
 
+        # 按轨道冲突自动分组（由主窗口连接，需要先在主页选择 NBS 文件）
+        self.autoBtn = PushButton("自动分组", self)
+        self.autoBtn.setFixedWidth(110)
+        self.autoBtn.setIcon(FluentIcon.ROBOT)
+
+        # 按各组实际生成范围自动排布基准坐标（由主窗口连接）
+        self.packBtn = PushButton("自动排布", self)
+        self.packBtn.setFixedWidth(110)
+        self.packBtn.setIcon(FluentIcon.LAYOUT)
+
         toolbar.addWidget(self.addBtn)
         toolbar.addWidget(self.removeBtn)
+        toolbar.addWidget(self.autoBtn)
+        toolbar.addWidget(self.packBtn)
         toolbar.addStretch(1)
 
         self.vBoxLayout.addLayout(toolbar)
@@ -114,6 +129,7 @@ class GroupsInterface(ScrollArea):
             TableWidget.SelectionBehavior.SelectRows
         )
         self.table.setMinimumHeight(300)
+        self.table.itemChanged.connect(self._onItemChanged)
 
         cardLayout.addWidget(self.table)
         self.vBoxLayout.addWidget(self.tableCard, 1)
@@ -128,6 +144,7 @@ class GroupsInterface(ScrollArea):
         if not self._main_window:
             return
         gc = self._main_window.group_config
+        self.table.blockSignals(True)
         self.table.setRowCount(len(gc))
         for r, (gid, cfg) in enumerate(gc.items()):
             self.table.setItem(r, 0, QTableWidgetItem(str(gid)))
@@ -157,6 +174,7 @@ class GroupsInterface(ScrollArea):
             self.table.setItem(
                 r, 8, QTableWidgetItem(cfg.get("generation_mode", "default"))
             )
+        self.table.blockSignals(False)
 
     def saveTableToConfig(self):
         """将表格内容写回主窗口的 group_config"""
@@ -245,7 +263,14 @@ class GroupsInterface(ScrollArea):
         dlg = CoordinatePickerDialog(gid, gc, self)
         if dlg.exec():
             nx, ny, nz = dlg.get_coords()
+            self.table.blockSignals(True)
             self.table.setItem(row, 1, QTableWidgetItem(str(nx)))
             self.table.setItem(row, 2, QTableWidgetItem(str(ny)))
             self.table.setItem(row, 3, QTableWidgetItem(str(nz)))
+            self.table.blockSignals(False)
             self.saveTableToConfig()
+            self.coordinatesChanged.emit()
+
+    def _onItemChanged(self, item):
+        if item.column() in (1, 2, 3):
+            self.coordinatesChanged.emit()
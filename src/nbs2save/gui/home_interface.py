@@ -23,7 +23,7 @@ from qfluentwidgets import (
 )
 
 from ..core.constants import MINECRAFT_VERSIONS
-from .widgets import FileSelectCard, ComboBoxCard
+from .widgets import FileSelectCard, ComboBoxCard, SwitchCard
 
 
 class HomeInterface(ScrollArea):
@@ -31,6 +31,7 @@ class HomeInterface(ScrollArea):
 
     # 向主窗口暴露操作信号
     startConvertSignal = pyqtSignal()
+    dryRunSignal = pyqtSignal()
     loadConfigSignal = pyqtSignal()
     saveConfigSignal = pyqtSignal()
     exitSignal = pyqtSignal()
@@ -120,10 +121,10 @@ class HomeInterface(ScrollArea):
     def _browseOutputFile(self):
         """浏览输出文件，根据输出格式自动补全扩展名"""
         output_type = self.typeCard.currentData()
-        ext = ".schem" if output_type == "schematic" else ".mcfunction"
+        ext = {"schematic": ".schem", "litematic": ".litematic"}.get(output_type, ".mcfunction")
         path, _ = QFileDialog.getSaveFileName(
             self, "选择保存位置", "",
-            "Schematic (*.schem);;McFunction (*.mcfunction)"
+            "Schematic (*.schem);;Litematic (*.litematic);;McFunction (*.mcfunction)"
         )
         if path:
             if not path.endswith(ext):
@@ -151,10 +152,19 @@ class HomeInterface(ScrollArea):
             parent=self.paramGroup,
         )
         self.typeCard.addItem("WorldEdit Schematic (.schem)", "schematic")
+        self.typeCard.addItem("Litematica 投影 (.litematic)", "litematic")
         self.typeCard.addItem("Minecraft Function (.mcfunction)", "mcfunction")
 
+        self.loadReportCard = SwitchCard(
+            FluentIcon.SPEED_HIGH,
+            "红石负载分析",
+            "转换时模拟播放，在日志中报告每个游戏刻的红石元件状态变化数与最繁忙的游戏刻",
+            parent=self.paramGroup,
+        )
+
         self.paramGroup.addSettingCard(self.versionCard)
         self.paramGroup.addSettingCard(self.typeCard)
+        self.paramGroup.addSettingCard(self.loadReportCard)
         self.vBoxLayout.addWidget(self.paramGroup)
 
     # ── 操作栏 ──
@@ -180,6 +190,8 @@ class HomeInterface(ScrollArea):
         self.saveConfigBtn.setIcon(FluentIcon.SAVE)
         self.exitBtn = PushButton("退出", self.actionCard)
         self.exitBtn.setIcon(FluentIcon.CLOSE)
+        self.dryRunBtn = PushButton("试运行", self.actionCard)
+        self.dryRunBtn.setIcon(FluentIcon.SEARCH)
         self.startBtn = PrimaryPushButton("开始转换", self.actionCard)
         self.startBtn.setIcon(FluentIcon.PLAY)
         self.startBtn.setFixedHeight(40)
@@ -192,6 +204,7 @@ class HomeInterface(ScrollArea):
         actionLayout.addWidget(self.saveConfigBtn)
         actionLayout.addWidget(self.exitBtn)
         actionLayout.addSpacing(20)
+        actionLayout.addWidget(self.dryRunBtn)
         actionLayout.addWidget(self.startBtn)
 
         self.vBoxLayout.addSpacing(8)
@@ -201,6 +214,7 @@ class HomeInterface(ScrollArea):
         self.loadConfigBtn.clicked.connect(self.loadConfigSignal.emit)
         self.saveConfigBtn.clicked.connect(self.saveConfigSignal.emit)
         self.exitBtn.clicked.connect(self.exitSignal.emit)
+        self.dryRunBtn.clicked.connect(self.dryRunSignal.emit)
         self.startBtn.clicked.connect(self.startConvertSignal.emit)
 
     # ── 公开接口 ──
@@ -237,6 +251,12 @@ class HomeInterface(ScrollArea):
                 self.typeCard.setCurrentIndex(i)
                 return
 
+    def getLoadReport(self) -> bool:
+        return self.loadReportCard.isChecked()
+
+    def setLoadReport(self, checked: bool):
+        self.loadReportCard.setChecked(checked)
+
     def setStatus(self, text: str):
         self.statusLabel.setText(text)
 
@@ -4,13 +4,14 @@
 """
 
 import os
+import copy
 import json
 import traceback
 
 import pynbs
 from mcschematic import Version
 
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
 from PyQt6.QtWidgets import QFileDialog
 
 from qfluentwidgets import (
@@ -24,6 +25,12 @@ from qfluentwidgets import (
 from ..core.constants import MINECRAFT_VERSIONS
 from ..core.core import GroupProcessor
 from ..core.schematic import SchematicOutputStrategy
+from ..core.composite import CompositeOutputStrategy
+from ..core.litematic import LitematicOutputStrategy
+from ..core.load import LoadAnalysisStrategy
+from ..core.overlap import OverlapIndex
+from ..core.packing import pack_song
+from ..core.partition import partition_song
 from ..core.mcfunction import McFunctionOutputStrategy
 
 from .home_interface import HomeInterface
@@ -69,6 +76,71 @@ def _restore_from_json(d: dict):
     return config, group_config
 
 
+# 修改坐标后等待多久再检测重叠（毫秒），连续编辑只检测最后一次
+OVERLAP_CHECK_DELAY = 400
+
+
+class OverlapCheckThread(QThread):
+    """
+    后台检测轨道组重叠：首次检测或更换 NBS 文件、配置后需要计算各组足迹，不能阻塞界面。
+
+    参数:
+    key: 本次检测对应的 (NBS 文件, 修改时间, 配置) 缓存键
+    index: 可复用的 OverlapIndex，None 表示在后台读取 NBS 文件并新建
+    config, group_config: 检测时的配置快照
+    """
+
+    # (缓存键, OverlapIndex, 重叠列表, 错误信息)
+    checked = pyqtSignal(object, object, object, str)
+
+    def __init__(self, key, index, config: dict, group_config: dict, parent=None):
+        super().__init__(parent)
+        self.key = key
+        self.index = index
+        self.config = config
+        self.group_config = group_config
+
+    def run(self):
+        try:
+            index = self.index
+            if index is None:
+                song = pynbs.read(self.key[0])
+                index = OverlapIndex(song.notes, song.header.song_length, self.config, song.header.tempo)
+            overlaps = index.find_overlaps(self.group_config)
+        except Exception as e:
+            self.checked.emit(self.key, None, [], str(e))
+            return
+        self.checked.emit(self.key, index, overlaps, "")
+
+
+class PackThread(QThread):
+    """
+    后台自动排布：需要按当前配置计算各组足迹，长曲子不能阻塞界面。
+
+    参数:
+    input_file: NBS 文件路径
+    config, group_config: 排布时的配置快照
+    """
+
+    # (新的 group_config, 排布后的整体包围盒, 错误信息)
+    packed = pyqtSignal(object, object, str)
+
+    def __init__(self, input_file: str, config: dict, group_config: dict, parent=None):
+        super().__init__(parent)
+        self.input_file = input_file
+        self.config = config
+        self.group_config = group_config
+
+    def run(self):
+        try:
+            song = pynbs.read(self.input_file)
+            group_config, bounds = pack_song(song, self.config, self.group_config)
+        except Exception as e:
+            self.packed.emit(None, None, str(e))
+            return
+        self.packed.emit(group_config, bounds, "")
+
+
 class MainWindow(MSFluentWindow):
     """NBS-to-Minecraft 主窗口"""
 
@@ -98,6 +170,19 @@ class MainWindow(MSFluentWindow):
             }
         }
 
+        # 重叠检测缓存（各组足迹只在首次检测或更换 NBS 文件、配置后重新计算）
+        self._overlap_index = None
+        self._overlap_key = None
+        # 重叠检测在后台线程中进行，修改坐标后延迟 OVERLAP_CHECK_DELAY 毫秒再开始
+        self._overlap_thread = None
+        self._overlap_pending = False
+        self._overlap_timer = QTimer(self)
+        self._overlap_timer.setSingleShot(True)
+        self._overlap_timer.setInterval(OVERLAP_CHECK_DELAY)
+        self._overlap_timer.timeout.connect(self._start_overlap_check)
+        # 自动排布在后台线程中进行
+        self._pack_thread = None
+
         # ── 初始化界面 ──
         self._initInterfaces()
         self._initNavigation()
@@ -150,6 +235,7 @@ class MainWindow(MSFluentWindow):
     def _connectSignals(self):
         # 主页信号
         self.homeInterface.startConvertSignal.connect(self.start_conversion)
+        self.homeInterface.dryRunSignal.connect(self.dry_run)
         self.homeInterface.loadConfigSignal.connect(self.load_config)
         self.homeInterface.saveConfigSignal.connect(self.save_config)
         self.homeInterface.exitSignal.connect(self.close)
@@ -159,6 +245,9 @@ class MainWindow(MSFluentWindow):
         self.groupsInterface.removeBtn.clicked.connect(
             self.groupsInterface.removeGroup
         )
+        self.groupsInterface.autoBtn.clicked.connect(self.auto_partition)
+        self.groupsInterface.packBtn.clicked.connect(self.auto_pack)
+        self.groupsInterface.coordinatesChanged.connect(self.check_overlaps)
 
     def _syncUIFromConfig(self):
         """将 config/group_config 同步到界面控件"""
@@ -166,6 +255,7 @@ class MainWindow(MSFluentWindow):
         self.homeInterface.setOutputFile(self.config.get("output_file", ""))
         self.homeInterface.setVersion(self.config.get("data_version"))
         self.homeInterface.setType(self.config.get("type", "schematic"))
+        self.homeInterface.setLoadReport(bool(self.config.get("load_report")))
         self.groupsInterface.refreshTable()
 
     # ── 日志与进度 ──
@@ -260,6 +350,210 @@ class MainWindow(MSFluentWindow):
         except Exception:
             pass
 
+    # ── 自动分组 ──
+
+    def auto_partition(self):
+        """按轨道冲突自动分组，以第一个轨道组为模板替换当前的 group_config"""
+        self.groupsInterface.saveTableToConfig()
+        input_file = self.homeInterface.getInputFile()
+        if not input_file or not os.path.exists(input_file):
+            InfoBar.error(
+                title="错误",
+                content="请先在主页选择有效的 NBS 文件",
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP,
+                duration=5000,
+                parent=self,
+            )
+            return
+        try:
+            song = pynbs.read(input_file)
+            template = next(iter(self.group_config.values()), None)
+            self.group_config, bound = partition_song(song, self.config, template)
+            self.groupsInterface.refreshTable()
+            self.log(f">>> 自动分组: {len(self.group_config)} 组（下界 {bound}）")
+            InfoBar.success(
+                title="自动分组完成",
+                content=f"{len(self.group_config)} 个轨道组，组内没有位置冲突",
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP,
+                duration=3000,
+                parent=self,
+            )
+        except Exception as e:
+            self.logInterface.appendLog(f">>> 错误: {e}")
+            InfoBar.error(
+                title="自动分组失败",
+                content=str(e),
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP,
+                duration=8000,
+                parent=self,
+            )
+
+    def auto_pack(self):
+        """按各组实际生成范围自动排布基准坐标（在后台线程中计算），完成后写回 group_config"""
+        if self._pack_thread is not None:
+            return
+        self.groupsInterface.saveTableToConfig()
+        input_file = self.homeInterface.getInputFile()
+        if not input_file or not os.path.exists(input_file):
+            InfoBar.error(
+                title="错误",
+                content="请先在主页选择有效的 NBS 文件",
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP,
+                duration=5000,
+                parent=self,
+            )
+            return
+        self.groupsInterface.packBtn.setEnabled(False)
+        self._pack_thread = PackThread(input_file, dict(self.config), copy.deepcopy(self.group_config), self)
+        self._pack_thread.packed.connect(self._on_packed)
+        self._pack_thread.finished.connect(self._pack_thread.deleteLater)
+        self._pack_thread.start()
+
+    def _on_packed(self, group_config, bounds, error: str):
+        """后台自动排布完成（在界面线程中执行）"""
+        self._pack_thread = None
+        self.groupsInterface.packBtn.setEnabled(True)
+        if error:
+            self.logInterface.appendLog(f">>> 错误: {error}")
+            InfoBar.error(
+                title="自动排布失败",
+                content=error,
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP,
+                duration=8000,
+                parent=self,
+            )
+            return
+        self.group_config = group_config
+        low, high = bounds
+        self.groupsInterface.refreshTable()
+        self.log(f">>> 自动排布: 整体范围 {low} ~ {high}")
+        InfoBar.success(
+            title="自动排布完成",
+            content=f"{len(self.group_config)} 个轨道组已重新排布，互不重叠",
+            orient=Qt.Orientation.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP,
+            duration=3000,
+            parent=self,
+        )
+
+    def dry_run(self):
+        """试运行：不生成方块，估算输出规模并输出到日志"""
+        self.groupsInterface.saveTableToConfig()
+        input_file = self.homeInterface.getInputFile()
+        if not input_file or not os.path.exists(input_file):
+            InfoBar.error(
+                title="错误",
+                content="请先选择有效的 NBS 文件",
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP,
+                duration=5000,
+                parent=self,
+            )
+            return
+        try:
+            song = pynbs.read(input_file)
+            proc = GroupProcessor(
+                song.notes, song.header.song_length, self.config, self.group_config, song.header.tempo
+            )
+            estimate = proc.estimate()
+            for line in estimate.lines():
+                self.log(line)
+            InfoBar.success(
+                title="试运行完成",
+                content=f"{estimate.total} 个方块，{estimate.chunks} 个区块，{estimate.commands} 条命令",
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP,
+                duration=5000,
+                parent=self,
+            )
+        except Exception as e:
+            self.logInterface.appendLog(f">>> 错误: {e}")
+            InfoBar.error(
+                title="试运行失败",
+                content=str(e),
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP,
+                duration=8000,
+                parent=self,
+            )
+
+    def check_overlaps(self):
+        """基准坐标修改后检测轨道组重叠（连续修改只检测最后一次，在后台线程中进行）"""
+        self.groupsInterface.saveTableToConfig()
+        self._overlap_timer.start()
+
+    def _start_overlap_check(self):
+        """开始一次后台重叠检测；上一次检测尚未完成时等它完成后再检测（未选择 NBS 文件时跳过）"""
+        if self._overlap_thread is not None:
+            self._overlap_pending = True
+            return
+        input_file = self.homeInterface.getInputFile()
+        if not input_file or not os.path.exists(input_file):
+            return
+        try:
+            key = (
+                input_file,
+                os.path.getmtime(input_file),
+                json.dumps(self.config, sort_keys=True, default=str),
+            )
+        except OSError as e:
+            self.logInterface.appendLog(f">>> 重叠检测失败: {e}")
+            return
+        index = self._overlap_index if self._overlap_key == key else None
+        self._overlap_thread = OverlapCheckThread(
+            key, index, dict(self.config), copy.deepcopy(self.group_config), self
+        )
+        self._overlap_thread.checked.connect(self._on_overlaps_checked)
+        self._overlap_thread.finished.connect(self._overlap_thread.deleteLater)
+        self._overlap_thread.start()
+
+    def closeEvent(self, event):
+        """关闭窗口前等待后台重叠检测与自动排布结束"""
+        self._overlap_timer.stop()
+        if self._overlap_thread is not None:
+            self._overlap_thread.wait()
+        if self._pack_thread is not None:
+            self._pack_thread.wait()
+        super().closeEvent(event)
+
+    def _on_overlaps_checked(self, key, index, overlaps, error: str):
+        """后台重叠检测完成（在界面线程中执行），有重叠时给出提示"""
+        self._overlap_thread = None
+        if error:
+            self.logInterface.appendLog(f">>> 重叠检测失败: {error}")
+        else:
+            self._overlap_index, self._overlap_key = index, key
+            for overlap in overlaps:
+                self.logInterface.appendLog(f">>> 重叠: {overlap.describe()}")
+            if overlaps:
+                InfoBar.warning(
+                    title=f"轨道组重叠（{len(overlaps)} 处）",
+                    content=overlaps[0].describe(),
+                    orient=Qt.Orientation.Horizontal,
+                    isClosable=True,
+                    position=InfoBarPosition.TOP,
+                    duration=5000,
+                    parent=self,
+                )
+        if self._overlap_pending:
+            # 检测期间又修改了坐标：按最新配置再检测一次
+            self._overlap_pending = False
+            self._start_overlap_check()
+
     # ── 转换核心逻辑 ──
 
     def start_conversion(self):
@@ -267,6 +561,7 @@ class MainWindow(MSFluentWindow):
         self.config["data_version"] = self.homeInterface.getVersion()
         self.config["input_file"] = self.homeInterface.getInputFile()
         self.config["type"] = self.homeInterface.getType()
+        self.config["load_report"] = self.homeInterface.getLoadReport()
 
         # 标准化输出路径：移除已有扩展名，由核心模块统一添加
         output_file = self.homeInterface.getOutputFile()
@@ -276,6 +571,9 @@ class MainWindow(MSFluentWindow):
         elif self.config["type"] == "mcfunction":
             if output_file.endswith(".mcfunction"):
                 output_file = output_file[:-11]
+        elif self.config["type"] == "litematic":
+            if output_file.endswith(".litematic"):
+                output_file = output_file[:-10]
         self.config["output_file"] = output_file
 
         if not self.config["input_file"] or not os.path.exists(
@@ -306,14 +604,21 @@ class MainWindow(MSFluentWindow):
                 song.header.song_length,
                 self.config,
                 self.group_config,
+                song.header.tempo,
             )
             proc.set_log_callback(self.log)
             proc.set_progress_callback(self.update_progress)
 
             if self.config["type"] == "schematic":
-                proc.set_output_strategy(SchematicOutputStrategy())
+                strategy = SchematicOutputStrategy()
+            elif self.config["type"] == "litematic":
+                strategy = LitematicOutputStrategy()
             else:
-                proc.set_output_strategy(McFunctionOutputStrategy())
+                strategy = McFunctionOutputStrategy()
+            if self.config["load_report"]:
+                # 负载报告与转换一起生成，输出到日志页面
+                strategy = CompositeOutputStrategy([strategy, LoadAnalysisStrategy()])
+            proc.set_output_strategy(strategy)
 
             proc.process()
             self.logInterface.appendLog(">>> 转换成功!")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+声像微调功能测试脚本
+验证冲突音符移到同侧最近的空闲偏移，以及优先顺序与边界
+"""
+
+import os
+import sys
+import unittest
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mcschematic import Version
+from pynbs import Note
+
+from nbs2save.core.core import GroupProcessor
+from nbs2save.core.nudge import nudge_pans
+from nbs2save.core.schematic import SchematicOutputStrategy
+
+
+def _note(tick, layer, pan):
+    return Note(tick=tick, layer=layer, instrument=0, key=45, panning=pan * 10)
+
+
+def _pans(notes):
+    return [(note.tick, note.layer, note.panning // 10) for note in notes]
+
+
+class Nudge_Functionality_Test(unittest.TestCase):
+    """声像微调功能测试类"""
+
+    def test_01_lowest_layer_stays_inward_first(self):
+        """测试轨道编号最小的音符保留原位，其余音符优先向中央方向移动，顺序不变"""
+        notes = [_note(0, 2, 3), _note(0, 0, 3), _note(0, 1, 3), _note(1, 0, -5), _note(1, 1, -5)]
+        result, adjustments, unresolved = nudge_pans(notes, 2)
+        self.assertEqual(_pans(result), [(0, 2, 4), (0, 0, 3), (0, 1, 2), (1, 0, -5), (1, 1, -4)])
+        self.assertEqual(
+            [(note.layer, old, new) for note, old, new in adjustments], [(1, 3, 2), (2, 3, 4), (1, -5, -4)]
+        )
+        self.assertEqual(unresolved, [])
+
+    def test_02_centre_prefers_left_and_never_crosses(self):
+        """测试中央的冲突音符先左后右；非中央的音符不越过中央"""
+        notes = [_note(0, layer, 0) for layer in range(3)] + [_note(1, 0, 1), _note(1, 1, 1)]
+        result, _, _ = nudge_pans(notes, 1)
+        self.assertEqual(_pans(result), [(0, 0, 0), (0, 1, -1), (0, 2, 1), (1, 0, 1), (1, 1, 2)])
+
+    def test_03_limits_and_unresolved(self):
+        """测试不超出 ±10，超出移动距离或没有空闲偏移时保持原位并报告"""
+        notes = [_note(0, 0, 10), _note(0, 1, 9), _note(0, 2, 10)]
+        result, adjustments, unresolved = nudge_pans(notes, 1)
+        self.assertEqual(_pans(result), _pans(notes))
+        self.assertEqual((adjustments, unresolved), ([], [notes[2]]))
+
+        result, adjustments, _ = nudge_pans(notes, 2)
+        self.assertEqual(_pans(result)[2], (0, 2, 8))
+        self.assertEqual(nudge_pans(notes, 0), (notes, [], []))
+
+    def test_04_generation_succeeds_after_nudge(self):
+        """测试同一位置的冲突在未配置 pan_nudge 时中止生成，配置后正常生成"""
+        notes = [_note(tick, layer, tick % 3 - 1) for tick in range(30) for layer in range(3)]
+        group_config = {
+            0: {
+                "base_coords": ("0", "0", "0"),
+                "layers": [0, 1, 2],
+                "block": {"base": "minecraft:iron_block", "cover": "minecraft:iron_block"},
+            }
+        }
+
+        def generate(**extra):
+            config = dict(output_file="unused", data_version=Version.JE_1_21_4, **extra)
+            processor = GroupProcessor(notes, 30, config, group_config)
+            processor.set_output_strategy(SchematicOutputStrategy())
+            processor.generate()
+
+        with self.assertRaisesRegex(Exception, "冲突"):
+            generate()
+        generate(pan_nudge=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
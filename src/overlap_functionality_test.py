@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重叠检测功能测试脚本
+验证由写入模型算出的足迹与实际生成一致，以及修改坐标后的重叠检测
+"""
+
+import os
+import sys
+import unittest
+from collections import defaultdict
+
+import numpy as np
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mcschematic import Version
+from pynbs import Note
+
+from nbs2save.core.composite import CompositeOutputStrategy
+from nbs2save.core.core import GroupProcessor
+from nbs2save.core.overlap import OverlapIndex, encode_positions, measure_footprints
+from nbs2save.core.schematic import SchematicOutputStrategy
+
+CONFIG = dict(output_file="unused", data_version=Version.JE_1_21_4)
+
+
+class _Recorder:
+    """代替 MCSchematic，按轨道组记录每个方块相对基准坐标的位置与写入时的 tick。"""
+
+    def __init__(self, processor):
+        self.processor = processor
+        self.blocks = defaultdict(dict)
+
+    def setBlock(self, position, block):
+        processor = self.processor
+        x, y, z = position
+        relative = (x - processor.base_x, y - processor.base_y, z - processor.base_z)
+        self.blocks[processor.group_id][relative] = processor.current_tick
+
+
+def _notes(ticks):
+    pans = (-6, -3, 0, 2, 5, 6)
+    return [
+        Note(tick=tick, layer=layer, instrument=layer, key=45, panning=pan * 10)
+        for tick in range(ticks)
+        for layer, pan in enumerate(pans)
+        if (tick + layer) % 3
+    ]
+
+
+def _group_config():
+    block = {"base": "minecraft:stone", "cover": "minecraft:iron_block"}
+    return {
+        0: {"base_coords": ("0", "0", "0"), "layers": [0, 1, 2], "block": block, "generation_mode": "staircase"},
+        1: {"base_coords": ("0", "8", "0"), "layers": [3, 4, 5], "block": block, "components": "repeater"},
+        2: {
+            "base_coords": ("0", "16", "0"),
+            "layers": [0, 4],
+            "block": block,
+            "generation_mode": "staircase_up",
+            "compact": True,
+        },
+    }
+
+
+class Overlap_Functionality_Test(unittest.TestCase):
+    """重叠检测功能测试类"""
+
+    def test_01_footprints_match_generation(self):
+        """测试足迹与实际生成写入的方块和 tick 一致"""
+        notes = _notes(120)
+        processor = GroupProcessor(notes, 120, CONFIG, _group_config())
+        schematic = SchematicOutputStrategy()
+        schematic.schem = _Recorder(processor)
+        processor.set_output_strategy(CompositeOutputStrategy([schematic]))
+        processor.generate()
+
+        footprints = measure_footprints(notes, 120, CONFIG, _group_config())
+        self.assertEqual(set(footprints), set(schematic.schem.blocks))
+        for group_id, blocks in schematic.schem.blocks.items():
+            keys = encode_positions(np.array(list(blocks)))
+            order = np.argsort(keys)
+            self.assertTrue(np.array_equal(footprints[group_id].keys, keys[order]))
+            self.assertTrue(np.array_equal(footprints[group_id].ticks, np.array(list(blocks.values()))[order]))
+
+    def test_02_moved_groups(self):
+        """测试修改坐标后重新检测：错开时没有重叠，移到一起时报告重叠"""
+        index = OverlapIndex(_notes(120), 120, CONFIG)
+        group_config = _group_config()
+        self.assertEqual(index.find_overlaps(group_config), [])
+        group_config[1]["base_coords"] = ("0", "1", "0")
+        overlaps = index.find_overlaps(group_config)
+        self.assertEqual([overlap.groups for overlap in overlaps], [(0, 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
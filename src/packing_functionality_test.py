@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动排布功能测试脚本
+验证各排布方向、区块对齐与每排长度上限下排布后的轨道组互不重叠，以及共用时钟的轨道组保持相对位置
+"""
+
+import os
+import random
+import sys
+import unittest
+from itertools import combinations
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pynbs import Note
+
+from nbs2save.core.overlap import OverlapIndex
+from nbs2save.core.packing import measure_groups, pack_groups
+from nbs2save.core.tiling import CHUNK_SIZE
+
+BLOCK = {"base": "minecraft:iron_block", "cover": "minecraft:iron_block"}
+
+
+def _song(groups, ticks=200, seed=0):
+    """每组 4 个轨道，同一 tick 同组的声像偏移互不相同；第 n 组的最后一个音符约在 ticks 的 (n+1)/groups 处。"""
+    rng = random.Random(seed)
+    notes = []
+    for group in range(groups):
+        for tick in range(ticks * (group + 1) // groups):
+            for layer, pan in enumerate(rng.sample(range(-2 - group, 3 + group), 4)):
+                if rng.random() < 0.3:
+                    notes.append(Note(tick=tick, layer=group * 4 + layer, instrument=0, key=45, panning=pan * 10))
+    return notes
+
+
+def _shifted(bounds, old, new):
+    """按 base_coords 的变化平移包围盒。"""
+    result = {}
+    for group_id, (low, high) in bounds.items():
+        shift = [int(n) - int(o) for o, n in zip(old[group_id]["base_coords"], new[group_id]["base_coords"])]
+        result[group_id] = (
+            tuple(v + d for v, d in zip(low, shift)),
+            tuple(v + d for v, d in zip(high, shift)),
+        )
+    return result
+
+
+def _disjoint(a, b, spacing):
+    """两个包围盒在某个坐标轴上至少相隔 spacing 格。"""
+    return any(a[1][i] + spacing < b[0][i] or b[1][i] + spacing < a[0][i] for i in range(3))
+
+
+class Packing_Functionality_Test(unittest.TestCase):
+    """自动排布功能测试类"""
+
+    def setUp(self):
+        self.notes = _song(5)
+        # 所有组初始都在同一位置，互相重叠；紧凑布局的主干道在最后一个音符处结束，各组长度不同
+        self.group_config = {
+            group: {
+                "base_coords": ("0", "0", "0"),
+                "layers": list(range(group * 4, group * 4 + 4)),
+                "block": BLOCK,
+                "compact": True,
+            }
+            for group in range(4)
+        }
+        self.group_config[4] = {"base_coords": ("0", "0", "0"), "layers": [16, 17, 18, 19], "block": BLOCK}
+        self.group_config[3]["generation_mode"] = "staircase"
+        self.group_config[4]["generation_mode"] = "dense"
+        self.bounds = measure_groups(self.notes, 200, {}, self.group_config)
+
+    def test_01_packed_without_overlaps(self):
+        """测试两种排布方向、区块对齐与每排长度上限的各种组合排布后都互不重叠"""
+        for axis in ("z", "y"):
+            for chunk_align in (False, True):
+                for row_length in (None, 200, 450):
+                    with self.subTest(axis=axis, chunk_align=chunk_align, row_length=row_length):
+                        packed, (low, high) = pack_groups(
+                            self.bounds, self.group_config, axis, 2, chunk_align, row_length
+                        )
+                        boxes = _shifted(self.bounds, self.group_config, packed)
+                        for a, b in combinations(boxes.values(), 2):
+                            self.assertTrue(_disjoint(a, b, 2))
+                        for box in boxes.values():
+                            self.assertTrue(all(low[i] <= box[0][i] and box[1][i] <= high[i] for i in range(3)))
+                            if chunk_align:
+                                self.assertEqual(box[0][0] % CHUNK_SIZE, 0)
+                                if axis == "z":
+                                    self.assertEqual(box[0][2] % CHUNK_SIZE, 0)
+                            if row_length is not None:
+                                self.assertLessEqual(box[1][0] - low[0] + 1, max(row_length, box[1][0] - box[0][0] + 1))
+                        if axis == "y":
+                            self.assertEqual(len({box[0][2] for box in boxes.values()}), 1)
+                        if row_length is None:
+                            self.assertEqual(len({box[0][0] for box in boxes.values()}), 1)
+                        self.assertEqual(OverlapIndex(self.notes, 200, {}).find_overlaps(packed), [])
+
+    def test_02_rows_share_x(self):
+        """测试设置每排长度上限时较短的组放进同一排，整体更紧凑"""
+        stacked, (_, stacked_high) = pack_groups(self.bounds, self.group_config, "z", 1)
+        packed, (low, high) = pack_groups(self.bounds, self.group_config, "z", 1, row_length=450)
+        self.assertLess(high[2] - low[2], stacked_high[2])
+        xs = {int(group["base_coords"][0]) for group in packed.values()}
+        self.assertGreater(len(xs), 1)
+
+    def test_03_shared_clock_moves_together(self):
+        """测试共用时钟的轨道组与被共用的组整体移动，保持相对位置"""
+        group_config = {
+            0: {"base_coords": ("0", "0", "0"), "layers": [0, 1, 2, 3], "block": BLOCK},
+            1: {"base_coords": ("0", "0", "0"), "layers": [4, 5, 6, 7], "block": BLOCK},
+            2: {"base_coords": ("0", "0", "10"), "layers": [8, 9, 10, 11], "block": BLOCK, "shared_clock": 1},
+        }
+        bounds = {0: ((0, -1, -3), (50, 0, 3)), 1: ((0, -1, -3), (60, 0, 3)), 2: ((0, -1, 7), (60, 0, 13))}
+        packed, _ = pack_groups(bounds, group_config, "z", 1)
+        source, sharing = (tuple(map(int, packed[g]["base_coords"])) for g in (1, 2))
+        self.assertEqual(sharing[2] - source[2], 10)
+        self.assertEqual(sharing[0], source[0])
+
+    def test_04_invalid_arguments(self):
+        """测试未知的排布方向与负数间距报错"""
+        with self.assertRaises(ValueError):
+            pack_groups(self.bounds, self.group_config, "x")
+        with self.assertRaises(ValueError):
+            pack_groups(self.bounds, self.group_config, "z", -1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动分组功能测试脚本
+验证轨道冲突图、着色结果与生成的 group_config（各组内无位置冲突、各组之间互不重叠）
+"""
+
+import os
+import random
+import sys
+import unittest
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pynbs
+from pynbs import Note
+
+from nbs2save.core.overlap import OverlapIndex
+from nbs2save.core.partition import (
+    clique_lower_bound,
+    dsatur,
+    layer_conflicts,
+    partition_layers,
+    partition_song,
+    refine,
+)
+
+
+def _random_song(ticks=600, layers=8, seed=0):
+    rng = random.Random(seed)
+    song = pynbs.new_file(song_length=ticks)
+    song.notes = [
+        Note(tick=tick, layer=layer, instrument=0, key=45, panning=rng.randint(-5, 5) * 10)
+        for tick in range(ticks)
+        for layer in range(layers)
+        if rng.random() < 0.3
+    ]
+    return song
+
+
+class Partition_Functionality_Test(unittest.TestCase):
+    """自动分组功能测试类"""
+
+    def test_01_layer_conflicts(self):
+        """测试同一 tick 同一声像偏移（按取整后的偏移）的轨道互相冲突，没有冲突的轨道也出现在图中"""
+        notes = [
+            Note(tick=0, layer=0, instrument=0, key=45, panning=0),
+            Note(tick=0, layer=1, instrument=0, key=45, panning=4),  # 取整后同为偏移 0
+            Note(tick=0, layer=2, instrument=0, key=45, panning=10),
+            Note(tick=1, layer=2, instrument=0, key=45, panning=-20),
+            Note(tick=1, layer=3, instrument=0, key=45, panning=-20),
+            Note(tick=2, layer=4, instrument=0, key=45, panning=0),
+        ]
+        self.assertEqual(layer_conflicts(notes), {0: {1}, 1: {0}, 2: {3}, 3: {2}, 4: set()})
+        self.assertEqual(layer_conflicts([]), {})
+
+    def test_02_coloring(self):
+        """测试着色是合法的，迭代贪心不增加颜色数，完全图的组数等于团下界"""
+        song = _random_song()
+        graph = layer_conflicts(song.notes)
+        colors = dsatur(graph)
+        refined = refine(graph, colors)
+        for coloring in (colors, refined):
+            for layer, neighbors in graph.items():
+                self.assertTrue(all(coloring[layer] != coloring[n] for n in neighbors))
+        self.assertLessEqual(len(set(refined.values())), len(set(colors.values())))
+
+        complete = {layer: set(range(5)) - {layer} for layer in range(5)}
+        self.assertEqual(clique_lower_bound(complete), 5)
+        self.assertEqual(len(set(dsatur(complete).values())), 5)
+
+        groups, bound = partition_layers(song.notes)
+        self.assertEqual(sorted(layer for group in groups for layer in group), sorted(graph))
+        self.assertGreaterEqual(len(groups), bound)
+
+    def test_03_group_config_without_overlaps(self):
+        """测试生成的 group_config 各组内没有位置冲突，各种生成模式下各组之间都互不重叠"""
+        song = _random_song()
+        for mode in ("default", "staircase", "dense", "serpentine"):
+            template = {
+                "base_coords": ("3", "-10", "5"),
+                "block": {"base": "minecraft:iron_block", "cover": "minecraft:iron_block"},
+                "generation_mode": mode,
+                "segment_length": 32,
+                "shared_clock": 7,
+            }
+            with self.subTest(mode=mode):
+                group_config, _ = partition_song(song, {}, template)
+                self.assertEqual(group_config[0]["base_coords"], ("3", "-10", "5"))
+                for group in group_config.values():
+                    self.assertEqual(group["generation_mode"], mode)
+                    self.assertNotIn("shared_clock", group)
+                    self.assertEqual(group["base_coords"][:2], ("3", "-10"))
+                    members = [note for note in song.notes if note.layer in group["layers"]]
+                    self.assertFalse(any(layer_conflicts(members).values()))
+                index = OverlapIndex(song.notes, song.header.song_length, {})
+                self.assertEqual(index.find_overlaps(group_config), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RCON 推送功能测试脚本
+使用进程内模拟服务器离线测试吞吐、限速、背压与重发
+"""
+
+import os
+import sys
+import unittest
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mcschematic import Version
+from pynbs import Note
+
+from nbs2save.core.core import GroupProcessor
+from nbs2save.core.fake_rcon import FakeRconServer
+from nbs2save.core.rcon import RconOutputStrategy, RconPushClient
+
+
+def _commands(count):
+    return [f"setblock {i} 0 0 minecraft:stone" for i in range(count)]
+
+
+def _final_state(commands):
+    """按顺序执行 setblock 命令后每个位置的方块。"""
+    state = {}
+    for command in commands:
+        _, x, y, z, block = command.split(" ", 4)
+        state[(x, y, z)] = block
+    return state
+
+
+class RCON_Functionality_Test(unittest.TestCase):
+    """RCON 推送功能测试类"""
+
+    def test_01_pipelined_pool_delivers_all(self):
+        """测试连接池流水线推送全部命令"""
+        commands = _commands(1000)
+        with FakeRconServer("pw") as server:
+            client = RconPushClient("127.0.0.1", server.port, "pw", pool_size=3)
+            stats = client.push(commands)
+
+        self.assertEqual(stats["acknowledged"], len(commands))
+        self.assertEqual(stats["failed"], 0)
+        self.assertEqual(sorted(server.commands), sorted(commands))
+        self.assertEqual(server.max_connections, 3)
+
+    def test_02_same_chunk_keeps_order(self):
+        """测试同一区块的命令在同一连接上按顺序执行"""
+        commands = [f"setblock 5 {y} 0 minecraft:stone" for y in range(200)]
+        with FakeRconServer("pw") as server:
+            RconPushClient("127.0.0.1", server.port, "pw", pool_size=4).push(commands)
+
+        self.assertEqual(server.commands, commands)
+
+    def test_03_retry_on_dropped_packets(self):
+        """测试丢包后按原顺序重发：同一位置被多次写入时最终状态与原命令顺序一致"""
+        blocks = ["minecraft:stone", "minecraft:iron_block", "note_block[note=0,instrument=harp]"]
+        # 每个位置连续写入覆盖方块、基座和音符盒，重发的命令若排在后面的命令之后会覆盖音符盒
+        commands = [f"setblock {i // 3 % 40} {i // 120} 0 {blocks[i % 3]}" for i in range(600)]
+        with FakeRconServer("pw", drop_every=37) as server:
+            client = RconPushClient("127.0.0.1", server.port, "pw", timeout=0.2)
+            stats = client.push(commands)
+
+        self.assertGreater(server.dropped, 0)
+        self.assertGreaterEqual(stats["retried"], server.dropped)
+        self.assertEqual(stats["failed"], 0)
+        self.assertEqual(_final_state(server.commands), _final_state(commands))
+
+    def test_04_rate_limit(self):
+        """测试每秒命令数上限"""
+        commands = _commands(300)
+        with FakeRconServer("pw") as server:
+            client = RconPushClient("127.0.0.1", server.port, "pw", commands_per_second=200)
+            stats = client.push(commands)
+
+        # 令牌桶允许一秒的突发，剩余 100 条至少需要 0.5 秒
+        self.assertGreaterEqual(stats["elapsed"], 0.45)
+
+    def test_05_backpressure(self):
+        """测试服务端处理缓慢时客户端受窗口限制而不丢命令"""
+        commands = _commands(200)
+        with FakeRconServer("pw", commands_per_second=400) as server:
+            client = RconPushClient("127.0.0.1", server.port, "pw", pool_size=1, max_in_flight=8)
+            stats = client.push(commands)
+
+        self.assertGreaterEqual(stats["elapsed"], 0.4)
+        self.assertEqual(server.commands, commands)
+
+    def test_06_wrong_password(self):
+        """测试密码错误"""
+        with FakeRconServer("pw") as server:
+            client = RconPushClient("127.0.0.1", server.port, "wrong")
+            with self.assertRaises(PermissionError):
+                client.push(_commands(1))
+
+    def test_07_pipelined_generation_push(self):
+        """测试流水线模式下边生成边推送，命令与一次性推送完全相同"""
+        notes = [Note(tick=t, layer=0, instrument=t % 16, key=45, panning=(t % 5 - 2) * 10) for t in range(300)]
+        group_config = {
+            0: {
+                "base_coords": ("0", "0", "0"),
+                "layers": [0],
+                "block": {"base": "minecraft:iron_block", "cover": "minecraft:iron_block"},
+            }
+        }
+
+        def push(**extra):
+            with FakeRconServer("pw") as server:
+                config = dict(
+                    output_file="unused",
+                    data_version=Version.JE_1_21_4,
+                    rcon_host="127.0.0.1",
+                    rcon_port=server.port,
+                    rcon_password="pw",
+                    rcon_pool_size=1,
+                    **extra,
+                )
+                processor = GroupProcessor(notes, 300, config, group_config)
+                processor.set_output_strategy(RconOutputStrategy())
+                processor.process()
+            return server.commands
+
+        self.assertEqual(push(pipeline_ticks=32), push())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+调色板重映射功能测试脚本
+验证重映射只改写调色板，结果与直接用新方块生成的 .schem 一致
+"""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mcschematic import MCSchematic, Version
+from pynbs import Note
+
+from nbs2save.core.core import GroupProcessor
+from nbs2save.core.remap import load_schematic_file, remap_schematic
+from nbs2save.core.schematic import SchematicOutputStrategy
+from nbs2save.core.tiling import schematic_blocks
+
+# 只用 0~5 号音色，乐器方块不与基座、覆盖方块重复
+NOTES = [
+    Note(tick=tick, layer=0, instrument=tick % 6, key=40 + tick % 10, panning=(tick % 5 - 2) * 20)
+    for tick in range(100)
+]
+
+
+def _generate(path, base, cover):
+    group_config = {
+        0: {"base_coords": ("0", "0", "0"), "layers": [0], "block": {"base": base, "cover": cover}},
+    }
+    processor = GroupProcessor(NOTES, 100, dict(output_file=path, data_version=Version.JE_1_21_4), group_config)
+    processor.set_output_strategy(SchematicOutputStrategy())
+    processor.process()
+    return path + ".schem"
+
+
+class Remap_Functionality_Test(unittest.TestCase):
+    """调色板重映射功能测试类"""
+
+    def test_01_rename_rewrites_palette_only(self):
+        """测试替换基座方块只改调色板（方块数据字节不变），结果与直接生成一致，并改写数据版本"""
+        with tempfile.TemporaryDirectory() as tmp:
+            source = _generate(os.path.join(tmp, "old"), "minecraft:quartz_block", "minecraft:smooth_stone")
+            expected = _generate(os.path.join(tmp, "new"), "minecraft:diamond_block", "minecraft:smooth_stone")
+            target = os.path.join(tmp, "remapped.schem")
+            changes = remap_schematic(source, target, {"quartz_block": "diamond_block"}, data_version=3953)
+
+            self.assertEqual(changes, {"minecraft:quartz_block": "minecraft:diamond_block"})
+            self.assertEqual(schematic_blocks(MCSchematic(target)), schematic_blocks(MCSchematic(expected)))
+            old_root, new_root = load_schematic_file(source), load_schematic_file(target)
+            self.assertEqual(list(old_root["BlockData"]), list(new_root["BlockData"]))
+            self.assertEqual(int(new_root["DataVersion"]), 3953)
+
+    def test_02_merged_entries_rewrite_data(self):
+        """测试两个调色板条目合并为同一方块时改写方块数据，结果与直接生成一致"""
+        with tempfile.TemporaryDirectory() as tmp:
+            source = _generate(os.path.join(tmp, "old"), "minecraft:quartz_block", "minecraft:smooth_stone")
+            expected = _generate(os.path.join(tmp, "new"), "minecraft:quartz_block", "minecraft:quartz_block")
+            target = io.BytesIO()
+            remap_schematic(source, target, {"minecraft:smooth_stone": "minecraft:quartz_block"})
+            target.seek(0)
+            root = load_schematic_file(target)
+            self.assertEqual(int(root["PaletteMax"]), len(root["Palette"]))
+            self.assertEqual(sorted(int(v) for v in root["Palette"].values()), list(range(len(root["Palette"]))))
+            target.seek(0)
+            merged = os.path.join(tmp, "merged.schem")
+            with open(merged, "wb") as f:
+                f.write(target.read())
+            self.assertEqual(schematic_blocks(MCSchematic(merged)), schematic_blocks(MCSchematic(expected)))
+
+    def test_03_instrument_block_rejected(self):
+        """测试要替换的方块同时是某个音色的乐器方块时拒绝重映射"""
+        with tempfile.TemporaryDirectory() as tmp:
+            source = _generate(os.path.join(tmp, "old"), "minecraft:quartz_block", "minecraft:smooth_stone")
+            with self.assertRaisesRegex(ValueError, "音色"):
+                remap_schematic(source, os.path.join(tmp, "out.schem"), {"minecraft:dirt": "minecraft:stone"})
+            self.assertFalse(os.path.exists(os.path.join(tmp, "out.schem")))
+
+
+if __name__ == "__main__":
+    unittest.main()
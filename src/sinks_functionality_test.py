@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+输出目标（sink）功能测试脚本
+验证写入文件对象与写入文件得到相同内容，以及阶梯模式轨道组与 sink 的组合
+"""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mcschematic import Version
+from pynbs import Note
+
+from nbs2save.core.core import GroupProcessor
+from nbs2save.core.mcfunction import McFunctionOutputStrategy
+from nbs2save.core.schematic import SchematicOutputStrategy
+
+NOTES = [
+    Note(tick=tick, layer=layer, instrument=0, key=45, panning=(tick % 3 - 1) * 20)
+    for tick in range(40)
+    for layer in (0, 1)
+]
+
+
+def _group_config(staircase=False):
+    block = {"base": "minecraft:iron_block", "cover": "minecraft:iron_block"}
+    return {
+        0: {"base_coords": ("0", "0", "0"), "layers": [0], "block": block},
+        1: {
+            "base_coords": ("0", "0", "20"),
+            "layers": [1],
+            "block": block,
+            "generation_mode": "staircase" if staircase else "default",
+        },
+    }
+
+
+def _run(strategy, output_file, output_type="schematic", staircase=False):
+    config = dict(output_file=output_file, data_version=Version.JE_1_21_4, type=output_type)
+    processor = GroupProcessor(NOTES, 40, config, _group_config(staircase))
+    processor.set_output_strategy(strategy)
+    processor.process()
+
+
+class Sinks_Functionality_Test(unittest.TestCase):
+    """输出目标功能测试类"""
+
+    def test_01_schematic_sink_matches_file(self):
+        """测试 .schem 写入 BytesIO 与写入文件的字节完全相同（含阶梯模式轨道组）"""
+        with tempfile.TemporaryDirectory() as tmp:
+            for staircase in (False, True):
+                path = os.path.join(tmp, f"song_{staircase}")
+                _run(SchematicOutputStrategy(), path, staircase=staircase)
+                sink = io.BytesIO()
+                _run(SchematicOutputStrategy(sink), os.path.join(tmp, "-"), staircase=staircase)
+                with open(path + ".schem", "rb") as f:
+                    self.assertEqual(sink.getvalue(), f.read())
+            self.assertFalse(os.path.exists(os.path.join(tmp, "-.schem")))
+
+    def test_02_mcfunction_sink_matches_file(self):
+        """测试 .mcfunction 写入 StringIO 与写入文件的文本完全相同"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "song")
+            _run(McFunctionOutputStrategy(), path, "mcfunction")
+            sink = io.StringIO()
+            _run(McFunctionOutputStrategy(sink), os.path.join(tmp, "-"), "mcfunction")
+            with open(path + ".mcfunction", encoding="utf-8") as f:
+                self.assertEqual(sink.getvalue(), f.read())
+
+    def test_03_staircase_needs_own_file_rejects_sink(self):
+        """测试默认策略没有结构数据（mcfunction）时，阶梯模式轨道组拒绝 sink，不会写出名为 - 的文件"""
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaisesRegex(ValueError, "sink"):
+                _run(McFunctionOutputStrategy(io.StringIO()), os.path.join(tmp, "-"), "mcfunction", staircase=True)
+            self.assertEqual(os.listdir(tmp), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+声像吸附功能测试脚本
+验证重新量化后的偏移保持顺序与区分度、不越过中央，且报告的节省量与实际生成的方块数一致
+"""
+
+import os
+import random
+import sys
+import unittest
+from collections import defaultdict
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mcschematic import Version
+from pynbs import Note
+
+from nbs2save.core.core import GroupProcessor
+from nbs2save.core.schematic import SchematicOutputStrategy
+from nbs2save.core.snap import snap_distances, snap_pans
+from nbs2save.core.tiling import schematic_blocks
+
+
+def _random_notes(ticks, seed=1):
+    """每个 tick 最多 4 个互不冲突的音符，偏移在 -10~10 之间随机。"""
+    rng = random.Random(seed)
+    notes = []
+    for tick in range(ticks):
+        used = set()
+        for layer in range(4):
+            pan = rng.randint(-10, 10)
+            if pan not in used:
+                used.add(pan)
+                notes.append(Note(tick=tick, layer=layer, instrument=0, key=45, panning=pan * 10))
+    return notes
+
+
+class Snap_Functionality_Test(unittest.TestCase):
+    """声像吸附功能测试类"""
+
+    def test_01_order_and_distinctness_kept(self):
+        """测试同一 tick 同侧的偏移保持顺序且互不相同，相同的仍相同，误差不超过上限且不越过中央"""
+        notes = _random_notes(300) + [Note(tick=5, layer=9, instrument=0, key=45, panning=0)]
+        for max_error in (1, 2, 4):
+            result, moved, _ = snap_pans(notes, max_error)
+            self.assertEqual(moved, sum(a.panning != b.panning for a, b in zip(notes, result)))
+            by_tick = defaultdict(list)
+            for old, new in zip(notes, result):
+                self.assertEqual((old.tick, old.layer), (new.tick, new.layer))
+                old_pan, new_pan = old.panning // 10, new.panning // 10
+                self.assertLessEqual(abs(old_pan - new_pan), max_error)
+                self.assertEqual((old_pan > 0, old_pan < 0), (new_pan > 0, new_pan < 0))
+                by_tick[old.tick].append((old_pan, new_pan))
+            for pairs in by_tick.values():
+                for a_old, a_new in pairs:
+                    for b_old, b_new in pairs:
+                        if a_old < b_old:
+                            self.assertLess(a_new, b_new)
+
+    def test_02_minimal_distances(self):
+        """测试逐个取最小可行距离"""
+        self.assertEqual(snap_distances([3, 4, 9], 2), {3: 1, 4: 2, 9: 7})
+        self.assertEqual(snap_distances([1, 2, 3], 5), {1: 1, 2: 2, 3: 3})
+
+    def test_03_saving_matches_generated_blocks(self):
+        """测试报告的声像平台节省量等于实际生成的方块数之差"""
+        notes = _random_notes(200)
+        group_config = {
+            0: {
+                "base_coords": ("0", "0", "0"),
+                "layers": [0, 1, 2, 3],
+                "block": {"base": "minecraft:iron_block", "cover": "minecraft:iron_block"},
+            }
+        }
+
+        def count(**extra):
+            config = dict(output_file="unused", data_version=Version.JE_1_21_4, **extra)
+            processor = GroupProcessor(notes, 200, config, group_config)
+            strategy = SchematicOutputStrategy()
+            processor.set_output_strategy(strategy)
+            processor.generate()
+            return len(schematic_blocks(strategy.schem))
+
+        _, _, (before, after) = snap_pans(notes, 2)
+        self.assertGreater(before, after)
+        self.assertEqual(count() - count(pan_snap=2), before - after)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+原版结构导出功能测试脚本
+验证按放置函数放置全部 .nbt 结构后与 .schem 输出的方块完全一致
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import nbtlib
+from mcschematic import MCSchematic, Version
+from pynbs import Note
+
+from nbs2save.core.anvil import palette_key
+from nbs2save.core.core import GroupProcessor
+from nbs2save.core.nbt_utils import block_state_compound
+from nbs2save.core.schematic import SchematicOutputStrategy
+from nbs2save.core.structure import MAX_STRUCTURE_SIZE, StructureOutputStrategy
+from nbs2save.core.tiling import schematic_blocks
+
+NOTES = [
+    Note(tick=tick, layer=0, instrument=tick % 16, key=33 + tick % 25, panning=(tick % 9 - 4) * 10)
+    for tick in range(150)
+]
+GROUP_CONFIG = {
+    0: {
+        "base_coords": ("-20", "3", "-50"),
+        "layers": [0],
+        "block": {"base": "minecraft:red_sand", "cover": "minecraft:iron_block"},
+    }
+}
+
+
+def _generate(strategy, output_file):
+    config = dict(output_file=output_file, data_version=Version.JE_1_21_4)
+    processor = GroupProcessor(NOTES, 150, config, GROUP_CONFIG)
+    processor.set_output_strategy(strategy)
+    processor.process()
+
+
+def _place_structures(output_file):
+    """按 <output_file>_place.mcfunction 中的 place template 命令放置全部结构，返回 {坐标: palette_key}。"""
+    structure_dir = output_file + "_structures"
+    blocks = {}
+    with open(output_file + "_place.mcfunction", encoding="utf-8") as f:
+        commands = f.read().split("\n")[:-1]
+    for command in commands:
+        _, _, template, x, y, z = command.split(" ")
+        name = template.split(":", 1)[1]
+        root = nbtlib.load(os.path.join(structure_dir, name + ".nbt"))
+        size = [int(v) for v in root["size"]]
+        assert max(size) <= MAX_STRUCTURE_SIZE
+        palette = [palette_key(entry) for entry in root["palette"]]
+        for entry in root["blocks"]:
+            pos = [int(v) for v in entry["pos"]]
+            assert all(0 <= p < s for p, s in zip(pos, size))
+            world = (int(x) + pos[0], int(y) + pos[1], int(z) + pos[2])
+            assert world not in blocks
+            blocks[world] = palette[int(entry["state"])]
+    return blocks
+
+
+class Structure_Functionality_Test(unittest.TestCase):
+    """原版结构导出功能测试类"""
+
+    def test_01_placed_structures_match_schem(self):
+        """测试依次放置全部结构后与 .schem 输出的方块完全一致，且每个结构不超过 48³"""
+        with tempfile.TemporaryDirectory() as tmp:
+            _generate(SchematicOutputStrategy(), os.path.join(tmp, "song"))
+            expected = {
+                pos: palette_key(block_state_compound(block))
+                for pos, block in schematic_blocks(MCSchematic(os.path.join(tmp, "song.schem"))).items()
+            }
+            _generate(StructureOutputStrategy(), os.path.join(tmp, "My Song"))
+            self.assertEqual(_place_structures(os.path.join(tmp, "My Song")), expected)
+            self.assertIn("my_song_000.nbt", os.listdir(os.path.join(tmp, "My Song_structures")))
+
+    def test_02_template_name_sanitized(self):
+        """测试结构ID只保留小写字母、数字和 _-. 字符"""
+        self.assertEqual(StructureOutputStrategy.get_template_name("My Song.v2"), "my_song.v2")
+        self.assertEqual(StructureOutputStrategy.get_template_name("小星星"), "___")
+
+
+if __name__ == "__main__":
+    unittest.main()
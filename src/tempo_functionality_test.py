@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+速度重映射功能测试脚本
+验证红石刻取整方式与重映射后跨轨道的位置冲突处理
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mcschematic import Version
+from pynbs import Note
+
+from nbs2save.core.core import GroupProcessor
+from nbs2save.core.mcfunction import McFunctionOutputStrategy
+from nbs2save.core.tempo import drop_slot_conflicts, quantize_ticks
+
+
+class Tempo_Functionality_Test(unittest.TestCase):
+    """速度重映射功能测试类"""
+
+    def test_01_round_half_up(self):
+        """测试 20 t/s 下间隔 0.1 秒的 tick 不会因四舍六入五成双而合并"""
+        slots, errors = quantize_ticks(np.array([1, 3, 5, 7, 9, 11]), 20.0)
+        self.assertEqual(slots.tolist(), [1, 2, 3, 4, 5, 6])
+        self.assertTrue(np.allclose(errors, 0.05))
+
+    def test_02_cross_layer_conflict(self):
+        """测试不同轨道合并到同一位置时只保留轨道编号小的音符"""
+        notes = [
+            Note(tick=4, layer=1, instrument=0, key=50, panning=0),
+            Note(tick=3, layer=0, instrument=0, key=45, panning=0),
+        ]
+        slots, _ = quantize_ticks(np.array([note.tick for note in notes]), 20.0)
+        merged = [
+            Note(tick=int(slot), layer=note.layer, instrument=note.instrument, key=note.key, panning=note.panning)
+            for note, slot in zip(notes, slots)
+        ]
+        kept, dropped = drop_slot_conflicts(merged)
+        self.assertEqual([note.layer for note in kept], [0])
+        self.assertEqual([note.layer for note in dropped], [1])
+
+    def test_03_generate_after_remap(self):
+        """测试重映射后同组不同轨道落在同一红石刻时生成不再报位置冲突"""
+        notes = [
+            Note(tick=3, layer=0, instrument=0, key=45, panning=0),
+            Note(tick=4, layer=1, instrument=0, key=50, panning=0),
+            Note(tick=8, layer=1, instrument=0, key=52, panning=0),
+        ]
+        group_config = {
+            0: {
+                "base_coords": ("0", "0", "0"),
+                "layers": [0, 1],
+                "block": {"base": "minecraft:iron_block", "cover": "minecraft:iron_block"},
+            }
+        }
+        with tempfile.TemporaryDirectory() as folder:
+            config = dict(
+                output_file=os.path.join(folder, "song"),
+                data_version=Version.JE_1_21_4,
+                tempo_remap=True,
+            )
+            processor = GroupProcessor(notes, 8, config, group_config, tempo=20.0)
+            processor.set_output_strategy(McFunctionOutputStrategy())
+            processor.generate()
+            self.assertEqual(len(processor.notes), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分片导出功能测试脚本
+验证分片恰好覆盖全部方块、包围盒正确，以及分片 .schem 读回后拼成原结构（含流水线模式）
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mcschematic import MCSchematic, Version
+from pynbs import Note
+
+from nbs2save.core.core import GroupProcessor
+from nbs2save.core.schematic import SchematicOutputStrategy
+from nbs2save.core.tiling import bounding_box, schematic_blocks, split_into_tiles
+
+NOTES = [
+    Note(tick=tick, layer=0, instrument=tick % 16, key=45, panning=(tick % 7 - 3) * 10) for tick in range(200)
+]
+GROUP_CONFIG = {
+    0: {
+        "base_coords": ("-40", "0", "-20"),
+        "layers": [0],
+        "block": {"base": "minecraft:iron_block", "cover": "minecraft:iron_block"},
+    }
+}
+
+
+def _generate(output_file, **extra):
+    """按配置生成并保存 .schem（或分片）。"""
+    config = dict(output_file=output_file, data_version=Version.JE_1_21_4, **extra)
+    processor = GroupProcessor(NOTES, 200, config, GROUP_CONFIG)
+    processor.set_output_strategy(SchematicOutputStrategy())
+    processor.process()
+
+
+def _read_tiles(output_file):
+    """读回分片清单中的全部分片（分片 .schem 自带偏移，读回即为世界坐标），同时检查清单中的偏移与尺寸。"""
+    with open(output_file + "_tiles.json", encoding="utf-8") as f:
+        manifest = json.load(f)
+    blocks = {}
+    for tile in manifest["tiles"]:
+        tile_blocks = schematic_blocks(MCSchematic(os.path.join(os.path.dirname(output_file), tile["file"])))
+        min_corner, max_corner = bounding_box(tile_blocks)
+        assert list(min_corner) == tile["offset"]
+        assert [b - a + 1 for a, b in zip(min_corner, max_corner)] == tile["size"]
+        assert not blocks.keys() & tile_blocks.keys()
+        blocks.update(tile_blocks)
+    return manifest, blocks
+
+
+class Tiling_Functionality_Test(unittest.TestCase):
+    """分片导出功能测试类"""
+
+    def test_01_tiles_cover_all_blocks(self):
+        """测试每个方块恰好落在一个分片中，分片包围盒不越过网格边界"""
+        rng = random.Random(0)
+        blocks = {
+            (rng.randint(-70, 70), rng.randint(-5, 5), rng.randint(-40, 40)): "minecraft:stone" for _ in range(2000)
+        }
+        tiles = split_into_tiles(blocks, (32, None, 16))
+        merged = {}
+        for tile in tiles:
+            self.assertFalse(merged.keys() & tile.blocks.keys())
+            merged.update(tile.blocks)
+            (x0, _, z0), (x1, _, z1) = tile.bounds
+            self.assertEqual((x0 // 32, x1 // 32, z0 // 16, z1 // 16), (tile.key[0],) * 2 + (tile.key[2],) * 2)
+            self.assertEqual(tile.bounds, bounding_box(tile.blocks))
+        self.assertEqual(merged, blocks)
+        keys = [(tile.key[0], tile.key[2]) for tile in tiles]
+        self.assertEqual(keys, sorted(keys))
+
+    def test_02_tiled_schem_round_trip(self):
+        """测试分片 .schem 读回后与单个 .schem 的方块完全一致，流水线模式写出相同的分片"""
+        with tempfile.TemporaryDirectory() as tmp:
+            single = os.path.join(tmp, "single")
+            _generate(single)
+            expected = schematic_blocks(MCSchematic(single + ".schem"))
+            manifests = []
+            for name, extra in (("tiled", {}), ("pipelined", {"pipeline_ticks": 16})):
+                path = os.path.join(tmp, name)
+                _generate(path, tile_size=32, **extra)
+                manifest, blocks = _read_tiles(path)
+                self.assertEqual(blocks, expected)
+                manifests.append(sorted((tile["offset"], tile["blocks"]) for tile in manifest["tiles"]))
+            self.assertEqual(manifests[0], manifests[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
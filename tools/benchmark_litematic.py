@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+.litematic 与 .schem 输出性能对比
+
+对同一首曲子分别执行 .schem 与 .litematic 输出，统计生成与保存耗时、文件大小，
+并校验 .litematic 解包后的方块与 .schem 完全一致。未指定曲子时生成一首随机测试曲。
+
+运行:
+    python tools/benchmark_litematic.py [曲子.nbs] [--ticks 20000] [--groups 4]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import nbtlib
+import pynbs
+from mcschematic import Version
+
+from nbs2save.core.core import GroupProcessor
+from nbs2save.core.litematic import LitematicOutputStrategy, read_litematic_region
+from nbs2save.core.schematic import SchematicOutputStrategy
+from nbs2save.core.tiling import schematic_blocks
+
+
+def make_song(ticks: int, groups: int):
+    """生成随机测试曲：每个轨道组 4 条轨道，每个 tick 0~3 个音符。"""
+    rng = random.Random(0)
+    song = pynbs.new_file(song_name="benchmark")
+    for tick in range(ticks):
+        for group_id in range(groups):
+            # 同一 tick 同一声像位置只放一个音符，避免位置冲突
+            pans = rng.sample(range(-10, 11), rng.randrange(4))
+            for layer, pan in enumerate(pans, group_id * 4):
+                song.notes.append(
+                    pynbs.Note(tick=tick, layer=layer, instrument=rng.randrange(16), key=rng.randrange(33, 58), panning=pan * 10)
+                )
+    song.header.song_length = ticks
+    return song
+
+
+def group_config(groups: int):
+    return {
+        group_id: {
+            "base_coords": ("0", str(group_id * 8), "0"),
+            "layers": list(range(group_id * 4, group_id * 4 + 4)),
+            "block": {"base": "minecraft:iron_block", "cover": "minecraft:iron_block"},
+            "generation_mode": "default",
+        }
+        for group_id in range(groups)
+    }
+
+
+def run(strategy, song, groups: int, output_file: str):
+    config = {"type": "schematic", "output_file": output_file, "data_version": Version.JE_1_21_4}
+    processor = GroupProcessor(song.notes, song.header.song_length, config, group_config(groups))
+    processor.set_output_strategy(strategy)
+    start = time.perf_counter()
+    processor.generate()
+    generated = time.perf_counter()
+    processor._finalize_strategies()
+    saved = time.perf_counter()
+    return generated - start, saved - generated
+
+
+def litematic_blocks(path: str):
+    """把 .litematic 解包为 {世界坐标: 方块ID}（以 .schem 相同的原点对齐）。"""
+    root = nbtlib.load(path)
+    blocks = {}
+    for region in root["Regions"].values():
+        (px, py, pz), (sx, sy, sz), palette, values = read_litematic_region(region)
+        for index, value in enumerate(values.tolist()):
+            if value:
+                y, rest = divmod(index, sx * sz)
+                z, x = divmod(rest, sx)
+                blocks[(px + x, py + y, pz + z)] = palette[value]
+    return blocks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("song", nargs="?", help=".nbs 文件（省略时生成随机测试曲）")
+    parser.add_argument("--ticks", type=int, default=20000)
+    parser.add_argument("--groups", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.song:
+        song = pynbs.read(args.song)
+        groups = max(1, (max(n.layer for n in song.notes) + 4) // 4)
+    else:
+        song, groups = make_song(args.ticks, args.groups), args.groups
+    print(f"曲子: {song.header.song_length} tick, {len(song.notes)} 个音符, {groups} 个轨道组")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        schem = SchematicOutputStrategy()
+        schem_times = run(schem, song, groups, os.path.join(tmp, "song"))
+        litematic = LitematicOutputStrategy()
+        litematic_times = run(litematic, song, groups, os.path.join(tmp, "song"))
+
+        schem_size = os.path.getsize(os.path.join(tmp, "song.schem"))
+        litematic_size = os.path.getsize(os.path.join(tmp, "song.litematic"))
+        print(f"{'格式':<12}{'生成(s)':>10}{'保存(s)':>10}{'大小(KB)':>12}")
+        print(f"{'.schem':<12}{schem_times[0]:>10.2f}{schem_times[1]:>10.2f}{schem_size / 1024:>12.1f}")
+        print(f"{'.litematic':<12}{litematic_times[0]:>10.2f}{litematic_times[1]:>10.2f}{litematic_size / 1024:>12.1f}")
+
+        expected = schematic_blocks(schem.schem)
+        min_corner = tuple(min(c) for c in zip(*expected))
+        expected = {tuple(a - b for a, b in zip(pos, min_corner)): block.split("[")[0] for pos, block in expected.items()}
+        actual = litematic_blocks(os.path.join(tmp, "song.litematic"))
+        print("校验:", "一致" if actual == expected else "不一致!")
+        return 0 if actual == expected else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())